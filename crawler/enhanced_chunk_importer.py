@@ -1,241 +1,174 @@
 #!/usr/bin/env python3
 """
 Enhanced Chunk Importer for Ptolemies Knowledge Graph
-Imports 292 chunks from SurrealDB into Neo4j with full-text search capabilities
+Streams chunks from SurrealDB into Neo4j with full-text search capabilities
 """
 
+import argparse
 import asyncio
-import subprocess
-import json
-from typing import List, Dict, Any
+import sys
+from pathlib import Path
+from typing import Dict, Any
 from datetime import datetime
 import re
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from graph_bulk_import import (
+    AdminImportWriter,
+    BulkImportConfig,
+    Neo4jBulkWriter,
+    SurrealRowStream
+)
+
+CHUNK_FIELDS = [
+    "id", "source_name", "source_url", "title", "content", "chunk_index",
+    "total_chunks", "quality_score", "topics", "created_at"
+]
+
+CHUNK_PROPERTIES = [
+    "source_name", "title", "content", "url", "chunk_index", "total_chunks",
+    "quality_score", "word_count", "char_count", "has_code", "has_examples",
+    "topics[]", "created_at"
+]
+
+CHUNK_QUERY = """
+UNWIND $rows AS row
+MERGE (c:Chunk {id: row.id})
+SET c.source_name = row.source_name,
+    c.title = row.title,
+    c.content = row.content,
+    c.url = row.url,
+    c.chunk_index = row.chunk_index,
+    c.total_chunks = row.total_chunks,
+    c.quality_score = row.quality_score,
+    c.word_count = row.word_count,
+    c.char_count = row.char_count,
+    c.has_code = row.has_code,
+    c.has_examples = row.has_examples,
+    c.topics = row.topics,
+    c.created_at = datetime(row.created_at),
+    c.imported_at = datetime()
+WITH c, row
+// Link chunk to source
+MATCH (s:Source {name: row.source_name})
+MERGE (s)-[r:HAS_CHUNK]->(c)
+SET r.imported_at = datetime()
+WITH c
+// Link chunk to topics
+UNWIND c.topics as topic_name
+MATCH (t:Topic {name: topic_name})
+MERGE (c)-[rt:COVERS_TOPIC]->(t)
+SET rt.confidence = 0.8
+"""
+
 class EnhancedChunkImporter:
-    def __init__(self, neo4j_uri="bolt://localhost:7687", neo4j_user="neo4j", neo4j_password="ptolemies"):
-        self.neo4j_uri = neo4j_uri
-        self.neo4j_user = neo4j_user
-        self.neo4j_password = neo4j_password
-        
-    def run_surreal_query(self, query: str) -> List[Dict[str, Any]]:
-        """Execute SurrealDB query and return results."""
-        cmd = [
-            'surreal', 'sql',
-            '--conn', 'ws://localhost:8000/rpc',
-            '--user', 'root',
-            '--pass', 'root',
-            '--ns', 'ptolemies',
-            '--db', 'knowledge',
-            '--json'
-        ]
-        
-        try:
-            result = subprocess.run(
-                cmd,
-                input=query,
-                text=True,
-                capture_output=True,
-                timeout=60
-            )
-            
-            if result.returncode == 0:
-                output = result.stdout.strip()
-                if output:
-                    try:
-                        data = json.loads(output)
-                        if isinstance(data, list) and len(data) > 0:
-                            result_data = data[0]
-                            if isinstance(result_data, dict):
-                                return result_data.get('result', [])
-                            elif isinstance(result_data, list):
-                                return result_data
-                    except json.JSONDecodeError as e:
-                        print(f"JSON decode error: {e}")
-            return []
-            
-        except Exception as e:
-            print(f"SurrealDB query failed: {e}")
-            return []
-    
-    def run_cypher_query(self, query: str, database: str = "neo4j") -> bool:
-        """Execute Cypher query in Neo4j."""
-        cmd = [
-            'cypher-shell',
-            '-a', self.neo4j_uri,
-            '-u', self.neo4j_user,
-            '-p', self.neo4j_password,
-            '-d', database
-        ]
-        
-        try:
-            result = subprocess.run(
-                cmd,
-                input=query,
-                text=True,
-                capture_output=True,
-                timeout=30
-            )
-            
-            if result.returncode == 0:
-                return True
-            else:
-                print(f"Cypher error: {result.stderr}")
-                return False
-                
-        except Exception as e:
-            print(f"Neo4j query failed: {e}")
-            return False
+    def __init__(self, neo4j_uri="bolt://localhost:7687", neo4j_user="neo4j", neo4j_password="ptolemies",
+                 batch_size: int = 500, workers: int = 4):
+        self.config = BulkImportConfig.from_env(
+            neo4j_uri=neo4j_uri,
+            neo4j_user=neo4j_user,
+            neo4j_password=neo4j_password,
+            batch_size=batch_size,
+            workers=workers
+        )
+        self.surreal = SurrealRowStream(self.config)
+        self.writer = Neo4jBulkWriter(self.config)
     
     def clean_text(self, text: str) -> str:
         """Clean text for Neo4j storage."""
         if not text:
             return ""
-        # Escape single quotes and clean problematic characters
-        text = str(text).replace("'", "''").replace("\\", "\\\\")
         # Remove control characters
-        text = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', text)
+        text = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', str(text))
         # Limit length to prevent memory issues
         return text[:2000] if len(text) > 2000 else text
     
-    async def fetch_all_chunks_enhanced(self) -> List[Dict[str, Any]]:
-        """Fetch all chunks with enhanced metadata."""
-        print("📊 Fetching all 292 chunks from SurrealDB...")
-        
-        query = """
-        SELECT 
-            id,
-            source_name,
-            source_url,
-            title,
-            content,
-            chunk_index,
-            total_chunks,
-            quality_score,
-            topics,
-            created_at
-        FROM document_chunks
-        ORDER BY source_name, chunk_index;
-        """
-        
-        chunks = self.run_surreal_query(query)
-        print(f"✅ Fetched {len(chunks)} chunks from SurrealDB")
-        
-        # Enhance chunks with additional metadata
-        enhanced_chunks = []
-        for chunk in chunks:
-            enhanced = chunk.copy()
-            
-            # Add content analysis
-            content = str(chunk.get('content', ''))
-            enhanced['word_count'] = len(content.split())
-            enhanced['char_count'] = len(content)
-            enhanced['has_code'] = 'def ' in content or 'function' in content or 'class ' in content
-            enhanced['has_examples'] = 'example' in content.lower() or 'tutorial' in content.lower()
-            
-            # Clean content for Neo4j
-            enhanced['content_clean'] = self.clean_text(content)
-            enhanced['title_clean'] = self.clean_text(chunk.get('title', ''))
-            
-            enhanced_chunks.append(enhanced)
-        
-        return enhanced_chunks
+    def enhance_chunk(self, chunk: Dict[str, Any]) -> Dict[str, Any]:
+        """Chunk node properties with content analysis metadata."""
+        content = str(chunk.get('content', ''))
+        
+        return {
+            "id": chunk['id'],
+            "source_name": chunk.get('source_name', ''),
+            "title": self.clean_text(chunk.get('title', '')),
+            "content": self.clean_text(content),
+            "url": self.clean_text(chunk.get('source_url', '')),
+            "chunk_index": chunk.get('chunk_index', 0),
+            "total_chunks": chunk.get('total_chunks', 1),
+            "quality_score": chunk.get('quality_score', 0.5),
+            "word_count": len(content.split()),
+            "char_count": len(content),
+            "has_code": 'def ' in content or 'function' in content or 'class ' in content,
+            "has_examples": 'example' in content.lower() or 'tutorial' in content.lower(),
+            "topics": [self.clean_text(str(t)) for t in (chunk.get('topics') or [])[:10]],
+            "created_at": str(chunk.get('created_at') or datetime.now().isoformat())
+        }
     
-    def create_chunk_with_fulltext(self, chunk: Dict[str, Any], batch_size: int = 50) -> str:
-        """Generate Cypher query to create chunk with full-text search capabilities."""
-        chunk_id = chunk['id']
-        source_name = chunk.get('source_name', '')
-        title = chunk.get('title_clean', '')
-        content = chunk.get('content_clean', '')
-        url = self.clean_text(chunk.get('source_url', ''))
-        
-        # Build topics array
-        topics = chunk.get('topics', [])
-        topics_str = "[" + ", ".join([f"'{self.clean_text(str(t))}'" for t in topics[:10]]) + "]"
+    async def stream_chunks_enhanced(self):
+        """Stream all chunks from SurrealDB with enhanced metadata."""
+        async for chunk in self.surreal.stream(
+            "document_chunks",
+            fields=CHUNK_FIELDS,
+            order_by="source_name, chunk_index"
+        ):
+            yield self.enhance_chunk(chunk)
+    
+    async def import_chunks(self) -> int:
+        """Stream chunks into Neo4j in parallel UNWIND batches."""
+        print(f"📦 Importing chunks in batches of {self.config.batch_size} "
+              f"across {self.config.workers} workers...")
         
-        query = f"""
-        CREATE (c:Chunk {{
-            id: '{chunk_id}',
-            source_name: '{self.clean_text(source_name)}',
-            title: '{title}',
-            content: '{content}',
-            url: '{url}',
-            chunk_index: {chunk.get('chunk_index', 0)},
-            total_chunks: {chunk.get('total_chunks', 1)},
-            quality_score: {chunk.get('quality_score', 0.5)},
-            word_count: {chunk.get('word_count', 0)},
-            char_count: {chunk.get('char_count', 0)},
-            has_code: {str(chunk.get('has_code', False)).lower()},
-            has_examples: {str(chunk.get('has_examples', False)).lower()},
-            topics: {topics_str},
-            created_at: datetime('{chunk.get('created_at', datetime.now().isoformat())}'),
-            imported_at: datetime()
-        }})
-        """
+        stats = await self.writer.write(CHUNK_QUERY, self.stream_chunks_enhanced())
+        if stats.failed_batches:
+            print(f"❌ {stats.failed_batches} batches failed: {stats.errors[0]}")
+        print(f"✅ {stats.batches} batches completed in {stats.elapsed_seconds:.1f}s")
         
-        return query
+        return stats.rows
     
-    def create_chunk_relationships(self, source_name: str, chunk_id: str) -> str:
-        """Create relationships between chunk and existing nodes."""
-        return f"""
-        // Link chunk to source
-        MATCH (s:Source {{name: '{self.clean_text(source_name)}'}}),
-              (c:Chunk {{id: '{chunk_id}'}})
-        MERGE (s)-[r:HAS_CHUNK]->(c)
-        SET r.imported_at = datetime()
+    async def export_admin_csv(self, output_dir: str) -> int:
+        """Write neo4j-admin import CSVs for chunks and their Source/Topic links (cold loads).
         
-        WITH c
-        // Link chunk to topics
-        UNWIND c.topics as topic_name
-        MATCH (t:Topic {{name: topic_name}})
-        MERGE (c)-[rt:COVERS_TOPIC]->(t)
-        SET rt.confidence = 0.8
+        ``neo4j-admin import`` needs an empty database, so the Source and
+        Topic nodes the bolt path matches against are written here too.
         """
+        admin = AdminImportWriter(output_dir)
+        source_counts: Dict[str, int] = {}
+        chunk_sources = []
+        chunk_topics = []
+        
+        async def chunks():
+            async for row in self.stream_chunks_enhanced():
+                if row["source_name"]:
+                    source_counts[row["source_name"]] = source_counts.get(row["source_name"], 0) + 1
+                    chunk_sources.append({"start": row["source_name"], "end": row["id"]})
+                for topic in dict.fromkeys(t for t in row["topics"] if t):
+                    chunk_topics.append({"start": row["id"], "end": topic, "confidence": 0.8})
+                yield row
+        
+        count = await admin.write_nodes("Chunk", chunks(), "id", CHUNK_PROPERTIES, id_space="Chunk")
+        await admin.write_nodes("Source",
+                                [{"name": name, "chunk_count": n} for name, n in sorted(source_counts.items())],
+                                "name", ["chunk_count"], id_space="Source")
+        await admin.write_nodes("Topic",
+                                [{"name": topic} for topic in sorted({r["end"] for r in chunk_topics})],
+                                "name", [], id_space="Topic")
+        await admin.write_relationships("HAS_CHUNK", chunk_sources,
+                                        start_id_space="Source", end_id_space="Chunk")
+        await admin.write_relationships("COVERS_TOPIC", chunk_topics, properties=["confidence"],
+                                        start_id_space="Chunk", end_id_space="Topic")
+        print("Load into an empty (stopped) database with:")
+        print("  " + " ".join(admin.command(self.config.neo4j_database)))
+        return count
     
-    async def import_chunks_batch(self, chunks: List[Dict[str, Any]], batch_size: int = 10):
-        """Import chunks in batches to avoid memory issues."""
-        total_chunks = len(chunks)
-        imported_count = 0
-        
-        print(f"📦 Importing {total_chunks} chunks in batches of {batch_size}...")
-        
-        for i in range(0, total_chunks, batch_size):
-            batch = chunks[i:i + batch_size]
-            batch_num = (i // batch_size) + 1
-            total_batches = (total_chunks + batch_size - 1) // batch_size
-            
-            print(f"Processing batch {batch_num}/{total_batches} ({len(batch)} chunks)...")
-            
-            # Create batch query
-            batch_queries = []
-            for chunk in batch:
-                chunk_query = self.create_chunk_with_fulltext(chunk)
-                batch_queries.append(chunk_query)
-            
-            # Execute batch create
-            combined_query = "\n".join(batch_queries)
-            if self.run_cypher_query(combined_query):
-                # Create relationships for this batch
-                for chunk in batch:
-                    rel_query = self.create_chunk_relationships(
-                        chunk['source_name'], 
-                        chunk['id']
-                    )
-                    self.run_cypher_query(rel_query)
-                
-                imported_count += len(batch)
-                print(f"✅ Batch {batch_num} completed. Total imported: {imported_count}/{total_chunks}")
-            else:
-                print(f"❌ Batch {batch_num} failed")
-        
-        return imported_count
-    
-    def setup_fulltext_indexes(self):
+    async def setup_fulltext_indexes(self):
         """Create full-text search indexes for chunks."""
         print("🔍 Setting up full-text search indexes...")
         
         indexes = [
             "CREATE FULLTEXT INDEX chunk_content_search IF NOT EXISTS FOR (c:Chunk) ON EACH [c.content]",
             "CREATE FULLTEXT INDEX chunk_title_search IF NOT EXISTS FOR (c:Chunk) ON EACH [c.title]", 
+            "CREATE CONSTRAINT chunk_id_unique IF NOT EXISTS FOR (c:Chunk) REQUIRE c.id IS UNIQUE",
             "CREATE INDEX chunk_source IF NOT EXISTS FOR (c:Chunk) ON (c.source_name)",
             "CREATE INDEX chunk_quality IF NOT EXISTS FOR (c:Chunk) ON (c.quality_score)",
             "CREATE INDEX chunk_word_count IF NOT EXISTS FOR (c:Chunk) ON (c.word_count)",
@@ -244,10 +177,11 @@ class EnhancedChunkImporter:
         ]
         
         for index_query in indexes:
-            if self.run_cypher_query(index_query):
+            try:
+                await self.writer.run(index_query)
                 print(f"✅ Created index")
-            else:
-                print(f"❌ Failed to create index")
+            except Exception as e:
+                print(f"❌ Failed to create index: {e}")
     
     async def verify_import(self):
         """Verify the chunk import."""
@@ -262,37 +196,49 @@ class EnhancedChunkImporter:
         
         for query in verification_queries:
             print(f"Query: {query}")
-            # We'll just prepare the queries for manual execution in Neo4j Browser
+            for record in await self.writer.run(query):
+                print(f"  {record}")
 
 async def main():
     """Main execution function."""
+    parser = argparse.ArgumentParser(description="Import SurrealDB chunks into Neo4j")
+    parser.add_argument("--admin-csv", metavar="DIR",
+                        help="write neo4j-admin import CSVs to DIR instead of importing over bolt")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    
     print("🚀 Starting Enhanced Chunk Import for Ptolemies Knowledge Graph")
     print("=" * 70)
     
-    importer = EnhancedChunkImporter()
+    importer = EnhancedChunkImporter(batch_size=args.batch_size, workers=args.workers)
     
     try:
-        # Setup full-text indexes first
-        importer.setup_fulltext_indexes()
-        
-        # Fetch all chunks from SurrealDB
-        chunks = await importer.fetch_all_chunks_enhanced()
-        
-        if not chunks:
-            print("❌ No chunks found in SurrealDB")
-            return
-        
-        # Import chunks in batches
-        imported_count = await importer.import_chunks_batch(chunks, batch_size=5)
-        
-        print(f"\n✅ Import Complete!")
-        print(f"📊 Successfully imported {imported_count}/{len(chunks)} chunks")
-        
-        # Verify import
-        await importer.verify_import()
+        async with importer.surreal:
+            if args.admin_csv:
+                count = await importer.export_admin_csv(args.admin_csv)
+                print(f"\n✅ Wrote {count} chunks to {args.admin_csv}")
+                return
+            
+            async with importer.writer:
+                # Setup full-text indexes first
+                await importer.setup_fulltext_indexes()
+                
+                # Stream chunks from SurrealDB into Neo4j
+                imported_count = await importer.import_chunks()
+                
+                if not imported_count:
+                    print("❌ No chunks found in SurrealDB")
+                    return
+                
+                print(f"\n✅ Import Complete!")
+                print(f"📊 Successfully imported {imported_count} chunks")
+                
+                # Verify import
+                await importer.verify_import()
         
     except Exception as e:
         print(f"❌ Import failed: {e}")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
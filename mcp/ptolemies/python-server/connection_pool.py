@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Database Connection Pooling for Ptolemies
+Holds several authenticated SurrealDB connections so concurrent queries run
+on separate sockets instead of queueing behind one client, with least-loaded
+checkout, periodic health checks and reaping of idle connections. Also
+tracks session and transaction counters for the Neo4j driver's pool.
+"""
+
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Optional, Callable, Awaitable, AsyncIterator
+
+import logfire
+
+try:
+    from websockets.exceptions import ConnectionClosed
+except ImportError:
+    ConnectionClosed = None
+
+try:
+    from surrealdb import ConnectionUnavailableError
+except ImportError:
+    ConnectionUnavailableError = None
+
+# Errors after which a connection is assumed broken and discarded; a dropped
+# SurrealDB websocket raises the websocket or SDK errors, not ConnectionError
+CONNECTION_ERRORS = tuple(
+    error for error in (
+        ConnectionError, OSError, asyncio.TimeoutError, ConnectionClosed, ConnectionUnavailableError
+    ) if error is not None
+)
+
+class PoolTimeoutError(RuntimeError):
+    """No pooled connection became available within the acquire timeout."""
+
+@dataclass
+class PoolMetrics:
+    """Session and transaction counters for the store's connection pool.
+    
+    Each open session holds at most one pooled connection, so
+    ``sessions_in_use`` against ``max_size`` shows how close the pool is to
+    saturation. Acquisition time is measured from starting a managed
+    transaction to its first attempt running, which is dominated by waiting
+    for a connection when the pool is exhausted.
+    """
+    max_size: int
+    sessions_in_use: int = 0
+    peak_sessions_in_use: int = 0
+    sessions_opened: int = 0
+    read_transactions: int = 0
+    write_transactions: int = 0
+    retried_attempts: int = 0
+    failed_transactions: int = 0
+    total_acquisition_ms: float = 0.0
+    max_acquisition_ms: float = 0.0
+    
+    def session_opened(self):
+        self.sessions_opened += 1
+        self.sessions_in_use += 1
+        self.peak_sessions_in_use = max(self.peak_sessions_in_use, self.sessions_in_use)
+    
+    def session_closed(self):
+        self.sessions_in_use -= 1
+    
+    def record_transaction(self, write: bool, attempts: int, acquisition_ms: float, failed: bool):
+        if write:
+            self.write_transactions += 1
+        else:
+            self.read_transactions += 1
+        self.retried_attempts += max(0, attempts - 1)
+        self.failed_transactions += int(failed)
+        self.total_acquisition_ms += acquisition_ms
+        self.max_acquisition_ms = max(self.max_acquisition_ms, acquisition_ms)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        transactions = self.read_transactions + self.write_transactions
+        return {
+            **asdict(self),
+            "saturation": round(self.sessions_in_use / self.max_size, 3) if self.max_size else 0.0,
+            "avg_acquisition_ms": round(self.total_acquisition_ms / transactions, 3) if transactions else 0.0
+        }
+
+async def ping_surrealdb(client: Any) -> None:
+    """Default health check: a trivial SurrealQL round trip."""
+    await client.query("RETURN true;")
+
+class PooledConnection:
+    """One pooled client and its checkout state."""
+    
+    def __init__(self, client: Any, connection_id: int):
+        self.client = client
+        self.connection_id = connection_id
+        self.in_flight = 0
+        self.uses = 0
+        self.last_used = time.monotonic()
+
+class SurrealConnectionPool:
+    """Pool of SurrealDB clients opened by ``factory``.
+    
+    ``factory`` returns a connected, signed-in client with its namespace
+    and database selected. Checkout picks the least-loaded connection
+    below ``max_in_flight`` concurrent queries, opens a new one while the
+    pool is under ``max_size``, and otherwise waits up to
+    ``acquire_timeout_seconds``. A background task pings idle connections
+    every ``health_check_interval_seconds``, replaces those that fail, and
+    closes connections idle longer than ``idle_timeout_seconds`` down to
+    ``min_size``. A connection whose query raised a connection error is
+    discarded instead of returned.
+    
+    ``query`` and ``create`` mirror the client methods, so the pool can be
+    used wherever a single client was.
+    """
+    
+    def __init__(
+        self,
+        factory: Callable[[], Awaitable[Any]],
+        min_size: int = 1,
+        max_size: int = 10,
+        max_in_flight: int = 1,
+        acquire_timeout_seconds: float = 10.0,
+        idle_timeout_seconds: float = 300.0,
+        health_check_interval_seconds: float = 30.0,
+        health_check: Callable[[Any], Awaitable[Any]] = ping_surrealdb,
+        name: str = "surrealdb"
+    ):
+        self.factory = factory
+        self.min_size = min(min_size, max_size)
+        self.max_size = max_size
+        self.max_in_flight = max(1, max_in_flight)
+        self.acquire_timeout_seconds = acquire_timeout_seconds
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.health_check_interval_seconds = health_check_interval_seconds
+        self.health_check = health_check
+        self.name = name
+        
+        self._connections: List[PooledConnection] = []
+        self._opening = 0
+        self._waiting = 0
+        self._changed = asyncio.Condition()
+        self._ids = itertools.count(1)
+        self._maintenance: Optional[asyncio.Task] = None
+        self._closed = False
+        
+        self.checkouts = 0
+        self.timeouts = 0
+        self.created = 0
+        self.closed = 0
+        self.reaped = 0
+        self.discarded = 0
+        self.health_failures = 0
+        self.open_failures = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+    
+    @property
+    def size(self) -> int:
+        return len(self._connections)
+    
+    async def start(self):
+        """Open ``min_size`` connections and start health checks and reaping."""
+        with logfire.span("Starting connection pool", pool=self.name, min_size=self.min_size):
+            self._opening += self.min_size
+            results = await asyncio.gather(
+                *(self._open_connection() for _ in range(self.min_size)),
+                return_exceptions=True
+            )
+            errors = [result for result in results if isinstance(result, BaseException)]
+            if errors:
+                await self.close()
+                raise errors[0]
+            
+            if self.health_check_interval_seconds > 0:
+                self._maintenance = asyncio.ensure_future(self._maintain())
+            logfire.info("Connection pool started", pool=self.name, size=self.size, max_size=self.max_size)
+    
+    def _least_loaded(self) -> Optional[PooledConnection]:
+        candidates = [c for c in self._connections if c.in_flight < self.max_in_flight]
+        if not candidates:
+            return None
+        # Among equally loaded connections prefer the most recently used, so surplus ones go idle and are reaped
+        return min(candidates, key=lambda c: (c.in_flight, -c.last_used))
+    
+    async def acquire(self) -> PooledConnection:
+        """Check out a connection; raises ``PoolTimeoutError`` if none frees up in time."""
+        started = time.perf_counter()
+        deadline = started + self.acquire_timeout_seconds
+        async with self._changed:
+            while True:
+                if self._closed:
+                    raise RuntimeError(f"{self.name} connection pool is closed")
+                connection = self._least_loaded()
+                if connection is not None:
+                    connection.in_flight += 1
+                    break
+                if self.size + self._opening < self.max_size:
+                    self._opening += 1
+                    break
+                
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    logfire.warning("Connection pool exhausted", pool=self.name, size=self.size, waiting=self._waiting)
+                    raise PoolTimeoutError(
+                        f"No {self.name} connection available within {self.acquire_timeout_seconds}s"
+                    )
+                self._waiting += 1
+                try:
+                    await asyncio.wait_for(self._changed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    self._waiting -= 1
+        
+        if connection is None:
+            connection = await self._open_connection(in_flight=1)
+        
+        connection.uses += 1
+        wait_ms = (time.perf_counter() - started) * 1000
+        self.checkouts += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        return connection
+    
+    async def release(self, connection: PooledConnection, discard: bool = False):
+        """Return a checked-out connection, or close it if ``discard``."""
+        async with self._changed:
+            connection.in_flight -= 1
+            connection.last_used = time.monotonic()
+            discard = discard and connection in self._connections
+            if discard:
+                self._connections.remove(connection)
+            self._changed.notify()
+        
+        if discard:
+            self.discarded += 1
+            await self._close_connection(connection)
+    
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[Any]:
+        """Client checked out for the duration of the block."""
+        pooled = await self.acquire()
+        discard = False
+        try:
+            yield pooled.client
+        except CONNECTION_ERRORS:
+            discard = True
+            raise
+        finally:
+            await self.release(pooled, discard)
+    
+    async def query(self, *args: Any, **kwargs: Any) -> Any:
+        async with self.connection() as client:
+            return await client.query(*args, **kwargs)
+    
+    async def create(self, *args: Any, **kwargs: Any) -> Any:
+        async with self.connection() as client:
+            return await client.create(*args, **kwargs)
+    
+    async def _open_connection(self, in_flight: int = 0) -> PooledConnection:
+        """Open a connection into a slot already reserved in ``_opening``."""
+        try:
+            client = await self.factory()
+        except BaseException as e:
+            self.open_failures += 1
+            async with self._changed:
+                self._opening -= 1
+                # Let a waiter retry the slot
+                self._changed.notify()
+            logfire.warning("Failed to open pooled connection", pool=self.name, error=str(e))
+            raise
+        
+        connection = PooledConnection(client, next(self._ids))
+        connection.in_flight = in_flight
+        async with self._changed:
+            self._opening -= 1
+            self._connections.append(connection)
+            self._changed.notify()
+        self.created += 1
+        return connection
+    
+    async def _close_connection(self, connection: PooledConnection):
+        try:
+            await connection.client.close()
+        except Exception as e:
+            logfire.warning("Failed to close pooled connection", pool=self.name, error=str(e))
+        self.closed += 1
+    
+    async def _ping(self, connection: PooledConnection) -> bool:
+        try:
+            await asyncio.wait_for(self.health_check(connection.client), self.acquire_timeout_seconds)
+            return True
+        except Exception as e:
+            logfire.warning("Pooled connection failed health check",
+                          pool=self.name,
+                          connection_id=connection.connection_id,
+                          error=str(e))
+            return False
+    
+    async def check_health(self) -> int:
+        """Ping idle connections and discard those that fail; returns the number discarded."""
+        async with self._changed:
+            idle = [c for c in self._connections if c.in_flight == 0]
+            # Held while pinging so they are not checked out mid-check
+            for connection in idle:
+                connection.in_flight += 1
+        
+        healthy = await asyncio.gather(*(self._ping(c) for c in idle))
+        failed = [c for c, ok in zip(idle, healthy) if not ok]
+        
+        async with self._changed:
+            for connection in idle:
+                connection.in_flight -= 1
+            for connection in failed:
+                self._connections.remove(connection)
+            self._changed.notify_all()
+        
+        for connection in failed:
+            await self._close_connection(connection)
+        self.health_failures += len(failed)
+        return len(failed)
+    
+    async def reap_idle(self, now: Optional[float] = None) -> int:
+        """Close connections idle past ``idle_timeout_seconds``, keeping ``min_size``."""
+        now = time.monotonic() if now is None else now
+        async with self._changed:
+            idle = sorted(
+                (c for c in self._connections
+                 if c.in_flight == 0 and now - c.last_used >= self.idle_timeout_seconds),
+                key=lambda c: c.last_used
+            )
+            reaped = idle[:max(0, self.size - self.min_size)]
+            for connection in reaped:
+                self._connections.remove(connection)
+        
+        for connection in reaped:
+            await self._close_connection(connection)
+        self.reaped += len(reaped)
+        return len(reaped)
+    
+    async def fill(self):
+        """Open connections until the pool holds ``min_size`` again."""
+        async with self._changed:
+            missing = self.min_size - self.size - self._opening
+            if missing <= 0:
+                return
+            self._opening += missing
+        await asyncio.gather(*(self._open_connection() for _ in range(missing)), return_exceptions=True)
+    
+    async def _maintain(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval_seconds)
+            try:
+                await self.check_health()
+                await self.reap_idle()
+                await self.fill()
+            except Exception as e:
+                logfire.warning("Connection pool maintenance failed", pool=self.name, error=str(e))
+    
+    async def close(self):
+        """Stop maintenance and close every connection."""
+        self._closed = True
+        if self._maintenance is not None:
+            self._maintenance.cancel()
+            await asyncio.gather(self._maintenance, return_exceptions=True)
+            self._maintenance = None
+        
+        async with self._changed:
+            connections = self._connections
+            self._connections = []
+            self._changed.notify_all()
+        await asyncio.gather(*(self._close_connection(c) for c in connections))
+        logfire.info("Connection pool closed", pool=self.name, connections_closed=len(connections))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics."""
+        in_use = sum(1 for c in self._connections if c.in_flight)
+        return {
+            "name": self.name,
+            "size": self.size,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "in_use": in_use,
+            "idle": self.size - in_use,
+            "in_flight": sum(c.in_flight for c in self._connections),
+            "waiting": self._waiting,
+            "saturation": round(in_use / self.max_size, 3) if self.max_size else 0.0,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "created": self.created,
+            "closed": self.closed,
+            "reaped": self.reaped,
+            "discarded": self.discarded,
+            "health_failures": self.health_failures,
+            "open_failures": self.open_failures,
+            "avg_wait_ms": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 3)
+        }
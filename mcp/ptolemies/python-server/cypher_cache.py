@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Versioned Cypher Result Cache for Ptolemies
+Caches read query results keyed by query text and parameters, tagged with the
+graph version they were read at. Every writer bumps the version stored on a
+GraphVersion node, so results read before a write are never served after it.
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple, Callable, Awaitable
+
+GRAPH_VERSION_NAME = "graph"
+
+GRAPH_VERSION_CONSTRAINT = (
+    "CREATE CONSTRAINT graph_version_name_unique IF NOT EXISTS "
+    "FOR (v:GraphVersion) REQUIRE v.name IS UNIQUE"
+)
+
+READ_GRAPH_VERSION_QUERY = f"""
+OPTIONAL MATCH (v:GraphVersion {{name: "{GRAPH_VERSION_NAME}"}})
+RETURN coalesce(v.version, 0) AS version
+"""
+
+BUMP_GRAPH_VERSION_QUERY = f"""
+MERGE (v:GraphVersion {{name: "{GRAPH_VERSION_NAME}"}})
+SET v.version = coalesce(v.version, 0) + 1
+RETURN v.version AS version
+"""
+
+# Unit subquery appended to a write statement so the bump commits with the write
+BUMP_GRAPH_VERSION_CLAUSE = f"""
+CALL {{
+    MERGE (v:GraphVersion {{name: "{GRAPH_VERSION_NAME}"}})
+    SET v.version = coalesce(v.version, 0) + 1
+}}
+"""
+
+def query_cache_key(query: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Stable key for a query and its parameters."""
+    digest = hashlib.sha256(query.encode("utf-8"))
+    digest.update(json.dumps(params or {}, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+class CypherResultCache:
+    """Bounded LRU of read results, each tagged with the graph version it was read at.
+    
+    By default the current version is re-read from Neo4j before every read,
+    so writes from any process are seen at once. A positive
+    ``version_check_seconds`` opts into reusing a checked version for that
+    long: writes made in this process still call ``invalidate`` and are seen
+    at once, but writes by other processes may be served stale for up to
+    ``version_check_seconds``.
+    """
+    
+    MISS = object()
+    
+    def __init__(self, max_entries: int = 1024, version_check_seconds: float = 0.0):
+        self.max_entries = max_entries
+        self.version_check_seconds = version_check_seconds
+        self.version: Optional[int] = None
+        self.epoch = 0
+        self._version_checked_at = 0.0
+        self._entries: "OrderedDict[str, Tuple[int, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+    
+    def version_is_current(self) -> bool:
+        """Whether the known version is recent enough to serve cached reads."""
+        return (self.version is not None
+                and time.monotonic() - self._version_checked_at < self.version_check_seconds)
+    
+    def observe_version(self, version: int, epoch: int):
+        """Record a version read from Neo4j, dropping entries from older versions.
+        
+        ``epoch`` is the value of ``self.epoch`` when the read started; a
+        read that overlapped a local write, or that returns an older version
+        than one already seen, is ignored.
+        """
+        if epoch != self.epoch or (self.version is not None and version < self.version):
+            return
+        if version != self.version:
+            self._entries.clear()
+        self.version = version
+        self._version_checked_at = time.monotonic()
+    
+    def invalidate(self):
+        """Forget the known version after a local write so the next read re-checks it."""
+        self.version = None
+        self.epoch += 1
+        self._entries.clear()
+    
+    def get(self, key: str, version: int) -> Any:
+        """Cached value read at ``version``, or ``MISS``."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return self.MISS
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+    
+    def put(self, key: str, value: Any, version: int):
+        """Store a value read at ``version``; values from superseded versions are dropped."""
+        if not self.enabled or version != self.version:
+            return
+        self._entries[key] = (version, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    async def current_version(self, read_version: Callable[[], Awaitable[int]]) -> int:
+        """Known graph version, re-read with ``read_version`` when it is too old."""
+        if self.version_is_current():
+            return self.version
+        epoch = self.epoch
+        version = await read_version()
+        self.observe_version(version, epoch)
+        return version
+    
+    async def fetch(
+        self,
+        key: str,
+        read_version: Callable[[], Awaitable[int]],
+        load: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Cached result for ``key`` at the current graph version, loading it on a miss."""
+        version = await self.current_version(read_version)
+        value = self.get(key, version)
+        if value is self.MISS:
+            value = await load()
+            self.put(key, value, version)
+        return value
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "graph_version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Materialized Graph Views for Ptolemies
+Precomputes framework-to-framework learning paths and transitive dependency
+closures from a graph snapshot and stores them as keyed rows in Neo4j, so the
+learning-path and dependency tools are single index lookups.
+"""
+
+import asyncio
+import time
+import uuid
+from typing import Dict, List, Any, Optional, Sequence
+
+import logfire
+
+from cypher_cache import BUMP_GRAPH_VERSION_QUERY
+from graph_snapshot import GraphSnapshot, OUTGOING, BOTH, load_graph_snapshot
+
+# Relationship types followed when resolving framework dependencies
+DEPENDENCY_RELATIONSHIP_TYPES = ["DEPENDS_ON", "USES", "INTEGRATES_WITH"]
+
+# Learning paths longer than this are not materialized
+MAX_LEARNING_PATH_DEPTH = 6
+
+LEARNING_PATH_LABEL = "LearningPath"
+DEPENDENCY_CLOSURE_LABEL = "DependencyClosure"
+
+SCHEMA_QUERIES = [
+    f"CREATE CONSTRAINT learning_path_key_unique IF NOT EXISTS FOR (p:{LEARNING_PATH_LABEL}) REQUIRE p.key IS UNIQUE",
+    f"CREATE CONSTRAINT dependency_closure_key_unique IF NOT EXISTS FOR (d:{DEPENDENCY_CLOSURE_LABEL}) REQUIRE d.key IS UNIQUE"
+]
+
+UPSERT_QUERY = """
+UNWIND $rows AS row
+MERGE (m:{label} {{key: row.key}})
+SET m += row, m.run_id = $run_id, m.materialized_at = datetime()
+"""
+
+DELETE_STALE_QUERY = """
+MATCH (m:{label})
+WHERE m.run_id <> $run_id
+DELETE m
+"""
+
+READ_QUERY = """
+MATCH (m:{label} {{key: $key}})
+RETURN properties(m) AS row
+"""
+
+def learning_path_key(start: str, end: str) -> str:
+    """Lookup key of the learning path between two frameworks."""
+    return f"{start.lower()}->{end.lower()}"
+
+def dependency_closure_key(framework: str) -> str:
+    """Lookup key of a framework's dependency closure."""
+    return framework.lower()
+
+def _name(snapshot: GraphSnapshot, index: int) -> str:
+    # Neo4j list properties cannot hold nulls
+    return snapshot.names[index] or ""
+
+def materialize_learning_paths(
+    snapshot: GraphSnapshot,
+    label: str = "Framework",
+    max_depth: int = MAX_LEARNING_PATH_DEPTH,
+    dependency_types: Sequence[str] = DEPENDENCY_RELATIONSHIP_TYPES
+) -> List[Dict[str, Any]]:
+    """Shortest learning path rows for every ordered pair of ``label`` nodes.
+    
+    One breadth-first search per start node covers all of its targets.
+    Unreachable pairs are stored with no steps, so a missing row always
+    means the pair was not materialized.
+    """
+    nodes = [index for index, node_label in enumerate(snapshot.labels)
+             if node_label == label and snapshot.names[index]]
+    rows = []
+    for start in nodes:
+        parents = snapshot.shortest_path_tree(start, max_depth=max_depth, direction=BOTH)
+        for end in nodes:
+            path = _walk_back(parents, end) if end in parents else []
+            rows.append({
+                "key": learning_path_key(snapshot.names[start], snapshot.names[end]),
+                "start": snapshot.names[start],
+                "end": snapshot.names[end],
+                "steps": [_name(snapshot, index) for index in path],
+                "step_labels": [snapshot.labels[index] for index in path],
+                "path_length": max(len(path) - 1, 0),
+                "max_depth": max_depth,
+                # Filtered against the steps on read, since a shorter max_depth drops the path
+                "prerequisites": [
+                    _name(snapshot, index)
+                    for index in snapshot.neighbours(end, OUTGOING, dependency_types).tolist()
+                ]
+            })
+    return rows
+
+def materialize_dependency_closures(
+    snapshot: GraphSnapshot,
+    label: str = "Framework",
+    dependency_types: Sequence[str] = DEPENDENCY_RELATIONSHIP_TYPES
+) -> List[Dict[str, Any]]:
+    """Transitive dependency closure rows for every ``label`` node.
+    
+    ``names``/``labels``/``depths`` list the root first and then every
+    reachable dependency by depth; edges refer to positions in those lists.
+    """
+    rows = []
+    for root in range(snapshot.node_count):
+        if snapshot.labels[root] != label or not snapshot.names[root]:
+            continue
+        distances = snapshot.k_hop(root, snapshot.node_count, OUTGOING, dependency_types)
+        members = [root] + [index for index, _ in sorted(distances.items(), key=lambda item: item[1])]
+        position = {index: i for i, index in enumerate(members)}
+        
+        edge_sources = []
+        edge_targets = []
+        for index in members:
+            for target in snapshot.neighbours(index, OUTGOING, dependency_types).tolist():
+                if target in position:
+                    edge_sources.append(position[index])
+                    edge_targets.append(position[target])
+        
+        rows.append({
+            "key": dependency_closure_key(snapshot.names[root]),
+            "framework": snapshot.names[root],
+            "names": [_name(snapshot, index) for index in members],
+            "labels": [snapshot.labels[index] for index in members],
+            "depths": [0] + [distances[index] for index in members[1:]],
+            "edge_sources": edge_sources,
+            "edge_targets": edge_targets
+        })
+    return rows
+
+def _walk_back(parents: Dict[int, int], end: int) -> List[int]:
+    path = [end]
+    while parents[path[-1]] != -1:
+        path.append(parents[path[-1]])
+    return path[::-1]
+
+def learning_path_result(row: Dict[str, Any], max_depth: int) -> Optional[Dict[str, Any]]:
+    """Learning-path tool result from a materialized row.
+    
+    Returns None when ``max_depth`` exceeds the depth the row was built
+    with, since a longer path might then exist.
+    """
+    if max_depth > row["max_depth"]:
+        return None
+    steps = row["steps"] if row["path_length"] <= max_depth else []
+    labels = row["step_labels"] if steps else []
+    return {
+        "learning_steps": [
+            {"step": step, "name": name or None, "label": step_label}
+            for step, (name, step_label) in enumerate(zip(steps, labels), 1)
+        ],
+        "path_length": max(len(steps) - 1, 0),
+        "prerequisites": [name or None for name in row["prerequisites"] if name not in steps]
+    }
+
+def dependency_closure_result(row: Dict[str, Any], depth: int) -> Dict[str, Any]:
+    """Dependency tool result from a materialized row, cut off at ``depth``."""
+    names = [name or None for name in row["names"]]
+    depths = row["depths"]
+    included = {i for i, node_depth in enumerate(depths) if node_depth <= depth}
+    
+    relationships = []
+    circular = []
+    for source, target in zip(row["edge_sources"], row["edge_targets"]):
+        if source in included and target in included:
+            relationships.append({"source": names[source], "target": names[target]})
+            if target == 0:
+                circular.append(names[source])
+    
+    return {
+        "dependency_nodes": [
+            {"name": names[i], "label": row["labels"][i], "depth": depths[i]}
+            for i in range(1, len(names)) if i in included
+        ],
+        "dependency_relationships": relationships,
+        "circular_dependencies": circular
+    }
+
+async def read_materialized(session, label: str, key: str) -> Optional[Dict[str, Any]]:
+    """Fetch one materialized row by key, or None."""
+    async def work(tx):
+        result = await tx.run(READ_QUERY.format(label=label), {"key": key})
+        record = await result.single()
+        return dict(record["row"]) if record else None
+    
+    return await session.execute_read(work)
+
+async def write_materialized(
+    driver,
+    database: str,
+    learning_paths: List[Dict[str, Any]],
+    dependency_closures: List[Dict[str, Any]],
+    batch_size: int = 1000
+) -> str:
+    """Replace the stored views with new rows; returns the run id.
+    
+    Rows are upserted under a new run id and rows left from earlier runs
+    are deleted afterwards, so readers never see an empty table.
+    """
+    run_id = uuid.uuid4().hex
+    
+    async def upsert(tx, label, rows):
+        result = await tx.run(UPSERT_QUERY.format(label=label), {"rows": rows, "run_id": run_id})
+        await result.consume()
+    
+    async def delete_stale(tx, label):
+        result = await tx.run(DELETE_STALE_QUERY.format(label=label), {"run_id": run_id})
+        await result.consume()
+    
+    async with driver.session(database=database) as session:
+        for query in SCHEMA_QUERIES:
+            await session.run(query)
+        
+        for label, rows in ((LEARNING_PATH_LABEL, learning_paths),
+                            (DEPENDENCY_CLOSURE_LABEL, dependency_closures)):
+            for start in range(0, len(rows), batch_size):
+                await session.execute_write(upsert, label, rows[start:start + batch_size])
+            await session.execute_write(delete_stale, label)
+        
+        await session.run(BUMP_GRAPH_VERSION_QUERY)
+    
+    return run_id
+
+@logfire.instrument("materialize_graph_views")
+async def materialize_graph(
+    driver,
+    database: str,
+    snapshot: Optional[GraphSnapshot] = None
+) -> Dict[str, Any]:
+    """Recompute and store learning paths and dependency closures.
+    
+    Run after each graph sync; loads a fresh snapshot unless one is given.
+    """
+    with logfire.span("Materializing graph views", database=database):
+        start_time = time.time()
+        if snapshot is None:
+            snapshot = await load_graph_snapshot(driver, database)
+        
+        learning_paths = materialize_learning_paths(snapshot)
+        dependency_closures = materialize_dependency_closures(snapshot)
+        run_id = await write_materialized(driver, database, learning_paths, dependency_closures)
+        
+        summary = {
+            "run_id": run_id,
+            "learning_paths": len(learning_paths),
+            "dependency_closures": len(dependency_closures),
+            "elapsed_seconds": round(time.time() - start_time, 3)
+        }
+        logfire.info("Graph views materialized", **summary)
+        return summary
+
+if __name__ == "__main__":
+    from graph_bulk_import import BulkImportConfig, Neo4jBulkWriter
+    
+    async def main():
+        config = BulkImportConfig.from_env()
+        async with Neo4jBulkWriter(config) as writer:
+            summary = await materialize_graph(writer.driver, config.neo4j_database)
+            print(f"Materialized {summary['learning_paths']} learning paths and "
+                  f"{summary['dependency_closures']} dependency closures")
+    
+    asyncio.run(main())
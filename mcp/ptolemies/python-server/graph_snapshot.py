@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+In-Memory Graph Snapshot for Ptolemies
+Read-only compressed sparse row (CSR) copy of the Neo4j graph for in-process
+neighbourhood, k-hop and shortest-path queries.
+"""
+
+import asyncio
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Tuple, Iterable, Callable, Awaitable, Sequence
+
+import logfire
+import numpy as np
+
+# Directions accepted by traversal methods
+OUTGOING = "out"
+INCOMING = "in"
+BOTH = "both"
+
+# Materialized tables and sync bookkeeping stored in Neo4j but not part of the traversable graph
+EXCLUDED_LABELS = ["LearningPath", "DependencyClosure", "GraphVersion", "SyncState"]
+
+@dataclass(frozen=True, eq=False)
+class GraphSnapshot:
+    """Immutable CSR adjacency of the graph with an id-to-label/name table.
+    
+    Nodes are addressed by their position in ``node_ids``. Outgoing and
+    incoming adjacency are kept as separate CSR arrays so directed traversals
+    (prerequisites, dependencies) do not need to scan reverse edges.
+    """
+    node_ids: List[str]
+    labels: List[str]
+    names: List[Optional[str]]
+    relationship_types: List[str]
+    out_indptr: np.ndarray
+    out_indices: np.ndarray
+    out_types: np.ndarray
+    in_indptr: np.ndarray
+    in_indices: np.ndarray
+    in_types: np.ndarray
+    created_at: float = field(default_factory=time.time)
+    _name_index: Dict[Tuple[str, str], int] = field(default_factory=dict, repr=False, compare=False)
+    _element_index: Dict[str, int] = field(default_factory=dict, repr=False, compare=False)
+    
+    @classmethod
+    def build(
+        cls,
+        nodes: Iterable[Tuple[str, str, Optional[str]]],
+        edges: Iterable[Tuple[str, str, str]]
+    ) -> "GraphSnapshot":
+        """Build a snapshot from ``(element_id, label, name)`` nodes and
+        ``(start_id, end_id, relationship_type)`` edges."""
+        node_ids: List[str] = []
+        labels: List[str] = []
+        names: List[Optional[str]] = []
+        element_index: Dict[str, int] = {}
+        name_index: Dict[Tuple[str, str], int] = {}
+        
+        for element_id, label, name in nodes:
+            if element_id in element_index:
+                continue
+            index = len(node_ids)
+            element_index[element_id] = index
+            node_ids.append(element_id)
+            labels.append(label)
+            names.append(name)
+            if name:
+                name_index.setdefault((label, name.lower()), index)
+                name_index.setdefault(("", name.lower()), index)
+        
+        type_codes: Dict[str, int] = {}
+        sources: List[int] = []
+        targets: List[int] = []
+        codes: List[int] = []
+        for start_id, end_id, rel_type in edges:
+            start = element_index.get(start_id)
+            end = element_index.get(end_id)
+            if start is None or end is None:
+                continue
+            sources.append(start)
+            targets.append(end)
+            codes.append(type_codes.setdefault(rel_type, len(type_codes)))
+        
+        node_count = len(node_ids)
+        src = np.asarray(sources, dtype=np.int64)
+        dst = np.asarray(targets, dtype=np.int64)
+        rel = np.asarray(codes, dtype=np.int16)
+        out_indptr, out_indices, out_types = _to_csr(node_count, src, dst, rel)
+        in_indptr, in_indices, in_types = _to_csr(node_count, dst, src, rel)
+        
+        return cls(
+            node_ids=node_ids,
+            labels=labels,
+            names=names,
+            relationship_types=list(type_codes),
+            out_indptr=out_indptr,
+            out_indices=out_indices,
+            out_types=out_types,
+            in_indptr=in_indptr,
+            in_indices=in_indices,
+            in_types=in_types,
+            _name_index=name_index,
+            _element_index=element_index
+        )
+    
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids)
+    
+    @property
+    def edge_count(self) -> int:
+        return int(self.out_indices.shape[0])
+    
+    def find(self, name: str, label: Optional[str] = None) -> Optional[int]:
+        """Look up a node index by case-insensitive name, optionally by label."""
+        return self._name_index.get((label or "", name.lower()))
+    
+    def index_of(self, element_id: str) -> Optional[int]:
+        """Look up a node index by Neo4j element id."""
+        return self._element_index.get(element_id)
+    
+    def node(self, index: int) -> Dict[str, Any]:
+        """Describe a node by index."""
+        return {
+            "element_id": self.node_ids[index],
+            "label": self.labels[index],
+            "name": self.names[index]
+        }
+    
+    def neighbours(
+        self,
+        index: int,
+        direction: str = BOTH,
+        relationship_types: Optional[Sequence[str]] = None
+    ) -> np.ndarray:
+        """Indices of adjacent nodes, optionally filtered by relationship type."""
+        parts = []
+        if direction in (OUTGOING, BOTH):
+            parts.append(self._slice(self.out_indptr, self.out_indices, self.out_types, index, relationship_types))
+        if direction in (INCOMING, BOTH):
+            parts.append(self._slice(self.in_indptr, self.in_indices, self.in_types, index, relationship_types))
+        if not parts:
+            raise ValueError(f"Invalid direction: {direction!r}")
+        return np.unique(np.concatenate(parts)) if len(parts) > 1 else parts[0]
+    
+    def k_hop(
+        self,
+        index: int,
+        k: int,
+        direction: str = BOTH,
+        relationship_types: Optional[Sequence[str]] = None
+    ) -> Dict[int, int]:
+        """Breadth-first distances to every node within ``k`` hops (excluding the start)."""
+        distances = {index: 0}
+        frontier = [index]
+        for depth in range(1, k + 1):
+            next_frontier = []
+            for current in frontier:
+                for neighbour in self.neighbours(current, direction, relationship_types).tolist():
+                    if neighbour not in distances:
+                        distances[neighbour] = depth
+                        next_frontier.append(neighbour)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        del distances[index]
+        return distances
+    
+    def shortest_path(
+        self,
+        start: int,
+        end: int,
+        max_depth: int = 6,
+        direction: str = BOTH,
+        relationship_types: Optional[Sequence[str]] = None
+    ) -> Optional[List[int]]:
+        """Unweighted shortest path between two node indices, or None."""
+        if start == end:
+            return [start]
+        parents = {start: -1}
+        queue = deque([(start, 0)])
+        while queue:
+            current, depth = queue.popleft()
+            if depth >= max_depth:
+                continue
+            for neighbour in self.neighbours(current, direction, relationship_types).tolist():
+                if neighbour in parents:
+                    continue
+                parents[neighbour] = current
+                if neighbour == end:
+                    path = [end]
+                    while parents[path[-1]] != -1:
+                        path.append(parents[path[-1]])
+                    return path[::-1]
+                queue.append((neighbour, depth + 1))
+        return None
+    
+    def shortest_path_tree(
+        self,
+        start: int,
+        max_depth: int = 6,
+        direction: str = BOTH,
+        relationship_types: Optional[Sequence[str]] = None
+    ) -> Dict[int, int]:
+        """Breadth-first parent of every node within ``max_depth`` hops; the start maps to -1.
+        
+        Walking parents back from any reached node gives the same path
+        ``shortest_path`` returns, for all targets at once.
+        """
+        parents = {start: -1}
+        frontier = [start]
+        for _ in range(max_depth):
+            next_frontier = []
+            for current in frontier:
+                for neighbour in self.neighbours(current, direction, relationship_types).tolist():
+                    if neighbour not in parents:
+                        parents[neighbour] = current
+                        next_frontier.append(neighbour)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        return parents
+    
+    def co_neighbours(self, index: int, label: str, limit: int = 10) -> List[Tuple[int, int]]:
+        """Nodes with ``label`` two hops away, ranked by the number of shared neighbours."""
+        counts: Counter = Counter()
+        for middle in self.neighbours(index).tolist():
+            for candidate in self.neighbours(middle).tolist():
+                if candidate != index and self.labels[candidate] == label:
+                    counts[candidate] += 1
+        return counts.most_common(limit)
+    
+    def _slice(
+        self,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        types: np.ndarray,
+        index: int,
+        relationship_types: Optional[Sequence[str]]
+    ) -> np.ndarray:
+        start, end = indptr[index], indptr[index + 1]
+        targets = indices[start:end]
+        if relationship_types is None:
+            return targets
+        codes = [self.relationship_types.index(t) for t in relationship_types if t in self.relationship_types]
+        return targets[np.isin(types[start:end], codes)]
+
+def _to_csr(
+    node_count: int,
+    sources: np.ndarray,
+    targets: np.ndarray,
+    types: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sort edges by source into CSR index pointer, column and type arrays."""
+    order = np.argsort(sources, kind="stable")
+    indptr = np.zeros(node_count + 1, dtype=np.int64)
+    if sources.size:
+        np.cumsum(np.bincount(sources, minlength=node_count), out=indptr[1:])
+    return indptr, targets[order].astype(np.int32), types[order]
+
+async def load_graph_snapshot(driver, database: str) -> GraphSnapshot:
+    """Stream the nodes and relationships of the knowledge graph into a new snapshot.
+    
+    Nodes carrying any of ``EXCLUDED_LABELS`` are left out, with their
+    relationships.
+    """
+    with logfire.span("Loading graph snapshot", database=database):
+        start_time = time.time()
+        nodes: List[Tuple[str, str, Optional[str]]] = []
+        edges: List[Tuple[str, str, str]] = []
+        
+        async with driver.session(database=database) as session:
+            result = await session.run(
+                "MATCH (n) WHERE none(label IN labels(n) WHERE label IN $excluded) "
+                "RETURN elementId(n) as element_id, head(labels(n)) as label, "
+                "coalesce(n.name, n.title, n.id) as name",
+                excluded=EXCLUDED_LABELS
+            )
+            async for record in result:
+                nodes.append((record["element_id"], record["label"] or "", record["name"]))
+            
+            result = await session.run(
+                "MATCH (a)-[r]->(b) "
+                "WHERE none(label IN labels(a) WHERE label IN $excluded) "
+                "AND none(label IN labels(b) WHERE label IN $excluded) "
+                "RETURN elementId(a) as start_id, elementId(b) as end_id, type(r) as type",
+                excluded=EXCLUDED_LABELS
+            )
+            async for record in result:
+                edges.append((record["start_id"], record["end_id"], record["type"]))
+        
+        snapshot = GraphSnapshot.build(nodes, edges)
+        logfire.info("Graph snapshot loaded",
+                   nodes=snapshot.node_count,
+                   edges=snapshot.edge_count,
+                   load_time_ms=round((time.time() - start_time) * 1000, 2))
+        return snapshot
+
+class GraphSnapshotManager:
+    """Holds the current snapshot and refreshes it periodically.
+    
+    A refresh builds a complete new snapshot before replacing the reference,
+    so readers always see either the old or the new graph, never a mix.
+    """
+    
+    def __init__(
+        self,
+        loader: Callable[[], Awaitable[GraphSnapshot]],
+        refresh_interval_seconds: float = 300.0
+    ):
+        self.loader = loader
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self._snapshot: Optional[GraphSnapshot] = None
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+    
+    @property
+    def snapshot(self) -> Optional[GraphSnapshot]:
+        """Current snapshot, or None if none has been loaded yet."""
+        return self._snapshot
+    
+    async def refresh(self) -> Optional[GraphSnapshot]:
+        """Load a new snapshot and swap it in; keeps the old one on failure."""
+        async with self._refresh_lock:
+            try:
+                self._snapshot = await self.loader()
+            except Exception as e:
+                logfire.error("Graph snapshot refresh failed", error=str(e))
+            return self._snapshot
+    
+    async def get(self) -> Optional[GraphSnapshot]:
+        """Current snapshot, loading the first one on demand."""
+        if self._snapshot is None:
+            return await self.refresh()
+        return self._snapshot
+    
+    def start(self):
+        """Start periodic background refresh."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+    
+    async def stop(self):
+        """Stop periodic background refresh."""
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+    
+    async def _refresh_loop(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_interval_seconds)
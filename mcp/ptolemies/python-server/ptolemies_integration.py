@@ -9,7 +9,7 @@ SurrealDB, Neo4j, and Dehallucinator services for the ptolemies MCP server.
 
 import asyncio
 import os
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Callable, Awaitable
 from contextlib import asynccontextmanager
 import logging
 from datetime import datetime
@@ -32,6 +32,14 @@ except ImportError:
     logging.warning("Logfire not available, using standard logging")
 
 # Local imports
+from connection_pool import PoolMetrics, SurrealConnectionPool
+from cypher_cache import CypherResultCache, query_cache_key, READ_GRAPH_VERSION_QUERY
+from graph_materialization import (
+    DEPENDENCY_RELATIONSHIP_TYPES, LEARNING_PATH_LABEL, DEPENDENCY_CLOSURE_LABEL,
+    learning_path_key, dependency_closure_key, read_materialized,
+    learning_path_result, dependency_closure_result
+)
+from graph_snapshot import GraphSnapshot, GraphSnapshotManager, OUTGOING, load_graph_snapshot
 from ptolemies_types import (
     Framework, FrameworkRelationship, KnowledgeChunk, GraphNode,
     GraphRelationship, ConnectionStatus, SystemHealth,
@@ -77,7 +85,7 @@ class PtolemiesIntegration:
     def __init__(self):
         """Initialize the integration layer with database connections."""
         self.neo4j_driver: Optional[AsyncDriver] = None
-        self.surrealdb_client: Optional[Surreal] = None
+        self.surrealdb_client: Optional[SurrealConnectionPool] = None
         self.openai_client: Optional[OpenAI] = None
         self.hallucination_detector = None
 
@@ -90,14 +98,30 @@ class PtolemiesIntegration:
         self.surrealdb_url = os.getenv("SURREALDB_URL", "ws://localhost:8000/rpc")
         self.surrealdb_namespace = os.getenv("SURREALDB_NAMESPACE", "ptolemies")
         self.surrealdb_database = os.getenv("SURREALDB_DATABASE", "knowledge")
+        self.surrealdb_username = os.getenv("SURREALDB_USERNAME")
+        self.surrealdb_password = os.getenv("SURREALDB_PASSWORD")
 
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
 
         # Connection pools and caching
-        self._connection_pool_size = 10
+        self.surrealdb_pool_size = int(os.getenv("SURREALDB_POOL_SIZE", "10"))
+        self.neo4j_pool_size = int(os.getenv("NEO4J_MAX_CONNECTION_POOL_SIZE", "50"))
+        self.neo4j_pool_metrics = PoolMetrics(max_size=self.neo4j_pool_size)
         self._query_cache: Dict[str, Any] = {}
         self._cache_ttl = 300  # 5 minutes
 
+        # Neo4j read results, dropped whenever the graph version changes
+        self.query_cache = CypherResultCache(
+            max_entries=int(os.getenv("NEO4J_QUERY_CACHE_SIZE", "1024")),
+            version_check_seconds=float(os.getenv("GRAPH_VERSION_CHECK_SECONDS", "0"))
+        )
+
+        # In-memory graph snapshot for traversal-heavy tools
+        self.graph_snapshots = GraphSnapshotManager(
+            self._load_graph_snapshot,
+            refresh_interval_seconds=float(os.getenv("GRAPH_SNAPSHOT_REFRESH_SECONDS", "300"))
+        )
+
         logger.info("PtolemiesIntegration initialized")
 
     async def connect(self) -> bool:
@@ -119,6 +143,9 @@ class PtolemiesIntegration:
         success_count = sum(1 for result in results if result is True)
         total_connections = len(connection_tasks)
 
+        if results[0] is True:
+            self.graph_snapshots.start()
+
         if LOGFIRE_AVAILABLE:
             with logfire.span("ptolemies_connection_init"):
                 logfire.info(f"Connected to {success_count}/{total_connections} services")
@@ -131,11 +158,12 @@ class PtolemiesIntegration:
         try:
             self.neo4j_driver = AsyncGraphDatabase.driver(
                 self.neo4j_uri,
-                auth=(self.neo4j_username, self.neo4j_password)
+                auth=(self.neo4j_username, self.neo4j_password),
+                max_connection_pool_size=self.neo4j_pool_size
             )
 
             # Test connection
-            async with self.neo4j_driver.session(database=self.neo4j_database) as session:
+            async with self.neo4j_session() as session:
                 result = await session.run("RETURN 1 as test")
                 await result.single()
 
@@ -148,10 +176,17 @@ class PtolemiesIntegration:
 
     async def _connect_surrealdb(self) -> bool:
         """Connect to SurrealDB."""
+        async def open_connection() -> Surreal:
+            client = Surreal()
+            await client.connect(self.surrealdb_url)
+            if self.surrealdb_username:
+                await client.signin({"user": self.surrealdb_username, "pass": self.surrealdb_password})
+            await client.use(self.surrealdb_namespace, self.surrealdb_database)
+            return client
+
         try:
-            self.surrealdb_client = Surreal()
-            await self.surrealdb_client.connect(self.surrealdb_url)
-            await self.surrealdb_client.use(self.surrealdb_namespace, self.surrealdb_database)
+            self.surrealdb_client = SurrealConnectionPool(open_connection, max_size=self.surrealdb_pool_size)
+            await self.surrealdb_client.start()
 
             # Test connection
             result = await self.surrealdb_client.query("SELECT * FROM test LIMIT 1")
@@ -161,6 +196,9 @@ class PtolemiesIntegration:
 
         except Exception as e:
             logger.error(f"❌ SurrealDB connection failed: {e}")
+            if self.surrealdb_client:
+                await self.surrealdb_client.close()
+            self.surrealdb_client = None
             return False
 
     async def _connect_openai(self) -> bool:
@@ -203,6 +241,8 @@ class PtolemiesIntegration:
 
     async def disconnect(self):
         """Clean up all connections."""
+        await self.graph_snapshots.stop()
+
         if self.neo4j_driver:
             await self.neo4j_driver.close()
 
@@ -217,8 +257,33 @@ class PtolemiesIntegration:
         if not self.neo4j_driver:
             raise RuntimeError("Neo4j not connected")
 
-        async with self.neo4j_driver.session(database=self.neo4j_database) as session:
-            yield session
+        self.neo4j_pool_metrics.session_opened()
+        try:
+            async with self.neo4j_driver.session(database=self.neo4j_database) as session:
+                yield session
+        finally:
+            self.neo4j_pool_metrics.session_closed()
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Connection pool statistics for SurrealDB and Neo4j."""
+        return {
+            "surrealdb": self.surrealdb_client.stats() if self.surrealdb_client else None,
+            "neo4j": self.neo4j_pool_metrics.to_dict()
+        }
+
+    async def _cached_neo4j_read(
+        self, session, key: str, load: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Run ``load`` through the graph-versioned query cache."""
+        if not self.query_cache.enabled:
+            return await load()
+
+        async def read_version() -> int:
+            result = await session.run(READ_GRAPH_VERSION_QUERY)
+            record = await result.single()
+            return record["version"] if record else 0
+
+        return await self.query_cache.fetch(key, read_version, load)
 
     # === Knowledge Search Methods ===
 
@@ -332,8 +397,13 @@ class PtolemiesIntegration:
 
         try:
             async with self.neo4j_session() as session:
-                result = await session.run(cypher_query, params)
-                records = await result.data()
+                async def load():
+                    result = await session.run(cypher_query, params)
+                    return await result.data()
+
+                records = await self._cached_neo4j_read(
+                    session, query_cache_key(cypher_query, params), load
+                )
 
                 return [
                     {
@@ -487,8 +557,13 @@ class PtolemiesIntegration:
 
         try:
             async with self.neo4j_session() as session:
-                result = await session.run(cypher_query, {"framework": framework})
-                record = await result.single()
+                async def load():
+                    result = await session.run(cypher_query, {"framework": framework})
+                    return await result.single()
+
+                record = await self._cached_neo4j_read(
+                    session, query_cache_key(cypher_query, {"framework": framework}), load
+                )
 
                 if record:
                     return {
@@ -530,6 +605,125 @@ class PtolemiesIntegration:
             logger.error(f"Framework documentation error: {e}")
             return []
 
+    # === Graph Snapshot Methods ===
+
+    async def _load_graph_snapshot(self) -> GraphSnapshot:
+        """Load a fresh in-memory snapshot of the Neo4j graph."""
+        if not self.neo4j_driver:
+            raise RuntimeError("Neo4j not connected")
+
+        return await load_graph_snapshot(self.neo4j_driver, self.neo4j_database)
+
+    async def get_graph_snapshot(self) -> Optional[GraphSnapshot]:
+        """Current graph snapshot, or None when Neo4j is unavailable."""
+        if not self.neo4j_driver:
+            return None
+
+        return await self.graph_snapshots.get()
+
+    async def _read_materialized(self, label: str, key: str) -> Optional[Dict[str, Any]]:
+        """Materialized view row by key, or None when absent or unreadable."""
+        if not self.neo4j_driver:
+            return None
+
+        try:
+            async with self.neo4j_session() as session:
+                return await self._cached_neo4j_read(
+                    session,
+                    query_cache_key(label, {"key": key}),
+                    lambda: read_materialized(session, label, key)
+                )
+        except Exception as e:
+            logger.warning(f"Materialized view lookup failed: {e}")
+            return None
+
+    async def discover_learning_path(
+        self, start_framework: str, end_framework: str, max_depth: int = 6
+    ) -> Optional[Dict[str, Any]]:
+        """Find the shortest learning path between two frameworks.
+
+        Reads the materialized path when one exists and falls back to a
+        search of the graph snapshot otherwise.
+        """
+        row = await self._read_materialized(
+            LEARNING_PATH_LABEL, learning_path_key(start_framework, end_framework)
+        )
+        if row is not None:
+            result = learning_path_result(row, max_depth)
+            if result is not None:
+                return result
+
+        snapshot = await self.get_graph_snapshot()
+        if snapshot is None:
+            return None
+
+        start = snapshot.find(start_framework, "Framework")
+        end = snapshot.find(end_framework, "Framework")
+        if start is None or end is None:
+            return {"learning_steps": [], "path_length": 0, "prerequisites": []}
+
+        path = snapshot.shortest_path(start, end, max_depth=max_depth) or []
+        on_path = set(path)
+        prerequisites = [
+            snapshot.names[index]
+            for index in snapshot.neighbours(end, OUTGOING, DEPENDENCY_RELATIONSHIP_TYPES).tolist()
+            if index not in on_path
+        ]
+
+        return {
+            "learning_steps": [
+                {"step": step, "name": snapshot.names[index], "label": snapshot.labels[index]}
+                for step, index in enumerate(path, 1)
+            ],
+            "path_length": max(len(path) - 1, 0),
+            "prerequisites": prerequisites
+        }
+
+    async def get_framework_dependencies(
+        self, framework: str, include_transitive: bool = False, max_depth: int = 3
+    ) -> Optional[Dict[str, Any]]:
+        """Resolve direct and transitive framework dependencies.
+
+        Reads the materialized dependency closure when one exists and falls
+        back to traversing the graph snapshot otherwise.
+        """
+        depth = max_depth if include_transitive else 1
+        row = await self._read_materialized(DEPENDENCY_CLOSURE_LABEL, dependency_closure_key(framework))
+        if row is not None:
+            return dependency_closure_result(row, depth)
+
+        snapshot = await self.get_graph_snapshot()
+        if snapshot is None:
+            return None
+
+        root = snapshot.find(framework, "Framework")
+        if root is None:
+            return {"dependency_nodes": [], "dependency_relationships": [], "circular_dependencies": []}
+
+        distances = snapshot.k_hop(root, depth, OUTGOING, DEPENDENCY_RELATIONSHIP_TYPES)
+        reached = set(distances) | {root}
+
+        relationships = []
+        circular = []
+        for index in reached:
+            for target in snapshot.neighbours(index, OUTGOING, DEPENDENCY_RELATIONSHIP_TYPES).tolist():
+                if target in reached:
+                    relationships.append({
+                        "source": snapshot.names[index],
+                        "target": snapshot.names[target]
+                    })
+                    if target == root:
+                        circular.append(snapshot.names[index])
+
+        return {
+            "dependency_nodes": [
+                {"name": snapshot.names[index], "label": snapshot.labels[index], "depth": distance}
+                for index, distance in sorted(distances.items(), key=lambda item: item[1])
+            ],
+            "dependency_relationships": relationships,
+            "circular_dependencies": circular
+        }
+
     # === Code Validation Methods ===
 
     async def validate_code_snippet(
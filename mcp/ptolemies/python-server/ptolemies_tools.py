@@ -424,20 +424,21 @@ class PtolemiesTools:
         include_prerequisites = args.get("include_prerequisites", True)
         difficulty_preference = args.get("difficulty_preference", "any")
 
-        # This would be implemented with Neo4j path-finding algorithms
-        # For now, return a placeholder structure
+        path = await self.integration.discover_learning_path(start_framework, end_framework)
+
         result = {
             "start_framework": start_framework,
             "end_framework": end_framework,
-            "path_length": 0,
-            "total_steps": 0,
+            "path_length": path["path_length"] if path else 0,
+            "total_steps": len(path["learning_steps"]) if path else 0,
             "estimated_duration": "To be implemented",
             "difficulty_rating": difficulty_preference,
-            "learning_steps": [],
+            "learning_steps": path["learning_steps"] if path else [],
             "alternative_paths": [],
-            "prerequisites": [],
-            "note": "Learning path discovery implementation in progress"
+            "prerequisites": path["prerequisites"] if path and include_prerequisites else []
         }
+        if path is None:
+            result["note"] = "Graph snapshot not available"
 
         return {
             "success": True,
@@ -501,19 +502,26 @@ class PtolemiesTools:
         include_transitive = args.get("include_transitive", False)
         max_depth = args.get("max_depth", 3)
 
-        # This would query Neo4j for dependency relationships
-        # For now, return a placeholder structure
+        dependencies = await self.integration.get_framework_dependencies(
+            framework=framework,
+            include_transitive=include_transitive,
+            max_depth=max_depth
+        )
+        nodes = dependencies["dependency_nodes"] if dependencies else []
+        direct = sum(1 for node in nodes if node["depth"] == 1)
+
         result = {
             "root_framework": framework,
-            "total_dependencies": 0,
-            "direct_dependencies": 0,
-            "transitive_dependencies": 0,
-            "dependency_nodes": [],
-            "dependency_relationships": [],
-            "circular_dependencies": [],
-            "analysis_depth": max_depth,
-            "note": "Framework dependencies analysis implementation in progress"
+            "total_dependencies": len(nodes),
+            "direct_dependencies": direct,
+            "transitive_dependencies": len(nodes) - direct,
+            "dependency_nodes": nodes,
+            "dependency_relationships": dependencies["dependency_relationships"] if dependencies else [],
+            "circular_dependencies": dependencies["circular_dependencies"] if dependencies else [],
+            "analysis_depth": max_depth
         }
+        if dependencies is None:
+            result["note"] = "Graph snapshot not available"
 
         return {
             "success": True,
@@ -7,71 +7,81 @@ Ensures Neo4j has a complete graph with all framework data
 for comprehensive RAG and hallucination detection.
 """
 
-import subprocess
-import json
-from datetime import datetime
+import asyncio
+import sys
+from pathlib import Path
 
-def run_neo4j_query(query: str) -> bool:
-    """Execute Neo4j query."""
-    cmd = [
-        'cypher-shell',
-        '-a', 'bolt://localhost:7687',
-        '-u', 'neo4j',
-        '-p', 'ptolemies',
-        '-d', 'neo4j',
-        '--format', 'plain'
-    ]
-    
-    try:
-        result = subprocess.run(
-            cmd, input=query, text=True,
-            capture_output=True, timeout=30
-        )
-        return result.returncode == 0
-    except Exception as e:
-        print(f"Neo4j query error: {e}")
-        return False
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from graph_bulk_import import BulkImportConfig, Neo4jBulkWriter, SurrealRowStream
+
+FRAMEWORK_QUERY = """
+UNWIND $rows AS row
+MERGE (f:Framework {name: row.name})
+SET f.language = row.language,
+    f.type = row.type,
+    f.has_documentation = true,
+    f.created_at = coalesce(f.created_at, datetime())
+"""
+
+CLASS_QUERY = """
+UNWIND $rows AS row
+MATCH (f:Framework {name: row.framework})
+MERGE (c:Class {full_name: row.module + '.' + row.name})
+SET c.name = row.name,
+    c.module = row.module,
+    c.description = row.description,
+    c.framework = row.framework,
+    c.created_at = coalesce(c.created_at, datetime())
+MERGE (f)-[:HAS_CLASS]->(c)
+"""
 
-def get_surrealdb_sources() -> list:
+METHOD_QUERY = """
+UNWIND $rows AS row
+MATCH (c:Class {full_name: row.class})
+MERGE (m:Method {full_name: row.class + '.' + row.name})
+SET m.name = row.name,
+    m.parameters = row.parameters,
+    m.visibility = 'public',
+    m.created_at = coalesce(m.created_at, datetime())
+MERGE (c)-[:HAS_METHOD]->(m)
+"""
+
+FUNCTION_QUERY = """
+UNWIND $rows AS row
+MATCH (f:Framework {name: 'FastAPI'})
+MERGE (fn:Function {full_name: row.module + '.' + row.name})
+SET fn.name = row.name,
+    fn.module = row.module,
+    fn.parameters = row.parameters,
+    fn.description = row.description,
+    fn.created_at = coalesce(fn.created_at, datetime())
+MERGE (f)-[:HAS_FUNCTION]->(fn)
+"""
+
+INTEGRATION_QUERY = """
+UNWIND $rows AS row
+MATCH (a:Framework {name: row.source}), (b:Framework {name: row.target})
+MERGE (a)-[r:INTEGRATES_WITH]->(b)
+SET r.type = row.type
+"""
+
+async def get_surrealdb_sources(surreal: SurrealRowStream) -> list:
     """Get all sources from SurrealDB."""
-    cmd = [
-        'surreal', 'sql',
-        '--conn', 'ws://localhost:8000/rpc',
-        '--user', 'root',
-        '--pass', 'root',
-        '--ns', 'ptolemies',
-        '--db', 'knowledge',
-        '--pretty'
-    ]
-    
-    query = "SELECT DISTINCT source_name FROM document_chunks;"
-    
     try:
-        result = subprocess.run(
-            cmd, input=query, text=True,
-            capture_output=True, timeout=30
-        )
-        
-        sources = []
-        if result.returncode == 0:
-            lines = result.stdout.split('\n')
-            for line in lines:
-                if 'source_name:' in line:
-                    source = line.split("source_name: '")[1].split("'")[0]
-                    sources.append(source)
-        
-        return sources
+        rows = await surreal.query("SELECT source_name FROM document_chunks GROUP BY source_name;")
+        return [row["source_name"] for row in rows if row.get("source_name")]
     except Exception as e:
         print(f"SurrealDB query error: {e}")
         return []
 
-def populate_complete_graph():
+async def populate_complete_graph(writer: Neo4jBulkWriter, surreal: SurrealRowStream) -> bool:
     """Populate Neo4j with complete framework data."""
     
     print("🔗 Starting complete Neo4j graph population...")
     
     # Get sources from SurrealDB
-    sources = get_surrealdb_sources()
+    sources = await get_surrealdb_sources(surreal)
     print(f"📊 Found {len(sources)} sources in SurrealDB")
     
     # Create comprehensive framework schema
@@ -85,12 +95,12 @@ def populate_complete_graph():
     // Indexes for performance
     CREATE INDEX framework_type IF NOT EXISTS FOR (f:Framework) ON (f.type);
     CREATE INDEX class_module IF NOT EXISTS FOR (c:Class) ON (c.module);
-    CREATE TEXT INDEX content_search IF NOT EXISTS FOR (n:Framework|Class|Method|Function) ON EACH [n.name, n.description];
+    CREATE FULLTEXT INDEX content_search IF NOT EXISTS FOR (n:Framework|Class|Method|Function) ON EACH [n.name, n.description];
     """
     
     print("📐 Creating schema...")
-    if run_neo4j_query(schema_query):
-        print("✅ Schema created")
+    await writer.run_script(schema_query)
+    print("✅ Schema created")
     
     # Populate frameworks from crawled sources
     framework_mappings = {
@@ -114,21 +124,13 @@ def populate_complete_graph():
     }
     
     # Create framework nodes
-    for source in sources:
-        if source in framework_mappings:
-            mapping = framework_mappings[source]
-            query = f"""
-            MERGE (f:Framework {{
-                name: "{source}",
-                language: "{mapping['language']}",
-                type: "{mapping['type']}",
-                created_at: datetime(),
-                has_documentation: true
-            }});
-            """
-            
-            if run_neo4j_query(query):
-                print(f"✅ Framework: {source}")
+    frameworks = [
+        {"name": source, **framework_mappings[source]}
+        for source in sources if source in framework_mappings
+    ]
+    await writer.write(FRAMEWORK_QUERY, frameworks)
+    for framework in frameworks:
+        print(f"✅ Framework: {framework['name']}")
     
     # Add common classes for major frameworks
     common_classes = [
@@ -150,22 +152,8 @@ def populate_complete_graph():
         {"framework": "Panel", "name": "Param", "module": "panel", "description": "Parameter definition class"},
     ]
     
-    for cls in common_classes:
-        query = f"""
-        MATCH (f:Framework {{name: "{cls['framework']}"}})
-        MERGE (c:Class {{
-            name: "{cls['name']}",
-            full_name: "{cls['module']}.{cls['name']}",
-            module: "{cls['module']}",
-            description: "{cls['description']}",
-            framework: "{cls['framework']}",
-            created_at: datetime()
-        }})
-        MERGE (f)-[:HAS_CLASS]->(c);
-        """
-        
-        if run_neo4j_query(query):
-            print(f"✅ Class: {cls['framework']}.{cls['name']}")
+    stats = await writer.write(CLASS_QUERY, common_classes)
+    print(f"✅ Classes: {stats.rows}")
     
     # Add common methods
     common_methods = [
@@ -186,22 +174,11 @@ def populate_complete_graph():
         {"class": "surrealdb.Surreal", "name": "query", "params": ["sql", "vars"]},
     ]
     
-    for method in common_methods:
-        params_str = ", ".join(method['params'])
-        query = f"""
-        MATCH (c:Class {{full_name: "{method['class']}"}})
-        MERGE (m:Method {{
-            name: "{method['name']}",
-            full_name: "{method['class']}.{method['name']}",
-            parameters: "{params_str}",
-            visibility: "public",
-            created_at: datetime()
-        }})
-        MERGE (c)-[:HAS_METHOD]->(m);
-        """
-        
-        if run_neo4j_query(query):
-            print(f"✅ Method: {method['class']}.{method['name']}")
+    stats = await writer.write(METHOD_QUERY, [
+        {"class": method["class"], "name": method["name"], "parameters": ", ".join(method["params"])}
+        for method in common_methods
+    ])
+    print(f"✅ Methods: {stats.rows}")
     
     # Add common functions
     common_functions = [
@@ -211,100 +188,56 @@ def populate_complete_graph():
         {"module": "fastapi", "name": "Body", "params": ["default", "embed"], "description": "Request body parameter"},
     ]
     
-    for func in common_functions:
-        params_str = ", ".join(func['params'])
-        query = f"""
-        MATCH (f:Framework {{name: "FastAPI"}})
-        MERGE (fn:Function {{
-            name: "{func['name']}",
-            full_name: "{func['module']}.{func['name']}",
-            module: "{func['module']}",
-            parameters: "{params_str}",
-            description: "{func['description']}",
-            created_at: datetime()
-        }})
-        MERGE (f)-[:HAS_FUNCTION]->(fn);
-        """
-        
-        if run_neo4j_query(query):
-            print(f"✅ Function: {func['module']}.{func['name']}")
+    stats = await writer.write(FUNCTION_QUERY, [
+        {**{k: v for k, v in func.items() if k != "params"}, "parameters": ", ".join(func["params"])}
+        for func in common_functions
+    ])
+    print(f"✅ Functions: {stats.rows}")
     
     # Create relationships between frameworks
-    integration_query = """
-    // Framework integration relationships
-    MATCH (fastapi:Framework {name: "FastAPI"}), (pydantic:Framework {name: "Pydantic AI"})
-    MERGE (fastapi)-[:INTEGRATES_WITH {type: "ai_integration"}]->(pydantic);
-    
-    MATCH (fastapi:Framework {name: "FastAPI"}), (logfire:Framework {name: "Logfire"})
-    MERGE (fastapi)-[:INTEGRATES_WITH {type: "observability"}]->(logfire);
-    
-    MATCH (fastapi:Framework {name: "FastAPI"}), (surrealdb:Framework {name: "SurrealDB"})
-    MERGE (fastapi)-[:INTEGRATES_WITH {type: "database"}]->(surrealdb);
-    
-    MATCH (nextjs:Framework {name: "NextJS"}), (tailwind:Framework {name: "Tailwind"})
-    MERGE (nextjs)-[:INTEGRATES_WITH {type: "styling"}]->(tailwind);
-    
-    MATCH (nextjs:Framework {name: "NextJS"}), (shadcn:Framework {name: "Shadcn"})
-    MERGE (nextjs)-[:INTEGRATES_WITH {type: "components"}]->(shadcn);
-    """
+    integrations = [
+        {"source": "FastAPI", "target": "Pydantic AI", "type": "ai_integration"},
+        {"source": "FastAPI", "target": "Logfire", "type": "observability"},
+        {"source": "FastAPI", "target": "SurrealDB", "type": "database"},
+        {"source": "NextJS", "target": "Tailwind", "type": "styling"},
+        {"source": "NextJS", "target": "Shadcn", "type": "components"}
+    ]
     
     print("🔗 Creating framework relationships...")
-    if run_neo4j_query(integration_query):
-        print("✅ Relationships created")
+    await writer.write(INTEGRATION_QUERY, integrations)
+    print("✅ Relationships created")
     
     # Verify final state
     verification_query = """
     MATCH (n)
     WHERE n:Framework OR n:Class OR n:Method OR n:Function
     RETURN labels(n)[0] as type, count(*) as count
-    ORDER BY type;
+    ORDER BY type
     """
     
     print("\n📊 Final Neo4j Graph Status:")
-    cmd = [
-        'cypher-shell',
-        '-a', 'bolt://localhost:7687',
-        '-u', 'neo4j',
-        '-p', 'ptolemies',
-        '-d', 'neo4j',
-        '--format', 'plain'
-    ]
+    total_nodes = 0
+    for record in await writer.run(verification_query):
+        total_nodes += record["count"]
+        print(f"  {record['type']}: {record['count']}")
     
-    result = subprocess.run(
-        cmd, input=verification_query, text=True,
-        capture_output=True, timeout=30
-    )
+    print(f"\n🎯 Total Neo4j Nodes: {total_nodes}")
     
-    if result.returncode == 0:
-        lines = result.stdout.strip().split('\n')
-        total_nodes = 0
-        if len(lines) > 1:
-            for line in lines[1:]:
-                if line.strip():
-                    parts = line.split(', ')
-                    if len(parts) == 2:
-                        node_type = parts[0].strip('"')
-                        count = int(parts[1].strip('"'))
-                        total_nodes += count
-                        print(f"  {node_type}: {count}")
-        
-        print(f"\n🎯 Total Neo4j Nodes: {total_nodes}")
-        
-        if total_nodes >= 100:
-            print("✅ Neo4j graph is comprehensive!")
-            return True
-        else:
-            print("⚠️  Neo4j graph needs more data")
-            return False
-    
-    return False
+    if total_nodes >= 100:
+        print("✅ Neo4j graph is comprehensive!")
+        return True
+    else:
+        print("⚠️  Neo4j graph needs more data")
+        return False
 
-def main():
+async def main():
     """Main execution."""
     print("🚀 Complete Neo4j Graph Population")
     print("=" * 40)
     
-    success = populate_complete_graph()
+    config = BulkImportConfig.from_env()
+    async with SurrealRowStream(config) as surreal, Neo4jBulkWriter(config) as writer:
+        success = await populate_complete_graph(writer, surreal)
     
     if success:
         print("\n🎉 Neo4j graph population complete!")
@@ -313,4 +246,4 @@ def main():
         print("\n⚠️  Graph population had issues")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
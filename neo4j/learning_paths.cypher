@@ -2,6 +2,25 @@
 // ============================================
 // Intelligent learning path generation based on graph relationships
 
+// 0. MATERIALIZED LOOKUPS
+// =======================
+// Framework learning paths and dependency closures are precomputed after
+// each graph sync (src/graph_materialization.py); prefer these lookups to
+// the path searches below.
+
+// Shortest learning path between two frameworks (keys are lowercase)
+MATCH (p:LearningPath {key: "pydantic->starlette"})
+RETURN p.steps as learning_path,
+       p.path_length as steps,
+       p.prerequisites as prerequisites;
+
+// Transitive dependencies of a framework with their depth
+MATCH (d:DependencyClosure {key: "fastapi"})
+UNWIND range(1, size(d.names) - 1) as i
+RETURN d.names[i] as dependency,
+       d.depths[i] as depth
+ORDER BY depth, dependency;
+
 // 1. PREREQUISITE CHAINS
 // ======================
 
@@ -4,306 +4,217 @@ Neo4j Import Script for Ptolemies Knowledge Base
 Imports chunks from SurrealDB into Neo4j graph structure
 """
 
+import argparse
 import asyncio
-import subprocess
-import json
-from typing import List, Dict, Any
+import sys
+from dataclasses import replace
+from pathlib import Path
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 import os
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from graph_bulk_import import (
+    AdminImportWriter,
+    BulkImportConfig,
+    Neo4jBulkWriter,
+    SurrealRowStream
+)
+
 load_dotenv()
 
+# Map sources to frameworks
+FRAMEWORK_MAP = {
+    "FastAPI": "FastAPI",
+    "NextJS": "NextJS",
+    "SurrealDB": "SurrealDB",
+    "Tailwind": "Tailwind CSS",
+    "Shadcn": "Shadcn/UI",
+    "Pydantic AI": "Pydantic AI",
+    "Logfire": "Logfire",
+    "PyGAD": "PyGAD",
+    "bokeh": "bokeh",
+    "Panel": "Panel",
+    "Wildwood": "Wildwood",
+    "Crawl4AI": "Crawl4AI",
+    "FastMCP": "FastMCP",
+    "AnimeJS": "AnimeJS",
+    "PyMC": "PyMC",
+    "circom": "circom",
+    "Claude Code": "Claude Code"
+}
+
+CHUNK_FIELDS = [
+    "id", "source_name", "source_url", "title", "content", "chunk_index",
+    "total_chunks", "quality_score", "topics", "created_at"
+]
+
+SOURCE_QUERY = """
+UNWIND $rows AS row
+MERGE (s:Source {name: row.name})
+SET s.chunk_count = row.chunk_count,
+    s.avg_quality = row.avg_quality,
+    s.priority = row.priority,
+    s.last_imported = datetime(),
+    s.description = row.name + ' documentation source'
+"""
+
+FRAMEWORK_QUERY = """
+UNWIND $rows AS row
+MERGE (f:Framework {name: row.framework})
+SET f.type = row.type,
+    f.language = row.language
+WITH f, row
+MATCH (s:Source {name: row.source})
+MERGE (s)-[r:DOCUMENTS]->(f)
+SET r.coverage = CASE
+    WHEN s.chunk_count > 50 THEN 'complete'
+    WHEN s.chunk_count > 20 THEN 'partial'
+    ELSE 'minimal'
+END
+"""
+
+CHUNK_QUERY = """
+UNWIND $rows AS row
+MERGE (c:Chunk {id: row.id})
+SET c.title = row.title,
+    c.content = row.content,
+    c.url = row.url,
+    c.chunk_index = row.chunk_index,
+    c.total_chunks = row.total_chunks,
+    c.quality_score = row.quality_score,
+    c.created_at = datetime(row.created_at)
+WITH c, row
+MATCH (s:Source {name: row.source_name})
+MERGE (s)-[r:HAS_CHUNK]->(c)
+SET r.imported_at = datetime()
+WITH c, row
+UNWIND row.topics AS topic_name
+MERGE (t:Topic {name: topic_name})
+ON CREATE SET t.category = CASE
+    WHEN topic_name IN ['API', 'database', 'authentication', 'testing'] THEN 'concept'
+    WHEN topic_name IN ['Python', 'JavaScript', 'TypeScript'] THEN 'language'
+    ELSE 'framework'
+END
+MERGE (c)-[rt:COVERS_TOPIC]->(t)
+SET rt.relevance = 0.8
+"""
+
 class Neo4jImporter:
     """Import SurrealDB chunks into Neo4j knowledge graph."""
     
     def __init__(self, neo4j_uri: str = "bolt://localhost:7687", 
                  neo4j_user: str = "neo4j",
-                 neo4j_password: str = None):
-        self.neo4j_uri = neo4j_uri
-        self.neo4j_user = neo4j_user
-        self.neo4j_password = neo4j_password or os.getenv("NEO4J_PASSWORD")
-        
-    def run_surreal_query(self, query: str) -> List[Dict[str, Any]]:
-        """Execute SurrealDB query and return results."""
-        cmd = [
-            'surreal', 'sql',
-            '--conn', 'ws://localhost:8000/rpc',
-            '--user', 'root',
-            '--pass', 'root',
-            '--ns', 'ptolemies',
-            '--db', 'knowledge',
-            '--json'
-        ]
-        
-        try:
-            result = subprocess.run(
-                cmd,
-                input=query,
-                text=True,
-                capture_output=True,
-                timeout=30
-            )
-            
-            if result.returncode == 0:
-                # Parse JSON output
-                output = result.stdout.strip()
-                if output:
-                    try:
-                        data = json.loads(output)
-                        # SurrealDB returns array of results
-                        if isinstance(data, list) and len(data) > 0:
-                            result_data = data[0]
-                            if isinstance(result_data, dict):
-                                return result_data.get('result', [])
-                            elif isinstance(result_data, list):
-                                return result_data
-                    except json.JSONDecodeError as e:
-                        print(f"JSON decode error: {e}")
-                        print(f"Raw output: {output}")
-            return []
-            
-        except Exception as e:
-            print(f"SurrealDB query failed: {e}")
-            return []
-    
-    def run_cypher_query(self, query: str, database: str = "neo4j") -> bool:
-        """Execute Cypher query in Neo4j."""
-        if not self.neo4j_password:
-            print("❌ Neo4j password not set. Please set NEO4J_PASSWORD environment variable.")
-            return False
-            
-        cmd = [
-            'cypher-shell',
-            '-a', self.neo4j_uri,
-            '-u', self.neo4j_user,
-            '-p', self.neo4j_password,
-            '-d', database
-        ]
-        
-        try:
-            result = subprocess.run(
-                cmd,
-                input=query,
-                text=True,
-                capture_output=True,
-                timeout=30
-            )
-            
-            if result.returncode == 0:
-                return True
-            else:
-                print(f"Cypher error: {result.stderr}")
-                return False
-                
-        except Exception as e:
-            print(f"Neo4j query failed: {e}")
-            return False
-    
-    async def fetch_all_chunks(self) -> List[Dict[str, Any]]:
-        """Fetch all chunks from SurrealDB."""
-        print("📊 Fetching chunks from SurrealDB...")
-        
-        query = """
-        SELECT 
-            id,
-            source_name,
-            source_url,
-            title,
-            content,
-            chunk_index,
-            total_chunks,
-            quality_score,
-            topics,
-            created_at
-        FROM document_chunks
-        ORDER BY source_name, chunk_index;
-        """
-        
-        chunks = self.run_surreal_query(query)
-        print(f"✅ Fetched {len(chunks)} chunks from SurrealDB")
-        return chunks
+                 neo4j_password: str = None,
+                 database: str = "neo4j"):
+        self.config = BulkImportConfig.from_env(
+            neo4j_uri=neo4j_uri,
+            neo4j_user=neo4j_user,
+            neo4j_password=neo4j_password or os.getenv("NEO4J_PASSWORD"),
+            neo4j_database=database
+        )
+        self.neo4j_uri = self.config.neo4j_uri
+        self.surreal = SurrealRowStream(self.config)
+        self.writer = Neo4jBulkWriter(self.config)
     
     async def fetch_source_summary(self) -> List[Dict[str, Any]]:
         """Fetch source summary from SurrealDB."""
         print("📊 Fetching source summary...")
         
-        query = """
+        sources = await self.surreal.query("""
         SELECT 
             source_name,
-            COUNT() as chunk_count,
-            AVG(quality_score) as avg_quality
+            count() as chunk_count,
+            math::mean(quality_score) as avg_quality
         FROM document_chunks
         GROUP BY source_name;
-        """
-        
-        sources = self.run_surreal_query(query)
+        """)
         print(f"✅ Found {len(sources)} unique sources")
         return sources
     
-    def create_source_node(self, source_name: str, chunk_count: int, avg_quality: float, database: str = "neo4j") -> bool:
-        """Create a source node in Neo4j."""
-        # Determine priority based on chunk count
+    def stream_chunks(self):
+        """Stream all chunks from SurrealDB page by page."""
+        return self.surreal.stream(
+            "document_chunks",
+            fields=CHUNK_FIELDS,
+            order_by="source_name, chunk_index"
+        )
+    
+    @staticmethod
+    def source_row(source: Dict[str, Any]) -> Dict[str, Any]:
+        """Source node properties, with priority derived from chunk count."""
+        chunk_count = source['chunk_count']
         if chunk_count > 50:
             priority = "high"
         elif chunk_count > 10:
             priority = "medium"
         else:
             priority = "low"
-            
-        query = f"""
-        MERGE (s:Source {{name: '{source_name}'}})
-        SET s.chunk_count = {chunk_count},
-            s.avg_quality = {avg_quality:.3f},
-            s.priority = '{priority}',
-            s.last_imported = datetime(),
-            s.description = '{source_name} documentation source'
-        RETURN s;
-        """
         
-        return self.run_cypher_query(query, database)
-    
-    def create_chunk_node(self, chunk: Dict[str, Any], database: str = "neo4j") -> bool:
-        """Create a chunk node in Neo4j."""
-        # Escape single quotes in text fields
-        chunk_id = chunk['id']
-        title = chunk.get('title', '').replace("'", "''")
-        content = chunk.get('content', '')[:1000].replace("'", "''")  # Limit content length
-        source_url = chunk.get('source_url', '').replace("'", "''")
-        
-        query = f"""
-        MERGE (c:Chunk {{id: '{chunk_id}'}})
-        SET c.title = '{title}',
-            c.content = '{content}',
-            c.url = '{source_url}',
-            c.chunk_index = {chunk.get('chunk_index', 0)},
-            c.total_chunks = {chunk.get('total_chunks', 1)},
-            c.quality_score = {chunk.get('quality_score', 0.5)},
-            c.created_at = datetime('{chunk.get('created_at', datetime.now().isoformat())}')
-        RETURN c;
-        """
-        
-        return self.run_cypher_query(query, database)
+        return {
+            "name": source['source_name'],
+            "chunk_count": chunk_count,
+            "avg_quality": round(source.get('avg_quality') or 0.8, 3),
+            "priority": priority
+        }
     
-    def create_source_chunk_relationship(self, source_name: str, chunk_id: str, database: str = "neo4j") -> bool:
-        """Create relationship between source and chunk."""
-        query = f"""
-        MATCH (s:Source {{name: '{source_name}'}}),
-              (c:Chunk {{id: '{chunk_id}'}})
-        MERGE (s)-[r:HAS_CHUNK]->(c)
-        SET r.imported_at = datetime()
-        RETURN r;
-        """
+    @staticmethod
+    def framework_row(source_name: str) -> Optional[Dict[str, Any]]:
+        """Framework node and DOCUMENTS relationship for a known source."""
+        if source_name not in FRAMEWORK_MAP:
+            return None
         
-        return self.run_cypher_query(query, database)
-    
-    def create_topic_relationships(self, chunk_id: str, topics: List[str], database: str = "neo4j") -> bool:
-        """Create topic nodes and relationships."""
-        if not topics:
-            return True
-            
-        for topic in topics[:5]:  # Limit to 5 topics per chunk
-            topic_name = str(topic).replace("'", "''")
-            
-            # Create topic node
-            topic_query = f"""
-            MERGE (t:Topic {{name: '{topic_name}'}})
-            SET t.category = CASE 
-                WHEN '{topic_name}' IN ['API', 'database', 'authentication', 'testing'] 
-                THEN 'concept'
-                WHEN '{topic_name}' IN ['Python', 'JavaScript', 'TypeScript'] 
-                THEN 'language'
-                ELSE 'framework'
-            END
-            RETURN t;
-            """
-            
-            if self.run_cypher_query(topic_query, database):
-                # Create relationship
-                rel_query = f"""
-                MATCH (c:Chunk {{id: '{chunk_id}'}}),
-                      (t:Topic {{name: '{topic_name}'}})
-                MERGE (c)-[r:COVERS_TOPIC]->(t)
-                SET r.relevance = 0.8
-                RETURN r;
-                """
-                
-                self.run_cypher_query(rel_query, database)
+        # Determine framework type
+        if source_name in ["FastAPI", "Pydantic AI", "Logfire", "PyGAD", "PyMC"]:
+            framework_type, language = "backend", "Python"
+        elif source_name in ["NextJS", "AnimeJS"]:
+            framework_type, language = "frontend", "JavaScript"
+        elif source_name in ["Tailwind", "Shadcn"]:
+            framework_type, language = "frontend", "CSS"
+        elif source_name == "SurrealDB":
+            framework_type, language = "database", "Rust"
+        else:
+            framework_type, language = "tool", "Various"
         
-        return True
+        return {
+            "source": source_name,
+            "framework": FRAMEWORK_MAP[source_name],
+            "type": framework_type,
+            "language": language
+        }
     
-    def create_framework_relationships(self, source_name: str, database: str = "neo4j") -> bool:
-        """Create framework documentation relationships."""
-        # Map sources to frameworks
-        framework_map = {
-            "FastAPI": "FastAPI",
-            "NextJS": "NextJS",
-            "SurrealDB": "SurrealDB",
-            "Tailwind": "Tailwind CSS",
-            "Shadcn": "Shadcn/UI",
-            "Pydantic AI": "Pydantic AI",
-            "Logfire": "Logfire",
-            "PyGAD": "PyGAD",
-            "bokeh": "bokeh",
-            "Panel": "Panel",
-            "Wildwood": "Wildwood",
-            "Crawl4AI": "Crawl4AI",
-            "FastMCP": "FastMCP",
-            "AnimeJS": "AnimeJS",
-            "PyMC": "PyMC",
-            "circom": "circom",
-            "Claude Code": "Claude Code"
+    @staticmethod
+    def chunk_row(chunk: Dict[str, Any]) -> Dict[str, Any]:
+        """Chunk node properties; content is truncated and topics capped at 5."""
+        return {
+            "id": chunk['id'],
+            "source_name": chunk.get('source_name'),
+            "title": chunk.get('title', ''),
+            "content": (chunk.get('content') or '')[:1000],
+            "url": chunk.get('source_url', ''),
+            "chunk_index": chunk.get('chunk_index', 0),
+            "total_chunks": chunk.get('total_chunks', 1),
+            "quality_score": chunk.get('quality_score', 0.5),
+            "created_at": str(chunk.get('created_at') or datetime.now().isoformat()),
+            "topics": [str(topic) for topic in (chunk.get('topics') or [])[:5]]
         }
-        
-        if source_name in framework_map:
-            framework_name = framework_map[source_name]
-            
-            # Determine framework type
-            if source_name in ["FastAPI", "Pydantic AI", "Logfire", "PyGAD", "PyMC"]:
-                framework_type = "backend"
-                language = "Python"
-            elif source_name in ["NextJS", "AnimeJS"]:
-                framework_type = "frontend"
-                language = "JavaScript"
-            elif source_name in ["Tailwind", "Shadcn"]:
-                framework_type = "frontend"
-                language = "CSS"
-            elif source_name == "SurrealDB":
-                framework_type = "database"
-                language = "Rust"
-            else:
-                framework_type = "tool"
-                language = "Various"
-            
-            query = f"""
-            MERGE (f:Framework {{name: '{framework_name}'}})
-            SET f.type = '{framework_type}',
-                f.language = '{language}'
-            WITH f
-            MATCH (s:Source {{name: '{source_name}'}})
-            MERGE (s)-[r:DOCUMENTS]->(f)
-            SET r.coverage = CASE
-                WHEN s.chunk_count > 50 THEN 'complete'
-                WHEN s.chunk_count > 20 THEN 'partial'
-                ELSE 'minimal'
-            END
-            RETURN r;
-            """
-            
-            return self.run_cypher_query(query, database)
-        
-        return True
     
-    def setup_database(self):
+    async def chunk_rows(self):
+        async for chunk in self.stream_chunks():
+            yield self.chunk_row(chunk)
+    
+    async def setup_database(self):
         """Setup the ptolemies database."""
         print("🗄️ Setting up ptolemies database...")
         
         # First, try to create the database using system database
         try:
-            create_db_query = "CREATE DATABASE ptolemies IF NOT EXISTS"
-            if self.run_cypher_query(create_db_query, database="system"):
-                print("✅ Database 'ptolemies' created/verified")
-                return True
+            system = Neo4jBulkWriter(replace(self.config, neo4j_database="system"), driver=self.writer.driver)
+            await system.run("CREATE DATABASE ptolemies IF NOT EXISTS")
+            print("✅ Database 'ptolemies' created/verified")
+            return True
         except Exception as e:
             print(f"Could not create ptolemies database: {e}")
         
@@ -316,83 +227,102 @@ class Neo4jImporter:
         print("🚀 Starting Neo4j import from SurrealDB...")
         print(f"Neo4j URI: {self.neo4j_uri}")
         
-        # Step 0: Setup database
-        self.setup_database()
-        
-        # Use the default neo4j database in your devqai project
-        target_database = "neo4j"
-        print(f"📊 Using '{target_database}' database in your devqai project")
-        
-        # Step 1: Create schema
-        print(f"\n📋 Creating Neo4j schema in '{target_database}' database...")
-        with open('/Users/dionedge/devqai/ptolemies/neo4j_schema.cypher', 'r') as f:
-            schema_queries = f.read().split(';')
+        async with self.surreal, self.writer:
+            # Step 0: Setup database
+            await self.setup_database()
             
-        for query in schema_queries:
-            query = query.strip()
-            if query and not query.startswith('//'):
-                self.run_cypher_query(query + ';', database=target_database)
-        
-        print("✅ Schema created")
-        
-        # Step 2: Import sources
-        print("\n📦 Importing sources...")
-        sources = await self.fetch_source_summary()
-        
-        for source in sources:
-            source_name = source['source_name']
-            chunk_count = source['chunk_count']
-            avg_quality = source.get('avg_quality', 0.8)
+            target_database = self.config.neo4j_database
+            print(f"📊 Using '{target_database}' database")
             
-            if self.create_source_node(source_name, chunk_count, avg_quality):
-                print(f"✅ Created source: {source_name} ({chunk_count} chunks)")
-                self.create_framework_relationships(source_name)
-        
-        # Step 3: Import chunks
-        print("\n📄 Importing chunks...")
-        chunks = await self.fetch_all_chunks()
-        
-        imported_count = 0
-        for i, chunk in enumerate(chunks):
-            if i % 50 == 0:
-                print(f"Progress: {i}/{len(chunks)} chunks...")
+            # Step 1: Create schema
+            print(f"\n📋 Creating Neo4j schema in '{target_database}' database...")
+            schema_path = Path(__file__).resolve().parent / "neo4j_schema.cypher"
+            await self.writer.run_script(schema_path.read_text())
+            print("✅ Schema created")
             
-            chunk_id = chunk['id']
-            source_name = chunk['source_name']
+            # Step 2: Import sources and their frameworks
+            print("\n📦 Importing sources...")
+            sources = [self.source_row(source) for source in await self.fetch_source_summary()]
+            await self.writer.write(SOURCE_QUERY, sources)
+            frameworks = [row for row in (self.framework_row(s["name"]) for s in sources) if row]
+            await self.writer.write(FRAMEWORK_QUERY, frameworks)
+            for source in sources:
+                print(f"✅ Created source: {source['name']} ({source['chunk_count']} chunks)")
             
-            # Create chunk node
-            if self.create_chunk_node(chunk):
-                # Create source relationship
-                self.create_source_chunk_relationship(source_name, chunk_id)
-                
-                # Create topic relationships
-                topics = chunk.get('topics', [])
-                if topics:
-                    self.create_topic_relationships(chunk_id, topics)
-                
-                imported_count += 1
-        
-        print(f"\n✅ Import complete! Imported {imported_count}/{len(chunks)} chunks")
-        
-        # Step 4: Verify import
-        print("\n🔍 Verifying import...")
-        verification_query = """
-        MATCH (s:Source)
-        RETURN s.name as source, s.chunk_count as chunks
-        ORDER BY s.chunk_count DESC;
-        """
-        
-        self.run_cypher_query(verification_query)
+            # Step 3: Stream chunks with their source and topic relationships
+            print("\n📄 Importing chunks...")
+            stats = await self.writer.write(CHUNK_QUERY, self.chunk_rows())
+            print(f"\n✅ Import complete! Imported {stats.rows} chunks "
+                  f"in {stats.batches} batches ({stats.failed_batches} failed, {stats.elapsed_seconds:.1f}s)")
+            
+            # Step 4: Verify import
+            print("\n🔍 Verifying import...")
+            for record in await self.writer.run(
+                "MATCH (s:Source) RETURN s.name as source, s.chunk_count as chunks ORDER BY s.chunk_count DESC"
+            ):
+                print(f"  {record['source']}: {record['chunks']}")
         
         print("\n🎉 Neo4j import completed successfully!")
         print("\nUseful queries to try:")
         print("- MATCH (s:Source)-[:HAS_CHUNK]->(c:Chunk) RETURN s.name, COUNT(c) as chunks;")
         print("- MATCH (c:Chunk)-[:COVERS_TOPIC]->(t:Topic) RETURN t.name, COUNT(c) as mentions ORDER BY mentions DESC LIMIT 10;")
         print("- MATCH (f:Framework)<-[:DOCUMENTS]-(s:Source) RETURN f.name, COLLECT(s.name) as sources;")
+    
+    async def export_admin_csv(self, output_dir: str):
+        """Write neo4j-admin import CSVs instead of loading through bolt (cold loads)."""
+        print(f"📦 Writing neo4j-admin import files to {output_dir}...")
+        admin = AdminImportWriter(output_dir)
+        topics = set()
+        chunk_sources = []
+        chunk_topics = []
+        
+        async with self.surreal:
+            sources = [self.source_row(source) for source in await self.fetch_source_summary()]
+            frameworks = [row for row in (self.framework_row(s["name"]) for s in sources) if row]
+            
+            async def chunks():
+                async for row in self.chunk_rows():
+                    chunk_sources.append({"start": row["source_name"], "end": row["id"]})
+                    for topic in row["topics"]:
+                        topics.add(topic)
+                        chunk_topics.append({"start": row["id"], "end": topic, "relevance": 0.8})
+                    yield row
+            
+            chunk_count = await admin.write_nodes(
+                "Chunk", chunks(), "id",
+                ["title", "content", "url", "chunk_index", "total_chunks", "quality_score", "created_at"],
+                id_space="Chunk"
+            )
+        
+        await admin.write_nodes("Source", sources, "name",
+                                ["chunk_count", "avg_quality", "priority"], id_space="Source")
+        await admin.write_nodes("Framework", [{**f, "name": f["framework"]} for f in frameworks], "name",
+                                ["type", "language"], id_space="Framework")
+        await admin.write_nodes("Topic", [{"name": t} for t in sorted(topics)], "name", [], id_space="Topic")
+        await admin.write_relationships("HAS_CHUNK", chunk_sources,
+                                        start_id_space="Source", end_id_space="Chunk")
+        await admin.write_relationships("COVERS_TOPIC", chunk_topics, properties=["relevance"],
+                                        start_id_space="Chunk", end_id_space="Topic")
+        await admin.write_relationships("DOCUMENTS",
+                                        [{"start": f["source"], "end": f["framework"]} for f in frameworks],
+                                        start_id_space="Source", end_id_space="Framework")
+        
+        print(f"✅ Wrote {chunk_count} chunks, {len(sources)} sources, {len(topics)} topics")
+        print("Load into an empty (stopped) database with:")
+        print("  " + " ".join(admin.command(self.config.neo4j_database)))
 
 
 async def main():
     """Main execution function."""
+    parser = argparse.ArgumentParser(description="Import SurrealDB chunks into Neo4j")
+    parser.add_argument("--admin-csv", metavar="DIR",
+                        help="write neo4j-admin import CSVs to DIR instead of importing over bolt")
+    args = parser.parse_args()
+    
+    if args.admin_csv:
+        await Neo4jImporter(neo4j_password=os.getenv("NEO4J_PASSWORD", "")).export_admin_csv(args.admin_csv)
+        return
+    
     # Get Neo4j password from environment or prompt
     neo4j_password = os.getenv("NEO4J_PASSWORD")
     
@@ -407,4 +337,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
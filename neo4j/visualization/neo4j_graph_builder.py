@@ -7,13 +7,18 @@ Builds rich relationships between classes, functions, methods, attributes, and f
 to create comprehensive code knowledge graphs for visualization and analysis.
 """
 
-import subprocess
-import json
-import time
-from typing import Dict, List, Any, Optional
+import asyncio
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import logging
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from graph_bulk_import import BulkImportConfig, Neo4jBulkWriter, validate_identifier
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -21,43 +26,40 @@ class Neo4jGraphBuilder:
     """Build comprehensive code relationship graphs in Neo4j."""
     
     def __init__(self):
-        self.neo4j_config = {
-            'uri': 'bolt://localhost:7687',
-            'user': 'neo4j',
-            'password': 'ptolemies',
-            'database': 'neo4j'
-        }
+        self.config = BulkImportConfig.from_env(neo4j_password='ptolemies', neo4j_database='neo4j')
+        self.writer = Neo4jBulkWriter(self.config)
     
-    def run_cypher_query(self, query: str, description: str = "") -> bool:
-        """Execute Cypher query."""
-        cmd = [
-            'cypher-shell',
-            '-a', self.neo4j_config['uri'],
-            '-u', self.neo4j_config['user'],
-            '-p', self.neo4j_config['password'],
-            '-d', self.neo4j_config['database'],
-            '--format', 'plain'
-        ]
-        
+    async def run_cypher_query(self, query: str, description: str = "",
+                               parameters: Optional[Dict[str, Any]] = None) -> bool:
+        """Execute a parameterized Cypher query."""
         try:
-            result = subprocess.run(
-                cmd, input=query, text=True,
-                capture_output=True, timeout=60
-            )
-            
-            if result.returncode == 0:
-                if description:
-                    logger.info(f"✅ {description}")
-                return True
-            else:
-                logger.error(f"❌ {description}: {result.stderr}")
-                return False
-                
+            await self.writer.run(query, parameters)
+            if description:
+                logger.info(f"✅ {description}")
+            return True
         except Exception as e:
             logger.error(f"❌ Query failed ({description}): {e}")
             return False
     
-    def create_comprehensive_schema(self):
+    async def write_by_type(self, template: str, rows: List[Dict[str, Any]], description: str,
+                            key: str = "relationship"):
+        """Write rows in one UNWIND batch per relationship type.
+        
+        Relationship types cannot be parameterized, so ``template`` is
+        formatted with the validated type once per group.
+        """
+        groups: Dict[Tuple, List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            groups[row[key]].append(row)
+        
+        for group_key, group_rows in groups.items():
+            identifiers = group_key if isinstance(group_key, tuple) else (group_key,)
+            query = template.format(*(validate_identifier(i) for i in identifiers))
+            stats = await self.writer.write(query, group_rows)
+            status = "✅" if not stats.failed_batches else "❌"
+            logger.info(f"{status} {description}: {'/'.join(identifiers)} ({stats.rows} rows)")
+    
+    async def create_comprehensive_schema(self):
         """Create comprehensive schema for code relationships."""
         
         logger.info("🏗️ Creating comprehensive Neo4j schema...")
@@ -110,23 +112,23 @@ class Neo4jGraphBuilder:
             
             # Full-text search indexes
             """
-            CREATE TEXT INDEX code_elements_search IF NOT EXISTS 
+            CREATE FULLTEXT INDEX code_elements_search IF NOT EXISTS 
             FOR (n:Framework) ON EACH [n.name, n.description];
             """,
             """
-            CREATE TEXT INDEX class_search IF NOT EXISTS 
+            CREATE FULLTEXT INDEX class_search IF NOT EXISTS 
             FOR (n:Class) ON EACH [n.name, n.description, n.docstring];
             """,
             """
-            CREATE TEXT INDEX method_search IF NOT EXISTS 
+            CREATE FULLTEXT INDEX method_search IF NOT EXISTS 
             FOR (n:Method) ON EACH [n.name, n.description, n.docstring];
             """
         ]
         
         for i, query in enumerate(schema_queries):
-            self.run_cypher_query(query, f"Schema step {i+1}/{len(schema_queries)}")
+            await self.run_cypher_query(query, f"Schema step {i+1}/{len(schema_queries)}")
     
-    def build_framework_hierarchy(self):
+    async def build_framework_hierarchy(self):
         """Build framework dependency and integration hierarchies."""
         
         logger.info("🔗 Building framework hierarchy relationships...")
@@ -157,17 +159,23 @@ class Neo4jGraphBuilder:
             ("SurrealDB", "CRAWLED_BY", "Crawl4AI", "data_extraction"),
         ]
         
-        for source, relationship, target, context in framework_relationships:
-            query = f"""
-            MATCH (source:Framework {{name: "{source}"}}), (target:Framework {{name: "{target}"}})
-            MERGE (source)-[r:{relationship}]->(target)
-            SET r.context = "{context}",
-                r.created_at = datetime(),
-                r.relationship_type = "framework_integration";
+        await self.write_by_type(
             """
-            self.run_cypher_query(query, f"Framework relationship: {source} -> {target}")
+            UNWIND $rows AS row
+            MATCH (source:Framework {{name: row.source}}), (target:Framework {{name: row.target}})
+            MERGE (source)-[r:{0}]->(target)
+            SET r.context = row.context,
+                r.created_at = datetime(),
+                r.relationship_type = "framework_integration"
+            """,
+            [
+                {"source": source, "relationship": relationship, "target": target, "context": context}
+                for source, relationship, target, context in framework_relationships
+            ],
+            "Framework relationships"
+        )
     
-    def build_inheritance_chains(self):
+    async def build_inheritance_chains(self):
         """Build class inheritance and composition relationships."""
         
         logger.info("🧬 Building inheritance and composition chains...")
@@ -192,28 +200,43 @@ class Neo4jGraphBuilder:
             ("surrealdb.Surreal", "IMPLEMENTS", "surrealdb.Connection", "database_interface"),
         ]
         
-        for source_class, relationship, target_class, context in inheritance_patterns:
-            # Create target class if it doesn't exist
-            create_target_query = f"""
-            MERGE (target:Class {{full_name: "{target_class}"}})
-            SET target.name = split("{target_class}", ".")[size(split("{target_class}", "."))-1],
-                target.module = substring("{target_class}", 0, size("{target_class}") - size(split("{target_class}", ".")[size(split("{target_class}", "."))-1]) - 1),
+        rows = [
+            {
+                "source": source_class,
+                "relationship": relationship,
+                "target": target_class,
+                "target_name": target_class.split(".")[-1],
+                "target_module": target_class.rsplit(".", 1)[0] if "." in target_class else "",
+                "context": context
+            }
+            for source_class, relationship, target_class, context in inheritance_patterns
+        ]
+        
+        # Create target classes if they don't exist
+        await self.writer.write("""
+            UNWIND $rows AS row
+            MERGE (target:Class {full_name: row.target})
+            SET target.name = row.target_name,
+                target.module = row.target_module,
                 target.inferred = true,
-                target.created_at = datetime();
+                target.created_at = datetime()
+            """, rows)
+        logger.info(f"✅ Created {len(rows)} inferred classes")
+        
+        await self.write_by_type(
             """
-            self.run_cypher_query(create_target_query, f"Create inferred class: {target_class}")
-            
-            # Create relationship
-            relationship_query = f"""
-            MATCH (source:Class {{full_name: "{source_class}"}}), (target:Class {{full_name: "{target_class}"}})
-            MERGE (source)-[r:{relationship}]->(target)
-            SET r.context = "{context}",
+            UNWIND $rows AS row
+            MATCH (source:Class {{full_name: row.source}}), (target:Class {{full_name: row.target}})
+            MERGE (source)-[r:{0}]->(target)
+            SET r.context = row.context,
                 r.created_at = datetime(),
-                r.relationship_type = "code_structure";
-            """
-            self.run_cypher_query(relationship_query, f"Inheritance: {source_class} -> {target_class}")
+                r.relationship_type = "code_structure"
+            """,
+            rows,
+            "Inheritance"
+        )
     
-    def build_method_relationships(self):
+    async def build_method_relationships(self):
         """Build method call and override relationships."""
         
         logger.info("🔧 Building method relationships...")
@@ -235,35 +258,46 @@ class Neo4jGraphBuilder:
             ("surrealdb.Surreal.use", "CONFIGURES", "surrealdb.Surreal.connection", "namespace_setup"),
         ]
         
-        for source_method, relationship, target_method, context in method_patterns:
-            # Create target method if it doesn't exist
-            target_parts = target_method.split('.')
-            if len(target_parts) >= 2:
-                target_class = '.'.join(target_parts[:-1])
-                method_name = target_parts[-1]
-                
-                create_target_query = f"""
-                MERGE (target_class:Class {{full_name: "{target_class}"}})
-                SET target_class.inferred = true
-                MERGE (target_method:Method {{full_name: "{target_method}"}})
-                SET target_method.name = "{method_name}",
-                    target_method.inferred = true,
-                    target_method.created_at = datetime()
-                MERGE (target_class)-[:HAS_METHOD]->(target_method);
-                """
-                self.run_cypher_query(create_target_query, f"Create inferred method: {target_method}")
-            
-            # Create method relationship
-            relationship_query = f"""
-            MATCH (source:Method {{full_name: "{source_method}"}}), (target:Method {{full_name: "{target_method}"}})
-            MERGE (source)-[r:{relationship}]->(target)
-            SET r.context = "{context}",
-                r.created_at = datetime(),
-                r.relationship_type = "method_interaction";
+        rows = [
+            {
+                "source": source_method,
+                "relationship": relationship,
+                "target": target_method,
+                "target_class": target_method.rsplit(".", 1)[0],
+                "method_name": target_method.split(".")[-1],
+                "context": context
+            }
+            for source_method, relationship, target_method, context in method_patterns
+        ]
+        
+        # Create target methods if they don't exist
+        await self.writer.write("""
+            UNWIND $rows AS row
+            WITH row WHERE row.target CONTAINS '.'
+            MERGE (target_class:Class {full_name: row.target_class})
+            SET target_class.inferred = true
+            MERGE (target_method:Method {full_name: row.target})
+            SET target_method.name = row.method_name,
+                target_method.inferred = true,
+                target_method.created_at = datetime()
+            MERGE (target_class)-[:HAS_METHOD]->(target_method)
+            """, rows)
+        logger.info(f"✅ Created {len(rows)} inferred methods")
+        
+        await self.write_by_type(
             """
-            self.run_cypher_query(relationship_query, f"Method relationship: {source_method} -> {target_method}")
+            UNWIND $rows AS row
+            MATCH (source:Method {{full_name: row.source}}), (target:Method {{full_name: row.target}})
+            MERGE (source)-[r:{0}]->(target)
+            SET r.context = row.context,
+                r.created_at = datetime(),
+                r.relationship_type = "method_interaction"
+            """,
+            rows,
+            "Method relationships"
+        )
     
-    def build_parameter_relationships(self):
+    async def build_parameter_relationships(self):
         """Build function/method parameter and return type relationships."""
         
         logger.info("📋 Building parameter and type relationships...")
@@ -282,29 +316,39 @@ class Neo4jGraphBuilder:
             ("surrealdb.Surreal.query", "RETURNS", "QueryResult", "database_result"),
         ]
         
-        for function_name, relationship, type_name, context in parameter_patterns:
-            # Create type node
-            create_type_query = f"""
-            MERGE (type:Type {{name: "{type_name}"}})
+        # Create type nodes
+        await self.writer.write("""
+            UNWIND $rows AS row
+            MERGE (type:Type {name: row.name})
             SET type.category = "parameter_type",
-                type.created_at = datetime();
+                type.created_at = datetime()
+            """, [{"name": type_name} for _, _, type_name, _ in parameter_patterns])
+        
+        # Method (Class.method) or function (module.function)
+        await self.write_by_type(
             """
-            self.run_cypher_query(create_type_query, f"Create type: {type_name}")
-            
-            # Create relationship
-            if "." in function_name:
-                # Method or function
-                node_type = "Method" if function_name.count('.') >= 2 else "Function"
-                relationship_query = f"""
-                MATCH (func:{node_type} {{full_name: "{function_name}"}}), (type:Type {{name: "{type_name}"}})
-                MERGE (func)-[r:{relationship}]->(type)
-                SET r.context = "{context}",
-                    r.created_at = datetime(),
-                    r.relationship_type = "type_relationship";
-                """
-                self.run_cypher_query(relationship_query, f"Parameter relationship: {function_name} -> {type_name}")
+            UNWIND $rows AS row
+            MATCH (func:{0} {{full_name: row.function}}), (type:Type {{name: row.type}})
+            MERGE (func)-[r:{1}]->(type)
+            SET r.context = row.context,
+                r.created_at = datetime(),
+                r.relationship_type = "type_relationship"
+            """,
+            [
+                {
+                    "function": function_name,
+                    "type": type_name,
+                    "context": context,
+                    "key": ("Method" if function_name.count('.') >= 2 else "Function", relationship)
+                }
+                for function_name, relationship, type_name, context in parameter_patterns
+                if "." in function_name
+            ],
+            "Parameter relationships",
+            key="key"
+        )
     
-    def build_usage_patterns(self):
+    async def build_usage_patterns(self):
         """Build common usage pattern relationships."""
         
         logger.info("📊 Building usage pattern relationships...")
@@ -329,19 +373,25 @@ class Neo4jGraphBuilder:
             ("SurrealDB", "SUPPORTS", "SQL", "query_language"),
         ]
         
-        for framework, relationship, target, context in usage_patterns:
-            query = f"""
-            MATCH (framework:Framework {{name: "{framework}"}})
-            MERGE (target_node:UsagePattern {{name: "{target}"}})
-            SET target_node.context = "{context}",
+        await self.write_by_type(
+            """
+            UNWIND $rows AS row
+            MATCH (framework:Framework {{name: row.framework}})
+            MERGE (target_node:UsagePattern {{name: row.target}})
+            SET target_node.context = row.context,
                 target_node.created_at = datetime()
-            MERGE (framework)-[r:{relationship}]->(target_node)
+            MERGE (framework)-[r:{0}]->(target_node)
             SET r.pattern_type = "common_usage",
-                r.created_at = datetime();
-            """
-            self.run_cypher_query(query, f"Usage pattern: {framework} -> {target}")
+                r.created_at = datetime()
+            """,
+            [
+                {"framework": framework, "relationship": relationship, "target": target, "context": context}
+                for framework, relationship, target, context in usage_patterns
+            ],
+            "Usage patterns"
+        )
     
-    def create_code_complexity_metrics(self):
+    async def create_code_complexity_metrics(self):
         """Add complexity and metrics to code elements."""
         
         logger.info("📈 Adding complexity metrics to code elements...")
@@ -361,7 +411,7 @@ class Neo4jGraphBuilder:
                 ELSE 0
             END;
         """
-        self.run_cypher_query(complexity_query, "Method complexity metrics")
+        await self.run_cypher_query(complexity_query, "Method complexity metrics")
         
         # Add framework maturity scores
         maturity_query = """
@@ -388,7 +438,7 @@ class Neo4jGraphBuilder:
                 ELSE 'fair'
             END;
         """
-        self.run_cypher_query(maturity_query, "Framework maturity scores")
+        await self.run_cypher_query(maturity_query, "Framework maturity scores")
     
     def generate_visualization_queries(self) -> Dict[str, str]:
         """Generate useful queries for graph visualization."""
@@ -494,44 +544,49 @@ class Neo4jGraphBuilder:
         
         logger.info(f"📄 Visualization queries exported to: {query_file}")
     
-    def build_comprehensive_graph(self):
+    async def build_comprehensive_graph(self):
         """Build the complete comprehensive graph."""
         
         logger.info("🚀 Building Comprehensive Neo4j Knowledge Graph")
         logger.info("=" * 50)
         
-        # Step 1: Create schema
-        self.create_comprehensive_schema()
-        
-        # Step 2: Build framework relationships
-        self.build_framework_hierarchy()
-        
-        # Step 3: Build inheritance chains
-        self.build_inheritance_chains()
-        
-        # Step 4: Build method relationships
-        self.build_method_relationships()
-        
-        # Step 5: Build parameter relationships
-        self.build_parameter_relationships()
-        
-        # Step 6: Build usage patterns
-        self.build_usage_patterns()
+        await self.writer.connect()
         
-        # Step 7: Add complexity metrics
-        self.create_code_complexity_metrics()
-        
-        # Step 8: Generate and export visualization queries
-        queries = self.generate_visualization_queries()
-        self.export_visualization_queries(queries)
-        
-        # Final verification
-        self.verify_graph_completeness()
+        try:
+            # Step 1: Create schema
+            await self.create_comprehensive_schema()
+            
+            # Step 2: Build framework relationships
+            await self.build_framework_hierarchy()
+            
+            # Step 3: Build inheritance chains
+            await self.build_inheritance_chains()
+            
+            # Step 4: Build method relationships
+            await self.build_method_relationships()
+            
+            # Step 5: Build parameter relationships
+            await self.build_parameter_relationships()
+            
+            # Step 6: Build usage patterns
+            await self.build_usage_patterns()
+            
+            # Step 7: Add complexity metrics
+            await self.create_code_complexity_metrics()
+            
+            # Step 8: Generate and export visualization queries
+            queries = self.generate_visualization_queries()
+            self.export_visualization_queries(queries)
+            
+            # Final verification
+            await self.verify_graph_completeness()
+        finally:
+            await self.writer.close()
         
         logger.info("\n🎉 Comprehensive Neo4j Knowledge Graph Complete!")
         logger.info("="*50)
     
-    def verify_graph_completeness(self):
+    async def verify_graph_completeness(self):
         """Verify the completeness of the built graph."""
         
         logger.info("🔍 Verifying graph completeness...")
@@ -551,37 +606,21 @@ class Neo4jGraphBuilder:
         print("-" * 30)
         
         for description, query in verification_queries:
-            cmd = [
-                'cypher-shell',
-                '-a', self.neo4j_config['uri'],
-                '-u', self.neo4j_config['user'],
-                '-p', self.neo4j_config['password'],
-                '-d', self.neo4j_config['database'],
-                '--format', 'plain'
-            ]
-            
             try:
-                result = subprocess.run(
-                    cmd, input=query, text=True,
-                    capture_output=True, timeout=30
-                )
-                
-                if result.returncode == 0:
-                    lines = result.stdout.strip().split('\n')
-                    if len(lines) > 1:
-                        count = lines[1].strip('"')
-                        print(f"  {description}: {count}")
+                records = await self.writer.run(query)
+                if records:
+                    print(f"  {description}: {records[0]['total']}")
                         
             except Exception as e:
                 print(f"  {description}: Error - {e}")
 
-def main():
+async def main():
     """Main execution function."""
     
     builder = Neo4jGraphBuilder()
     
     try:
-        builder.build_comprehensive_graph()
+        await builder.build_comprehensive_graph()
         
         print("\n✅ Neo4j comprehensive graph building complete!")
         print("\n📖 Next steps:")
@@ -594,4 +633,4 @@ def main():
         logger.error(f"Critical error: {e}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Adaptive Concurrency Limits for Ptolemies
+Sizes the number of in-flight operations per backend from observed latency
+with additive-increase/multiplicative-decrease (AIMD): the limit grows by
+about one per round of completions while latency stays within target and is
+cut by a factor when it does not. Excess work waits in a bounded queue and is
+rejected as soon as the queue is full or its wait budget runs out, instead of
+piling onto an overloaded SurrealDB or Neo4j.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Deque, AsyncIterator
+
+import logfire
+
+class ConcurrencyLimitExceeded(RuntimeError):
+    """Work rejected because its backend is at its concurrency limit."""
+
+class AIMDLimiter:
+    """In-flight limit for one backend, adapted to its latency.
+    
+    Each operation completing within ``target_latency_ms`` while the limit
+    is at least half used raises the limit by ``1 / limit``; a slower or
+    timed-out operation multiplies it by ``backoff``. Only operations
+    started after the last decrease can decrease it again, so one burst of
+    slow responses cuts the limit once rather than once per response.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        target_latency_ms: float,
+        initial_limit: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 100,
+        backoff: float = 0.9,
+        max_queue: int = 100,
+        max_queue_wait_ms: float = 100.0
+    ):
+        self.name = name
+        self.target_latency_ms = target_latency_ms
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.backoff = backoff
+        self.max_queue = max_queue
+        self.max_queue_wait_ms = max_queue_wait_ms
+        
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = float("-inf")
+        
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.decreases = 0
+        self.peak_in_flight = 0
+    
+    @property
+    def current_limit(self) -> int:
+        return int(self.limit)
+    
+    def _admit(self):
+        self.in_flight += 1
+        self.admitted += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+    
+    def _wake(self):
+        while self._waiters and self.in_flight < self.current_limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._admit()
+                waiter.set_result(None)
+    
+    async def acquire(self) -> float:
+        """Wait for a slot; returns its start time, to be passed to ``release``.
+        
+        Raises ``ConcurrencyLimitExceeded`` immediately when the queue is
+        full, or once ``max_queue_wait_ms`` passes without a free slot.
+        """
+        if self.in_flight < self.current_limit and not self._waiters:
+            self._admit()
+            return time.monotonic()
+        
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise ConcurrencyLimitExceeded(
+                f"{self.name}: {self.in_flight} in flight and {len(self._waiters)} queued"
+            )
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            await asyncio.wait_for(waiter, self.max_queue_wait_ms / 1000.0)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # Handed a slot just as the wait ended; pass it on
+                self.in_flight -= 1
+                self._wake()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected += 1
+                raise ConcurrencyLimitExceeded(
+                    f"{self.name}: no slot free within {self.max_queue_wait_ms}ms"
+                ) from None
+            raise
+        return time.monotonic()
+    
+    def release(self, started: float, overloaded: bool = False):
+        """Free a slot and adapt the limit to the operation's latency.
+        
+        ``overloaded`` marks operations that timed out; they always count
+        as over target.
+        """
+        latency_ms = (time.monotonic() - started) * 1000
+        utilised = self.in_flight >= self.limit / 2
+        self.in_flight -= 1
+        
+        if overloaded or latency_ms > self.target_latency_ms:
+            if started > self._last_decrease:
+                old_limit = self.current_limit
+                self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                self._last_decrease = time.monotonic()
+                self.decreases += 1
+                if self.current_limit < old_limit:
+                    logfire.info("Concurrency limit decreased",
+                               backend=self.name,
+                               limit=self.current_limit,
+                               latency_ms=round(latency_ms, 2),
+                               target_ms=self.target_latency_ms)
+        elif utilised:
+            # Growing while mostly idle would only measure the light load
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+        
+        self._wake()
+    
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a slot for the block; a timeout inside it counts as overload."""
+        started = await self.acquire()
+        overloaded = False
+        try:
+            yield
+        except asyncio.TimeoutError:
+            overloaded = True
+            raise
+        finally:
+            self.release(started, overloaded)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.current_limit,
+            "in_flight": self.in_flight,
+            "queue_depth": len(self._waiters),
+            "target_latency_ms": self.target_latency_ms,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "decreases": self.decreases,
+            "peak_in_flight": self.peak_in_flight
+        }
+
+class BackendLimiters:
+    """One ``AIMDLimiter`` per backend name, created on first use with shared options."""
+    
+    def __init__(self, **limiter_options: Any):
+        self.limiter_options = limiter_options
+        self._limiters: Dict[str, AIMDLimiter] = {}
+    
+    def __getitem__(self, backend: str) -> AIMDLimiter:
+        limiter = self._limiters.get(backend)
+        if limiter is None:
+            limiter = self._limiters[backend] = AIMDLimiter(backend, **self.limiter_options)
+        return limiter
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {backend: limiter.stats() for backend, limiter in self._limiters.items()}
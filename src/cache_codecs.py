@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""
+Cache Payload Codecs for Ptolemies
+Registries of payload formats and compressors used by the Redis cache layer.
+Each stored value names its format and compressor by id in its header, so any
+registered codec can read values written with any other. Includes a columnar
+binary format for search result lists, dictionary-trained compressors, and a
+benchmark used to pick the defaults.
+"""
+
+import gzip
+import hashlib
+import json
+import pickle
+import random
+import re
+import struct
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from functools import partial
+from typing import Dict, List, Any, Optional, Callable, Iterable, Sequence, Tuple
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+try:
+    import lz4.frame as lz4_frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    lz4_frame = None
+    LZ4_AVAILABLE = False
+
+@dataclass(frozen=True)
+class PayloadFormat:
+    """Turns values into bytes and back."""
+    format_id: int
+    name: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+
+@dataclass(frozen=True)
+class Compressor:
+    """Compresses encoded payloads; dictionary compressors prefix the dictionary id."""
+    codec_id: int
+    name: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+    uses_dictionary: bool = False
+
+class MissingDictionaryError(KeyError):
+    """A value was compressed with a dictionary this process has not loaded."""
+    
+    def __init__(self, dictionary_id: int):
+        super().__init__(dictionary_id)
+        self.dictionary_id = dictionary_id
+
+FORMATS: Dict[str, PayloadFormat] = {}
+FORMATS_BY_ID: Dict[int, PayloadFormat] = {}
+COMPRESSORS: Dict[str, Compressor] = {}
+COMPRESSORS_BY_ID: Dict[int, Compressor] = {}
+DICTIONARIES: Dict[int, bytes] = {}
+
+def register_format(payload_format: PayloadFormat) -> PayloadFormat:
+    FORMATS[payload_format.name] = payload_format
+    FORMATS_BY_ID[payload_format.format_id] = payload_format
+    return payload_format
+
+def register_compressor(compressor: Compressor) -> Compressor:
+    COMPRESSORS[compressor.name] = compressor
+    COMPRESSORS_BY_ID[compressor.codec_id] = compressor
+    return compressor
+
+def format_by_id(format_id: int) -> PayloadFormat:
+    try:
+        return FORMATS_BY_ID[format_id]
+    except KeyError:
+        raise ValueError(f"Unknown cache format: {format_id}") from None
+
+def compressor_by_id(codec_id: int) -> Compressor:
+    try:
+        return COMPRESSORS_BY_ID[codec_id]
+    except KeyError:
+        raise ValueError(f"Unknown cache codec: {codec_id}") from None
+
+# JSON
+#
+# orjson reads integers wider than 64 bits back as floats, so payloads it
+# could not write (or written without it) start with a space, which orjson
+# never emits and any JSON parser skips, and are read back with json.
+
+_JSON_FALLBACK_MARK = b" "
+
+def _json_dumps(value: Any) -> bytes:
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(value, default=str,
+                                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            pass  # e.g. integers wider than 64 bits
+    return _JSON_FALLBACK_MARK + json.dumps(value, default=str, separators=(",", ":")).encode("utf-8")
+
+def _json_loads(data: bytes) -> Any:
+    if ORJSON_AVAILABLE and not data.startswith(_JSON_FALLBACK_MARK):
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8"))
+
+# Columnar result lists
+#
+# Lists of two or more dicts sharing the same string keys (search results)
+# are pulled out of the value and stored column by column: floats and ints
+# as little-endian arrays, strings as one UTF-8 blob plus lengths, anything
+# else as a JSON list. The rest of the value is JSON with a placeholder
+# where each table was.
+#
+#   u32 meta length | meta JSON {"v": skeleton, "t": [[rows, keys, types]]}
+#   then per column: u32 length | column bytes
+
+COLUMN_TABLE_KEY = "\x00table"
+_U32 = struct.Struct("<I")
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+def _is_table(value: Any) -> bool:
+    if not isinstance(value, list) or len(value) < 2 or type(value[0]) is not dict:
+        return False
+    keys = value[0].keys()
+    if not keys or not all(type(key) is str for key in keys):
+        return False
+    return all(type(row) is dict and row.keys() == keys for row in value)
+
+def _encode_column(values: List[Any]) -> Tuple[str, bytes]:
+    # struct beats numpy here: result lists are tens of rows, not thousands
+    rows = len(values)
+    kinds = {type(value) for value in values}
+    if kinds == {float}:
+        return "f", struct.pack(f"<{rows}d", *values)
+    if kinds == {int} and _INT64_MIN <= min(values) and max(values) <= _INT64_MAX:
+        return "i", struct.pack(f"<{rows}q", *values)
+    if kinds == {str}:
+        lengths = struct.pack(f"<{rows}I", *map(len, values))
+        return "s", lengths + "".join(values).encode("utf-8", "surrogatepass")
+    return "j", _json_dumps(values)
+
+def _decode_column(kind: str, data: bytes, rows: int) -> List[Any]:
+    if kind == "f":
+        return list(struct.unpack_from(f"<{rows}d", data))
+    if kind == "i":
+        return list(struct.unpack_from(f"<{rows}q", data))
+    if kind == "s":
+        lengths = struct.unpack_from(f"<{rows}I", data)
+        text = data[4 * rows:].decode("utf-8", "surrogatepass")
+        values = []
+        start = 0
+        for length in lengths:
+            values.append(text[start:start + length])
+            start += length
+        return values
+    return _json_loads(data)
+
+def _columnar_dumps(value: Any) -> bytes:
+    tables = []
+    columns = []
+    
+    def extract(node):
+        if _is_table(node):
+            keys = list(node[0])
+            types = []
+            for key in keys:
+                kind, data = _encode_column([row[key] for row in node])
+                types.append(kind)
+                columns.append(data)
+            tables.append([len(node), keys, "".join(types)])
+            return {COLUMN_TABLE_KEY: len(tables) - 1}
+        if isinstance(node, dict):
+            return {key: extract(item) for key, item in node.items()}
+        if isinstance(node, (list, tuple)):
+            return [extract(item) for item in node]
+        return node
+    
+    meta = _json_dumps({"v": extract(value), "t": tables})
+    parts = [_U32.pack(len(meta)), meta]
+    for data in columns:
+        parts.append(_U32.pack(len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+def _columnar_loads(data: bytes) -> Any:
+    view = memoryview(data)
+    (meta_length,) = _U32.unpack_from(view, 0)
+    offset = _U32.size + meta_length
+    meta = _json_loads(bytes(view[_U32.size:offset]))
+    
+    tables = []
+    for rows, keys, types in meta["t"]:
+        columns = []
+        for kind in types:
+            (length,) = _U32.unpack_from(view, offset)
+            offset += _U32.size
+            columns.append(_decode_column(kind, bytes(view[offset:offset + length]), rows))
+            offset += length
+        tables.append([dict(zip(keys, row)) for row in zip(*columns)])
+    
+    if not tables:
+        return meta["v"]
+    
+    def restore(node):
+        if isinstance(node, dict):
+            if len(node) == 1 and COLUMN_TABLE_KEY in node:
+                return tables[node[COLUMN_TABLE_KEY]]
+            return {key: restore(item) for key, item in node.items()}
+        if isinstance(node, list):
+            return [restore(item) for item in node]
+        return node
+    
+    return restore(meta["v"])
+
+register_format(PayloadFormat(1, "json", _json_dumps, _json_loads))
+register_format(PayloadFormat(2, "pickle", partial(pickle.dumps, protocol=pickle.HIGHEST_PROTOCOL), pickle.loads))
+register_format(PayloadFormat(3, "columnar", _columnar_dumps, _columnar_loads))
+
+# Compressors
+
+def _deflate_compress(data: bytes, level: int = 1, dictionary: Optional[bytes] = None) -> bytes:
+    if dictionary is None:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=dictionary)
+    return compressor.compress(data) + compressor.flush()
+
+def _deflate_decompress(data: bytes, dictionary: Optional[bytes] = None) -> bytes:
+    if dictionary is None:
+        decompressor = zlib.decompressobj(-15)
+    else:
+        decompressor = zlib.decompressobj(-15, zdict=dictionary)
+    return decompressor.decompress(data) + decompressor.flush()
+
+register_compressor(Compressor(0, "none", bytes, bytes))
+register_compressor(Compressor(1, "gzip", gzip.compress, gzip.decompress))
+register_compressor(Compressor(2, "deflate", _deflate_compress, _deflate_decompress))
+
+_zstd_contexts: Dict[Any, Any] = {}
+
+def _zstd_context(kind: str, dictionary_id: Optional[int] = None):
+    # Compressor objects are costly to build, especially with a dictionary
+    key = (kind, dictionary_id)
+    if key not in _zstd_contexts:
+        kwargs = {}
+        if dictionary_id is not None:
+            kwargs["dict_data"] = zstandard.ZstdCompressionDict(get_dictionary(dictionary_id))
+        if kind == "compress":
+            _zstd_contexts[key] = zstandard.ZstdCompressor(level=3, **kwargs)
+        else:
+            _zstd_contexts[key] = zstandard.ZstdDecompressor(**kwargs)
+    return _zstd_contexts[key]
+
+if ZSTD_AVAILABLE:
+    register_compressor(Compressor(
+        3, "zstd",
+        lambda data: _zstd_context("compress").compress(data),
+        lambda data: _zstd_context("decompress").decompress(data)
+    ))
+
+if LZ4_AVAILABLE:
+    register_compressor(Compressor(4, "lz4", lz4_frame.compress, lz4_frame.decompress))
+
+# Dictionaries
+#
+# Small payloads compress poorly on their own; a dictionary trained on our
+# own payloads supplies the repeated keys and phrases up front. Dictionaries
+# are content-addressed, so every worker derives the same id for the same
+# bytes and can fetch a missing one from shared storage.
+
+_DICTIONARY_ID = struct.Struct("<I")
+_TOKEN_PATTERN = re.compile(rb'"[^"\\]{2,48}"\s*:?|[^\s",:\[\]{}]{4,48}')
+
+def dictionary_id(dictionary: bytes) -> int:
+    return _DICTIONARY_ID.unpack(hashlib.sha256(dictionary).digest()[:4])[0]
+
+def register_dictionary(dictionary: bytes) -> int:
+    """Make a dictionary available for compression and decompression; returns its id."""
+    dict_id = dictionary_id(dictionary)
+    DICTIONARIES[dict_id] = dictionary
+    return dict_id
+
+def get_dictionary(dict_id: int) -> bytes:
+    try:
+        return DICTIONARIES[dict_id]
+    except KeyError:
+        raise MissingDictionaryError(dict_id) from None
+
+def payload_dictionary_id(data: bytes) -> int:
+    """Dictionary id at the front of a dictionary-compressed payload."""
+    return _DICTIONARY_ID.unpack_from(data)[0]
+
+def train_dictionary(samples: Sequence[bytes], size: int = 16 * 1024) -> bytes:
+    """Build a compression dictionary from sample payloads.
+    
+    Uses zstd's trainer when available. Otherwise it keeps the tokens
+    (JSON keys, words, identifiers) found in the most samples, weighted by
+    length, with the most valuable last since deflate reaches the end of
+    its dictionary most cheaply. Deflate only sees the last 32 KiB.
+    """
+    samples = [sample for sample in samples if sample]
+    if ZSTD_AVAILABLE and len(samples) >= 8:
+        try:
+            return zstandard.train_dictionary(size, samples).as_bytes()
+        except zstandard.ZstdError:
+            pass  # Too few or too similar samples; fall back below
+    
+    document_frequency = Counter()
+    for sample in samples:
+        document_frequency.update(set(_TOKEN_PATTERN.findall(sample)))
+    
+    chosen = []
+    total = 0
+    for token, count in sorted(document_frequency.items(),
+                               key=lambda item: item[1] * len(item[0]), reverse=True):
+        if count < 2:
+            break
+        if total + len(token) > size:
+            continue
+        chosen.append(token)
+        total += len(token)
+    return b"".join(reversed(chosen))
+
+def _dictionary_compress(kind: str, dict_id: int, data: bytes) -> bytes:
+    if kind == "zstd":
+        compressed = _zstd_context("compress", dict_id).compress(data)
+    else:
+        compressed = _deflate_compress(data, dictionary=get_dictionary(dict_id))
+    return _DICTIONARY_ID.pack(dict_id) + compressed
+
+def _dictionary_decompress(kind: str, data: bytes) -> bytes:
+    dict_id = payload_dictionary_id(data)
+    body = data[_DICTIONARY_ID.size:]
+    if kind == "zstd":
+        return _zstd_context("decompress", dict_id).decompress(body)
+    return _deflate_decompress(body, dictionary=get_dictionary(dict_id))
+
+def _unbound_compress(name: str, data: bytes) -> bytes:
+    raise ValueError(f"Compressor {name} needs a dictionary; use bind_dictionary()")
+
+register_compressor(Compressor(
+    5, "deflate-dict", partial(_unbound_compress, "deflate-dict"),
+    partial(_dictionary_decompress, "deflate"), uses_dictionary=True
+))
+
+if ZSTD_AVAILABLE:
+    register_compressor(Compressor(
+        6, "zstd-dict", partial(_unbound_compress, "zstd-dict"),
+        partial(_dictionary_decompress, "zstd"), uses_dictionary=True
+    ))
+
+def bind_dictionary(name: str, dict_id: int) -> Compressor:
+    """A dictionary compressor that compresses with the given registered dictionary."""
+    compressor = COMPRESSORS[name]
+    if not compressor.uses_dictionary:
+        raise ValueError(f"Compressor {name} does not use a dictionary")
+    get_dictionary(dict_id)
+    kind = "zstd" if name.startswith("zstd") else "deflate"
+    return Compressor(compressor.codec_id, name, partial(_dictionary_compress, kind, dict_id),
+                      compressor.decompress, uses_dictionary=True)
+
+# Benchmark
+
+def synthetic_result_payloads(count: int = 50, results: int = 20, seed: int = 7) -> List[Dict[str, Any]]:
+    """Query pipeline responses shaped like the ones cached in ``query_pipeline``."""
+    rng = random.Random(seed)
+    words = ("fastapi dependency injection async route middleware request response "
+             "neo4j cypher graph relationship node surrealdb vector embedding index "
+             "pydantic model validation schema logfire span trace redis cache ttl").split()
+    sources = ["fastapi", "neo4j", "surrealdb", "pydantic", "logfire", "redis", "pytest"]
+    payloads = []
+    for query_index in range(count):
+        hits = []
+        for rank in range(results):
+            source = sources[rng.randrange(len(sources))]
+            content = " ".join(rng.choices(words, k=80))
+            hits.append({
+                "id": f"document_chunk:{source}_{rng.randrange(1_000_000)}",
+                "title": f"{source.title()} guide section {rng.randrange(200)}",
+                "content": content,
+                "source_name": source,
+                "source_url": f"https://docs.example.com/{source}/{rng.randrange(500)}",
+                "chunk_index": rng.randrange(40),
+                "quality_score": rng.random(),
+                "semantic_score": rng.random(),
+                "graph_score": rng.random(),
+                "combined_score": rng.random(),
+                "rank": rank + 1
+            })
+        payloads.append({
+            "query": f"query {query_index} " + " ".join(rng.choices(words, k=5)),
+            "results": hits,
+            "metadata": {"processing_time_ms": rng.random() * 100, "session_id": "anonymous"}
+        })
+    return payloads
+
+def benchmark_codecs(
+    samples: Sequence[Any],
+    formats: Optional[Iterable[str]] = None,
+    compressors: Optional[Iterable[str]] = None,
+    repeat: int = 3
+) -> List[Dict[str, Any]]:
+    """Measure encode/decode time and size for each format and compressor pair.
+    
+    Dictionary compressors are benchmarked with a dictionary trained on the
+    first half of the samples and measured on the second half.
+    """
+    formats = list(formats or FORMATS)
+    compressors = list(compressors or COMPRESSORS)
+    results = []
+    for format_name in formats:
+        payload_format = FORMATS[format_name]
+        try:
+            encoded = [payload_format.dumps(sample) for sample in samples]
+        except Exception:
+            continue  # Format cannot represent these samples
+        
+        for compressor_name in compressors:
+            compressor = COMPRESSORS[compressor_name]
+            measured_samples = samples
+            measured = encoded
+            if compressor.uses_dictionary:
+                half = max(len(encoded) // 2, 1)
+                dict_id = register_dictionary(train_dictionary(encoded[:half]))
+                compressor = bind_dictionary(compressor_name, dict_id)
+                measured_samples, measured = samples[half:] or samples, encoded[half:] or encoded
+            
+            encode_seconds = decode_seconds = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                blobs = [compressor.compress(payload_format.dumps(sample)) for sample in measured_samples]
+                encode_seconds = min(encode_seconds, time.perf_counter() - start)
+                start = time.perf_counter()
+                for blob in blobs:
+                    payload_format.loads(compressor.decompress(blob))
+                decode_seconds = min(decode_seconds, time.perf_counter() - start)
+            
+            raw_bytes = sum(len(payload) for payload in measured)
+            stored_bytes = sum(len(blob) for blob in blobs)
+            results.append({
+                "format": format_name,
+                "compressor": compressor_name,
+                "encode_ms": encode_seconds * 1000 / len(blobs),
+                "decode_ms": decode_seconds * 1000 / len(blobs),
+                "bytes": stored_bytes / len(blobs),
+                "ratio": stored_bytes / raw_bytes if raw_bytes else 1.0
+            })
+    return results
+
+# Pickle is left out: loading a pickle from a shared Redis can run arbitrary code
+DEFAULT_CANDIDATE_FORMATS = ("json", "columnar")
+
+def choose_codec(
+    results: Sequence[Dict[str, Any]],
+    size_tolerance: float = 0.25,
+    formats: Sequence[str] = DEFAULT_CANDIDATE_FORMATS
+) -> Dict[str, Any]:
+    """Fastest result (encode plus decode) stored within ``size_tolerance`` of the smallest.
+    
+    Redis memory is the scarce resource, so size gates the choice and time
+    breaks the tie among codecs that are nearly as small as the best.
+    """
+    candidates = [result for result in results if result["format"] in formats]
+    smallest = min(result["bytes"] for result in candidates)
+    return min(
+        (result for result in candidates if result["bytes"] <= smallest * (1 + size_tolerance)),
+        key=lambda result: result["encode_ms"] + result["decode_ms"]
+    )
+
+# Picked with choose_codec(benchmark_codecs(synthetic_result_payloads())):
+# orjson beats the columnar format on encode/decode time and deflate at
+# level 1 stores within 25% of gzip -9 in under half the encode time.
+# The dictionary variant wins once a dictionary has been trained.
+DEFAULT_FORMAT = "json"
+DEFAULT_COMPRESSOR = "deflate"
+
+if __name__ == "__main__":
+    samples = synthetic_result_payloads()
+    results = benchmark_codecs(samples)
+    print(f"{'format':<10} {'compressor':<13} {'encode ms':>10} {'decode ms':>10} {'bytes':>9} {'ratio':>6}")
+    for result in sorted(results, key=lambda result: result["encode_ms"] + result["decode_ms"]):
+        print(f"{result['format']:<10} {result['compressor']:<13} {result['encode_ms']:>10.3f} "
+              f"{result['decode_ms']:>10.3f} {result['bytes']:>9.0f} {result['ratio']:>6.3f}")
+    best = choose_codec(results)
+    print(f"Best: {best['format']} + {best['compressor']}")
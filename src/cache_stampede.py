@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Cache Stampede Protection for Ptolemies
+Keeps a popular key's expiry from sending every concurrent caller to the
+backends at once: concurrent recomputations of a key share one call, values
+are refreshed probabilistically shortly before they expire (XFetch), and
+recently expired values can be served while a single background refresh runs.
+"""
+
+import asyncio
+import math
+import random
+import time
+from typing import Dict, Any, Optional, Tuple, Callable, Awaitable
+
+import logfire
+
+# Marks a cached value stored together with its freshness metadata
+ENVELOPE_MARKER = "__stampede__"
+
+def wrap_value(value: Any, ttl_seconds: float, compute_seconds: float, now: Optional[float] = None) -> Dict[str, Any]:
+    """Cacheable envelope of a freshly computed value."""
+    now = time.time() if now is None else now
+    return {
+        ENVELOPE_MARKER: 1,
+        "value": value,
+        "fresh_until": now + ttl_seconds,
+        "compute_seconds": compute_seconds
+    }
+
+def unwrap_value(stored: Any) -> Tuple[Any, Optional[float], float]:
+    """``(value, fresh_until, compute_seconds)`` of a cached value.
+    
+    Values cached without an envelope have no ``fresh_until`` and are
+    treated as fresh until their cache entry expires.
+    """
+    if isinstance(stored, dict) and stored.get(ENVELOPE_MARKER) == 1:
+        return stored["value"], stored["fresh_until"], stored["compute_seconds"]
+    return stored, None, 0.0
+
+def should_refresh_early(
+    fresh_until: Optional[float],
+    compute_seconds: float,
+    beta: float = 1.0,
+    now: Optional[float] = None
+) -> bool:
+    """XFetch early-refresh decision for a value that is still fresh.
+    
+    The chance of refreshing rises as expiry nears, and sooner for values
+    that take longer to compute, so one caller usually refreshes a hot key
+    before it expires. ``beta`` above 1 refreshes earlier; 0 disables it.
+    """
+    if fresh_until is None or beta <= 0 or compute_seconds <= 0:
+        return False
+    now = time.time() if now is None else now
+    # 1 - random() lies in (0, 1], so the log is finite and never positive
+    return now - compute_seconds * beta * math.log(1.0 - random.random()) >= fresh_until
+
+class SingleFlight:
+    """At most one in-flight call per key; concurrent callers share its result.
+    
+    Calls run as tasks, so a caller that is cancelled does not cancel the
+    call the other waiters depend on.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.started = 0
+        self.coalesced = 0
+    
+    def in_flight(self, key: str) -> bool:
+        return key in self._calls
+    
+    def start(self, key: str, call: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Task computing ``key``, starting ``call`` unless one is already running."""
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return task
+        
+        task = asyncio.ensure_future(call())
+        self._calls[key] = task
+        self.started += 1
+        
+        def done(finished: asyncio.Task):
+            if self._calls.get(key) is finished:
+                del self._calls[key]
+            # Retrieve the error so background refreshes nobody awaits are not reported as lost
+            if not finished.cancelled() and finished.exception() is not None:
+                logfire.warning("Cache recompute failed", key=key[:50], error=str(finished.exception()))
+        
+        task.add_done_callback(done)
+        return task
+    
+    async def run(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Result of ``call`` for ``key``, joining a call already in flight."""
+        return await asyncio.shield(self.start(key, call))
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._calls),
+            "started": self.started,
+            "coalesced": self.coalesced
+        }
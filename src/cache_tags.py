@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Source Tags for Cached Results
+Cached query results hold chunks from specific documentation sources. Each
+result is tagged with the sources it contains, so re-ingesting one source
+invalidates only the cached results that reference it.
+"""
+
+from typing import Any, Iterable, List, Set
+
+# Fields naming a chunk's documentation source in results and their dict forms
+SOURCE_FIELDS = ("source_name", "source")
+
+# Tag of results that reference no source; new content from any source could change them
+UNSOURCED_TAG = "source:"
+
+def source_tag(source_name: str) -> str:
+    """Cache tag of one documentation source."""
+    return f"{UNSOURCED_TAG}{source_name}"
+
+def source_names(value: Any) -> Set[str]:
+    """Names of every source referenced anywhere in a cached value.
+    
+    Looks at the ``SOURCE_FIELDS`` of nested dicts and at the
+    ``source_name`` attribute of result objects.
+    """
+    names = set()
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for field in SOURCE_FIELDS:
+                if isinstance(node.get(field), str) and node[field]:
+                    names.add(node[field])
+            stack.extend(node.values())
+        elif isinstance(node, (list, tuple, set)):
+            stack.extend(node)
+        elif isinstance(getattr(node, "source_name", None), str) and node.source_name:
+            names.add(node.source_name)
+    return names
+
+def source_tags(value: Any) -> List[str]:
+    """Tags to store a cached result under; ``UNSOURCED_TAG`` if it has no sources."""
+    return sorted(source_tag(name) for name in source_names(value)) or [UNSOURCED_TAG]
+
+def invalidation_tags(names: Iterable[str]) -> List[str]:
+    """Tags to invalidate after re-ingesting the sources in ``names``.
+    
+    Includes ``UNSOURCED_TAG``, since results that matched nothing before
+    may match the new content.
+    """
+    return sorted({source_tag(name) for name in names} | {UNSOURCED_TAG})
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Concept Extraction for Ptolemies
+Single-pass vocabulary matching over tokenized document text, parallelised
+across documents with a process pool.
+"""
+
+import asyncio
+import json
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple, Iterable, Union
+
+import logfire
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+@dataclass(frozen=True)
+class VocabularyTerm:
+    """A concept the extractor recognises.
+    
+    ``term`` may span several words ("machine learning"); matching is on
+    whole tokens, with a trailing plural ``s`` accepted.
+    """
+    term: str
+    name: str
+    category: str
+    description: str
+    min_frequency: int = 1
+    confidence_scale: float = 5.0
+    max_confidence: float = 0.95
+
+DEFAULT_VOCABULARY: List[VocabularyTerm] = [
+    VocabularyTerm("api", "Api", "Technical", "Application Programming Interface", 2, 10.0, 0.9),
+    VocabularyTerm("database", "Database", "Technical", "Data storage system", 2, 10.0, 0.9),
+    VocabularyTerm("framework", "Framework", "Technical", "Software development framework", 2, 10.0, 0.9),
+    VocabularyTerm("authentication", "Authentication", "Technical", "User verification system", 2, 10.0, 0.9),
+    VocabularyTerm("middleware", "Middleware", "Technical", "Software layer between applications", 2, 10.0, 0.9),
+    VocabularyTerm("endpoint", "Endpoint", "Technical", "API access point", 2, 10.0, 0.9),
+    VocabularyTerm("query", "Query", "Technical", "Data retrieval operation", 2, 10.0, 0.9),
+    VocabularyTerm("schema", "Schema", "Technical", "Data structure definition", 2, 10.0, 0.9),
+    VocabularyTerm("integration", "Integration", "Technical", "System connection method", 2, 10.0, 0.9),
+    VocabularyTerm("monitoring", "Monitoring", "Technical", "System observation and tracking", 2, 10.0, 0.9),
+    VocabularyTerm("fastapi", "FastAPI", "Framework", "Modern Python web framework"),
+    VocabularyTerm("logfire", "Logfire", "Framework", "Observability and monitoring platform"),
+    VocabularyTerm("surrealdb", "SurrealDB", "Framework", "Multi-model database"),
+    VocabularyTerm("neo4j", "Neo4j", "Framework", "Graph database platform"),
+    VocabularyTerm("pytest", "PyTest", "Framework", "Python testing framework"),
+    VocabularyTerm("redis", "Redis", "Framework", "In-memory data structure store")
+]
+
+# Frequency credited to a concept that is also one of the document's explicit topics
+TOPIC_WEIGHT = 10
+# Only these categories get the topic boost; framework counts stay as found in the text
+TOPIC_WEIGHTED_CATEGORIES = frozenset({"Technical"})
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+class ConceptVocabulary:
+    """Token-sequence index over a set of vocabulary terms."""
+    
+    def __init__(self, terms: Iterable[VocabularyTerm]):
+        self.terms: Dict[str, VocabularyTerm] = {}
+        self._index: Dict[Tuple[str, ...], str] = {}
+        self.max_ngram = 1
+        
+        for term in terms:
+            tokens = tuple(tokenize(term.term))
+            if not tokens:
+                continue
+            key = " ".join(tokens)
+            self.terms[key] = term
+            self._index[tokens] = key
+            self._index.setdefault(tokens[:-1] + (tokens[-1] + "s",), key)
+            self.max_ngram = max(self.max_ngram, len(tokens))
+    
+    def __len__(self) -> int:
+        return len(self.terms)
+    
+    @classmethod
+    def default(cls) -> "ConceptVocabulary":
+        """The built-in technical and framework vocabulary."""
+        return cls(DEFAULT_VOCABULARY)
+    
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "ConceptVocabulary":
+        """Load a vocabulary from a JSON list of term objects.
+        
+        Each object needs ``term`` and may set ``name`` (defaults to the
+        title-cased term), ``category``, ``description``, ``min_frequency``,
+        ``confidence_scale`` and ``max_confidence``.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        
+        terms = []
+        for entry in entries:
+            terms.append(VocabularyTerm(
+                term=entry["term"],
+                name=entry.get("name", entry["term"].title()),
+                category=entry.get("category", "Technical"),
+                description=entry.get("description", ""),
+                min_frequency=entry.get("min_frequency", 1),
+                confidence_scale=entry.get("confidence_scale", 5.0),
+                max_confidence=entry.get("max_confidence", 0.95)
+            ))
+        
+        logfire.info("Concept vocabulary loaded", path=str(path), terms=len(terms))
+        return cls(terms)
+    
+    def count(self, tokens: List[str]) -> Counter:
+        """Count every vocabulary term in one pass over the tokens."""
+        counts: Counter = Counter()
+        index = self._index
+        max_ngram = self.max_ngram
+        token_count = len(tokens)
+        
+        for position in range(token_count):
+            for length in range(1, min(max_ngram, token_count - position) + 1):
+                key = index.get(tuple(tokens[position:position + length]))
+                if key is not None:
+                    counts[key] += 1
+        
+        return counts
+    
+    def extract(self, topics: List[str], chunks: List[str]) -> List[Dict[str, Any]]:
+        """Concepts found in ``chunks`` as ``ConceptNode`` field dicts."""
+        counts = self.count(tokenize(" ".join(chunks)))
+        topic_keys = {" ".join(tokenize(topic)) for topic in topics}
+        
+        concepts = []
+        for key, frequency in counts.items():
+            term = self.terms[key]
+            if key in topic_keys and term.category in TOPIC_WEIGHTED_CATEGORIES:
+                frequency += TOPIC_WEIGHT
+            if frequency < term.min_frequency:
+                continue
+            concepts.append({
+                "name": term.name,
+                "category": term.category,
+                "description": term.description,
+                "frequency": frequency,
+                "confidence_score": min(term.max_confidence, frequency / term.confidence_scale),
+                "related_topics": list(topics)
+            })
+        
+        return concepts
+
+# Vocabulary installed in each worker process by _initialize_worker
+_worker_vocabulary: Optional[ConceptVocabulary] = None
+
+def _initialize_worker(terms: List[Dict[str, Any]]):
+    global _worker_vocabulary
+    _worker_vocabulary = ConceptVocabulary(VocabularyTerm(**term) for term in terms)
+
+def _extract_in_worker(item: Tuple[List[str], List[str]]) -> List[Dict[str, Any]]:
+    topics, chunks = item
+    return _worker_vocabulary.extract(topics, chunks)
+
+class ConceptExtractor:
+    """Runs vocabulary extraction inline or across a process pool.
+    
+    The vocabulary is shipped to each worker once, at pool start-up; per
+    document only the topics and chunk text cross the process boundary.
+    """
+    
+    def __init__(
+        self,
+        vocabulary: Optional[ConceptVocabulary] = None,
+        max_workers: Optional[int] = None,
+        min_parallel_documents: int = 16
+    ):
+        self.vocabulary = vocabulary if vocabulary is not None else ConceptVocabulary.default()
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_parallel_documents = min_parallel_documents
+        self._executor: Optional[ProcessPoolExecutor] = None
+    
+    def extract(self, topics: List[str], chunks: List[str]) -> List[Dict[str, Any]]:
+        """Extract concepts from a single document in-process."""
+        return self.vocabulary.extract(topics, chunks)
+    
+    async def extract_many(
+        self,
+        items: List[Tuple[List[str], List[str]]]
+    ) -> List[List[Dict[str, Any]]]:
+        """Extract concepts for many ``(topics, chunks)`` documents, in order."""
+        if len(items) < self.min_parallel_documents or self.max_workers <= 1:
+            return [self.extract(topics, chunks) for topics, chunks in items]
+        
+        with logfire.span("Parallel concept extraction",
+                          documents=len(items),
+                          workers=self.max_workers):
+            executor = self._get_executor()
+            chunksize = max(1, len(items) // (self.max_workers * 4))
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None,
+                lambda: list(executor.map(_extract_in_worker, items, chunksize=chunksize))
+            )
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            terms = [asdict(term) for term in self.vocabulary.terms.values()]
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_initialize_worker,
+                initargs=(terms,)
+            )
+        return self._executor
+    
+    def close(self):
+        """Shut down the worker pool, if one was started."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -28,6 +28,7 @@ from neo4j_integration import Neo4jGraphStore, DocumentNode, ConceptNode
 from hybrid_query_engine import HybridQueryEngine
 from performance_optimizer import PerformanceOptimizer
 from redis_cache_layer import RedisCacheLayer
+from cache_tags import invalidation_tags
 
 # Configure logging and monitoring
 logging.basicConfig(level=logging.INFO)
@@ -526,6 +527,13 @@ class PtolemiesCrawler:
                     result = await self.storage_adapter.store_document_chunks(document_chunks)
                     storage_results.append(("legacy_adapter", result))
                 
+                # Re-crawled content makes cached results that reference this source stale
+                if document_chunks:
+                    if self.redis_cache:
+                        await self.redis_cache.invalidate_tags(invalidation_tags([source_name]))
+                    if self.performance_optimizer:
+                        self.performance_optimizer.invalidate_sources([source_name])
+                
                 # Update Redis cache with new hashes
                 if self.redis_cache and new_hashes:
                     updated_hashes = existing_hashes | new_hashes
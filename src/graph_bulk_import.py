@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Bulk Graph Import for Ptolemies
+Streams rows from SurrealDB over the native client and writes them to Neo4j
+through a pooled bolt driver using parameterized UNWIND batches, or emits
+``neo4j-admin database import`` CSVs for cold loads.
+"""
+
+import asyncio
+import csv
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable, AsyncIterator, Union, Tuple
+
+import logfire
+from neo4j import AsyncGraphDatabase, AsyncDriver
+from surrealdb import Surreal
+
+from cypher_cache import BUMP_GRAPH_VERSION_QUERY
+
+IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+RowSource = Union[Iterable[Dict[str, Any]], AsyncIterator[Dict[str, Any]]]
+
+@dataclass
+class BulkImportConfig:
+    """Connection and batching settings for bulk imports."""
+    neo4j_uri: str = "bolt://localhost:7687"
+    neo4j_user: str = "neo4j"
+    neo4j_password: str = "password"
+    neo4j_database: str = "neo4j"
+    surreal_url: str = "ws://localhost:8000/rpc"
+    surreal_user: str = "root"
+    surreal_password: str = "root"
+    surreal_namespace: str = "ptolemies"
+    surreal_database: str = "knowledge"
+    batch_size: int = 1000
+    workers: int = 4
+    page_size: int = 1000
+    max_connection_pool_size: int = 50
+    
+    @classmethod
+    def from_env(cls, **defaults) -> "BulkImportConfig":
+        """Build a config from the NEO4J_* / SURREALDB_* variables, falling back to ``defaults``."""
+        config = cls(**{key: value for key, value in defaults.items() if value is not None})
+        for attribute, variables in ENV_VARIABLES.items():
+            for variable in variables:
+                value = os.getenv(variable)
+                if value:
+                    setattr(config, attribute, value)
+                    break
+        return config
+
+# Environment variables read by BulkImportConfig.from_env, in priority order
+ENV_VARIABLES: Dict[str, Tuple[str, ...]] = {
+    "neo4j_uri": ("NEO4J_URI",),
+    "neo4j_user": ("NEO4J_USERNAME", "NEO4J_USER"),
+    "neo4j_password": ("NEO4J_PASSWORD",),
+    "neo4j_database": ("NEO4J_DATABASE",),
+    "surreal_url": ("SURREALDB_URL",),
+    "surreal_user": ("SURREALDB_USERNAME",),
+    "surreal_password": ("SURREALDB_PASSWORD",),
+    "surreal_namespace": ("SURREALDB_NAMESPACE",),
+    "surreal_database": ("SURREALDB_DATABASE",)
+}
+
+@dataclass
+class ImportStats:
+    """Outcome of a batched write."""
+    rows: int = 0
+    batches: int = 0
+    failed_batches: int = 0
+    elapsed_seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+def validate_identifier(value: str) -> str:
+    """Guard labels and relationship types, which Cypher cannot parameterize."""
+    if not IDENTIFIER_PATTERN.match(value):
+        raise ValueError(f"Invalid Cypher identifier: {value!r}")
+    return value
+
+def _records(result: Any) -> List[Dict[str, Any]]:
+    """Normalize a SurrealDB query response to a list of row dicts."""
+    if not result:
+        return []
+    first = result[0] if isinstance(result, list) else result
+    if isinstance(first, dict) and "result" in first:
+        rows = first["result"] or []
+    elif isinstance(result, list) and isinstance(first, list):
+        rows = first
+    elif isinstance(result, list):
+        rows = result
+    else:
+        rows = [result]
+    return [
+        {key: (str(value) if key == "id" and value is not None else value) for key, value in dict(row).items()}
+        for row in rows
+    ]
+
+class SurrealRowStream:
+    """Pages rows out of SurrealDB over a single native client connection."""
+    
+    def __init__(self, config: BulkImportConfig):
+        self.config = config
+        self.db: Optional[Surreal] = None
+    
+    async def connect(self):
+        self.db = Surreal()
+        await self.db.connect(self.config.surreal_url)
+        await self.db.signin({"user": self.config.surreal_user, "pass": self.config.surreal_password})
+        await self.db.use(self.config.surreal_namespace, self.config.surreal_database)
+        logfire.info("SurrealDB stream connected", url=self.config.surreal_url)
+    
+    async def close(self):
+        if self.db:
+            await self.db.close()
+            self.db = None
+    
+    async def query(self, sql: str, variables: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Run one parameterized SurrealQL statement and return its rows."""
+        return _records(await self.db.query(sql, variables or {}))
+    
+    async def stream(
+        self,
+        table: str,
+        fields: Optional[List[str]] = None,
+        order_by: Optional[str] = None,
+        where: Optional[str] = None,
+        variables: Optional[Dict[str, Any]] = None,
+        page_size: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every row of ``table`` page by page."""
+        validate_identifier(table)
+        page_size = page_size or self.config.page_size
+        projection = ", ".join(validate_identifier(f) for f in fields) if fields else "*"
+        sql = f"SELECT {projection} FROM {table}"
+        if where:
+            sql += f" WHERE {where}"
+        if order_by:
+            sql += f" ORDER BY {order_by}"
+        sql += " LIMIT $limit START $start"
+        
+        start = 0
+        while True:
+            rows = await self.query(sql, {**(variables or {}), "limit": page_size, "start": start})
+            for row in rows:
+                yield row
+            if len(rows) < page_size:
+                break
+            start += page_size
+    
+    async def __aenter__(self) -> "SurrealRowStream":
+        await self.connect()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+class Neo4jBulkWriter:
+    """Writes row batches to Neo4j with parallel workers over a pooled driver."""
+    
+    def __init__(self, config: BulkImportConfig, driver: Optional[AsyncDriver] = None):
+        self.config = config
+        self.driver = driver
+        self._owns_driver = driver is None
+    
+    async def connect(self):
+        if self.driver is None:
+            self.driver = AsyncGraphDatabase.driver(
+                self.config.neo4j_uri,
+                auth=(self.config.neo4j_user, self.config.neo4j_password),
+                max_connection_pool_size=self.config.max_connection_pool_size
+            )
+            await self.driver.verify_connectivity()
+            logfire.info("Neo4j bulk writer connected", uri=self.config.neo4j_uri)
+    
+    async def close(self):
+        if self.driver and self._owns_driver:
+            await self.driver.close()
+            self.driver = None
+    
+    async def run(self, query: str, parameters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Run a single parameterized statement and return its records."""
+        async with self.driver.session(database=self.config.neo4j_database) as session:
+            result = await session.run(query, parameters or {})
+            return [record.data() async for record in result]
+    
+    async def run_script(self, script: str) -> int:
+        """Run a ``;``-separated Cypher script (schema files); returns statements run."""
+        statements = [
+            s.strip() for s in script.split(";")
+            if s.strip() and not all(line.strip().startswith("//") for line in s.strip().splitlines())
+        ]
+        for statement in statements:
+            await self.run(statement)
+        return len(statements)
+    
+    async def write(
+        self,
+        query: str,
+        rows: RowSource,
+        batch_size: Optional[int] = None,
+        workers: Optional[int] = None,
+        parameters: Optional[Dict[str, Any]] = None
+    ) -> ImportStats:
+        """Feed ``rows`` to ``query`` as ``$rows`` in batches across parallel workers.
+        
+        ``query`` must consume the batch with ``UNWIND $rows AS row``. The
+        graph version is bumped once at the end rather than per batch, so
+        parallel batches do not contend on the version node.
+        """
+        batch_size = batch_size or self.config.batch_size
+        workers = workers or self.config.workers
+        stats = ImportStats()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+        start_time = time.time()
+        
+        async def write_batch(tx, batch):
+            result = await tx.run(query, {**(parameters or {}), "rows": batch})
+            await result.consume()
+        
+        async def worker():
+            async with self.driver.session(database=self.config.neo4j_database) as session:
+                while True:
+                    batch = await queue.get()
+                    try:
+                        if batch is None:
+                            return
+                        await session.execute_write(write_batch, batch)
+                        stats.rows += len(batch)
+                        stats.batches += 1
+                    except Exception as e:
+                        stats.failed_batches += 1
+                        stats.errors.append(str(e))
+                        logfire.error("Bulk batch failed", error=str(e), batch_rows=len(batch))
+                    finally:
+                        queue.task_done()
+        
+        with logfire.span("Bulk write", batch_size=batch_size, workers=workers):
+            tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+            try:
+                batch: List[Dict[str, Any]] = []
+                async for row in _iterate(rows):
+                    batch.append(row)
+                    if len(batch) >= batch_size:
+                        await queue.put(batch)
+                        batch = []
+                if batch:
+                    await queue.put(batch)
+            finally:
+                for _ in tasks:
+                    await queue.put(None)
+                await asyncio.gather(*tasks)
+            
+            if stats.rows:
+                await self.run(BUMP_GRAPH_VERSION_QUERY)
+            
+            stats.elapsed_seconds = time.time() - start_time
+            logfire.info("Bulk write completed",
+                       rows=stats.rows,
+                       batches=stats.batches,
+                       failed_batches=stats.failed_batches,
+                       elapsed_seconds=round(stats.elapsed_seconds, 3))
+            return stats
+    
+    async def __aenter__(self) -> "Neo4jBulkWriter":
+        await self.connect()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+async def _iterate(rows: RowSource) -> AsyncIterator[Dict[str, Any]]:
+    if hasattr(rows, "__aiter__"):
+        async for row in rows:
+            yield row
+    else:
+        for row in rows:
+            yield row
+
+class AdminImportWriter:
+    """Writes node and relationship CSVs for ``neo4j-admin database import full``.
+    
+    Intended for cold loads into an empty database: the admin importer
+    bypasses the transaction layer entirely. Node ids must be unique across
+    every file that shares an id space.
+    """
+    
+    def __init__(self, output_dir: Union[str, Path]):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.node_files: List[Tuple[str, Path]] = []
+        self.relationship_files: List[Tuple[str, Path]] = []
+    
+    async def write_nodes(
+        self,
+        label: str,
+        rows: RowSource,
+        id_field: str,
+        properties: List[str],
+        id_space: Optional[str] = None
+    ) -> int:
+        """Write a node file; returns rows written."""
+        validate_identifier(label)
+        path = self.output_dir / f"nodes_{label.lower()}_{len(self.node_files)}.csv"
+        id_header = f"{id_field}:ID({id_space})" if id_space else f"{id_field}:ID"
+        header = [id_header] + [_csv_header(p) for p in properties if p != id_field]
+        count = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            async for row in _iterate(rows):
+                writer.writerow([row.get(id_field)] + [
+                    _csv_value(row.get(_property_name(p))) for p in properties if p != id_field
+                ])
+                count += 1
+        self.node_files.append((label, path))
+        return count
+    
+    async def write_relationships(
+        self,
+        relationship_type: str,
+        rows: RowSource,
+        start_field: str = "start",
+        end_field: str = "end",
+        properties: Optional[List[str]] = None,
+        start_id_space: Optional[str] = None,
+        end_id_space: Optional[str] = None
+    ) -> int:
+        """Write a relationship file; returns rows written."""
+        validate_identifier(relationship_type)
+        properties = properties or []
+        path = self.output_dir / f"relationships_{relationship_type.lower()}_{len(self.relationship_files)}.csv"
+        start_header = f":START_ID({start_id_space})" if start_id_space else ":START_ID"
+        end_header = f":END_ID({end_id_space})" if end_id_space else ":END_ID"
+        count = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow([start_header, end_header] + [_csv_header(p) for p in properties])
+            async for row in _iterate(rows):
+                writer.writerow([row.get(start_field), row.get(end_field)] + [
+                    _csv_value(row.get(_property_name(p))) for p in properties
+                ])
+                count += 1
+        self.relationship_files.append((relationship_type, path))
+        return count
+    
+    def command(self, database: str = "neo4j") -> List[str]:
+        """The ``neo4j-admin`` invocation that loads the written files."""
+        args = ["neo4j-admin", "database", "import", "full"]
+        args += [f"--nodes={label}={path}" for label, path in self.node_files]
+        args += [f"--relationships={rel_type}={path}" for rel_type, path in self.relationship_files]
+        args += ["--array-delimiter=|", "--overwrite-destination=true", database]
+        return args
+
+def _property_name(name: str) -> str:
+    """Row key for a property; a trailing ``[]`` marks a string-array column."""
+    return name[:-2] if name.endswith("[]") else name
+
+def _csv_header(name: str) -> str:
+    if name.endswith("[]"):
+        return f"{name[:-2]}:string[]"
+    return name
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (list, tuple)):
+        return "|".join(str(v) for v in value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return ""
+    return value
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Incremental Graph Sync for Ptolemies
+Streams chunks changed since the last run from SurrealDB and upserts or
+deletes only the affected Chunk/Source/Topic nodes and edges in Neo4j.
+"""
+
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, UTC
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+import logfire
+
+from cypher_cache import BUMP_GRAPH_VERSION_QUERY
+from graph_bulk_import import BulkImportConfig, Neo4jBulkWriter, SurrealRowStream
+from graph_materialization import materialize_graph
+
+CHUNK_FIELDS = [
+    "id", "source_name", "source_url", "title", "content", "chunk_index",
+    "total_chunks", "quality_score", "topics", "created_at", "updated_at"
+]
+
+# Keyset cursors over (updated_at, id) for paging changed chunks
+STAMPED_AFTER = (
+    "(updated_at > <datetime> $last"
+    " OR (updated_at = <datetime> $last AND id > <record> $last_id))"
+)
+UNSTAMPED_AFTER = "(updated_at != NONE OR id > <record> $last_id)"
+
+# Keyset pages of every chunk id, and a recheck of which given ids still exist
+CHUNK_IDS_QUERY = "SELECT id FROM document_chunks ORDER BY id LIMIT $limit"
+CHUNK_IDS_AFTER_QUERY = "SELECT id FROM document_chunks WHERE id > <record> $last ORDER BY id LIMIT $limit"
+CHUNKS_PRESENT_QUERY = "SELECT id FROM (SELECT VALUE <record> $this FROM $ids)"
+
+READ_WATERMARK_QUERY = """
+MERGE (state:SyncState {name: $name})
+RETURN state.watermark AS watermark, coalesce(state.inclusive, true) AS inclusive
+"""
+
+SAVE_WATERMARK_QUERY = """
+MERGE (state:SyncState {name: $name})
+SET state.watermark = $watermark,
+    state.inclusive = $inclusive,
+    state.rows_synced = coalesce(state.rows_synced, 0) + $rows,
+    state.last_synced_at = datetime()
+"""
+
+CHUNK_SOURCES_QUERY = """
+UNWIND $ids AS id
+MATCH (s:Source)-[:HAS_CHUNK]->(:Chunk {id: id})
+RETURN collect(DISTINCT s.name) AS sources
+"""
+
+UPSERT_CHUNKS_QUERY = """
+UNWIND $rows AS row
+MERGE (c:Chunk {id: row.id})
+SET c.title = row.title,
+    c.content = row.content,
+    c.url = row.url,
+    c.source_name = row.source_name,
+    c.chunk_index = row.chunk_index,
+    c.total_chunks = row.total_chunks,
+    c.quality_score = row.quality_score,
+    c.updated_at = row.updated_at,
+    c.synced_at = datetime()
+WITH c, row
+OPTIONAL MATCH (previous:Source)-[stale:HAS_CHUNK]->(c)
+WHERE previous.name <> row.source_name
+DELETE stale
+WITH DISTINCT c, row
+MERGE (s:Source {name: row.source_name})
+MERGE (s)-[r:HAS_CHUNK]->(c)
+SET r.imported_at = coalesce(r.imported_at, datetime())
+WITH c, row
+OPTIONAL MATCH (c)-[stale_topic:COVERS_TOPIC]->(t:Topic)
+WHERE NOT t.name IN row.topics
+DELETE stale_topic
+WITH DISTINCT c, row
+FOREACH (topic_name IN row.topics |
+    MERGE (t:Topic {name: topic_name})
+    MERGE (c)-[rt:COVERS_TOPIC]->(t)
+    SET rt.relevance = 0.8
+)
+"""
+
+DELETE_CHUNKS_QUERY = """
+UNWIND $ids AS id
+MATCH (c:Chunk {id: id})
+OPTIONAL MATCH (s:Source)-[:HAS_CHUNK]->(c)
+OPTIONAL MATCH (c)-[:COVERS_TOPIC]->(t:Topic)
+WITH c, collect(DISTINCT s.name) AS sources, collect(DISTINCT t.name) AS topics
+DETACH DELETE c
+RETURN sources, topics
+"""
+
+DELETE_ORPHAN_TOPICS_QUERY = """
+UNWIND $names AS name
+MATCH (t:Topic {name: name})
+WHERE NOT (t)--()
+DELETE t
+"""
+
+RECOUNT_SOURCES_QUERY = """
+UNWIND $names AS name
+MATCH (s:Source {name: name})
+OPTIONAL MATCH (s)-[:HAS_CHUNK]->(c:Chunk)
+WITH s, count(c) AS chunks, avg(c.quality_score) AS quality
+SET s.chunk_count = chunks,
+    s.avg_quality = quality,
+    s.last_imported = datetime()
+"""
+
+@dataclass
+class SyncResult:
+    """Outcome of one incremental sync run."""
+    upserted: int = 0
+    deleted: int = 0
+    batches: int = 0
+    watermark: Optional[str] = None
+    elapsed_seconds: float = 0.0
+
+def _timestamp(value: Any) -> Optional[str]:
+    """ISO-8601 form of a SurrealDB datetime, as stored in the watermark."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def chunk_row(chunk: Dict[str, Any]) -> Dict[str, Any]:
+    """Chunk node properties for the upsert query."""
+    return {
+        "id": chunk["id"],
+        "source_name": chunk.get("source_name") or "Unknown",
+        "title": chunk.get("title", ""),
+        "content": (chunk.get("content") or "")[:1000],
+        "url": chunk.get("source_url", ""),
+        "chunk_index": chunk.get("chunk_index", 0),
+        "total_chunks": chunk.get("total_chunks", 1),
+        "quality_score": chunk.get("quality_score", 0.5),
+        "updated_at": _timestamp(chunk.get("updated_at")),
+        "topics": [str(topic) for topic in (chunk.get("topics") or [])[:5]]
+    }
+
+class IncrementalGraphSync:
+    """Keeps the Neo4j chunk graph in step with SurrealDB using an ``updated_at`` watermark.
+    
+    The watermark lives on a ``SyncState`` node and only advances after a
+    batch has been written, so an interrupted run resumes where it stopped.
+    After an interrupted run, rows stamped exactly at the watermark are read
+    again; every write is a MERGE, so replaying them is harmless. Rows
+    carrying ``deleted_at`` are treated as tombstones and removed from the
+    graph.
+    """
+    
+    def __init__(
+        self,
+        surreal: SurrealRowStream,
+        writer: Neo4jBulkWriter,
+        name: str = "surrealdb_chunks",
+        batch_size: int = 500
+    ):
+        self.surreal = surreal
+        self.writer = writer
+        self.name = name
+        self.batch_size = batch_size
+    
+    async def get_watermark(self) -> Tuple[Optional[str], bool]:
+        """Stored watermark and whether rows stamped exactly at it still need reading."""
+        records = await self.writer.run(READ_WATERMARK_QUERY, {"name": self.name})
+        if not records:
+            return None, True
+        return records[0]["watermark"], records[0]["inclusive"]
+    
+    async def save_watermark(self, watermark: str, rows: int, inclusive: bool = True):
+        await self.writer.run(SAVE_WATERMARK_QUERY, {
+            "name": self.name,
+            "watermark": watermark,
+            "rows": rows,
+            "inclusive": inclusive
+        })
+    
+    async def stream_changes(self, since: Optional[str], inclusive: bool = True):
+        """Chunks with ``updated_at`` after (or at) ``since``, oldest first.
+        
+        Pages by keyset on ``(updated_at, id)`` rather than by offset: each
+        page starts after the last row read, so a row updated mid-scan moves
+        behind the cursor instead of shifting unread rows out of their page.
+        """
+        select = f"SELECT {', '.join(CHUNK_FIELDS + ['deleted_at'])} FROM document_chunks"
+        page = " ORDER BY updated_at, id LIMIT $limit"
+        if since:
+            operator = ">=" if inclusive else ">"
+            sql = f"{select} WHERE updated_at {operator} <datetime> $since{page}"
+        else:
+            sql = select + page
+        variables: Dict[str, Any] = {"since": since, "limit": self.batch_size}
+        
+        while True:
+            rows = await self.surreal.query(sql, variables)
+            for row in rows:
+                yield row
+            if len(rows) < self.batch_size:
+                break
+            last = rows[-1]
+            last_updated = _timestamp(last.get("updated_at"))
+            if last_updated is None:
+                # Unstamped rows sort first; finish them before the stamped ones
+                sql = f"{select} WHERE {UNSTAMPED_AFTER}{page}"
+            else:
+                sql = f"{select} WHERE {STAMPED_AFTER}{page}"
+            variables = {"last": last_updated, "last_id": last["id"], "limit": self.batch_size}
+    
+    @logfire.instrument("incremental_graph_sync")
+    async def sync(self) -> SyncResult:
+        """Apply every change since the stored watermark."""
+        start_time = time.time()
+        watermark, inclusive = await self.get_watermark()
+        result = SyncResult(watermark=watermark)
+        
+        with logfire.span("Incremental graph sync", name=self.name, since=watermark):
+            batch: List[Dict[str, Any]] = []
+            async for chunk in self.stream_changes(watermark, inclusive):
+                batch.append(chunk)
+                if len(batch) >= self.batch_size:
+                    await self._apply_batch(batch, result)
+                    batch = []
+            if batch:
+                await self._apply_batch(batch, result)
+            
+            # Every row up to the watermark is now in the graph
+            if result.batches and result.watermark:
+                await self.save_watermark(result.watermark, 0, inclusive=False)
+            if result.batches:
+                await self.writer.run(BUMP_GRAPH_VERSION_QUERY)
+            
+            result.elapsed_seconds = time.time() - start_time
+            logfire.info("Incremental graph sync completed",
+                       upserted=result.upserted,
+                       deleted=result.deleted,
+                       batches=result.batches,
+                       watermark=result.watermark,
+                       elapsed_seconds=round(result.elapsed_seconds, 3))
+            return result
+    
+    async def _apply_batch(self, chunks: List[Dict[str, Any]], result: SyncResult):
+        """Write one batch, then advance the watermark past it."""
+        tombstones = [chunk["id"] for chunk in chunks if chunk.get("deleted_at")]
+        rows = [chunk_row(chunk) for chunk in chunks if not chunk.get("deleted_at")]
+        
+        affected_sources: Set[str] = {row["source_name"] for row in rows}
+        if rows:
+            previous = await self.writer.run(CHUNK_SOURCES_QUERY, {"ids": [row["id"] for row in rows]})
+            if previous:
+                affected_sources.update(previous[0]["sources"])
+            await self.writer.run(UPSERT_CHUNKS_QUERY, {"rows": rows})
+        
+        if tombstones:
+            affected_sources.update(await self.delete_chunks(tombstones))
+        
+        await self.writer.run(RECOUNT_SOURCES_QUERY, {"names": sorted(affected_sources)})
+        
+        result.upserted += len(rows)
+        result.deleted += len(tombstones)
+        result.batches += 1
+        # Rows arrive ordered by updated_at; ISO strings with varying
+        # fractional precision do not sort as text, so never compare them
+        watermark = next(
+            (ts for ts in (_timestamp(chunk.get("updated_at")) for chunk in reversed(chunks)) if ts),
+            None
+        )
+        if watermark and watermark != result.watermark:
+            result.watermark = watermark
+            await self.save_watermark(watermark, len(chunks))
+    
+    async def delete_chunks(self, ids: List[str]) -> Set[str]:
+        """Detach-delete chunks and any topics they leave orphaned; returns their sources."""
+        records = await self.writer.run(DELETE_CHUNKS_QUERY, {"ids": ids})
+        sources = {name for record in records for name in record["sources"]}
+        topics = {name for record in records for name in record["topics"]}
+        if topics:
+            await self.writer.run(DELETE_ORPHAN_TOPICS_QUERY, {"names": sorted(topics)})
+        return sources
+    
+    async def live_chunk_ids(self) -> Set[str]:
+        """Every chunk id in SurrealDB, paged by keyset on ``id``."""
+        ids: Set[str] = set()
+        sql, variables = CHUNK_IDS_QUERY, {"limit": self.batch_size}
+        while True:
+            rows = await self.surreal.query(sql, variables)
+            ids.update(row["id"] for row in rows)
+            if len(rows) < self.batch_size:
+                return ids
+            sql, variables = CHUNK_IDS_AFTER_QUERY, {"last": rows[-1]["id"], "limit": self.batch_size}
+    
+    async def reconcile_deletions(self) -> int:
+        """Remove Chunk nodes whose rows were hard-deleted in SurrealDB.
+        
+        Hard deletes leave no tombstone for the watermark scan to see, so
+        this compares id sets; it reads ids only and can run far less often
+        than ``sync``. Graph ids are read before SurrealDB's, so a chunk a
+        concurrent sync adds mid-scan is never a candidate, and every
+        candidate is looked up again before it is deleted.
+        """
+        with logfire.span("Reconciling deleted chunks", name=self.name):
+            graph_ids = [record["id"] for record in await self.writer.run("MATCH (c:Chunk) RETURN c.id AS id")]
+            live_ids = await self.live_chunk_ids()
+            candidates = [chunk_id for chunk_id in graph_ids if chunk_id not in live_ids]
+            
+            missing: List[str] = []
+            for i in range(0, len(candidates), self.batch_size):
+                batch = candidates[i:i + self.batch_size]
+                present = {row["id"] for row in await self.surreal.query(CHUNKS_PRESENT_QUERY, {"ids": batch})}
+                missing.extend(chunk_id for chunk_id in batch if chunk_id not in present)
+            
+            sources: Set[str] = set()
+            for i in range(0, len(missing), self.batch_size):
+                sources.update(await self.delete_chunks(missing[i:i + self.batch_size]))
+            if sources:
+                await self.writer.run(RECOUNT_SOURCES_QUERY, {"names": sorted(sources)})
+            if missing:
+                await self.writer.run(BUMP_GRAPH_VERSION_QUERY)
+            
+            logfire.info("Deleted chunks reconciled", removed=len(missing))
+            return len(missing)
+
+async def run_sync(
+    interval_seconds: Optional[float] = None,
+    reconcile: bool = False,
+    materialize: bool = True
+):
+    """Run one sync (or keep syncing every ``interval_seconds``).
+    
+    Learning paths and dependency closures are rematerialized after any
+    run that changed the graph.
+    """
+    config = BulkImportConfig.from_env()
+    async with SurrealRowStream(config) as surreal, Neo4jBulkWriter(config) as writer:
+        sync = IncrementalGraphSync(surreal, writer)
+        while True:
+            result = await sync.sync()
+            print(f"[{datetime.now(UTC).isoformat()}] upserted={result.upserted} "
+                  f"deleted={result.deleted} watermark={result.watermark}")
+            removed = await sync.reconcile_deletions() if reconcile else 0
+            if reconcile:
+                print(f"Removed {removed} hard-deleted chunks")
+            if materialize and (result.upserted or result.deleted or removed):
+                summary = await materialize_graph(writer.driver, config.neo4j_database)
+                print(f"Materialized {summary['learning_paths']} learning paths and "
+                      f"{summary['dependency_closures']} dependency closures")
+            if not interval_seconds:
+                break
+            await asyncio.sleep(interval_seconds)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally sync SurrealDB chunks into Neo4j")
+    parser.add_argument("--interval", type=float, help="keep running, syncing every N seconds")
+    parser.add_argument("--reconcile", action="store_true", help="also remove hard-deleted chunks")
+    parser.add_argument("--no-materialize", action="store_true",
+                        help="skip rebuilding materialized learning paths and dependency closures")
+    args = parser.parse_args()
+    
+    asyncio.run(run_sync(args.interval, args.reconcile, not args.no_materialize))
@@ -5,6 +5,7 @@ Combines SurrealDB vector search with Neo4j graph relationships for comprehensiv
 """
 
 import asyncio
+import os
 import time
 from typing import Dict, List, Any, Optional, Tuple, Union
 from dataclasses import dataclass, asdict
@@ -47,6 +48,7 @@ from neo4j_integration import (
     DocumentNode,
     ConceptNode
 )
+from graph_snapshot import GraphSnapshotManager
 
 # Configure Logfire
 logfire.configure(send_to_logfire=False)  # Configure appropriately for production
@@ -149,16 +151,28 @@ class HybridQueryEngine:
         self, 
         vector_store: SurrealDBVectorStore,
         graph_store: Neo4jGraphStore,
-        config: HybridQueryConfig = None
+        config: HybridQueryConfig = None,
+        graph_snapshots: Optional[GraphSnapshotManager] = None
     ):
         self.vector_store = vector_store
         self.graph_store = graph_store
         self.config = config or HybridQueryConfig()
+        self.graph_snapshots = graph_snapshots
         
         # Cache for query analysis
         self._query_cache = {}
         self._concept_cache = {}
     
+    async def initialize(self):
+        """Start refreshing the graph snapshot in the background, if one is attached."""
+        if self.graph_snapshots:
+            self.graph_snapshots.start()
+    
+    async def close(self):
+        """Stop the graph snapshot refresh; the stores are closed by their owners."""
+        if self.graph_snapshots:
+            await self.graph_snapshots.stop()
+    
     @logfire.instrument("analyze_query")
     async def analyze_query(self, query: str) -> QueryAnalysis:
         """Analyze query to determine optimal search strategy."""
@@ -346,8 +360,19 @@ class HybridQueryEngine:
                 expanded_queries = [query]
                 
                 # Search for each detected concept
+                snapshot = self.graph_snapshots.snapshot if self.graph_snapshots else None
                 for concept in analysis.detected_concepts:
-                    if concept not in self._concept_cache:
+                    if snapshot is not None:
+                        # Co-occurring concepts straight from the in-memory snapshot
+                        concept_index = snapshot.find(concept, label="Concept")
+                        related_concepts = []
+                        if concept_index is not None:
+                            related_concepts = [
+                                snapshot.names[index]
+                                for index, _ in snapshot.co_neighbours(concept_index, "Concept", limit=5)
+                            ]
+                        self._concept_cache[concept] = related_concepts
+                    elif concept not in self._concept_cache:
                         concept_result = await self._graph_search(
                             concept, 
                             search_type="concept", 
@@ -782,8 +807,15 @@ async def create_hybrid_engine(
     vector_store = await create_vector_store(vector_config)
     graph_store = await create_graph_store(graph_config)
     
+    # Concept expansion reads co-occurrences from an in-memory snapshot
+    graph_snapshots = GraphSnapshotManager(
+        graph_store.load_snapshot,
+        refresh_interval_seconds=float(os.getenv("GRAPH_SNAPSHOT_REFRESH_SECONDS", "300"))
+    )
+    
     # Create hybrid engine
-    engine = HybridQueryEngine(vector_store, graph_store, hybrid_config)
+    engine = HybridQueryEngine(vector_store, graph_store, hybrid_config, graph_snapshots)
+    await engine.initialize()
     
     return engine
 
@@ -802,6 +834,7 @@ if __name__ == "__main__":
         for result in results[:5]:
             print(f"- {result.title} (score: {result.combined_score:.3f})")
         
+        await engine.close()
         await engine.vector_store.close()
         await engine.graph_store.close()
     
@@ -22,6 +22,7 @@ from crawl4ai_integration import PtolemiesCrawler, CrawlConfig, DOCUMENTATION_SO
 from surrealdb_integration import SurrealDBVectorStore, VectorStoreConfig
 from neo4j_integration import Neo4jGraphStore, Neo4jConfig
 from hybrid_query_engine import HybridQueryEngine
+from graph_snapshot import GraphSnapshotManager
 from performance_optimizer import PerformanceOptimizer
 from redis_cache_layer import RedisCacheLayer
 
@@ -112,9 +113,21 @@ async def lifespan(app: FastAPI):
             logfire.warning("Redis cache layer initialization failed", error=str(e))
             redis_cache = None
 
+        # Initialize performance optimizer; its per-backend limits gate the stores below
+        try:
+            performance_optimizer = PerformanceOptimizer()
+            await performance_optimizer.initialize()
+            logfire.info("Performance optimizer initialized successfully")
+        except Exception as e:
+            logfire.warning("Performance optimizer initialization failed", error=str(e))
+            performance_optimizer = None
+
         # Initialize SurrealDB vector store
         try:
-            surrealdb_store = SurrealDBVectorStore(VectorStoreConfig())
+            surrealdb_store = SurrealDBVectorStore(
+                VectorStoreConfig(),
+                limiter=performance_optimizer.concurrency_limiters["surrealdb"] if performance_optimizer else None
+            )
             await surrealdb_store.connect()
             logfire.info("SurrealDB vector store initialized successfully")
         except Exception as e:
@@ -123,30 +136,27 @@ async def lifespan(app: FastAPI):
 
         # Initialize Neo4j graph store
         try:
-            neo4j_store = Neo4jGraphStore(Neo4jConfig())
+            neo4j_store = Neo4jGraphStore(
+                Neo4jConfig(),
+                limiter=performance_optimizer.concurrency_limiters["neo4j"] if performance_optimizer else None
+            )
             await neo4j_store.connect()
             logfire.info("Neo4j graph store initialized successfully")
         except Exception as e:
             logfire.warning("Neo4j initialization failed", error=str(e))
             neo4j_store = None
 
-        # Initialize performance optimizer
-        try:
-            performance_optimizer = PerformanceOptimizer()
-            await performance_optimizer.initialize()
-            logfire.info("Performance optimizer initialized successfully")
-        except Exception as e:
-            logfire.warning("Performance optimizer initialization failed", error=str(e))
-            performance_optimizer = None
-
         # Initialize hybrid query engine
         try:
             if surrealdb_store and neo4j_store:
+                graph_snapshots = GraphSnapshotManager(
+                    neo4j_store.load_snapshot,
+                    refresh_interval_seconds=float(os.getenv("GRAPH_SNAPSHOT_REFRESH_SECONDS", "300"))
+                )
                 hybrid_engine = HybridQueryEngine(
-                    surrealdb_store=surrealdb_store,
-                    neo4j_store=neo4j_store,
-                    redis_cache=redis_cache,
-                    performance_optimizer=performance_optimizer
+                    vector_store=surrealdb_store,
+                    graph_store=neo4j_store,
+                    graph_snapshots=graph_snapshots
                 )
                 await hybrid_engine.initialize()
                 logfire.info("Hybrid query engine initialized successfully")
@@ -6,20 +6,37 @@ Implements graph-based document relationships and concept mapping.
 
 import asyncio
 import os
+import re
 import json
 import time
-from typing import Dict, List, Any, Optional, Tuple, Set
+from contextlib import asynccontextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Dict, List, Any, Optional, Tuple, Set, AsyncIterator, Callable, Awaitable
 from datetime import datetime, UTC
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from collections import defaultdict
 
 import logfire
-from neo4j import AsyncGraphDatabase, AsyncDriver, AsyncSession
+import numpy as np
+from scipy import sparse
+from neo4j import AsyncGraphDatabase, AsyncDriver, AsyncSession, AsyncManagedTransaction, Record
 from neo4j.exceptions import ServiceUnavailable, ClientError
 
+from adaptive_concurrency import AIMDLimiter
+from concept_extraction import ConceptExtractor, ConceptVocabulary
+from connection_pool import PoolMetrics
+from cypher_cache import (
+    CypherResultCache, query_cache_key, GRAPH_VERSION_CONSTRAINT,
+    READ_GRAPH_VERSION_QUERY, BUMP_GRAPH_VERSION_CLAUSE
+)
+from graph_snapshot import GraphSnapshot, load_graph_snapshot
+
 # Configure Logfire
 logfire.configure(send_to_logfire=False)  # Configure appropriately for production
 
+# Default for arguments that fall back to the store's config, leaving None free to mean "off"
+USE_CONFIG: Any = object()
+
 @dataclass
 class DocumentNode:
     """Represents a document node in the graph."""
@@ -46,20 +63,45 @@ class ConceptNode:
 
 @dataclass
 class Relationship:
-    """Represents a relationship between nodes."""
+    """Represents a relationship between nodes.
+
+    ``from_label``/``to_label`` type the endpoints so they can be resolved
+    through the unique constraints instead of a label-less scan.
+    """
     from_node: str
     to_node: str
     relationship_type: str
     strength: float
     properties: Dict[str, Any]
+    from_label: Optional[str] = None
+    to_label: Optional[str] = None
 
 @dataclass
 class GraphSearchResult:
-    """Represents a graph search result."""
+    """Represents a graph search result.
+    
+    ``node_table`` holds each node once keyed by its Neo4j element id, and
+    relationships and paths refer to nodes by those ids. ``nodes`` lists the
+    same node dicts in result order.
+    """
     nodes: List[Dict[str, Any]]
     relationships: List[Dict[str, Any]]
     paths: List[Dict[str, Any]]
     query_metadata: Dict[str, Any]
+    node_table: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+@dataclass
+class GraphNeighbourhood:
+    """Compact result of a bounded breadth-first expansion.
+    
+    Nodes are Neo4j element ids in discovery order (seeds first); edges are
+    ``(start_id, end_id, relationship_type)`` tuples between those nodes.
+    """
+    node_ids: List[str]
+    edges: List[Tuple[str, str, str]]
+    origins: Dict[str, str]
+    depth_reached: int
+    truncated: bool
 
 @dataclass
 class Neo4jConfig:
@@ -71,14 +113,120 @@ class Neo4jConfig:
     max_connection_lifetime: int = 3600
     max_connection_pool_size: int = 50
     connection_acquisition_timeout: int = 60
+    fetch_size: int = 1000
+    write_batch_size: int = 1000
+    expansion_fan_out: int = 25
+    expansion_node_budget: int = 200
+    max_topic_document_frequency: Optional[int] = 1000  # Topics in more documents are not used for pairing
+    concept_vocabulary_path: Optional[str] = None
+    concept_extraction_workers: Optional[int] = None
+    stats_cache_ttl_seconds: float = 60.0
+    query_cache_size: int = 1024
+    graph_version_check_seconds: float = 0.0  # >0 reuses a checked version, allowing stale reads for that long
+
+async def _fetch_all(tx: AsyncManagedTransaction, query: str, params: Dict[str, Any]) -> List[Record]:
+    """Transaction function returning every record of a query."""
+    result = await tx.run(query, params)
+    return [record async for record in result]
+
+async def _fetch_single(tx: AsyncManagedTransaction, query: str, params: Dict[str, Any]) -> Optional[Record]:
+    """Transaction function returning the first record of a query, if any."""
+    result = await tx.run(query, params)
+    return await result.single()
+
+# Unique key property per node label, matching the constraints in _initialize_schema
+NODE_KEYS: Dict[str, str] = {
+    "Document": "id",
+    "Concept": "name",
+    "Topic": "name",
+    "Source": "name"
+}
+
+# Hub labels are keyed by name only, so bulk writes MERGE them instead of requiring them upfront
+HUB_LABELS: Set[str] = {"Source"}
+
+# Full-text indexes that seed graph_search
+CONCEPT_FULLTEXT_INDEX = "concept_fulltext_idx"
+DOCUMENT_FULLTEXT_INDEX = "document_fulltext_idx"
+
+# Node properties returned by graph_search; large properties such as content stay in Neo4j
+NODE_PROJECTION_FIELDS: Tuple[str, ...] = (
+    "id", "name", "title", "source_name", "source_url", "quality_score", "topics",
+    "category", "description", "frequency", "confidence_score", "chunk_count"
+)
+
+# Label and relationship counts are answered from the count store without scanning
+GRAPH_COUNTS_QUERY = """
+CALL { MATCH (d:Document) RETURN count(d) AS document_count }
+CALL { MATCH (c:Concept) RETURN count(c) AS concept_count }
+CALL { MATCH ()-[r]->() RETURN count(r) AS relationship_count }
+RETURN document_count, concept_count, relationship_count
+"""
+
+GRAPH_STATS_QUERY = """
+CALL { MATCH (d:Document) RETURN count(d) AS document_count, avg(d.quality_score) AS avg_quality }
+CALL { MATCH (c:Concept) RETURN count(c) AS concept_count }
+CALL { MATCH ()-[r]->() RETURN count(r) AS relationship_count }
+CALL { MATCH ()-[r:RELATED_TO]->() RETURN avg(r.strength) AS avg_relationship_strength }
+RETURN document_count, concept_count, relationship_count, avg_quality, avg_relationship_strength
+"""
+
+def _node_projection(alias: str) -> str:
+    """Cypher map projection of the graph_search node properties."""
+    fields = ", ".join(f".{name}" for name in NODE_PROJECTION_FIELDS)
+    return f"{alias} {{{fields}, labels: labels({alias})}}"
+
+def _relationship_projection(alias: str) -> str:
+    """Cypher map describing a relationship by type, endpoint ids and properties."""
+    return (f"{{type: type({alias}), start: elementId(startNode({alias})), "
+            f"end: elementId(endNode({alias})), properties: properties({alias})}}")
+
+def _project_node(projection: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop properties the node does not have from a projected node map."""
+    return {key: value for key, value in dict(projection).items() if value is not None}
+
+_RELATIONSHIP_TYPE_PATTERN = re.compile(r"^[A-Z][A-Z0-9_]*$")
+_LUCENE_SPECIAL_CHARS = re.compile(r'([+\-!(){}\[\]^"~*?:\\/&|])')
+
+def _validate_relationship_type(relationship_type: str) -> str:
+    """Ensure a relationship type is safe to interpolate into Cypher."""
+    if not _RELATIONSHIP_TYPE_PATTERN.match(relationship_type or ""):
+        raise ValueError(f"Invalid relationship type: {relationship_type!r}")
+    return relationship_type
+
+def _fulltext_query(query: str) -> str:
+    """Turn free text into an escaped Lucene query matching any of its terms."""
+    # Lowercasing keeps words like AND/OR/NOT from being parsed as operators
+    terms = [_LUCENE_SPECIAL_CHARS.sub(r"\\\1", term.lower()) for term in query.split()]
+    return " OR ".join(term for term in terms if term)
+
+def _node_pattern(alias: str, label: Optional[str], param: str) -> Tuple[str, str]:
+    """Build a MATCH pattern and WHERE clause for a (possibly untyped) endpoint."""
+    if label is None:
+        return f"({alias})", f"({alias}.id = {param} OR {alias}.name = {param})"
+    if label not in NODE_KEYS:
+        raise ValueError(f"Unknown node label: {label!r}")
+    return f"({alias}:{label} {{{NODE_KEYS[label]}: {param}}})", ""
 
 class Neo4jGraphStore:
     """Neo4j graph storage implementation for document relationships."""
     
-    def __init__(self, config: Neo4jConfig = None):
+    def __init__(self, config: Neo4jConfig = None, limiter: Optional[AIMDLimiter] = None):
         self.config = config or Neo4jConfig()
         self.driver: Optional[AsyncDriver] = None
+        # Adaptive concurrency limit every transaction counts against, if any
+        self.limiter = limiter
+        self._concept_extractor: Optional[ConceptExtractor] = None
+        self._stats_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._shared_session: ContextVar[Optional[AsyncSession]] = ContextVar(
+            f"neo4j_shared_session_{id(self)}", default=None
+        )
         self._initialize_config()
+        self.pool_metrics = PoolMetrics(max_size=self.config.max_connection_pool_size)
+        self.query_cache = CypherResultCache(
+            max_entries=self.config.query_cache_size,
+            version_check_seconds=self.config.graph_version_check_seconds
+        )
     
     @logfire.instrument("neo4j_graph_initialize")
     def _initialize_config(self):
@@ -91,11 +239,24 @@ class Neo4jGraphStore:
             self.config.username = os.getenv("NEO4J_USERNAME", self.config.username)
             self.config.password = os.getenv("NEO4J_PASSWORD", self.config.password)
             self.config.database = os.getenv("NEO4J_DATABASE", self.config.database)
+            self.config.concept_vocabulary_path = os.getenv(
+                "CONCEPT_VOCABULARY_PATH", self.config.concept_vocabulary_path
+            )
+            self.config.max_connection_pool_size = int(os.getenv(
+                "NEO4J_MAX_CONNECTION_POOL_SIZE", self.config.max_connection_pool_size
+            ))
+            self.config.connection_acquisition_timeout = int(os.getenv(
+                "NEO4J_CONNECTION_ACQUISITION_TIMEOUT", self.config.connection_acquisition_timeout
+            ))
+            self.config.fetch_size = int(os.getenv("NEO4J_FETCH_SIZE", self.config.fetch_size))
+            if os.getenv("NEO4J_MAX_TOPIC_DOCUMENT_FREQUENCY"):
+                self.config.max_topic_document_frequency = int(os.environ["NEO4J_MAX_TOPIC_DOCUMENT_FREQUENCY"])
             
             logfire.info("Neo4j config initialized", 
                         uri=self.config.uri, 
                         username=self.config.username,
-                        database=self.config.database)
+                        database=self.config.database,
+                        max_connection_pool_size=self.config.max_connection_pool_size)
     
     @logfire.instrument("neo4j_connect")
     async def connect(self) -> bool:
@@ -109,7 +270,8 @@ class Neo4jGraphStore:
                     auth=(self.config.username, self.config.password),
                     max_connection_lifetime=self.config.max_connection_lifetime,
                     max_connection_pool_size=self.config.max_connection_pool_size,
-                    connection_acquisition_timeout=self.config.connection_acquisition_timeout
+                    connection_acquisition_timeout=self.config.connection_acquisition_timeout,
+                    fetch_size=self.config.fetch_size
                 )
                 
                 # Test connection
@@ -138,12 +300,14 @@ class Neo4jGraphStore:
         
         with logfire.span("Initializing Neo4j schema"):
             try:
-                async with self.driver.session(database=self.config.database) as session:
+                async with self.session() as session:
                     # Create constraints
                     constraints = [
                         "CREATE CONSTRAINT document_id_unique IF NOT EXISTS FOR (d:Document) REQUIRE d.id IS UNIQUE",
                         "CREATE CONSTRAINT concept_name_unique IF NOT EXISTS FOR (c:Concept) REQUIRE c.name IS UNIQUE",
-                        "CREATE CONSTRAINT topic_name_unique IF NOT EXISTS FOR (t:Topic) REQUIRE t.name IS UNIQUE"
+                        "CREATE CONSTRAINT topic_name_unique IF NOT EXISTS FOR (t:Topic) REQUIRE t.name IS UNIQUE",
+                        "CREATE CONSTRAINT source_name_unique IF NOT EXISTS FOR (s:Source) REQUIRE s.name IS UNIQUE",
+                        GRAPH_VERSION_CONSTRAINT
                     ]
                     
                     # Create indexes
@@ -152,7 +316,9 @@ class Neo4jGraphStore:
                         "CREATE INDEX document_quality_idx IF NOT EXISTS FOR (d:Document) ON (d.quality_score)",
                         "CREATE INDEX concept_category_idx IF NOT EXISTS FOR (c:Concept) ON (c.category)",
                         "CREATE INDEX concept_frequency_idx IF NOT EXISTS FOR (c:Concept) ON (c.frequency)",
-                        "CREATE INDEX relationship_strength_idx IF NOT EXISTS FOR ()-[r:RELATES_TO]-() ON (r.strength)"
+                        "CREATE INDEX relationship_strength_idx IF NOT EXISTS FOR ()-[r:RELATES_TO]-() ON (r.strength)",
+                        f"CREATE FULLTEXT INDEX {CONCEPT_FULLTEXT_INDEX} IF NOT EXISTS FOR (c:Concept) ON EACH [c.name, c.description]",
+                        f"CREATE FULLTEXT INDEX {DOCUMENT_FULLTEXT_INDEX} IF NOT EXISTS FOR (d:Document) ON EACH [d.title, d.source_name, d.topics]"
                     ]
                     
                     all_queries = constraints + indexes
@@ -171,6 +337,113 @@ class Neo4jGraphStore:
                 logfire.error("Failed to initialize schema", error=str(e))
                 raise
     
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """Session for one or more managed transactions.
+        
+        Inside ``shared_session()`` the current task's shared session is
+        returned instead of opening a new one.
+        """
+        if not self.driver:
+            raise RuntimeError("Not connected to Neo4j")
+        
+        shared = self._shared_session.get()
+        if shared is not None:
+            yield shared
+            return
+        
+        self.pool_metrics.session_opened()
+        try:
+            async with self.driver.session(database=self.config.database) as session:
+                yield session
+        finally:
+            self.pool_metrics.session_closed()
+    
+    @asynccontextmanager
+    async def shared_session(self) -> AsyncIterator[AsyncSession]:
+        """Run every store call made by this task inside one session.
+        
+        Sessions are not safe for concurrent use, so only sequential
+        multi-step operations should share one.
+        """
+        if self._shared_session.get() is not None:
+            yield self._shared_session.get()
+            return
+        
+        async with self.session() as session:
+            token = self._shared_session.set(session)
+            try:
+                yield session
+            finally:
+                self._shared_session.reset(token)
+    
+    async def _execute(
+        self,
+        session: AsyncSession,
+        write: bool,
+        work: Callable[..., Awaitable[Any]],
+        *args: Any
+    ) -> Any:
+        """Run ``work`` as a managed read or write transaction, retried on transient errors."""
+        started = time.perf_counter()
+        acquisition_ms = 0.0
+        attempts = 0
+        
+        async def attempt(tx: AsyncManagedTransaction, *work_args: Any) -> Any:
+            nonlocal attempts, acquisition_ms
+            attempts += 1
+            if attempts == 1:
+                acquisition_ms = (time.perf_counter() - started) * 1000
+            return await work(tx, *work_args)
+        
+        execute = session.execute_write if write else session.execute_read
+        failed = True
+        try:
+            async with self.limiter.slot() if self.limiter else nullcontext():
+                result = await execute(attempt, *args)
+            failed = False
+            return result
+        finally:
+            self.pool_metrics.record_transaction(write, attempts, acquisition_ms, failed)
+    
+    async def _cached_read(
+        self,
+        session: AsyncSession,
+        work: Callable[..., Awaitable[Any]],
+        query: str,
+        params: Dict[str, Any]
+    ) -> Any:
+        """Read through the graph-versioned query result cache."""
+        async def load() -> Any:
+            return await self._execute(session, False, work, query, params)
+        
+        if not self.query_cache.enabled:
+            return await load()
+        
+        async def read_version() -> int:
+            record = await self._execute(session, False, _fetch_single, READ_GRAPH_VERSION_QUERY, {})
+            return record["version"] if record else 0
+        
+        key = query_cache_key(f"{work.__name__}:{query}", params)
+        return await self.query_cache.fetch(key, read_version, load)
+    
+    async def _read_all(self, session: AsyncSession, query: str, params: Optional[Dict[str, Any]] = None) -> List[Record]:
+        return await self._cached_read(session, _fetch_all, query, params or {})
+    
+    async def _read_single(self, session: AsyncSession, query: str, params: Optional[Dict[str, Any]] = None) -> Optional[Record]:
+        return await self._cached_read(session, _fetch_single, query, params or {})
+    
+    async def _write_single(self, session: AsyncSession, query: str, params: Optional[Dict[str, Any]] = None) -> Optional[Record]:
+        return await self._execute(session, True, _fetch_single, query, params or {})
+    
+    def get_pool_metrics(self) -> Dict[str, Any]:
+        """Session, transaction and pool saturation counters."""
+        return self.pool_metrics.to_dict()
+    
+    def get_query_cache_stats(self) -> Dict[str, Any]:
+        """Entry count, graph version and hit rate of the query result cache."""
+        return self.query_cache.stats()
+    
     @logfire.instrument("create_document_node")
     async def create_document_node(self, document: DocumentNode) -> bool:
         """Create or update a document node in the graph."""
@@ -189,9 +462,9 @@ class Neo4jGraphStore:
                 if not document.created_at:
                     document.created_at = now
                 
-                async with self.driver.session(database=self.config.database) as session:
-                    query = """
-                    MERGE (d:Document {id: $id})
+                async with self.session() as session:
+                    query = f"""
+                    MERGE (d:Document {{id: $id}})
                     SET d.source_name = $source_name,
                         d.source_url = $source_url,
                         d.title = $title,
@@ -201,13 +474,14 @@ class Neo4jGraphStore:
                         d.topics = $topics,
                         d.created_at = $created_at,
                         d.updated_at = $updated_at
+                    {BUMP_GRAPH_VERSION_CLAUSE}
                     RETURN d.id as document_id
                     """
                     
-                    result = await session.run(query, **asdict(document))
-                    record = await result.single()
+                    record = await self._write_single(session, query, asdict(document))
                     
                     if record:
+                        self._graph_changed()
                         logfire.info("Document node created successfully", 
                                    document_id=record["document_id"])
                         return True
@@ -234,21 +508,22 @@ class Neo4jGraphStore:
                            category=concept.category,
                            frequency=concept.frequency)
                 
-                async with self.driver.session(database=self.config.database) as session:
-                    query = """
-                    MERGE (c:Concept {name: $name})
+                async with self.session() as session:
+                    query = f"""
+                    MERGE (c:Concept {{name: $name}})
                     SET c.category = $category,
                         c.description = $description,
                         c.frequency = $frequency,
                         c.confidence_score = $confidence_score,
                         c.related_topics = $related_topics
+                    {BUMP_GRAPH_VERSION_CLAUSE}
                     RETURN c.name as concept_name
                     """
                     
-                    result = await session.run(query, **asdict(concept))
-                    record = await result.single()
+                    record = await self._write_single(session, query, asdict(concept))
                     
                     if record:
+                        self._graph_changed()
                         logfire.info("Concept node created successfully", 
                                    concept_name=record["concept_name"])
                         return True
@@ -279,17 +554,24 @@ class Neo4jGraphStore:
                            relationship_type=relationship.relationship_type,
                            strength=relationship.strength)
                 
-                async with self.driver.session(database=self.config.database) as session:
+                async with self.session() as session:
                     # Build properties string for the relationship
                     properties_str = ", ".join([f"{k}: ${k}" for k in relationship.properties.keys()])
                     if properties_str:
                         properties_str = f", {properties_str}"
                     
+                    rel_type = _validate_relationship_type(relationship.relationship_type)
+                    from_pattern, from_where = _node_pattern("from_node", relationship.from_label, "$from_node")
+                    to_pattern, to_where = _node_pattern("to_node", relationship.to_label, "$to_node")
+                    where_clause = " AND ".join(clause for clause in (from_where, to_where) if clause)
+                    if where_clause:
+                        where_clause = f"WHERE {where_clause}"
+                    
                     query = f"""
-                    MATCH (from_node), (to_node)
-                    WHERE from_node.id = $from_node OR from_node.name = $from_node
-                    AND (to_node.id = $to_node OR to_node.name = $to_node)
-                    MERGE (from_node)-[r:{relationship.relationship_type} {{strength: $strength{properties_str}}}]->(to_node)
+                    MATCH {from_pattern}, {to_pattern}
+                    {where_clause}
+                    MERGE (from_node)-[r:{rel_type} {{strength: $strength{properties_str}}}]->(to_node)
+                    {BUMP_GRAPH_VERSION_CLAUSE}
                     RETURN type(r) as relationship_type
                     """
                     
@@ -300,10 +582,10 @@ class Neo4jGraphStore:
                         **relationship.properties
                     }
                     
-                    result = await session.run(query, params)
-                    record = await result.single()
+                    record = await self._write_single(session, query, params)
                     
                     if record:
+                        self._graph_changed()
                         logfire.info("Relationship created successfully", 
                                    relationship_type=record["relationship_type"])
                         return True
@@ -318,6 +600,98 @@ class Neo4jGraphStore:
                             error=str(e))
                 return False
     
+    @logfire.instrument("create_relationships_bulk")
+    async def create_relationships_bulk(
+        self,
+        relationships: List[Relationship],
+        batch_size: Optional[int] = None
+    ) -> int:
+        """Create many relationships with one UNWIND query per type and batch.
+        
+        Every relationship must carry ``from_label`` and ``to_label`` so both
+        endpoints are looked up through their unique constraint.
+        Returns the number of relationships written.
+        """
+        if not self.driver:
+            raise RuntimeError("Not connected to Neo4j")
+        
+        batch_size = batch_size or self.config.write_batch_size
+        
+        # Group rows by (type, from label, to label) since none of these can be parameters
+        groups: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = defaultdict(list)
+        for rel in relationships:
+            if rel.from_label is None or rel.to_label is None:
+                raise ValueError(
+                    f"Bulk relationships require typed endpoints: {rel.from_node} -> {rel.to_node}"
+                )
+            key = (_validate_relationship_type(rel.relationship_type), rel.from_label, rel.to_label)
+            groups[key].append({
+                "from_key": rel.from_node,
+                "to_key": rel.to_node,
+                "strength": rel.strength,
+                "properties": rel.properties
+            })
+        
+        with logfire.span("Creating relationships in bulk",
+                         relationship_count=len(relationships),
+                         group_count=len(groups)):
+            created = 0
+            try:
+                async with self.session() as session:
+                    for (rel_type, from_label, to_label), rows in groups.items():
+                        from_pattern, _ = _node_pattern("from_node", from_label, "row.from_key")
+                        to_pattern, _ = _node_pattern("to_node", to_label, "row.to_key")
+                        from_clause = "MERGE" if from_label in HUB_LABELS else "MATCH"
+                        to_clause = "MERGE" if to_label in HUB_LABELS else "MATCH"
+                        query = f"""
+                        UNWIND $rows AS row
+                        {from_clause} {from_pattern}
+                        {to_clause} {to_pattern}
+                        MERGE (from_node)-[r:{rel_type}]->(to_node)
+                        SET r += row.properties, r.strength = row.strength
+                        WITH count(r) as created
+                        {BUMP_GRAPH_VERSION_CLAUSE}
+                        RETURN created
+                        """
+                        
+                        for start in range(0, len(rows), batch_size):
+                            batch = rows[start:start + batch_size]
+                            record = await self._write_single(session, query, {"rows": batch})
+                            created += record["created"] if record else 0
+                            self._graph_changed()
+                        
+                        logfire.debug("Relationship group written",
+                                    relationship_type=rel_type,
+                                    from_label=from_label,
+                                    to_label=to_label,
+                                    rows=len(rows))
+                
+                logfire.info("Bulk relationships created",
+                           requested=len(relationships),
+                           created=created)
+                return created
+                
+            except Exception as e:
+                logfire.error("Failed to create relationships in bulk",
+                            created=created,
+                            error=str(e))
+                return created
+    
+    @property
+    def concept_extractor(self) -> ConceptExtractor:
+        """Concept extractor over the configured vocabulary, created on first use."""
+        if self._concept_extractor is None:
+            vocabulary = (
+                ConceptVocabulary.from_file(self.config.concept_vocabulary_path)
+                if self.config.concept_vocabulary_path
+                else ConceptVocabulary.default()
+            )
+            self._concept_extractor = ConceptExtractor(
+                vocabulary,
+                max_workers=self.config.concept_extraction_workers
+            )
+        return self._concept_extractor
+    
     @logfire.instrument("extract_concepts_from_document")
     async def extract_concepts_from_document(
         self, 
@@ -331,68 +705,10 @@ class Neo4jGraphStore:
                            document_id=document.id,
                            chunk_count=len(content_chunks))
                 
-                concepts = []
-                concept_frequency = defaultdict(int)
-                
-                # Simple concept extraction based on topics and keywords
-                # In production, this would use NLP/ML models
-                all_text = " ".join(content_chunks).lower()
-                
-                # Extract concepts from document topics
-                for topic in document.topics:
-                    concept_frequency[topic.lower()] += 10  # Higher weight for explicit topics
-                
-                # Extract common technical concepts
-                technical_concepts = {
-                    "api": "Application Programming Interface",
-                    "database": "Data storage system",
-                    "framework": "Software development framework",
-                    "authentication": "User verification system",
-                    "middleware": "Software layer between applications",
-                    "endpoint": "API access point",
-                    "query": "Data retrieval operation",
-                    "schema": "Data structure definition",
-                    "integration": "System connection method",
-                    "monitoring": "System observation and tracking"
-                }
-                
-                for concept, description in technical_concepts.items():
-                    if concept in all_text:
-                        frequency = all_text.count(concept)
-                        concept_frequency[concept] += frequency
-                        
-                        if concept_frequency[concept] >= 2:  # Minimum threshold
-                            concepts.append(ConceptNode(
-                                name=concept.title(),
-                                category="Technical",
-                                description=description,
-                                frequency=concept_frequency[concept],
-                                confidence_score=min(0.9, concept_frequency[concept] / 10),
-                                related_topics=document.topics
-                            ))
-                
-                # Extract framework-specific concepts
-                framework_concepts = {
-                    "fastapi": ("FastAPI", "Modern Python web framework"),
-                    "logfire": ("Logfire", "Observability and monitoring platform"),
-                    "surrealdb": ("SurrealDB", "Multi-model database"),
-                    "neo4j": ("Neo4j", "Graph database platform"),
-                    "pytest": ("PyTest", "Python testing framework"),
-                    "redis": ("Redis", "In-memory data structure store")
-                }
-                
-                for keyword, (name, description) in framework_concepts.items():
-                    if keyword in all_text:
-                        frequency = all_text.count(keyword)
-                        if frequency >= 1:
-                            concepts.append(ConceptNode(
-                                name=name,
-                                category="Framework",
-                                description=description,
-                                frequency=frequency,
-                                confidence_score=min(0.95, frequency / 5),
-                                related_topics=document.topics
-                            ))
+                concepts = [
+                    ConceptNode(**concept)
+                    for concept in self.concept_extractor.extract(document.topics, content_chunks)
+                ]
                 
                 logfire.info("Concepts extracted successfully", 
                            document_id=document.id,
@@ -406,64 +722,126 @@ class Neo4jGraphStore:
                             error=str(e))
                 return []
     
+    @logfire.instrument("extract_concepts_from_documents")
+    async def extract_concepts_from_documents(
+        self,
+        documents: List[Tuple[DocumentNode, List[str]]]
+    ) -> List[List[ConceptNode]]:
+        """Extract concepts for many ``(document, content_chunks)`` pairs.
+        
+        Large batches are spread over a process pool; results are returned in
+        input order.
+        """
+        with logfire.span("Extracting concepts from documents", document_count=len(documents)):
+            try:
+                extracted = await self.concept_extractor.extract_many(
+                    [(document.topics, chunks) for document, chunks in documents]
+                )
+                return [[ConceptNode(**concept) for concept in concepts] for concepts in extracted]
+                
+            except Exception as e:
+                logfire.error("Failed to extract concepts", 
+                            document_count=len(documents), 
+                            error=str(e))
+                return [[] for _ in documents]
+    
     @logfire.instrument("build_document_relationships")
     async def build_document_relationships(
         self, 
-        documents: List[DocumentNode]
+        documents: List[DocumentNode],
+        max_topic_document_frequency: Optional[int] = USE_CONFIG
     ) -> List[Relationship]:
-        """Build relationships between documents based on content similarity."""
+        """Build relationships between documents based on content similarity.
+        
+        Topic pairs are scored from a sparse document/topic incidence matrix, so
+        only documents that actually share a topic are compared. Topics found in
+        more than ``max_topic_document_frequency`` documents are ignored for
+        pairing; this defaults to the config's value, since each such topic adds
+        a number of pairs quadratic in its document count, and ``None``
+        disables the cap. Same-source
+        membership is expressed as one HAS_DOCUMENT edge from a Source hub node
+        per document.
+        """
+        if max_topic_document_frequency is USE_CONFIG:
+            max_topic_document_frequency = self.config.max_topic_document_frequency
+        
         with logfire.span("Building document relationships", document_count=len(documents)):
             try:
                 logfire.info("Building document relationships", document_count=len(documents))
                 
                 relationships = []
                 
-                # Create relationships based on shared topics
-                for i, doc1 in enumerate(documents):
-                    for j, doc2 in enumerate(documents[i+1:], i+1):
-                        shared_topics = set(doc1.topics) & set(doc2.topics)
+                # Inverted index: topic -> column, one incidence entry per (document, topic)
+                topic_columns: Dict[str, int] = {}
+                rows: List[int] = []
+                cols: List[int] = []
+                for i, doc in enumerate(documents):
+                    for topic in set(doc.topics):
+                        rows.append(i)
+                        cols.append(topic_columns.setdefault(topic, len(topic_columns)))
+                
+                if rows:
+                    incidence = sparse.csr_matrix(
+                        (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+                        shape=(len(documents), len(topic_columns))
+                    )
+                    
+                    pairing_topics = set(topic_columns)
+                    if max_topic_document_frequency is not None:
+                        document_frequency = np.asarray(incidence.sum(axis=0)).ravel()
+                        keep = np.flatnonzero(document_frequency <= max_topic_document_frequency)
+                        incidence = incidence[:, keep]
+                        column_topics = list(topic_columns)
+                        pairing_topics = {column_topics[column] for column in keep}
+                    
+                    # Shared-topic counts for every co-occurring pair (i < j)
+                    co_occurrence = sparse.triu(incidence @ incidence.T, k=1).tocoo()
+                    order = np.lexsort((co_occurrence.col, co_occurrence.row))
+                    first = co_occurrence.row[order]
+                    second = co_occurrence.col[order]
+                    shared_counts = co_occurrence.data[order]
+                    
+                    # Calculate relationship strength based on shared topics and quality scores
+                    topic_lengths = np.array([len(doc.topics) for doc in documents], dtype=np.float64)
+                    quality_scores = np.array([doc.quality_score for doc in documents], dtype=np.float64)
+                    topic_overlap = shared_counts / np.maximum(topic_lengths[first], topic_lengths[second])
+                    quality_factor = (quality_scores[first] + quality_scores[second]) / 2
+                    strength = topic_overlap * quality_factor
+                    
+                    for k in np.flatnonzero(strength >= 0.3):  # Minimum threshold
+                        doc1 = documents[first[k]]
+                        doc2 = documents[second[k]]
+                        doc2_topics = set(doc2.topics) & pairing_topics
+                        shared_topics = list(dict.fromkeys(t for t in doc1.topics if t in doc2_topics))
                         
-                        if shared_topics:
-                            # Calculate relationship strength based on shared topics
-                            topic_overlap = len(shared_topics) / max(len(doc1.topics), len(doc2.topics))
-                            
-                            # Consider quality scores in relationship strength
-                            quality_factor = (doc1.quality_score + doc2.quality_score) / 2
-                            strength = topic_overlap * quality_factor
-                            
-                            if strength >= 0.3:  # Minimum threshold
-                                relationships.append(Relationship(
-                                    from_node=doc1.id,
-                                    to_node=doc2.id,
-                                    relationship_type="RELATED_TO",
-                                    strength=round(strength, 3),
-                                    properties={
-                                        "shared_topics": list(shared_topics),
-                                        "topic_overlap": round(topic_overlap, 3),
-                                        "quality_factor": round(quality_factor, 3)
-                                    }
-                                ))
-                
-                # Create relationships based on same source
-                source_groups = defaultdict(list)
+                        relationships.append(Relationship(
+                            from_node=doc1.id,
+                            to_node=doc2.id,
+                            relationship_type="RELATED_TO",
+                            strength=round(float(strength[k]), 3),
+                            properties={
+                                "shared_topics": shared_topics,
+                                "topic_overlap": round(float(topic_overlap[k]), 3),
+                                "quality_factor": round(float(quality_factor[k]), 3)
+                            },
+                            from_label="Document",
+                            to_label="Document"
+                        ))
+                
+                # Link each document to its Source hub instead of pairing same-source documents
                 for doc in documents:
-                    source_groups[doc.source_name].append(doc)
-                
-                for source_name, source_docs in source_groups.items():
-                    if len(source_docs) > 1:
-                        # Create PART_OF relationships within same source
-                        for i, doc1 in enumerate(source_docs):
-                            for doc2 in source_docs[i+1:]:
-                                relationships.append(Relationship(
-                                    from_node=doc1.id,
-                                    to_node=doc2.id,
-                                    relationship_type="PART_OF_SAME_SOURCE",
-                                    strength=0.8,
-                                    properties={
-                                        "source_name": source_name,
-                                        "relationship_basis": "same_source"
-                                    }
-                                ))
+                    relationships.append(Relationship(
+                        from_node=doc.source_name,
+                        to_node=doc.id,
+                        relationship_type="HAS_DOCUMENT",
+                        strength=1.0,
+                        properties={
+                            "source_name": doc.source_name,
+                            "relationship_basis": "same_source"
+                        },
+                        from_label="Source",
+                        to_label="Document"
+                    ))
                 
                 logfire.info("Document relationships built successfully", 
                            relationships_created=len(relationships))
@@ -474,6 +852,108 @@ class Neo4jGraphStore:
                 logfire.error("Failed to build document relationships", error=str(e))
                 return []
     
+    async def _expand_neighbourhood(
+        self,
+        session: AsyncSession,
+        seed_ids: List[str],
+        max_depth: int,
+        fan_out: Optional[int] = None,
+        node_budget: Optional[int] = None
+    ) -> GraphNeighbourhood:
+        """Expand breadth-first from seed nodes, one query per hop.
+        
+        Each frontier node contributes at most ``fan_out`` unvisited neighbours
+        and the whole expansion stops at ``node_budget`` nodes. Visited nodes
+        are filtered and neighbours deduplicated inside Neo4j.
+        """
+        fan_out = fan_out or self.config.expansion_fan_out
+        node_budget = node_budget or self.config.expansion_node_budget
+        
+        hop_query = """
+        UNWIND $frontier AS frontier_id
+        MATCH (n) WHERE elementId(n) = frontier_id
+        CALL {
+            WITH n
+            MATCH (n)-[r]-(m)
+            WHERE NOT elementId(m) IN $visited
+            RETURN r, m
+            LIMIT $fan_out
+        }
+        RETURN elementId(m) as node_id,
+               head(collect(frontier_id)) as parent_id,
+               collect([elementId(startNode(r)), elementId(endNode(r)), type(r)]) as edges
+        LIMIT $remaining
+        """
+        
+        node_ids = list(dict.fromkeys(seed_ids))[:node_budget]
+        origins = {node_id: node_id for node_id in node_ids}
+        edges: List[Tuple[str, str, str]] = []
+        frontier = list(node_ids)
+        depth_reached = 0
+        truncated = False
+        
+        for depth in range(1, max_depth + 1):
+            remaining = node_budget - len(node_ids)
+            if not frontier:
+                break
+            if remaining <= 0:
+                truncated = True
+                break
+            
+            records = await self._read_all(session, hop_query, {
+                "frontier": frontier,
+                "visited": node_ids,
+                "fan_out": fan_out,
+                "remaining": remaining
+            })
+            next_frontier = []
+            for record in records:
+                node_id = record["node_id"]
+                next_frontier.append(node_id)
+                origins[node_id] = origins.get(record["parent_id"], record["parent_id"])
+                edges.extend(tuple(edge) for edge in record["edges"])
+            
+            node_ids.extend(next_frontier)
+            frontier = next_frontier
+            if next_frontier:
+                depth_reached = depth
+            if len(next_frontier) >= remaining:
+                truncated = True
+                break
+        
+        return GraphNeighbourhood(
+            node_ids=node_ids,
+            edges=edges,
+            origins=origins,
+            depth_reached=depth_reached,
+            truncated=truncated
+        )
+    
+    @logfire.instrument("expand_neighbourhood")
+    async def expand_neighbourhood(
+        self,
+        seed_ids: List[str],
+        max_depth: int = 2,
+        fan_out: Optional[int] = None,
+        node_budget: Optional[int] = None
+    ) -> GraphNeighbourhood:
+        """Bounded breadth-first expansion from nodes given by element id."""
+        if not self.driver:
+            raise RuntimeError("Not connected to Neo4j")
+        
+        with logfire.span("Expanding neighbourhood", seed_count=len(seed_ids), max_depth=max_depth):
+            async with self.session() as session:
+                neighbourhood = await self._expand_neighbourhood(
+                    session, seed_ids, max_depth, fan_out, node_budget
+                )
+            
+            logfire.info("Neighbourhood expanded",
+                       nodes=len(neighbourhood.node_ids),
+                       edges=len(neighbourhood.edges),
+                       depth_reached=neighbourhood.depth_reached,
+                       truncated=neighbourhood.truncated)
+            return neighbourhood
+    
     @logfire.instrument("graph_search")
     async def graph_search(
         self,
@@ -495,122 +975,174 @@ class Neo4jGraphStore:
                            max_depth=max_depth,
                            limit=limit)
                 
-                async with self.driver.session(database=self.config.database) as session:
-                    nodes = []
+                search_text = _fulltext_query(query)
+                max_depth = int(max_depth)
+                
+                node_projection = _node_projection("n")
+                
+                async with self.session() as session:
+                    node_table: Dict[str, Dict[str, Any]] = {}
                     relationships = []
                     paths = []
+                    expansion_metadata = {}
+                    
+                    def add_node(element_id: str, projection: Dict[str, Any]) -> str:
+                        if element_id not in node_table:
+                            node_table[element_id] = _project_node(projection)
+                        return element_id
                     
-                    if search_type == "concept":
-                        # Search for concepts and related documents
-                        concept_query = """
-                        MATCH (c:Concept)
-                        WHERE c.name CONTAINS $query OR c.description CONTAINS $query
-                        OPTIONAL MATCH (c)-[r]-(related)
-                        RETURN c, collect(distinct r) as rels, collect(distinct related) as related_nodes
+                    if not search_text:
+                        logfire.debug("Empty graph search query, skipping index lookup")
+                    
+                    elif search_type == "concept":
+                        # Seed concepts from the full-text index, then take their neighbours
+                        concept_query = f"""
+                        CALL db.index.fulltext.queryNodes($index_name, $search_text)
+                        YIELD node AS c, score
+                        WITH c, score
+                        ORDER BY score DESC
                         LIMIT $limit
+                        CALL {{
+                            WITH c
+                            OPTIONAL MATCH (c)-[r]-(related)
+                            RETURN r, related
+                            LIMIT $fan_out
+                        }}
+                        RETURN elementId(c) as element_id, {_node_projection("c")} as c, score,
+                               collect(distinct {_relationship_projection("r")}) as rels,
+                               collect(distinct {{element_id: elementId(related), node: {_node_projection("related")}}}) as related_nodes
+                        ORDER BY score DESC
                         """
                         
-                        result = await session.run(concept_query, query=query, limit=limit)
-                        async for record in result:
-                            concept = record["c"]
-                            nodes.append(dict(concept))
-                            
-                            for rel in record["rels"]:
-                                if rel:
-                                    relationships.append({
-                                        "type": rel.type,
-                                        "properties": dict(rel)
-                                    })
+                        records = await self._read_all(session, concept_query, {
+                            "index_name": CONCEPT_FULLTEXT_INDEX,
+                            "search_text": search_text,
+                            "limit": limit,
+                            "fan_out": self.config.expansion_fan_out
+                        })
+                        for record in records:
+                            concept_id = add_node(record["element_id"], record["c"])
+                            node_table[concept_id]["relevance_score"] = record.get("score")
                             
                             for related in record["related_nodes"]:
-                                if related:
-                                    nodes.append(dict(related))
+                                if related and related.get("element_id"):
+                                    add_node(related["element_id"], related["node"])
+                            
+                            for rel in record["rels"]:
+                                if rel and rel.get("type"):
+                                    relationships.append(dict(rel))
                     
                     elif search_type == "document":
-                        # Search for documents and their relationships
-                        doc_query = """
-                        MATCH (d:Document)
-                        WHERE d.title CONTAINS $query OR d.source_name CONTAINS $query
-                           OR any(topic IN d.topics WHERE topic CONTAINS $query)
-                        OPTIONAL MATCH path = (d)-[*1..$max_depth]-(related)
-                        RETURN d, collect(distinct nodes(path)) as path_nodes, 
-                               collect(distinct relationships(path)) as path_rels
-                        ORDER BY d.quality_score DESC
+                        # Seed documents from the full-text index, then expand within the node budget
+                        doc_query = f"""
+                        CALL db.index.fulltext.queryNodes($index_name, $search_text)
+                        YIELD node AS d, score
+                        RETURN elementId(d) as element_id, {_node_projection("d")} as d, score
+                        ORDER BY score DESC, d.quality_score DESC
                         LIMIT $limit
                         """
                         
-                        result = await session.run(doc_query, 
-                                                 query=query, 
-                                                 max_depth=max_depth,
-                                                 limit=limit)
-                        async for record in result:
-                            document = record["d"]
-                            nodes.append(dict(document))
+                        records = await self._read_all(session, doc_query, {
+                            "index_name": DOCUMENT_FULLTEXT_INDEX,
+                            "search_text": search_text,
+                            "limit": limit
+                        })
+                        seed_ids = []
+                        for record in records:
+                            seed_id = add_node(record["element_id"], record["d"])
+                            node_table[seed_id]["relevance_score"] = record.get("score")
+                            seed_ids.append(seed_id)
+                        
+                        if seed_ids:
+                            neighbourhood = await self._expand_neighbourhood(session, seed_ids, max_depth)
+                            
+                            # Materialize each expanded node once
+                            expanded_ids = [node_id for node_id in neighbourhood.node_ids if node_id not in node_table]
+                            if expanded_ids:
+                                fetched = await self._read_all(
+                                    session,
+                                    f"MATCH (n) WHERE elementId(n) IN $node_ids "
+                                    f"RETURN elementId(n) as element_id, {node_projection} as n",
+                                    {"node_ids": expanded_ids}
+                                )
+                                for record in fetched:
+                                    add_node(record["element_id"], record["n"])
+                            
+                            for start_id, end_id, rel_type in neighbourhood.edges:
+                                relationships.append({
+                                    "type": rel_type,
+                                    "start": start_id,
+                                    "end": end_id
+                                })
                             
-                            # Add path information
-                            if record["path_nodes"]:
-                                path_data = {
-                                    "length": len(record["path_nodes"]),
-                                    "nodes": [dict(node) for node in record["path_nodes"] if node],
-                                    "relationships": [dict(rel) for rel in record["path_rels"] if rel]
-                                }
-                                paths.append(path_data)
-                                
-                                # Add unique nodes and relationships
-                                for node in record["path_nodes"]:
-                                    if node:
-                                        nodes.append(dict(node))
-                                
-                                for rel in record["path_rels"]:
-                                    if rel:
-                                        relationships.append({
-                                            "type": rel.type,
-                                            "properties": dict(rel)
-                                        })
+                            # One path entry per seed covering the nodes reached from it
+                            for seed_id in seed_ids:
+                                reached = [node_id for node_id in expanded_ids
+                                           if neighbourhood.origins.get(node_id) == seed_id
+                                           and node_id in node_table]
+                                if reached:
+                                    paths.append({
+                                        "length": len(reached) + 1,
+                                        "nodes": [seed_id] + reached,
+                                        "relationships": [
+                                            {"type": rel_type, "start": start_id, "end": end_id}
+                                            for start_id, end_id, rel_type in neighbourhood.edges
+                                            if neighbourhood.origins.get(start_id) == seed_id
+                                            and neighbourhood.origins.get(end_id) == seed_id
+                                        ]
+                                    })
+                            
+                            expansion_metadata = {
+                                "depth_reached": neighbourhood.depth_reached,
+                                "truncated": neighbourhood.truncated,
+                                "node_budget": self.config.expansion_node_budget,
+                                "fan_out": self.config.expansion_fan_out
+                            }
                     
                     elif search_type == "path":
-                        # Find paths between concepts/documents
-                        path_query = """
-                        MATCH (start), (end)
-                        WHERE (start.name CONTAINS $query OR start.title CONTAINS $query)
-                          AND (end.name CONTAINS $query OR end.title CONTAINS $query)
-                          AND id(start) <> id(end)
-                        MATCH path = shortestPath((start)-[*1..$max_depth]-(end))
-                        RETURN path
+                        # Find paths between the best-scoring concepts/documents
+                        path_query = f"""
+                        CALL {{
+                            CALL db.index.fulltext.queryNodes($concept_index, $search_text)
+                            YIELD node, score
+                            RETURN node, score
+                            UNION
+                            CALL db.index.fulltext.queryNodes($document_index, $search_text)
+                            YIELD node, score
+                            RETURN node, score
+                        }}
+                        WITH node, score
+                        ORDER BY score DESC
+                        LIMIT $limit
+                        WITH collect(node) as seeds
+                        UNWIND seeds as start
+                        UNWIND seeds as end
+                        WITH start, end
+                        WHERE elementId(start) < elementId(end)
+                        MATCH path = shortestPath((start)-[*1..{max_depth}]-(end))
+                        RETURN [n IN nodes(path) | {{element_id: elementId(n), node: {node_projection}}}] as path_nodes,
+                               [r IN relationships(path) | {_relationship_projection("r")}] as path_rels
                         LIMIT $limit
                         """
                         
-                        result = await session.run(path_query, 
-                                                 query=query,
-                                                 max_depth=max_depth,
-                                                 limit=limit)
-                        async for record in result:
-                            path = record["path"]
-                            path_data = {
-                                "length": len(path.nodes),
-                                "nodes": [dict(node) for node in path.nodes],
-                                "relationships": [{"type": rel.type, "properties": dict(rel)} 
-                                               for rel in path.relationships]
-                            }
-                            paths.append(path_data)
-                            
-                            # Add nodes and relationships to main collections
-                            for node in path.nodes:
-                                nodes.append(dict(node))
-                            for rel in path.relationships:
-                                relationships.append({
-                                    "type": rel.type,
-                                    "properties": dict(rel)
-                                })
+                        records = await self._read_all(session, path_query, {
+                            "concept_index": CONCEPT_FULLTEXT_INDEX,
+                            "document_index": DOCUMENT_FULLTEXT_INDEX,
+                            "search_text": search_text,
+                            "limit": limit
+                        })
+                        for record in records:
+                            path_node_ids = [add_node(item["element_id"], item["node"])
+                                             for item in record["path_nodes"]]
+                            path_rels = [dict(rel) for rel in record["path_rels"]]
+                            paths.append({
+                                "length": len(path_node_ids),
+                                "nodes": path_node_ids,
+                                "relationships": path_rels
+                            })
+                            relationships.extend(path_rels)
                     
-                    # Remove duplicates
-                    unique_nodes = []
-                    seen_node_ids = set()
-                    for node in nodes:
-                        node_id = node.get("id") or node.get("name")
-                        if node_id and node_id not in seen_node_ids:
-                            unique_nodes.append(node)
-                            seen_node_ids.add(node_id)
+                    unique_nodes = list(node_table.values())
                     
                     search_time = time.time() - start_time
                     
@@ -622,7 +1154,8 @@ class Neo4jGraphStore:
                         "search_time_ms": round(search_time * 1000, 2),
                         "nodes_found": len(unique_nodes),
                         "relationships_found": len(relationships),
-                        "paths_found": len(paths)
+                        "paths_found": len(paths),
+                        **expansion_metadata
                     }
                     
                     logfire.info("Graph search completed", 
@@ -636,71 +1169,78 @@ class Neo4jGraphStore:
                         nodes=unique_nodes,
                         relationships=relationships,
                         paths=paths,
-                        query_metadata=query_metadata
+                        query_metadata=query_metadata,
+                        node_table=node_table
                     )
                     
             except Exception as e:
                 logfire.error("Graph search failed", error=str(e))
                 raise
     
+    def _graph_changed(self):
+        """Drop cached statistics and query results after a write through this store."""
+        self._stats_cache = None
+        self.query_cache.invalidate()
+    
     @logfire.instrument("get_graph_stats")
-    async def get_graph_stats(self) -> Dict[str, Any]:
-        """Get graph database statistics."""
+    async def get_graph_stats(self, include_averages: bool = True, refresh: bool = False) -> Dict[str, Any]:
+        """Get graph database statistics in a single round trip.
+        
+        Counts come from the count store; the averages scan Document nodes
+        and RELATED_TO relationships, so health checks should pass
+        ``include_averages=False``. Results are cached for
+        ``stats_cache_ttl_seconds`` and dropped whenever this store writes.
+        """
         if not self.driver:
             raise RuntimeError("Not connected to Neo4j")
         
-        with logfire.span("Get graph statistics"):
+        if not refresh and self._stats_cache is not None:
+            cached_at, cached = self._stats_cache
+            if (time.time() - cached_at < self.config.stats_cache_ttl_seconds
+                    and (cached["includes_averages"] or not include_averages)):
+                return {**cached, "cached": True}
+        
+        with logfire.span("Get graph statistics", include_averages=include_averages):
             try:
-                async with self.driver.session(database=self.config.database) as session:
-                    stats_queries = [
-                        "MATCH (d:Document) RETURN count(d) as document_count",
-                        "MATCH (c:Concept) RETURN count(c) as concept_count",
-                        "MATCH ()-[r]->() RETURN count(r) as relationship_count",
-                        "MATCH (d:Document) RETURN avg(d.quality_score) as avg_quality",
-                        "MATCH ()-[r:RELATED_TO]->() RETURN avg(r.strength) as avg_relationship_strength"
-                    ]
-                    
-                    stats = {}
-                    
-                    # Document count
-                    result = await session.run(stats_queries[0])
-                    record = await result.single()
-                    stats["document_count"] = record["document_count"] if record else 0
-                    
-                    # Concept count
-                    result = await session.run(stats_queries[1])
-                    record = await result.single()
-                    stats["concept_count"] = record["concept_count"] if record else 0
-                    
-                    # Relationship count
-                    result = await session.run(stats_queries[2])
-                    record = await result.single()
-                    stats["relationship_count"] = record["relationship_count"] if record else 0
-                    
-                    # Average quality
-                    result = await session.run(stats_queries[3])
-                    record = await result.single()
+                query = GRAPH_STATS_QUERY if include_averages else GRAPH_COUNTS_QUERY
+                async with self.session() as session:
+                    record = await self._read_single(session, query)
+                
+                stats = {
+                    "document_count": record["document_count"] if record else 0,
+                    "concept_count": record["concept_count"] if record else 0,
+                    "relationship_count": record["relationship_count"] if record else 0,
+                    "includes_averages": include_averages
+                }
+                if include_averages:
                     stats["average_quality"] = round(record["avg_quality"], 3) if record and record["avg_quality"] else 0.0
-                    
-                    # Average relationship strength
-                    result = await session.run(stats_queries[4])
-                    record = await result.single()
                     stats["average_relationship_strength"] = round(record["avg_relationship_strength"], 3) if record and record["avg_relationship_strength"] else 0.0
-                    
-                    # Additional metrics
-                    stats["database"] = self.config.database
-                    stats["connected"] = True
-                    
-                    logfire.info("Graph statistics retrieved", stats=stats)
-                    return stats
-                    
+                
+                stats["database"] = self.config.database
+                stats["connected"] = True
+                self._stats_cache = (time.time(), stats)
+                
+                logfire.info("Graph statistics retrieved", stats=stats)
+                return {**stats, "cached": False}
+                
             except Exception as e:
                 logfire.error("Failed to get graph statistics", error=str(e))
                 raise
     
+    @logfire.instrument("load_graph_snapshot")
+    async def load_snapshot(self) -> GraphSnapshot:
+        """Load a read-only in-memory CSR snapshot of the whole graph."""
+        if not self.driver:
+            raise RuntimeError("Not connected to Neo4j")
+        
+        return await load_graph_snapshot(self.driver, self.config.database)
+    
     @logfire.instrument("neo4j_close")
     async def close(self):
         """Close Neo4j connection."""
+        if self._concept_extractor:
+            self._concept_extractor.close()
+        
         if self.driver:
             with logfire.span("Closing Neo4j connection"):
                 await self.driver.close()
@@ -738,40 +1278,48 @@ async def migrate_documents_to_graph(
             )
             document_nodes.append(doc_node)
         
-        # Create document nodes
-        for doc_node in document_nodes:
-            await graph_store.create_document_node(doc_node)
-        
-        # Extract and create concepts if requested
-        if extract_concepts:
-            all_concepts = []
+        # Every write below runs sequentially, so they all share one session
+        async with graph_store.shared_session():
+            # Create document nodes
             for doc_node in document_nodes:
-                content_chunks = [doc_data.get("content", "") for doc_data in documents 
-                                if doc_data.get("id") == doc_node.id]
-                concepts = await graph_store.extract_concepts_from_document(doc_node, content_chunks)
-                all_concepts.extend(concepts)
-                
-                # Create concept nodes and relationships
-                for concept in concepts:
-                    await graph_store.create_concept_node(concept)
-                    
-                    # Create relationship between document and concept
-                    relationship = Relationship(
-                        from_node=doc_node.id,
-                        to_node=concept.name,
-                        relationship_type="CONTAINS_CONCEPT",
-                        strength=concept.confidence_score,
-                        properties={
-                            "frequency": concept.frequency,
-                            "category": concept.category
-                        }
-                    )
-                    await graph_store.create_relationship(relationship)
-        
-        # Build relationships between documents
-        relationships = await graph_store.build_document_relationships(document_nodes)
-        for relationship in relationships:
-            await graph_store.create_relationship(relationship)
+                await graph_store.create_document_node(doc_node)
+            
+            # Extract and create concepts if requested
+            if extract_concepts:
+                chunks_by_document = defaultdict(list)
+                for doc_data in documents:
+                    chunks_by_document[doc_data.get("id")].append(doc_data.get("content", ""))
+                
+                extracted = await graph_store.extract_concepts_from_documents(
+                    [(doc_node, chunks_by_document[doc_node.id]) for doc_node in document_nodes]
+                )
+                
+                for doc_node, concepts in zip(document_nodes, extracted):
+                    # Create concept nodes and relationships
+                    for concept in concepts:
+                        await graph_store.create_concept_node(concept)
+                        
+                        # Create relationship between document and concept
+                        relationship = Relationship(
+                            from_node=doc_node.id,
+                            to_node=concept.name,
+                            relationship_type="CONTAINS_CONCEPT",
+                            strength=concept.confidence_score,
+                            properties={
+                                "frequency": concept.frequency,
+                                "category": concept.category
+                            },
+                            from_label="Document",
+                            to_label="Concept"
+                        )
+                        await graph_store.create_relationship(relationship)
+            
+            # Build relationships between documents
+            relationships = await graph_store.build_document_relationships(
+                document_nodes,
+                max_topic_document_frequency=graph_store.config.max_topic_document_frequency
+            )
+            await graph_store.create_relationships_bulk(relationships)
         
         return True
         
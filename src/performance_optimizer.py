@@ -8,17 +8,21 @@ query optimization, and intelligent resource management.
 import asyncio
 import time
 import hashlib
-from typing import Dict, List, Any, Optional, Tuple, Union
+from typing import Dict, List, Any, Tuple, Union
 from dataclasses import dataclass, asdict
 from enum import Enum
 import json
-from collections import defaultdict, OrderedDict
-import threading
+from collections import defaultdict
 import weakref
 
 import logfire
 import numpy as np
 
+from adaptive_concurrency import BackendLimiters, ConcurrencyLimitExceeded
+from cache_stampede import SingleFlight, should_refresh_early, unwrap_value, wrap_value
+from cache_tags import invalidation_tags, source_tags
+from sharded_cache import ShardedCache
+
 # Configure Logfire
 logfire.configure(send_to_logfire=False)  # Configure appropriately for production
 
@@ -45,9 +49,18 @@ class PerformanceConfig:
     embedding_cache_size: int = 2000
     concept_cache_size: int = 500
     cache_ttl_seconds: int = 3600
+    stale_while_revalidate_seconds: int = 0  # Serve expired results this long while one refresh runs
+    early_refresh_beta: float = 1.0  # XFetch early refresh aggressiveness; 0 disables it
+    cache_memory_mb: float = 256.0  # Split across the caches in proportion to their sizes
+    cache_shards: int = 16
     
     # Connection pooling
-    max_concurrent_queries: int = 100
+    max_concurrent_queries: int = 100  # Upper bound of each backend's adaptive limit
+    initial_concurrency_limit: int = 100  # Start open; limits only shrink once latency misses target
+    min_concurrency_limit: int = 1
+    concurrency_backoff: float = 0.9  # Limit multiplier when latency exceeds target
+    max_queued_queries: int = 100  # Per backend; further work is rejected at once
+    max_queue_wait_ms: float = 100.0
     connection_pool_size: int = 20
     connection_timeout_ms: int = 5000
     
@@ -91,77 +104,8 @@ class PerformanceMetrics:
         if self.bottlenecks_detected is None:
             self.bottlenecks_detected = []
 
-class LRUCache:
-    """Thread-safe LRU cache implementation."""
-    
-    def __init__(self, max_size: int = 1000, ttl_seconds: int = 3600):
-        self.max_size = max_size
-        self.ttl_seconds = ttl_seconds
-        self.cache = OrderedDict()
-        self.timestamps = {}
-        self.lock = threading.RLock()
-        self.hits = 0
-        self.misses = 0
-    
-    def _is_expired(self, key: str) -> bool:
-        """Check if cache entry is expired."""
-        if key not in self.timestamps:
-            return True
-        return time.time() - self.timestamps[key] > self.ttl_seconds
-    
-    def get(self, key: str) -> Optional[Any]:
-        """Get value from cache."""
-        with self.lock:
-            if key in self.cache and not self._is_expired(key):
-                # Move to end (most recently used)
-                self.cache.move_to_end(key)
-                self.hits += 1
-                return self.cache[key]
-            elif key in self.cache:
-                # Remove expired entry
-                del self.cache[key]
-                del self.timestamps[key]
-            
-            self.misses += 1
-            return None
-    
-    def put(self, key: str, value: Any) -> None:
-        """Put value in cache."""
-        with self.lock:
-            if key in self.cache:
-                self.cache.move_to_end(key)
-            else:
-                if len(self.cache) >= self.max_size:
-                    # Remove least recently used
-                    oldest_key = next(iter(self.cache))
-                    del self.cache[oldest_key]
-                    del self.timestamps[oldest_key]
-            
-            self.cache[key] = value
-            self.timestamps[key] = time.time()
-    
-    def clear(self) -> None:
-        """Clear all cache entries."""
-        with self.lock:
-            self.cache.clear()
-            self.timestamps.clear()
-            self.hits = 0
-            self.misses = 0
-    
-    def stats(self) -> Dict[str, Any]:
-        """Get cache statistics."""
-        with self.lock:
-            total_requests = self.hits + self.misses
-            hit_rate = self.hits / total_requests if total_requests > 0 else 0.0
-            
-            return {
-                "size": len(self.cache),
-                "max_size": self.max_size,
-                "hits": self.hits,
-                "misses": self.misses,
-                "hit_rate": hit_rate,
-                "memory_usage_estimate": len(self.cache) * 1024  # Rough estimate
-            }
+# Kept for callers of the previous single-lock cache
+LRUCache = ShardedCache
 
 class QueryOptimizer:
     """Optimizes individual queries for better performance."""
@@ -313,21 +257,22 @@ class PerformanceOptimizer:
         self.config = config or PerformanceConfig()
         
         # Caches
-        self.query_cache = LRUCache(
-            max_size=self.config.query_cache_size,
-            ttl_seconds=self.config.cache_ttl_seconds
+        self.query_cache = self._create_cache(
+            self.config.query_cache_size,
+            self.config.cache_ttl_seconds + self.config.stale_while_revalidate_seconds
         )
-        self.result_cache = LRUCache(
-            max_size=self.config.result_cache_size,
-            ttl_seconds=self.config.cache_ttl_seconds
+        self.result_cache = self._create_cache(
+            self.config.result_cache_size,
+            self.config.cache_ttl_seconds + self.config.stale_while_revalidate_seconds
         )
-        self.embedding_cache = LRUCache(
-            max_size=self.config.embedding_cache_size,
-            ttl_seconds=self.config.cache_ttl_seconds * 2  # Embeddings last longer
+        self.embedding_cache = self._create_cache(
+            self.config.embedding_cache_size,
+            # Embeddings last longer
+            self.config.cache_ttl_seconds * 2 + self.config.stale_while_revalidate_seconds
         )
-        self.concept_cache = LRUCache(
-            max_size=self.config.concept_cache_size,
-            ttl_seconds=self.config.cache_ttl_seconds
+        self.concept_cache = self._create_cache(
+            self.config.concept_cache_size,
+            self.config.cache_ttl_seconds + self.config.stale_while_revalidate_seconds
         )
         
         # Optimizers
@@ -341,14 +286,37 @@ class PerformanceOptimizer:
         self.metrics = PerformanceMetrics()
         self.start_time = time.time()
         
-        # Concurrency control
-        self.query_semaphore = asyncio.Semaphore(self.config.max_concurrent_queries)
+        # Concurrency control: per-backend limits adapted to latency against the target
+        self.concurrency_limiters = BackendLimiters(
+            target_latency_ms=self.config.target_response_time_ms,
+            initial_limit=self.config.initial_concurrency_limit,
+            min_limit=self.config.min_concurrency_limit,
+            max_limit=self.config.max_concurrent_queries,
+            backoff=self.config.concurrency_backoff,
+            max_queue=self.config.max_queued_queries,
+            max_queue_wait_ms=self.config.max_queue_wait_ms
+        )
         self.active_queries = 0
         
+        # Stampede protection: one recompute per cache key at a time
+        self._flights = SingleFlight()
+        
         # Optimization state
         self.bottleneck_history = defaultdict(int)
         self.optimization_log = []
     
+    def _create_cache(self, max_size: int, ttl_seconds: int) -> ShardedCache:
+        """Cache with its share of ``cache_memory_mb``, proportional to its size."""
+        total_size = (self.config.query_cache_size + self.config.result_cache_size +
+                      self.config.embedding_cache_size + self.config.concept_cache_size)
+        max_bytes = int(self.config.cache_memory_mb * 1024 * 1024 * max_size / max(total_size, 1))
+        return ShardedCache(
+            max_size=max_size,
+            ttl_seconds=ttl_seconds,
+            max_bytes=max_bytes,
+            shards=self.config.cache_shards
+        )
+    
     def _generate_cache_key(self, operation: str, **kwargs) -> str:
         """Generate cache key for operation and parameters."""
         # Sort kwargs for consistent key generation
@@ -365,7 +333,13 @@ class PerformanceOptimizer:
         operation_func,
         **kwargs
     ) -> Tuple[Any, bool]:
-        """Execute operation with caching."""
+        """Execute operation with caching.
+        
+        Concurrent misses for the same key share one execution. Results
+        close to expiry are refreshed early in the background, and results
+        expired less than ``stale_while_revalidate_seconds`` ago are served
+        while a single background refresh runs.
+        """
         cache_key = self._generate_cache_key(operation, **kwargs)
         
         # Select appropriate cache
@@ -376,23 +350,55 @@ class PerformanceOptimizer:
             "concept": self.concept_cache
         }.get(cache_type, self.query_cache)
         
+        flight_key = f"{cache_type}:{cache_key}"
+        
+        def execute():
+            return self._execute_and_cache(cache, cache_key, cache_type, operation, operation_func, kwargs)
+        
         # Try cache first
         cached_result = cache.get(cache_key)
         if cached_result is not None:
-            logfire.info("Cache hit", 
-                        cache_type=cache_type,
-                        operation=operation,
-                        key=cache_key[:8])
-            return cached_result, True
-        
-        # Execute operation
+            value, fresh_until, compute_seconds = unwrap_value(cached_result)
+            now = time.time()
+            if fresh_until is not None and now >= fresh_until:
+                # Kept past its freshness only for the stale-while-revalidate window
+                self._flights.start(flight_key, execute)
+                logfire.info("Cache hit - stale, refreshing",
+                            cache_type=cache_type,
+                            operation=operation,
+                            key=cache_key[:8])
+            else:
+                if (not self._flights.in_flight(flight_key)
+                        and should_refresh_early(fresh_until, compute_seconds, self.config.early_refresh_beta, now)):
+                    self._flights.start(flight_key, execute)
+                logfire.info("Cache hit", 
+                            cache_type=cache_type,
+                            operation=operation,
+                            key=cache_key[:8])
+            return value, True
+        
+        return await self._flights.run(flight_key, execute), False
+    
+    async def _execute_and_cache(
+        self,
+        cache: ShardedCache,
+        cache_key: str,
+        cache_type: str,
+        operation: str,
+        operation_func,
+        kwargs: Dict[str, Any]
+    ) -> Any:
+        """Run an operation and cache its result with freshness metadata."""
         start_time = time.time()
         try:
             result = await operation_func(**kwargs)
             execution_time = (time.time() - start_time) * 1000
             
-            # Cache successful results
-            cache.put(cache_key, result)
+            # Cache successful results; the entry outlives its freshness by the stale window
+            fresh_ttl = cache.ttl_seconds - self.config.stale_while_revalidate_seconds
+            # Results are tagged with their sources so a re-crawl drops only those that use it
+            tags = source_tags(result) if cache is self.result_cache else ()
+            cache.put(cache_key, wrap_value(result, fresh_ttl, execution_time / 1000), tags)
             
             logfire.info("Cache miss - operation executed",
                         cache_type=cache_type,
@@ -400,7 +406,7 @@ class PerformanceOptimizer:
                         execution_time_ms=execution_time,
                         key=cache_key[:8])
             
-            return result, False
+            return result
             
         except Exception as e:
             logfire.error("Cached operation failed",
@@ -477,81 +483,102 @@ class PerformanceOptimizer:
         self,
         operation_name: str,
         operation_func,
+        backend: str = "default",
         **kwargs
     ) -> Tuple[Any, Dict[str, Any]]:
-        """Execute operation with comprehensive performance monitoring."""
-        # Acquire concurrency slot
-        async with self.query_semaphore:
-            self.active_queries += 1
-            start_time = time.time()
+        """Execute operation with comprehensive performance monitoring.
+        
+        ``backend`` selects the adaptive concurrency limit the operation
+        counts against. Stores built with ``concurrency_limiters["surrealdb"]``
+        or ``["neo4j"]`` already hold a slot per call, so operations that
+        call into them should use a backend of their own. Raises
+        ``ConcurrencyLimitExceeded`` when that backend is saturated.
+        """
+        # Acquire concurrency slot; excess work is rejected before it reaches the backend
+        limiter = self.concurrency_limiters[backend]
+        try:
+            slot_started = await limiter.acquire()
+        except ConcurrencyLimitExceeded:
+            self.bottleneck_history[f"rejected_{operation_name}"] += 1
+            logfire.warning("Operation rejected by concurrency limit",
+                          operation=operation_name,
+                          backend=backend,
+                          limit=limiter.current_limit)
+            raise
+        
+        self.active_queries += 1
+        start_time = time.time()
+        overloaded = False
+        
+        try:
+            # Connection pool management
+            connection_acquired = await self.connection_pool.acquire()
+            if not connection_acquired:
+                raise RuntimeError("Could not acquire database connection")
             
             try:
-                # Connection pool management
-                connection_acquired = await self.connection_pool.acquire()
-                if not connection_acquired:
-                    raise RuntimeError("Could not acquire database connection")
+                # Execute with timeout
+                result = await asyncio.wait_for(
+                    operation_func(**kwargs),
+                    timeout=self.config.query_timeout_ms / 1000.0
+                )
                 
-                try:
-                    # Execute with timeout
-                    result = await asyncio.wait_for(
-                        operation_func(**kwargs),
-                        timeout=self.config.query_timeout_ms / 1000.0
-                    )
-                    
-                    execution_time = (time.time() - start_time) * 1000
-                    
-                    # Update metrics
-                    self.metrics.query_count += 1
-                    self.metrics.total_query_time_ms += execution_time
-                    self.metrics.avg_query_time_ms = (
-                        self.metrics.total_query_time_ms / self.metrics.query_count
-                    )
-                    
-                    # Performance analysis
-                    performance_info = {
-                        "execution_time_ms": execution_time,
-                        "within_target": execution_time <= self.config.target_response_time_ms,
-                        "active_queries": self.active_queries,
-                        "operation": operation_name
-                    }
-                    
-                    # Detect bottlenecks
-                    if execution_time > self.config.target_response_time_ms:
-                        bottleneck = f"slow_{operation_name}"
-                        self.bottleneck_history[bottleneck] += 1
-                        self.metrics.bottlenecks_detected.append(bottleneck)
-                        
-                        logfire.warning("Performance target missed",
-                                      operation=operation_name,
-                                      execution_time_ms=execution_time,
-                                      target_ms=self.config.target_response_time_ms)
-                    
-                    logfire.info("Operation completed with monitoring",
-                               operation=operation_name,
-                               execution_time_ms=execution_time,
-                               within_target=performance_info["within_target"])
-                    
-                    return result, performance_info
-                    
-                finally:
-                    await self.connection_pool.release()
+                execution_time = (time.time() - start_time) * 1000
+                
+                # Update metrics
+                self.metrics.query_count += 1
+                self.metrics.total_query_time_ms += execution_time
+                self.metrics.avg_query_time_ms = (
+                    self.metrics.total_query_time_ms / self.metrics.query_count
+                )
+                
+                # Performance analysis
+                performance_info = {
+                    "execution_time_ms": execution_time,
+                    "within_target": execution_time <= self.config.target_response_time_ms,
+                    "active_queries": self.active_queries,
+                    "operation": operation_name
+                }
+                
+                # Detect bottlenecks
+                if execution_time > self.config.target_response_time_ms:
+                    bottleneck = f"slow_{operation_name}"
+                    self.bottleneck_history[bottleneck] += 1
+                    self.metrics.bottlenecks_detected.append(bottleneck)
                     
-            except asyncio.TimeoutError:
-                self.bottleneck_history[f"timeout_{operation_name}"] += 1
-                logfire.error("Operation timeout",
-                            operation=operation_name,
-                            timeout_ms=self.config.query_timeout_ms)
-                raise
+                    logfire.warning("Performance target missed",
+                                  operation=operation_name,
+                                  execution_time_ms=execution_time,
+                                  target_ms=self.config.target_response_time_ms)
                 
-            except Exception as e:
-                self.bottleneck_history[f"error_{operation_name}"] += 1
-                logfire.error("Operation failed",
-                            operation=operation_name,
-                            error=str(e))
-                raise
+                logfire.info("Operation completed with monitoring",
+                           operation=operation_name,
+                           execution_time_ms=execution_time,
+                           within_target=performance_info["within_target"])
+                
+                return result, performance_info
                 
             finally:
-                self.active_queries -= 1
+                await self.connection_pool.release()
+                
+        except asyncio.TimeoutError:
+            overloaded = True
+            self.bottleneck_history[f"timeout_{operation_name}"] += 1
+            logfire.error("Operation timeout",
+                        operation=operation_name,
+                        timeout_ms=self.config.query_timeout_ms)
+            raise
+            
+        except Exception as e:
+            self.bottleneck_history[f"error_{operation_name}"] += 1
+            logfire.error("Operation failed",
+                        operation=operation_name,
+                        error=str(e))
+            raise
+            
+        finally:
+            self.active_queries -= 1
+            limiter.release(slot_started, overloaded)
     
     @logfire.instrument("adaptive_optimization")
     async def adaptive_optimization(self) -> None:
@@ -628,6 +655,7 @@ class PerformanceOptimizer:
         self.metrics.cache_hits = total_hits
         self.metrics.cache_misses = total_misses
         self.metrics.cache_hit_rate = overall_hit_rate
+        self.metrics.memory_usage_mb = sum(stats["memory_bytes"] for stats in cache_stats.values()) / (1024 * 1024)
         self.metrics.concurrent_queries = self.active_queries
         
         # Performance analysis
@@ -647,6 +675,8 @@ class PerformanceOptimizer:
             "performance_metrics": asdict(self.metrics),
             "cache_statistics": cache_stats,
             "connection_pool": self.connection_pool.stats(),
+            "concurrency_limits": self.concurrency_limiters.stats(),
+            "recomputes": self._flights.stats(),
             "configuration": asdict(self.config),
             "runtime_info": {
                 "uptime_seconds": uptime_seconds,
@@ -669,6 +699,13 @@ class PerformanceOptimizer:
         
         return report
     
+    @logfire.instrument("invalidate_sources")
+    def invalidate_sources(self, source_names: List[str]) -> int:
+        """Drop cached results that reference any of the re-ingested sources."""
+        removed = sum(self.result_cache.invalidate_tag(tag) for tag in invalidation_tags(source_names))
+        logfire.info("Source results invalidated", sources=source_names, results_removed=removed)
+        return removed
+    
     @logfire.instrument("clear_caches")
     def clear_caches(self) -> None:
         """Clear all caches."""
@@ -56,7 +56,8 @@ except ImportError:
 # Import Ptolemies components
 from hybrid_query_engine import HybridQueryEngine, QueryType, HybridSearchResult
 from performance_optimizer import PerformanceOptimizer
-from redis_cache_layer import RedisCacheLayer
+from redis_cache_layer import RedisCacheLayer, QUERY_PIPELINE_NAMESPACE
+from cache_tags import source_tags
 from mcp_tool_registry import MCPToolRegistry
 
 # Configure Logfire
@@ -665,7 +666,7 @@ class QueryPipelineOrchestrator:
                 cache_key = self._generate_cache_key(query, context)
                 if self.cache_layer and self.config.enable_caching:
                     cached_result, found = await self.cache_layer.get(
-                        cache_key, "query_pipeline"
+                        cache_key, QUERY_PIPELINE_NAMESPACE
                     )
                     if found:
                         logfire.info("Query pipeline cache hit", cache_key=cache_key[:50])
@@ -719,8 +720,9 @@ class QueryPipelineOrchestrator:
                     await self.cache_layer.set(
                         cache_key,
                         response,
-                        "query_pipeline",
-                        self.config.cache_ttl_seconds
+                        QUERY_PIPELINE_NAMESPACE,
+                        self.config.cache_ttl_seconds,
+                        tags=source_tags(final_results)
                     )
                 
                 logfire.info("Query pipeline completed",
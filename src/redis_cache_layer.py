@@ -6,12 +6,20 @@ and scalability across multiple instances.
 """
 
 import asyncio
+import functools
+import inspect
 import json
+import math
 import pickle
 import time
 import hashlib
 import gzip
-from typing import Dict, List, Any, Optional, Union, Tuple, Callable
+import heapq
+import re
+import struct
+import uuid
+from collections import OrderedDict, defaultdict, deque
+from typing import Dict, List, Any, Optional, Union, Tuple, Callable, Awaitable, Deque, Iterable, Set
 from dataclasses import dataclass, asdict
 from enum import Enum
 import os
@@ -21,9 +29,59 @@ import redis.asyncio as redis
 import logfire
 import numpy as np
 
+from cache_codecs import (
+    COMPRESSORS,
+    FORMATS,
+    DEFAULT_CANDIDATE_FORMATS,
+    DEFAULT_COMPRESSOR,
+    Compressor,
+    MissingDictionaryError,
+    benchmark_codecs,
+    bind_dictionary,
+    choose_codec,
+    compressor_by_id,
+    format_by_id,
+    register_dictionary,
+    train_dictionary
+)
+from cache_stampede import SingleFlight, should_refresh_early, unwrap_value, wrap_value
+from sharded_cache import estimate_size
+
 # Configure Logfire
 logfire.configure(send_to_logfire=False)  # Configure appropriately for production
 
+# Namespace of cached query pipeline responses; cleared when documentation is re-crawled
+QUERY_PIPELINE_NAMESPACE = "query_pipeline"
+
+# Generation segment of a namespaced key, e.g. "g3:" in "ptolemies:query:g3:key"
+GENERATION_KEY = re.compile(r"g(\d+):")
+
+# Deletes a recompute lease only if it is still held by the caller's token
+RELEASE_LEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Adds ARGV[3..] to the tag set KEYS[1], extends (never shortens) its TTL to
+# ARGV[1], and removes up to ARGV[2] sampled members whose keys are gone
+TAG_KEYS_SCRIPT = """
+redis.call("sadd", KEYS[1], unpack(ARGV, 3))
+if redis.call("ttl", KEYS[1]) < tonumber(ARGV[1]) then
+    redis.call("expire", KEYS[1], ARGV[1])
+end
+local pruned = 0
+if tonumber(ARGV[2]) > 0 then
+    for _, member in ipairs(redis.call("srandmember", KEYS[1], ARGV[2])) do
+        if redis.call("exists", member) == 0 then
+            pruned = pruned + redis.call("srem", KEYS[1], member)
+        end
+    end
+end
+return pruned
+"""
+
 class CacheMode(Enum):
     """Redis cache operation modes."""
     LOCAL_ONLY = "local_only"
@@ -46,6 +104,11 @@ class CacheStrategy(Enum):
     WRITE_THROUGH = "write_through"
     ADAPTIVE = "adaptive"
 
+class EvictionPolicy(Enum):
+    """Eviction policies for the bounded local cache tier."""
+    LRU = "lru"
+    LFU = "lfu"
+
 @dataclass
 class RedisCacheConfig:
     """Configuration for Redis cache layer."""
@@ -61,6 +124,8 @@ class RedisCacheConfig:
     # Cache behavior
     cache_mode: CacheMode = CacheMode.HYBRID
     serialization_format: SerializationFormat = SerializationFormat.COMPRESSED_JSON
+    payload_format: Optional[str] = None  # cache_codecs format; None follows serialization_format
+    compressor: Optional[str] = None  # cache_codecs compressor for the compressed formats
     cache_strategy: CacheStrategy = CacheStrategy.ADAPTIVE
     
     # Performance settings
@@ -69,6 +134,37 @@ class RedisCacheConfig:
     max_value_size_mb: float = 16.0
     compression_threshold: int = 1024
     
+    # Local (in-process) tier used by HYBRID and LOCAL_ONLY modes
+    local_cache_max_entries: int = 10000
+    local_cache_max_bytes: int = 64 * 1024 * 1024
+    local_cache_policy: EvictionPolicy = EvictionPolicy.LRU
+    local_ttl_seconds: Optional[int] = None  # None follows the Redis TTL
+    local_sweep_interval_seconds: float = 30.0
+    
+    # Coalescing of single-key calls into MGET / pipelined SET batches
+    enable_batching: bool = True
+    batch_window_ms: float = 0.0  # 0 batches calls made in the same event-loop tick
+    max_batch_size: int = 256
+    
+    # Namespace generations: clearing a namespace bumps a counter embedded in its keys
+    generation_check_seconds: float = 1.0  # How stale another worker's bump may be seen
+    sweep_old_generations: bool = True  # UNLINK superseded keys in the background
+    generation_sweep_batch: int = 500
+    tag_prune_sample: int = 20  # Tag set members checked for deleted keys on each tagged write
+    
+    # HYBRID mode: workers publish overwritten keys and cleared namespaces so
+    # every other worker drops its local copy, which allows long local TTLs
+    publish_invalidations: bool = True
+    invalidation_channel: str = "invalidations"
+    invalidation_resubscribe_seconds: float = 1.0
+    
+    # Stampede protection for get_or_compute and redis_cached
+    stale_while_revalidate_seconds: int = 0  # Serve expired values this long while one refresh runs
+    early_refresh_beta: float = 1.0  # XFetch early refresh aggressiveness; 0 disables it
+    lease_ttl_ms: int = 10000  # Cross-worker recompute lease, released once the value is stored
+    lease_wait_ms: int = 5000  # How long other workers wait for the lease holder's value
+    lease_poll_ms: int = 50
+    
     # Connection pooling
     max_connections: int = 20
     connection_timeout_seconds: int = 5
@@ -103,6 +199,7 @@ class CacheMetrics:
     total_operations: int = 0
     total_bytes_read: int = 0
     total_bytes_written: int = 0
+    total_raw_bytes_written: int = 0  # Serialized size before compression
     avg_read_time_ms: float = 0.0
     avg_write_time_ms: float = 0.0
     hit_rate: float = 0.0
@@ -110,6 +207,78 @@ class CacheMetrics:
     circuit_breaker_trips: int = 0
     compression_ratio: float = 0.0
 
+@dataclass
+class NamespaceStats:
+    """Byte and entry counters of one cache namespace."""
+    writes: int = 0
+    raw_bytes_written: int = 0  # Serialized size before compression
+    encoded_bytes_written: int = 0  # Stored size, header included
+    hits: int = 0
+    misses: int = 0
+    encoded_bytes_read: int = 0
+    deletes: int = 0
+    
+    @property
+    def compression_ratio(self) -> float:
+        """Stored bytes per serialized byte; below 1 when compression pays off."""
+        return self.encoded_bytes_written / self.raw_bytes_written if self.raw_bytes_written else 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "compression_ratio": round(self.compression_ratio, 4)}
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with percentile estimates.
+    
+    Bucket bounds grow by ``growth`` from ``min_ms``, so a percentile is
+    reported within that factor of the true value over the whole range
+    while memory stays fixed. Percentiles return the upper bound of their
+    bucket, capped at the largest latency seen.
+    """
+    
+    def __init__(self, min_ms: float = 0.01, growth: float = 1.25, buckets: int = 96):
+        self.min_ms = min_ms
+        self.growth = growth
+        self._log_growth = math.log(growth)
+        self.counts = [0] * (buckets + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+    
+    def record(self, ms: float):
+        if ms <= self.min_ms:
+            index = 0
+        else:
+            index = min(math.ceil(math.log(ms / self.min_ms) / self._log_growth), len(self.counts) - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+    
+    def percentile(self, fraction: float) -> float:
+        """Latency below which ``fraction`` of the recorded calls fall."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(fraction * self.count))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                if index == len(self.counts) - 1:
+                    # The last bucket is unbounded
+                    return self.max_ms
+                return min(self.min_ms * self.growth ** index, self.max_ms)
+        return self.max_ms
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50), 3),
+            "p95_ms": round(self.percentile(0.95), 3),
+            "p99_ms": round(self.percentile(0.99), 3),
+            "max_ms": round(self.max_ms, 3)
+        }
+
 @dataclass
 class CacheEntry:
     """Represents a cache entry with metadata."""
@@ -122,6 +291,7 @@ class CacheEntry:
     size_bytes: int = 0
     compressed: bool = False
     namespace: str = "default"
+    tags: Tuple[str, ...] = ()
 
 class CircuitBreaker:
     """Circuit breaker for Redis operations."""
@@ -159,64 +329,510 @@ class CircuitBreaker:
         if self.failure_count >= self.threshold:
             self.state = "OPEN"
 
+class LRUPolicy:
+    """Evicts the least recently used key."""
+    
+    def __init__(self):
+        self._order: "OrderedDict[str, None]" = OrderedDict()
+    
+    def insert(self, key: str):
+        self._order[key] = None
+        self._order.move_to_end(key)
+    
+    def touch(self, key: str):
+        self._order.move_to_end(key)
+    
+    def remove(self, key: str):
+        self._order.pop(key, None)
+    
+    def victim(self) -> Optional[str]:
+        return next(iter(self._order), None)
+
+class LFUPolicy:
+    """Evicts the least frequently used key, oldest first among equal counts.
+    
+    Keys are kept in per-count buckets so every operation is O(1).
+    """
+    
+    def __init__(self):
+        self._counts: Dict[str, int] = {}
+        self._buckets: Dict[int, "OrderedDict[str, None]"] = {}
+        self._min_count = 0
+    
+    def _unlink(self, key: str) -> int:
+        count = self._counts.pop(key)
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+        return count
+    
+    def _link(self, key: str, count: int):
+        self._counts[key] = count
+        self._buckets.setdefault(count, OrderedDict())[key] = None
+    
+    def insert(self, key: str):
+        if key in self._counts:
+            self.touch(key)
+            return
+        self._link(key, 1)
+        self._min_count = 1
+    
+    def touch(self, key: str):
+        count = self._unlink(key)
+        if self._min_count == count and count not in self._buckets:
+            self._min_count = count + 1
+        self._link(key, count + 1)
+    
+    def remove(self, key: str):
+        if key in self._counts:
+            self._unlink(key)
+    
+    def victim(self) -> Optional[str]:
+        if not self._buckets:
+            return None
+        if self._min_count not in self._buckets:
+            self._min_count = min(self._buckets)
+        return next(iter(self._buckets[self._min_count]))
+
+EVICTION_POLICIES = {
+    EvictionPolicy.LRU: LRUPolicy,
+    EvictionPolicy.LFU: LFUPolicy
+}
+
+class LocalCacheTier:
+    """Size- and byte-bounded in-process cache of ``CacheEntry`` objects.
+    
+    Entries over ``max_entries`` or ``max_bytes`` are evicted by the
+    configured policy. Expiry times sit in a heap that is swept at most every
+    ``sweep_interval_seconds`` on reads and writes, so expired keys are
+    reclaimed even if they are never read again; ``RedisCacheLayer`` also
+    sweeps on a timer so an idle worker lets go of them.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        policy: Union[EvictionPolicy, LRUPolicy, LFUPolicy] = EvictionPolicy.LRU,
+        sweep_interval_seconds: float = 30.0
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.policy_name = policy.value if isinstance(policy, EvictionPolicy) else type(policy).__name__
+        self.policy = EVICTION_POLICIES[policy]() if isinstance(policy, EvictionPolicy) else policy
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.total_bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries: Dict[str, CacheEntry] = {}
+        self._tagged: Dict[str, set] = {}  # tag -> keys of entries carrying it
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._next_sweep = time.time() + sweep_interval_seconds
+    
+    @staticmethod
+    def _expires_at(entry: CacheEntry) -> Optional[float]:
+        if entry.ttl_seconds is None:
+            return None
+        return entry.created_at + entry.ttl_seconds
+    
+    def _is_expired(self, entry: CacheEntry, now: float) -> bool:
+        expires_at = self._expires_at(entry)
+        return expires_at is not None and now >= expires_at
+    
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Live entry for ``key``, counted as an access; expired entries are dropped."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        now = time.time()
+        if self._is_expired(entry, now):
+            self.pop(key)
+            self.expirations += 1
+            return None
+        if now >= self._next_sweep:
+            self.sweep_expired(now)
+        entry.accessed_at = now
+        entry.access_count += 1
+        self.policy.touch(key)
+        return entry
+    
+    def put(self, key: str, entry: CacheEntry) -> bool:
+        """Store an entry, evicting others to stay within bounds.
+        
+        Returns False when the entry alone exceeds ``max_bytes``.
+        """
+        now = time.time()
+        if entry.created_at is None:
+            entry.created_at = now
+        entry.size_bytes = estimate_size(entry.value)
+        self.pop(key)
+        if entry.size_bytes > self.max_bytes or self.max_entries <= 0:
+            return False
+        
+        if now >= self._next_sweep:
+            self.sweep_expired(now)
+        # Evict before inserting so a new LFU entry is not its own victim
+        while self._entries and (len(self._entries) >= self.max_entries
+                                 or self.total_bytes + entry.size_bytes > self.max_bytes):
+            self.pop(self.policy.victim())
+            self.evictions += 1
+        
+        self._entries[key] = entry
+        self.total_bytes += entry.size_bytes
+        self.policy.insert(key)
+        for tag in entry.tags:
+            self._tagged.setdefault(tag, set()).add(key)
+        expires_at = self._expires_at(entry)
+        if expires_at is not None:
+            heapq.heappush(self._expiry_heap, (expires_at, key))
+        return True
+    
+    def pop(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry.size_bytes
+            self.policy.remove(key)
+            for tag in entry.tags:
+                keys = self._tagged.get(tag)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._tagged[tag]
+        return entry
+    
+    def remove_prefix(self, prefix: str) -> int:
+        """Drop every key starting with ``prefix``; returns the number removed."""
+        keys = [key for key in self._entries if key.startswith(prefix)]
+        for key in keys:
+            self.pop(key)
+        return len(keys)
+    
+    def remove_tagged(self, tag: str) -> int:
+        """Drop every entry carrying ``tag``; returns the number removed."""
+        keys = list(self._tagged.get(tag, ()))
+        for key in keys:
+            self.pop(key)
+        return len(keys)
+    
+    def sweep_expired(self, now: Optional[float] = None) -> int:
+        """Remove all expired entries; returns the number removed."""
+        now = time.time() if now is None else now
+        self._next_sweep = now + self.sweep_interval_seconds
+        removed = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            _, key = heapq.heappop(self._expiry_heap)
+            entry = self._entries.get(key)
+            # The heap keeps stale times for overwritten keys; check the live entry
+            if entry is not None and self._is_expired(entry, now):
+                self.pop(key)
+                removed += 1
+        
+        if len(self._expiry_heap) > 2 * len(self._entries) + 64:
+            self._expiry_heap = [
+                (self._expires_at(entry), key) for key, entry in self._entries.items()
+                if entry.ttl_seconds is not None
+            ]
+            heapq.heapify(self._expiry_heap)
+        
+        self.expirations += removed
+        return removed
+    
+    def clear(self):
+        self._entries.clear()
+        self._tagged.clear()
+        self._expiry_heap.clear()
+        self.policy = type(self.policy)()
+        self.total_bytes = 0
+    
+    def keys(self):
+        return self._entries.keys()
+    
+    def namespace_counts(self) -> Dict[str, int]:
+        """Number of live entries per namespace."""
+        counts: Dict[str, int] = defaultdict(int)
+        for entry in self._entries.values():
+            counts[entry.namespace] += 1
+        return dict(counts)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+    
+    def __getitem__(self, key: str) -> CacheEntry:
+        return self._entries[key]
+    
+    def __setitem__(self, key: str, entry: CacheEntry):
+        self.put(key, entry)
+    
+    def __delitem__(self, key: str):
+        if self.pop(key) is None:
+            raise KeyError(key)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "memory_bytes": self.total_bytes,
+            "memory_mb": round(self.total_bytes / (1024 * 1024), 3),
+            "max_bytes": self.max_bytes,
+            "policy": self.policy_name,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+# Stored values start with a header: magic byte, format byte, codec byte.
+# Format and codec ids come from the cache_codecs registries.
+VALUE_HEADER = struct.Struct("!BBB")
+VALUE_HEADER_MAGIC = 0xA7  # Never the first byte of JSON, pickle or gzip data
+GZIP_MAGIC = b"\x1f\x8b"
+NO_COMPRESSION = COMPRESSORS["none"]
+MAX_SAMPLE_BYTES = 64 * 1024
+MIN_TRAINING_SAMPLES = 8
+
 class RedisSerializer:
-    """Handles serialization/deserialization for Redis storage."""
+    """Handles serialization/deserialization for Redis storage.
+    
+    ``encode``/``decode`` write and read headered values through the codec
+    registries; ``serialize``/``deserialize`` handle the headerless values
+    written before the header existed.
+    """
     
-    def __init__(self, format_type: SerializationFormat = SerializationFormat.COMPRESSED_JSON):
+    def __init__(
+        self,
+        format_type: SerializationFormat = SerializationFormat.COMPRESSED_JSON,
+        payload_format: Optional[str] = None,
+        compressor: Optional[str] = None,
+        sample_every: int = 16,
+        max_samples: int = 256
+    ):
         self.format_type = format_type
+        is_json = format_type in [SerializationFormat.JSON, SerializationFormat.COMPRESSED_JSON]
+        is_compressed = format_type in [SerializationFormat.COMPRESSED_JSON, SerializationFormat.COMPRESSED_PICKLE]
+        self.payload_format = FORMATS[payload_format or ("json" if is_json else "pickle")]
+        self.compressor = COMPRESSORS[compressor or DEFAULT_COMPRESSOR] if is_compressed else NO_COMPRESSION
+        
+        # Reservoir of uncompressed payloads for dictionary training and codec tuning
+        self.sample_every = sample_every
+        self.samples: Deque[bytes] = deque(maxlen=max_samples)
+        self._encodes = 0
     
-    @logfire.instrument("serialize_data")
     def serialize(self, data: Any, compress_threshold: int = 1024) -> Tuple[bytes, bool]:
-        """Serialize data for Redis storage."""
-        with logfire.span("Serializing data", format=self.format_type.value):
-            try:
-                if self.format_type in [SerializationFormat.JSON, SerializationFormat.COMPRESSED_JSON]:
-                    serialized = json.dumps(data, default=str).encode('utf-8')
-                else:  # PICKLE or COMPRESSED_PICKLE
-                    serialized = pickle.dumps(data)
-                
-                # Apply compression if needed
-                compressed = False
-                if (self.format_type in [SerializationFormat.COMPRESSED_JSON, SerializationFormat.COMPRESSED_PICKLE] 
-                    and len(serialized) > compress_threshold):
-                    serialized = gzip.compress(serialized)
-                    compressed = True
-                
-                logfire.info("Data serialized", 
-                           format=self.format_type.value,
-                           original_size=len(serialized),
-                           compressed=compressed)
-                
-                return serialized, compressed
-                
-            except Exception as e:
-                logfire.error("Serialization failed", error=str(e))
-                raise
+        """Serialize data in the headerless format."""
+        try:
+            if self.format_type in [SerializationFormat.JSON, SerializationFormat.COMPRESSED_JSON]:
+                serialized = json.dumps(data, default=str).encode('utf-8')
+            else:  # PICKLE or COMPRESSED_PICKLE
+                serialized = pickle.dumps(data)
+            
+            # Apply compression if needed
+            compressed = False
+            if (self.format_type in [SerializationFormat.COMPRESSED_JSON, SerializationFormat.COMPRESSED_PICKLE] 
+                and len(serialized) > compress_threshold):
+                serialized = gzip.compress(serialized)
+                compressed = True
+            
+            return serialized, compressed
+            
+        except Exception as e:
+            logfire.error("Serialization failed", error=str(e))
+            raise
     
-    @logfire.instrument("deserialize_data")
     def deserialize(self, data: bytes, compressed: bool = False) -> Any:
-        """Deserialize data from Redis storage."""
-        with logfire.span("Deserializing data", format=self.format_type.value, compressed=compressed):
-            try:
-                # Decompress if needed
-                if compressed:
-                    data = gzip.decompress(data)
-                
-                # Deserialize based on format
-                if self.format_type in [SerializationFormat.JSON, SerializationFormat.COMPRESSED_JSON]:
-                    result = json.loads(data.decode('utf-8'))
-                else:  # PICKLE or COMPRESSED_PICKLE
-                    result = pickle.loads(data)
-                
-                logfire.info("Data deserialized", 
-                           format=self.format_type.value,
-                           decompressed=compressed)
-                
-                return result
-                
-            except Exception as e:
-                logfire.error("Deserialization failed", error=str(e))
-                raise
+        """Deserialize data in the headerless format."""
+        try:
+            # Decompress if needed
+            if compressed:
+                data = gzip.decompress(data)
+            
+            # Deserialize based on format
+            if self.format_type in [SerializationFormat.JSON, SerializationFormat.COMPRESSED_JSON]:
+                return json.loads(data.decode('utf-8'))
+            return pickle.loads(data)
+            
+        except Exception as e:
+            logfire.error("Deserialization failed", error=str(e))
+            raise
+    
+    def use_codec(self, payload_format: Optional[str] = None, compressor: Optional[Union[str, Compressor]] = None):
+        """Switch the format and/or compressor used for new values."""
+        if payload_format is not None and payload_format != self.payload_format.name:
+            self.payload_format = FORMATS[payload_format]
+            self.samples.clear()  # Samples are payloads in the previous format
+        if compressor is not None:
+            self.compressor = COMPRESSORS[compressor] if isinstance(compressor, str) else compressor
+    
+    def train_dictionary(self, size: int = 16 * 1024, payloads: Optional[List[bytes]] = None) -> Tuple[int, bytes]:
+        """Train and register a dictionary on sampled (or given) payloads.
+        
+        Returns the dictionary id and bytes. New values only use it after
+        ``use_dictionary``, so callers can share it with other processes first.
+        """
+        dictionary = train_dictionary(payloads if payloads is not None else list(self.samples), size)
+        return register_dictionary(dictionary), dictionary
+    
+    def use_dictionary(self, dict_id: int):
+        """Compress new values with a registered dictionary."""
+        name = "zstd-dict" if self.compressor.name.startswith("zstd") else "deflate-dict"
+        self.compressor = bind_dictionary(name, dict_id)
+    
+    def encode(self, data: Any, compress_threshold: int = 1024) -> Tuple[bytes, bool]:
+        """Serialize data into a single stored value, header first."""
+        blob, compressed, _ = self.encode_measured(data, compress_threshold)
+        return blob, compressed
+    
+    def encode_measured(self, data: Any, compress_threshold: int = 1024) -> Tuple[bytes, bool, int]:
+        """``encode`` that also returns the serialized size before compression."""
+        payload = self.payload_format.dumps(data)
+        raw_size = len(payload)
+        
+        self._encodes += 1
+        if self.sample_every and self._encodes % self.sample_every == 0 and len(payload) <= MAX_SAMPLE_BYTES:
+            self.samples.append(payload)
+        
+        compressor = NO_COMPRESSION
+        if self.compressor is not NO_COMPRESSION and len(payload) > compress_threshold:
+            compressor = self.compressor
+            payload = compressor.compress(payload)
+        
+        header = VALUE_HEADER.pack(VALUE_HEADER_MAGIC, self.payload_format.format_id, compressor.codec_id)
+        return header + payload, compressor is not NO_COMPRESSION, raw_size
+    
+    def decode(self, blob: bytes) -> Tuple[Any, bool]:
+        """Deserialize a stored value; returns the value and whether it was compressed.
+        
+        The header names the format and codec, so values stay readable after
+        the configured codec changes. Values written before the header
+        existed are read with the configured format. Raises
+        ``MissingDictionaryError`` for a dictionary this process lacks.
+        """
+        if len(blob) < VALUE_HEADER.size or blob[0] != VALUE_HEADER_MAGIC:
+            compressed = blob[:2] == GZIP_MAGIC
+            return self.deserialize(blob, compressed), compressed
+        
+        _, format_id, codec_id = VALUE_HEADER.unpack_from(blob)
+        payload = blob[VALUE_HEADER.size:]
+        if codec_id != NO_COMPRESSION.codec_id:
+            payload = compressor_by_id(codec_id).decompress(payload)
+        return format_by_id(format_id).loads(payload), codec_id != NO_COMPRESSION.codec_id
+
+class RedisBatcher:
+    """Coalesces single-key GETs and SETs issued close together into one round trip.
+    
+    Calls made within ``window_ms`` of the first queued call (0 means the
+    same event-loop tick) are sent as one MGET or one pipelined batch of
+    SETs, and each caller gets its own result. A batch of one is sent as a
+    plain GET or SET.
+    """
+    
+    def __init__(self, get_client: Callable[[], Any], window_ms: float = 0.0, max_batch_size: int = 256):
+        self.get_client = get_client
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self.round_trips = 0
+        self.commands = 0
+        self._gets: Dict[str, asyncio.Future] = {}
+        self._sets: List[Tuple[str, bytes, int, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.Handle] = None
+        self._flush_tasks: Set[asyncio.Task] = set()
+    
+    async def get(self, redis_key: str) -> Optional[bytes]:
+        future = self._gets.get(redis_key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._gets[redis_key] = future
+            self._schedule(len(self._gets))
+        # Callers of the same key share a future; one cancelling must not cancel the rest
+        return await asyncio.shield(future)
+    
+    async def set(self, redis_key: str, data: bytes, ttl_seconds: int) -> bool:
+        future = asyncio.get_running_loop().create_future()
+        self._sets.append((redis_key, data, ttl_seconds, future))
+        self._schedule(len(self._sets))
+        return await asyncio.shield(future)
+    
+    def _schedule(self, queued: int):
+        loop = asyncio.get_running_loop()
+        if queued >= self.max_batch_size:
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+            self._flush_handle = None
+            self._spawn_flush()
+        elif self._flush_handle is None:
+            if self.window_ms > 0:
+                self._flush_handle = loop.call_later(self.window_ms / 1000, self._start_flush)
+            else:
+                self._flush_handle = loop.call_soon(self._start_flush)
+    
+    def _start_flush(self):
+        self._flush_handle = None
+        self._spawn_flush()
+    
+    def _spawn_flush(self):
+        # The loop only holds weak references to tasks; keep in-flight flushes alive
+        task = asyncio.get_running_loop().create_task(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+    
+    async def flush(self):
+        """Send everything queued so far."""
+        gets, self._gets = self._gets, {}
+        sets, self._sets = self._sets, []
+        if gets:
+            await self._flush_gets(gets)
+        if sets:
+            await self._flush_sets(sets)
+    
+    async def _flush_gets(self, gets: Dict[str, asyncio.Future]):
+        keys = list(gets)
+        try:
+            client = self.get_client()
+            if len(keys) == 1:
+                values = [await client.get(keys[0])]
+            else:
+                values = await client.mget(keys)
+        except Exception as e:
+            _fail_all(gets.values(), e)
+            return
+        self.round_trips += 1
+        self.commands += len(keys)
+        for key, value in zip(keys, values):
+            if not gets[key].done():
+                gets[key].set_result(value)
+    
+    async def _flush_sets(self, sets: List[Tuple[str, bytes, int, asyncio.Future]]):
+        try:
+            client = self.get_client()
+            if len(sets) == 1:
+                redis_key, data, ttl_seconds, _ = sets[0]
+                results = [await client.set(redis_key, data, ex=ttl_seconds)]
+            else:
+                pipe = client.pipeline(transaction=False)
+                for redis_key, data, ttl_seconds, _ in sets:
+                    pipe.set(redis_key, data, ex=ttl_seconds)
+                results = await pipe.execute()
+        except Exception as e:
+            _fail_all([future for *_, future in sets], e)
+            return
+        self.round_trips += 1
+        self.commands += len(sets)
+        for (*_, future), result in zip(sets, results):
+            if not future.done():
+                future.set_result(bool(result))
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "round_trips": self.round_trips,
+            "commands": self.commands,
+            "commands_per_round_trip": round(self.commands / self.round_trips, 2) if self.round_trips else 0.0
+        }
+
+def _fail_all(futures: Iterable[asyncio.Future], error: Exception):
+    for future in futures:
+        if not future.done():
+            future.set_exception(error)
 
 class RedisCacheLayer:
     """Redis-based distributed caching layer with Upstash support."""
@@ -224,14 +840,40 @@ class RedisCacheLayer:
     def __init__(self, config: RedisCacheConfig = None):
         self.config = config or RedisCacheConfig()
         self.redis_client: Optional[redis.Redis] = None
-        self.serializer = RedisSerializer(self.config.serialization_format)
+        self.serializer = RedisSerializer(
+            self.config.serialization_format,
+            payload_format=self.config.payload_format,
+            compressor=self.config.compressor
+        )
         self.circuit_breaker = CircuitBreaker(
             threshold=self.config.circuit_breaker_threshold,
             timeout_seconds=self.config.circuit_breaker_timeout_seconds
         )
         self.metrics = CacheMetrics()
-        self.local_cache = {}  # Simple local cache for hybrid mode
+        self.batcher = RedisBatcher(
+            lambda: self.redis_client,
+            window_ms=self.config.batch_window_ms,
+            max_batch_size=self.config.max_batch_size
+        )
+        self.local_cache = LocalCacheTier(
+            max_entries=self.config.local_cache_max_entries,
+            max_bytes=self.config.local_cache_max_bytes,
+            policy=self.config.local_cache_policy,
+            sweep_interval_seconds=self.config.local_sweep_interval_seconds
+        )
         self.start_time = time.time()
+        self._generations: Dict[str, Tuple[int, float]] = {}  # namespace -> (generation, checked_at)
+        self._background_tasks = set()
+        self._flights = SingleFlight()
+        self.stampede_stats = {"computes": 0, "lease_waits": 0, "early_refreshes": 0, "stale_served": 0}
+        self.instance_id = uuid.uuid4().hex
+        self._pending_invalidations: List[str] = []
+        self._invalidation_listener: Optional[asyncio.Task] = None
+        self._local_sweeper: Optional[asyncio.Task] = None
+        self._invalidation_seq = 0  # Bumped whenever another worker's invalidation lands
+        self.invalidation_stats = {"published": 0, "received": 0, "keys_evicted": 0, "resyncs": 0}
+        self.namespace_stats: Dict[str, NamespaceStats] = defaultdict(NamespaceStats)
+        self.latency = {operation: LatencyHistogram() for operation in ("get", "get_many", "set", "set_many")}
         
         # Initialize from environment
         self._initialize_from_environment()
@@ -246,6 +888,7 @@ class RedisCacheLayer:
     @logfire.instrument("connect_redis")
     async def connect(self) -> bool:
         """Connect to Redis instance."""
+        self._start_local_sweeper()
         try:
             with logfire.span("Connecting to Redis"):
                 if self.config.upstash_url and self.config.upstash_token:
@@ -281,6 +924,7 @@ class RedisCacheLayer:
                 await self.redis_client.ping()
                 
                 logfire.info("Redis connection established successfully")
+                self._start_invalidation_listener()
                 return True
                 
         except Exception as e:
@@ -288,14 +932,68 @@ class RedisCacheLayer:
             self.redis_client = None
             return False
     
-    def _generate_cache_key(self, namespace: str, key: str) -> str:
-        """Generate Redis cache key with namespace."""
+    def _local_ttl(self, ttl_seconds: Optional[int]) -> Optional[int]:
+        """TTL for a local copy; capped by ``local_ttl_seconds`` when set."""
+        if self.config.local_ttl_seconds is None:
+            return ttl_seconds
+        if ttl_seconds is None:
+            return self.config.local_ttl_seconds
+        return min(ttl_seconds, self.config.local_ttl_seconds)
+    
+    def _generate_cache_key(self, namespace: str, key: str, generation: Optional[int] = None) -> str:
+        """Generate Redis cache key with namespace and, if given, its generation."""
         # Ensure key is within size limits
         if len(key) > self.config.max_key_size:
             # Hash long keys
             key = hashlib.md5(key.encode()).hexdigest()
         
-        return f"{self.config.key_prefix}:{namespace}:{key}"
+        if generation is None:
+            return f"{self.config.key_prefix}:{namespace}:{key}"
+        return f"{self.config.key_prefix}:{namespace}:g{generation}:{key}"
+    
+    def _generation_key(self, namespace: str) -> str:
+        return f"{self.config.key_prefix}:generation:{namespace}"
+    
+    async def _namespace_generation(self, namespace: str) -> int:
+        """Current generation of a namespace, re-read at most every ``generation_check_seconds``.
+        
+        Falls back to the last known generation (or 0) when Redis cannot be
+        reached, so lookups keep working locally.
+        """
+        known = self._generations.get(namespace)
+        if self.config.cache_mode == CacheMode.LOCAL_ONLY:
+            return known[0] if known else 0
+        if known and time.monotonic() - known[1] < self.config.generation_check_seconds:
+            return known[0]
+        
+        if not self.redis_client and not known:
+            await self.connect()
+        if not self.redis_client:
+            return known[0] if known else 0
+        
+        try:
+            generation_key = self._generation_key(namespace)
+            if self.config.enable_batching:
+                value = await self.batcher.get(generation_key)
+            else:
+                value = await self.redis_client.get(generation_key)
+            generation = int(value or 0)
+        except Exception as e:
+            logfire.warning("Namespace generation read failed", namespace=namespace, error=str(e))
+            return known[0] if known else 0
+        
+        self._generations[namespace] = (generation, time.monotonic())
+        return generation
+    
+    async def _cache_key(self, namespace: str, key: str) -> str:
+        """Redis key of ``key`` in the current generation of ``namespace``."""
+        return self._generate_cache_key(namespace, key, await self._namespace_generation(namespace))
+    
+    def _record_write(self, namespace: str, raw_size: int, encoded_size: int):
+        stats = self.namespace_stats[namespace]
+        stats.writes += 1
+        stats.raw_bytes_written += raw_size
+        stats.encoded_bytes_written += encoded_size
     
     @logfire.instrument("redis_get")
     async def get(self, key: str, namespace: str = "default") -> Tuple[Any, bool]:
@@ -304,26 +1002,25 @@ class RedisCacheLayer:
             logfire.warning("Circuit breaker open, skipping Redis operation")
             return None, False
         
-        redis_key = self._generate_cache_key(namespace, key)
+        redis_key = await self._cache_key(namespace, key)
         
         start_time = time.time()
         try:
             with logfire.span("Redis GET operation", key=redis_key[:50], namespace=namespace):
                 # Try local cache first in hybrid and local-only modes
-                if self.config.cache_mode in [CacheMode.HYBRID, CacheMode.LOCAL_ONLY] and redis_key in self.local_cache:
-                    entry = self.local_cache[redis_key]
-                    if entry.ttl_seconds is None or time.time() - entry.created_at < entry.ttl_seconds:
+                if self.config.cache_mode in [CacheMode.HYBRID, CacheMode.LOCAL_ONLY]:
+                    entry = self.local_cache.get(redis_key)
+                    if entry is not None:
                         self.metrics.hits += 1
                         self.metrics.total_operations += 1
+                        self.namespace_stats[namespace].hits += 1
                         logfire.info("Local cache hit", key=redis_key[:50])
                         return entry.value, True
-                    else:
-                        # Remove expired entry
-                        del self.local_cache[redis_key]
                 
                 if self.config.cache_mode == CacheMode.LOCAL_ONLY:
                     self.metrics.misses += 1
                     self.metrics.total_operations += 1
+                    self.namespace_stats[namespace].misses += 1
                     return None, False
                 
                 # Get from Redis
@@ -335,50 +1032,23 @@ class RedisCacheLayer:
                     self.metrics.total_operations += 1
                     return None, False
                 
-                # Get value and metadata
-                pipe = self.redis_client.pipeline()
-                pipe.get(redis_key)
-                pipe.get(f"{redis_key}:meta")
-                
-                results = await pipe.execute()
-                value_data, meta_data = results
+                invalidation_seq = self._invalidation_seq
+                if self.config.enable_batching:
+                    value_data = await self.batcher.get(redis_key)
+                else:
+                    value_data = await self.redis_client.get(redis_key)
                 
                 if value_data is None:
                     self.metrics.misses += 1
                     self.metrics.total_operations += 1
+                    self.namespace_stats[namespace].misses += 1
                     logfire.debug("Redis cache miss", key=redis_key[:50])
                     return None, False
                 
-                # Deserialize metadata
-                compressed = False
-                if meta_data:
-                    try:
-                        meta = json.loads(meta_data.decode('utf-8'))
-                        compressed = meta.get('compressed', False)
-                    except:
-                        pass
-                
-                # Deserialize value
-                value = self.serializer.deserialize(value_data, compressed)
-                
-                # Update local cache in hybrid mode
-                if self.config.cache_mode == CacheMode.HYBRID:
-                    entry = CacheEntry(
-                        key=key,
-                        value=value,
-                        created_at=time.time(),
-                        namespace=namespace,
-                        compressed=compressed
-                    )
-                    self.local_cache[redis_key] = entry
-                
-                read_time = (time.time() - start_time) * 1000
-                self.metrics.hits += 1
-                self.metrics.total_operations += 1
-                self.metrics.total_bytes_read += len(value_data)
-                self.metrics.avg_read_time_ms = (
-                    (self.metrics.avg_read_time_ms * (self.metrics.hits - 1) + read_time) / self.metrics.hits
+                value, compressed = await self._decode_hit(
+                    redis_key, key, namespace, value_data, start_time, invalidation_seq
                 )
+                read_time = (time.time() - start_time) * 1000
                 
                 self.circuit_breaker.record_success()
                 
@@ -403,6 +1073,143 @@ class RedisCacheLayer:
             self.circuit_breaker.record_failure()
             logfire.error("Redis GET failed", key=redis_key[:50], error=str(e))
             return None, False
+        
+        finally:
+            self.latency["get"].record((time.time() - start_time) * 1000)
+    
+    async def _decode_hit(
+        self,
+        redis_key: str,
+        key: str,
+        namespace: str,
+        value_data: bytes,
+        start_time: float,
+        invalidation_seq: int
+    ) -> Tuple[Any, bool]:
+        """Decode a value read from Redis, fill the local tier and record the hit.
+        
+        ``invalidation_seq`` is the invalidation sequence taken before the
+        read; if an invalidation landed since, the value may predate it and
+        is returned without being kept locally.
+        """
+        try:
+            value, compressed = self.serializer.decode(value_data)
+        except MissingDictionaryError as e:
+            await self._load_dictionary(e.dictionary_id)
+            value, compressed = self.serializer.decode(value_data)
+        
+        # Update local cache in hybrid mode
+        if self.config.cache_mode == CacheMode.HYBRID and invalidation_seq == self._invalidation_seq:
+            entry = CacheEntry(
+                key=key,
+                value=value,
+                ttl_seconds=self._local_ttl(self.config.default_ttl_seconds),
+                created_at=time.time(),
+                namespace=namespace,
+                compressed=compressed
+            )
+            self.local_cache.put(redis_key, entry)
+        
+        read_time = (time.time() - start_time) * 1000
+        self.metrics.hits += 1
+        self.metrics.total_operations += 1
+        self.metrics.total_bytes_read += len(value_data)
+        self.namespace_stats[namespace].hits += 1
+        self.namespace_stats[namespace].encoded_bytes_read += len(value_data)
+        self.metrics.avg_read_time_ms = (
+            (self.metrics.avg_read_time_ms * (self.metrics.hits - 1) + read_time) / self.metrics.hits
+        )
+        return value, compressed
+    
+    @logfire.instrument("redis_get_many")
+    async def get_many(self, keys: List[str], namespace: str = "default") -> List[Tuple[Any, bool]]:
+        """Get several values in one MGET; results follow the order of ``keys``."""
+        results: List[Tuple[Any, bool]] = [(None, False)] * len(keys)
+        if not keys:
+            return results
+        if not self.circuit_breaker.can_execute():
+            logfire.warning("Circuit breaker open, skipping Redis operation")
+            return results
+        
+        generation = await self._namespace_generation(namespace)
+        redis_keys = [self._generate_cache_key(namespace, key, generation) for key in keys]
+        start_time = time.time()
+        try:
+            with logfire.span("Redis MGET operation", keys=len(keys), namespace=namespace):
+                pending = []
+                for index, redis_key in enumerate(redis_keys):
+                    entry = None
+                    if self.config.cache_mode in [CacheMode.HYBRID, CacheMode.LOCAL_ONLY]:
+                        entry = self.local_cache.get(redis_key)
+                    if entry is not None:
+                        self.metrics.hits += 1
+                        self.metrics.total_operations += 1
+                        self.namespace_stats[namespace].hits += 1
+                        results[index] = (entry.value, True)
+                    else:
+                        pending.append(index)
+                
+                if not pending:
+                    return results
+                
+                if self.config.cache_mode == CacheMode.LOCAL_ONLY:
+                    self.metrics.misses += len(pending)
+                    self.metrics.total_operations += len(pending)
+                    self.namespace_stats[namespace].misses += len(pending)
+                    return results
+                
+                if not self.redis_client:
+                    await self.connect()
+                
+                if not self.redis_client:
+                    self.metrics.errors += 1
+                    self.metrics.total_operations += len(pending)
+                    return results
+                
+                invalidation_seq = self._invalidation_seq
+                values = await self.redis_client.mget([redis_keys[index] for index in pending])
+                for index, value_data in zip(pending, values):
+                    if value_data is None:
+                        self.metrics.misses += 1
+                        self.metrics.total_operations += 1
+                        self.namespace_stats[namespace].misses += 1
+                        continue
+                    try:
+                        value, _ = await self._decode_hit(
+                            redis_keys[index], keys[index], namespace, value_data, start_time, invalidation_seq
+                        )
+                    except Exception as e:
+                        # One unreadable value is a miss for its key, not a failed batch
+                        self.metrics.misses += 1
+                        self.metrics.total_operations += 1
+                        self.namespace_stats[namespace].misses += 1
+                        logfire.warning("Redis value decode failed", key=redis_keys[index][:50], error=str(e))
+                        continue
+                    results[index] = (value, True)
+                
+                self.circuit_breaker.record_success()
+                logfire.info("Redis cache multi-get",
+                           keys=len(keys),
+                           fetched=len(pending),
+                           found=sum(1 for _, found in results if found))
+                return results
+                
+        except asyncio.TimeoutError:
+            self.metrics.timeouts += 1
+            self.metrics.total_operations += 1
+            self.circuit_breaker.record_failure()
+            logfire.warning("Redis MGET timeout", keys=len(keys))
+            return results
+            
+        except Exception as e:
+            self.metrics.errors += 1
+            self.metrics.total_operations += 1
+            self.circuit_breaker.record_failure()
+            logfire.error("Redis MGET failed", keys=len(keys), error=str(e))
+            return results
+        
+        finally:
+            self.latency["get_many"].record((time.time() - start_time) * 1000)
     
     @logfire.instrument("redis_set")
     async def set(
@@ -410,21 +1217,26 @@ class RedisCacheLayer:
         key: str, 
         value: Any, 
         namespace: str = "default",
-        ttl_seconds: Optional[int] = None
+        ttl_seconds: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None
     ) -> bool:
-        """Set value in cache."""
+        """Set value in cache.
+        
+        ``tags`` record the entry under each tag so ``invalidate_tags``
+        can drop it later.
+        """
         if not self.circuit_breaker.can_execute():
             logfire.warning("Circuit breaker open, skipping Redis operation")
             return False
         
-        redis_key = self._generate_cache_key(namespace, key)
+        redis_key = await self._cache_key(namespace, key)
         ttl = ttl_seconds or self.config.default_ttl_seconds
         
         start_time = time.time()
         try:
             with logfire.span("Redis SET operation", key=redis_key[:50], namespace=namespace):
                 # Serialize value
-                serialized_data, compressed = self.serializer.serialize(
+                serialized_data, compressed, raw_size = self.serializer.encode_measured(
                     value, self.config.compression_threshold
                 )
                 
@@ -441,16 +1253,17 @@ class RedisCacheLayer:
                     entry = CacheEntry(
                         key=key,
                         value=value,
-                        ttl_seconds=ttl,
+                        ttl_seconds=self._local_ttl(ttl),
                         created_at=time.time(),
                         namespace=namespace,
-                        size_bytes=len(serialized_data),
-                        compressed=compressed
+                        compressed=compressed,
+                        tags=tuple(tags or ())
                     )
-                    self.local_cache[redis_key] = entry
+                    self.local_cache.put(redis_key, entry)
                 
                 if self.config.cache_mode == CacheMode.LOCAL_ONLY:
                     self.metrics.total_operations += 1
+                    self._record_write(namespace, raw_size, len(serialized_data))
                     return True
                 
                 # Set in Redis
@@ -461,23 +1274,19 @@ class RedisCacheLayer:
                     self.metrics.errors += 1
                     return False
                 
-                # Store value and metadata
-                metadata = {
-                    'compressed': compressed,
-                    'size_bytes': len(serialized_data),
-                    'created_at': time.time(),
-                    'namespace': namespace
-                }
-                
-                pipe = self.redis_client.pipeline()
-                pipe.setex(redis_key, ttl, serialized_data)
-                pipe.setex(f"{redis_key}:meta", ttl, json.dumps(metadata))
-                
-                await pipe.execute()
+                if self.config.enable_batching:
+                    await self.batcher.set(redis_key, serialized_data, ttl)
+                else:
+                    await self.redis_client.set(redis_key, serialized_data, ex=ttl)
+                if tags:
+                    await self._add_to_tags(tags, [redis_key], ttl)
+                self._invalidate_elsewhere([redis_key])
                 
                 write_time = (time.time() - start_time) * 1000
                 self.metrics.total_operations += 1
                 self.metrics.total_bytes_written += len(serialized_data)
+                self.metrics.total_raw_bytes_written += raw_size
+                self._record_write(namespace, raw_size, len(serialized_data))
                 write_count = getattr(self.metrics, '_write_count', 0) + 1
                 setattr(self.metrics, '_write_count', write_count)
                 self.metrics.avg_write_time_ms = (
@@ -506,17 +1315,109 @@ class RedisCacheLayer:
             self.circuit_breaker.record_failure()
             logfire.error("Redis SET failed", key=redis_key[:50], error=str(e))
             return False
+        
+        finally:
+            self.latency["set"].record((time.time() - start_time) * 1000)
+    
+    @logfire.instrument("redis_set_many")
+    async def set_many(
+        self,
+        items: Dict[str, Any],
+        namespace: str = "default",
+        ttl_seconds: Optional[int] = None
+    ) -> bool:
+        """Set several values in one pipelined round trip."""
+        if not items:
+            return True
+        if not self.circuit_breaker.can_execute():
+            logfire.warning("Circuit breaker open, skipping Redis operation")
+            return False
+        
+        ttl = ttl_seconds or self.config.default_ttl_seconds
+        start_time = time.time()
+        try:
+            with logfire.span("Redis multi-SET operation", keys=len(items), namespace=namespace):
+                generation = await self._namespace_generation(namespace)
+                encoded = []
+                raw_sizes = []
+                for key, value in items.items():
+                    redis_key = self._generate_cache_key(namespace, key, generation)
+                    serialized_data, compressed, raw_size = self.serializer.encode_measured(
+                        value, self.config.compression_threshold
+                    )
+                    if len(serialized_data) / (1024 * 1024) > self.config.max_value_size_mb:
+                        logfire.warning("Value too large for cache", key=redis_key[:50])
+                        continue
+                    
+                    if self.config.cache_mode in [CacheMode.HYBRID, CacheMode.LOCAL_ONLY]:
+                        self.local_cache.put(redis_key, CacheEntry(
+                            key=key,
+                            value=value,
+                            ttl_seconds=self._local_ttl(ttl),
+                            created_at=time.time(),
+                            namespace=namespace,
+                            compressed=compressed
+                        ))
+                    encoded.append((redis_key, serialized_data))
+                    raw_sizes.append(raw_size)
+                
+                if self.config.cache_mode == CacheMode.LOCAL_ONLY:
+                    self.metrics.total_operations += len(encoded)
+                    for (_, serialized_data), raw_size in zip(encoded, raw_sizes):
+                        self._record_write(namespace, raw_size, len(serialized_data))
+                    return len(encoded) == len(items)
+                
+                if not self.redis_client:
+                    await self.connect()
+                
+                if not self.redis_client:
+                    self.metrics.errors += 1
+                    return False
+                
+                pipe = self.redis_client.pipeline(transaction=False)
+                for redis_key, serialized_data in encoded:
+                    pipe.set(redis_key, serialized_data, ex=ttl)
+                await pipe.execute()
+                self._invalidate_elsewhere([redis_key for redis_key, _ in encoded])
+                
+                self.metrics.total_operations += len(encoded)
+                self.metrics.total_bytes_written += sum(len(data) for _, data in encoded)
+                self.metrics.total_raw_bytes_written += sum(raw_sizes)
+                for (_, serialized_data), raw_size in zip(encoded, raw_sizes):
+                    self._record_write(namespace, raw_size, len(serialized_data))
+                self.circuit_breaker.record_success()
+                
+                logfire.info("Redis cache multi-set",
+                           keys=len(encoded),
+                           write_time_ms=(time.time() - start_time) * 1000,
+                           ttl_seconds=ttl)
+                return len(encoded) == len(items)
+                
+        except asyncio.TimeoutError:
+            self.metrics.timeouts += 1
+            self.circuit_breaker.record_failure()
+            logfire.warning("Redis multi-SET timeout", keys=len(items))
+            return False
+            
+        except Exception as e:
+            self.metrics.errors += 1
+            self.circuit_breaker.record_failure()
+            logfire.error("Redis multi-SET failed", keys=len(items), error=str(e))
+            return False
+        
+        finally:
+            self.latency["set_many"].record((time.time() - start_time) * 1000)
     
     @logfire.instrument("redis_delete")
     async def delete(self, key: str, namespace: str = "default") -> bool:
         """Delete value from cache."""
-        redis_key = self._generate_cache_key(namespace, key)
+        redis_key = await self._cache_key(namespace, key)
         
         try:
             with logfire.span("Redis DELETE operation", key=redis_key[:50]):
                 # Remove from local cache
-                if redis_key in self.local_cache:
-                    del self.local_cache[redis_key]
+                self.local_cache.pop(redis_key)
+                self.namespace_stats[namespace].deletes += 1
                 
                 if self.config.cache_mode == CacheMode.LOCAL_ONLY:
                     return True
@@ -524,13 +1425,8 @@ class RedisCacheLayer:
                 if not self.redis_client:
                     return False
                 
-                # Delete from Redis
-                pipe = self.redis_client.pipeline()
-                pipe.delete(redis_key)
-                pipe.delete(f"{redis_key}:meta")
-                
-                results = await pipe.execute()
-                deleted = results[0] > 0
+                deleted = await self.redis_client.delete(redis_key) > 0
+                self._invalidate_elsewhere([redis_key])
                 
                 logfire.info("Redis cache delete", key=redis_key[:50], deleted=deleted)
                 return deleted
@@ -542,16 +1438,12 @@ class RedisCacheLayer:
     @logfire.instrument("redis_exists")
     async def exists(self, key: str, namespace: str = "default") -> bool:
         """Check if key exists in cache."""
-        redis_key = self._generate_cache_key(namespace, key)
+        redis_key = await self._cache_key(namespace, key)
         
         try:
             # Check local cache first
-            if self.config.cache_mode in [CacheMode.HYBRID, CacheMode.LOCAL_ONLY] and redis_key in self.local_cache:
-                entry = self.local_cache[redis_key]
-                if entry.ttl_seconds is None or time.time() - entry.created_at < entry.ttl_seconds:
-                    return True
-                else:
-                    del self.local_cache[redis_key]
+            if self.config.cache_mode in [CacheMode.HYBRID, CacheMode.LOCAL_ONLY] and self.local_cache.get(redis_key) is not None:
+                return True
             
             if self.config.cache_mode == CacheMode.LOCAL_ONLY:
                 return False
@@ -565,66 +1457,497 @@ class RedisCacheLayer:
             logfire.error("Redis EXISTS failed", key=redis_key[:50], error=str(e))
             return False
     
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.config.key_prefix}:tag:{tag}"
+    
+    async def _add_to_tags(self, tags: Iterable[str], redis_keys: List[str], ttl_seconds: int):
+        """Add keys to the Redis set of each tag.
+        
+        A tag set lives at least as long as its longest-lived member, so
+        a short-TTL write never expires the set under older members. Each
+        write also samples ``tag_prune_sample`` members and removes those
+        whose keys were deleted or expired, which keeps a busy tag's set
+        from growing without bound.
+        """
+        pipe = self.redis_client.pipeline(transaction=False)
+        for tag in tags:
+            pipe.eval(TAG_KEYS_SCRIPT, 1, self._tag_key(tag), ttl_seconds, self.config.tag_prune_sample, *redis_keys)
+        await pipe.execute()
+    
+    @logfire.instrument("redis_invalidate_tags")
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Drop every entry written with any of ``tags``.
+        
+        Tag sets are read and deleted in one transaction, and the tagged
+        keys are unlinked and announced to other workers. Returns the
+        number of tagged keys found in Redis, or the number of local
+        entries dropped in LOCAL_ONLY mode.
+        """
+        tags = list(tags)
+        if not tags:
+            return 0
+        try:
+            with logfire.span("Invalidating tags", tags=tags):
+                local_removed = sum(self.local_cache.remove_tagged(tag) for tag in tags)
+                
+                if self.config.cache_mode == CacheMode.LOCAL_ONLY:
+                    logfire.info("Local tags invalidated", tags=tags, keys_removed=local_removed)
+                    return local_removed
+                
+                if not self.redis_client:
+                    await self.connect()
+                
+                if not self.redis_client:
+                    logfire.warning("Tags invalidated locally only, Redis unavailable", tags=tags)
+                    return local_removed
+                
+                tag_keys = [self._tag_key(tag) for tag in tags]
+                pipe = self.redis_client.pipeline(transaction=True)
+                for tag_key in tag_keys:
+                    pipe.smembers(tag_key)
+                pipe.delete(*tag_keys)
+                *members, _ = await pipe.execute()
+                
+                redis_keys = sorted({
+                    key.decode() if isinstance(key, bytes) else key
+                    for tagged in members for key in tagged
+                })
+                batch_size = self.config.generation_sweep_batch
+                for start in range(0, len(redis_keys), batch_size):
+                    await self.redis_client.unlink(*redis_keys[start:start + batch_size])
+                self._invalidate_elsewhere(redis_keys)
+                
+                logfire.info("Tags invalidated", tags=tags, keys_removed=len(redis_keys))
+                return len(redis_keys)
+                
+        except Exception as e:
+            logfire.error("Invalidate tags failed", tags=tags, error=str(e))
+            return 0
+    
     @logfire.instrument("redis_clear_namespace")
     async def clear_namespace(self, namespace: str) -> int:
-        """Clear all keys in a namespace."""
+        """Invalidate every key in a namespace by bumping its generation.
+        
+        Keys embed their namespace generation, so a single INCR makes all
+        existing entries unreachable for every worker. They expire through
+        their TTL, and a background UNLINK sweep reclaims their memory
+        sooner. Returns the number of local entries dropped.
+        """
         try:
             with logfire.span("Clearing namespace", namespace=namespace):
-                pattern = f"{self.config.key_prefix}:{namespace}:*"
-                
                 # Clear local cache
-                local_cleared = 0
-                keys_to_remove = [k for k in self.local_cache.keys() if k.startswith(f"{self.config.key_prefix}:{namespace}:")]
-                for key in keys_to_remove:
-                    del self.local_cache[key]
-                    local_cleared += 1
+                local_cleared = self.local_cache.remove_prefix(f"{self.config.key_prefix}:{namespace}:")
                 
                 if self.config.cache_mode == CacheMode.LOCAL_ONLY:
+                    generation = await self._namespace_generation(namespace) + 1
+                    self._generations[namespace] = (generation, time.monotonic())
                     logfire.info("Local namespace cleared", namespace=namespace, keys_cleared=local_cleared)
                     return local_cleared
                 
                 if not self.redis_client:
+                    await self.connect()
+                
+                if not self.redis_client:
+                    logfire.warning("Namespace cleared locally only, Redis unavailable", namespace=namespace)
                     return local_cleared
                 
-                # Clear Redis
-                redis_cleared = 0
-                async for key in self.redis_client.scan_iter(match=pattern):
-                    await self.redis_client.delete(key)
-                    redis_cleared += 1
+                generation = await self.redis_client.incr(self._generation_key(namespace))
+                self._generations[namespace] = (generation, time.monotonic())
+                if self._publishes_invalidations():
+                    await self._publish_invalidation({"namespace": namespace, "generation": generation})
+                
+                if self.config.sweep_old_generations:
+                    self._spawn(self._sweep_old_generations(namespace, generation))
                 
-                total_cleared = local_cleared + redis_cleared
                 logfire.info("Namespace cleared", 
                            namespace=namespace, 
-                           total_keys_cleared=total_cleared,
-                           local_cleared=local_cleared,
-                           redis_cleared=redis_cleared)
+                           generation=generation,
+                           local_cleared=local_cleared)
                 
-                return total_cleared
+                return local_cleared
                 
         except Exception as e:
             logfire.error("Clear namespace failed", namespace=namespace, error=str(e))
             return 0
     
+    def _invalidation_channel(self) -> str:
+        return f"{self.config.key_prefix}:{self.config.invalidation_channel}"
+    
+    def _publishes_invalidations(self) -> bool:
+        return self.config.cache_mode == CacheMode.HYBRID and self.config.publish_invalidations
+    
+    def _invalidate_elsewhere(self, redis_keys: List[str]):
+        """Queue keys just written to Redis for other workers to drop locally.
+        
+        Keys written in the same event-loop tick go out as one message.
+        Callers queue keys only after the write has landed, so a worker
+        that re-reads on receipt sees the new value.
+        """
+        if not redis_keys or not self._publishes_invalidations():
+            return
+        if not self._pending_invalidations:
+            self._spawn(self._publish_pending_invalidations())
+        self._pending_invalidations.extend(redis_keys)
+    
+    async def _publish_pending_invalidations(self):
+        keys, self._pending_invalidations = self._pending_invalidations, []
+        if keys:
+            await self._publish_invalidation({"keys": keys})
+    
+    async def _publish_invalidation(self, message: Dict[str, Any]):
+        try:
+            await self.redis_client.publish(
+                self._invalidation_channel(),
+                json.dumps({"origin": self.instance_id, **message})
+            )
+            self.invalidation_stats["published"] += 1
+        except Exception as e:
+            # Other workers' copies expire through their local TTL
+            logfire.warning("Invalidation publish failed", error=str(e))
+    
+    def _start_local_sweeper(self):
+        if (self.config.local_sweep_interval_seconds <= 0
+                or self.config.cache_mode not in [CacheMode.HYBRID, CacheMode.LOCAL_ONLY]):
+            return
+        if self._local_sweeper is None or self._local_sweeper.done():
+            self._local_sweeper = self._spawn(self._sweep_local_cache())
+    
+    async def _sweep_local_cache(self):
+        """Reclaim expired local entries on a timer, even while this worker is idle."""
+        while True:
+            await asyncio.sleep(self.config.local_sweep_interval_seconds)
+            self.local_cache.sweep_expired()
+    
+    def _start_invalidation_listener(self):
+        if not self._publishes_invalidations():
+            return
+        if self._invalidation_listener is None or self._invalidation_listener.done():
+            self._invalidation_listener = self._spawn(self._listen_for_invalidations())
+    
+    async def _listen_for_invalidations(self):
+        """Drop local entries named in other workers' invalidation messages.
+        
+        Messages published while the subscription is down are lost, so
+        the local tier is emptied whenever it resubscribes after an error.
+        """
+        resubscribing = False
+        while self.redis_client:
+            try:
+                async with self.redis_client.pubsub() as pubsub:
+                    await pubsub.subscribe(self._invalidation_channel())
+                    if resubscribing:
+                        self._invalidation_seq += 1
+                        self.local_cache.clear()
+                        self._generations.clear()
+                        self.invalidation_stats["resyncs"] += 1
+                        logfire.info("Local cache dropped after invalidation resubscribe")
+                    
+                    async for message in pubsub.listen():
+                        if message.get("type") == "message":
+                            self._apply_invalidation(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logfire.warning("Invalidation subscription lost", error=str(e))
+            
+            resubscribing = True
+            await asyncio.sleep(self.config.invalidation_resubscribe_seconds)
+    
+    def _apply_invalidation(self, data: Union[bytes, str]):
+        """Apply one invalidation message published by another worker."""
+        try:
+            message = json.loads(data)
+        except ValueError:
+            logfire.warning("Malformed invalidation message")
+            return
+        if message.get("origin") == self.instance_id:
+            return
+        
+        self.invalidation_stats["received"] += 1
+        self._invalidation_seq += 1
+        evicted = 0
+        for redis_key in message.get("keys", ()):
+            if self.local_cache.pop(redis_key) is not None:
+                evicted += 1
+        
+        namespace = message.get("namespace")
+        if namespace is not None:
+            evicted += self.local_cache.remove_prefix(f"{self.config.key_prefix}:{namespace}:")
+            known = self._generations.get(namespace)
+            generation = max(message.get("generation", 0), known[0] if known else 0)
+            self._generations[namespace] = (generation, time.monotonic())
+        
+        self.invalidation_stats["keys_evicted"] += evicted
+    
+    def _spawn(self, coroutine) -> asyncio.Task:
+        """Run a background task, keeping a reference until it finishes."""
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+    
+    async def _sweep_old_generations(self, namespace: str, generation: int) -> int:
+        """UNLINK a namespace's keys from every generation below ``generation``.
+        
+        The whole namespace is scanned, so generations whose own sweep
+        failed or was cancelled are reclaimed too, as are keys written in
+        the ungenerationed ``prefix:namespace:key`` form used before
+        generations existed. Keys of ``generation`` or later are kept.
+        """
+        prefix = f"{self.config.key_prefix}:{namespace}:"
+        batch_size = self.config.generation_sweep_batch
+        swept = 0
+        try:
+            batch = []
+            async for key in self.redis_client.scan_iter(match=_escape_glob(prefix) + "*", count=batch_size):
+                name = key.decode() if isinstance(key, bytes) else key
+                match = GENERATION_KEY.match(name, len(prefix))
+                if match and int(match.group(1)) >= generation:
+                    continue
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    swept += await self.redis_client.unlink(*batch)
+                    batch = []
+            if batch:
+                swept += await self.redis_client.unlink(*batch)
+            logfire.info("Old namespace generations swept", namespace=namespace, generation=generation, keys=swept)
+        except Exception as e:
+            logfire.warning("Namespace generation sweep failed", namespace=namespace, error=str(e))
+        return swept
+    
+    @logfire.instrument("redis_get_or_compute")
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        namespace: str = "default",
+        ttl_seconds: Optional[int] = None,
+        stale_seconds: Optional[int] = None
+    ) -> Any:
+        """Cached value of ``key``, computing and storing it on a miss.
+        
+        Concurrent misses in this process share one ``compute`` call, and
+        other workers wait on a Redis lease for its value instead of
+        recomputing. Values close to expiry are refreshed early in the
+        background, and values expired less than ``stale_seconds`` ago
+        are served while a single background refresh runs. Values are
+        stored with their freshness metadata, so keys written here should
+        only be read through this method.
+        """
+        ttl = ttl_seconds or self.config.default_ttl_seconds
+        stale = self.config.stale_while_revalidate_seconds if stale_seconds is None else stale_seconds
+        flight_key = f"{namespace}:{key}"
+        
+        def recompute(wait: bool):
+            return lambda: self._compute_and_store(key, compute, namespace, ttl, stale, wait)
+        
+        stored, found = await self.get(key, namespace)
+        if found:
+            value, fresh_until, compute_seconds = unwrap_value(stored)
+            now = time.time()
+            if fresh_until is None or now < fresh_until:
+                if (not self._flights.in_flight(flight_key)
+                        and should_refresh_early(fresh_until, compute_seconds, self.config.early_refresh_beta, now)):
+                    self.stampede_stats["early_refreshes"] += 1
+                    self._flights.start(flight_key, recompute(False))
+                return value
+            if now < fresh_until + stale:
+                self.stampede_stats["stale_served"] += 1
+                self._flights.start(flight_key, recompute(False))
+                return value
+        
+        return await self._flights.run(flight_key, recompute(True))
+    
+    async def _compute_and_store(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        namespace: str,
+        ttl_seconds: int,
+        stale_seconds: int,
+        wait: bool
+    ) -> Any:
+        """Compute and store ``key`` under the cross-worker lease.
+        
+        When another worker holds the lease, waits for its value if
+        ``wait`` is set (computing anyway if none arrives in time) and
+        otherwise leaves the refresh to it.
+        """
+        lease = await self._acquire_lease(namespace, key)
+        if lease is None:
+            if not wait:
+                return None
+            self.stampede_stats["lease_waits"] += 1
+            value, found = await self._wait_for_fresh_value(key, namespace)
+            if found:
+                return value
+        
+        try:
+            self.stampede_stats["computes"] += 1
+            start_time = time.perf_counter()
+            value = await compute()
+            compute_seconds = time.perf_counter() - start_time
+            await self.set(key, wrap_value(value, ttl_seconds, compute_seconds), namespace, ttl_seconds + stale_seconds)
+            return value
+        finally:
+            if lease:
+                await self._release_lease(namespace, key, lease)
+    
+    async def _wait_for_fresh_value(self, key: str, namespace: str) -> Tuple[Any, bool]:
+        """Poll for a fresh value of ``key`` until ``lease_wait_ms`` runs out."""
+        deadline = time.monotonic() + self.config.lease_wait_ms / 1000
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.config.lease_poll_ms / 1000)
+            stored, found = await self.get(key, namespace)
+            if found:
+                value, fresh_until, _ = unwrap_value(stored)
+                if fresh_until is None or time.time() < fresh_until:
+                    return value, True
+        return None, False
+    
+    def _lease_key(self, namespace: str, key: str) -> str:
+        return self._generate_cache_key(f"lease:{namespace}", key)
+    
+    async def _acquire_lease(self, namespace: str, key: str) -> Optional[str]:
+        """Token of a newly taken recompute lease, or None if another worker holds it.
+        
+        Returns an empty token when there is no Redis to coordinate
+        through, so the caller computes without a lease.
+        """
+        if (self.config.cache_mode == CacheMode.LOCAL_ONLY or not self.redis_client
+                or not self.circuit_breaker.can_execute()):
+            return ""
+        
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.redis_client.set(
+                self._lease_key(namespace, key), token, nx=True, px=self.config.lease_ttl_ms
+            )
+        except Exception as e:
+            logfire.warning("Recompute lease unavailable", key=key[:50], error=str(e))
+            return ""
+        return token if acquired else None
+    
+    async def _release_lease(self, namespace: str, key: str, token: str):
+        try:
+            await self.redis_client.eval(RELEASE_LEASE_SCRIPT, 1, self._lease_key(namespace, key), token)
+        except Exception as e:
+            # The lease expires after lease_ttl_ms anyway
+            logfire.warning("Recompute lease release failed", key=key[:50], error=str(e))
+    
+    def _dictionary_key(self, dict_id: int) -> str:
+        return f"{self.config.key_prefix}:codec:dictionary:{dict_id}"
+    
+    async def _load_dictionary(self, dict_id: int):
+        """Fetch a compression dictionary trained by another process."""
+        dictionary = await self.redis_client.get(self._dictionary_key(dict_id))
+        if dictionary is None:
+            raise MissingDictionaryError(dict_id)
+        register_dictionary(dictionary)
+    
+    @logfire.instrument("train_compression_dictionary")
+    async def train_compression_dictionary(
+        self,
+        size: int = 16 * 1024,
+        payloads: Optional[List[bytes]] = None
+    ) -> Optional[int]:
+        """Train a dictionary on recent payloads, share it and compress new values with it.
+        
+        The dictionary is stored in Redis without a TTL before any value uses
+        it, so every worker can read those values. Returns the dictionary id,
+        or None when there are too few samples or compression is off.
+        """
+        payloads = payloads if payloads is not None else list(self.serializer.samples)
+        if len(payloads) < MIN_TRAINING_SAMPLES or self.serializer.compressor is NO_COMPRESSION:
+            return None
+        
+        dict_id, dictionary = self.serializer.train_dictionary(size, payloads)
+        if self.config.cache_mode != CacheMode.LOCAL_ONLY:
+            if not self.redis_client:
+                await self.connect()
+            if not self.redis_client:
+                return None
+            await self.redis_client.set(self._dictionary_key(dict_id), dictionary)
+        
+        self.serializer.use_dictionary(dict_id)
+        logfire.info("Compression dictionary trained",
+                   dictionary_id=dict_id,
+                   size_bytes=len(dictionary),
+                   samples=len(payloads))
+        return dict_id
+    
+    @logfire.instrument("tune_cache_codecs")
+    async def tune_codecs(
+        self,
+        samples: Optional[List[Any]] = None,
+        size_tolerance: float = 0.25
+    ) -> Optional[Dict[str, Any]]:
+        """Benchmark codecs on recent values and switch to the best one.
+        
+        Picks the fastest format/compressor stored within ``size_tolerance``
+        of the smallest (see ``cache_codecs.choose_codec``). Values written
+        with the previous codec stay readable. Returns the chosen benchmark
+        row, or None when there are too few samples.
+        """
+        if samples is None:
+            samples = [self.serializer.payload_format.loads(payload) for payload in self.serializer.samples]
+        if len(samples) < MIN_TRAINING_SAMPLES:
+            return None
+        
+        if self.serializer.compressor is NO_COMPRESSION:
+            compressors = ["none"]
+        else:
+            compressors = [name for name in COMPRESSORS if name != "none"]
+        formats = list(DEFAULT_CANDIDATE_FORMATS)
+        if self.serializer.payload_format.name == "pickle":
+            formats.append("pickle")
+        
+        results = await asyncio.to_thread(benchmark_codecs, samples, formats, compressors)
+        best = choose_codec(results, size_tolerance, formats)
+        
+        if COMPRESSORS[best["compressor"]].uses_dictionary:
+            self.serializer.use_codec(best["format"], best["compressor"].replace("-dict", ""))
+            payload_format = FORMATS[best["format"]]
+            await self.train_compression_dictionary(
+                payloads=[payload_format.dumps(sample) for sample in samples]
+            )
+        else:
+            self.serializer.use_codec(best["format"], best["compressor"])
+        
+        logfire.info("Cache codecs tuned", **best)
+        return best
+    
     @logfire.instrument("get_cache_stats")
     async def get_cache_stats(self) -> Dict[str, Any]:
         """Get comprehensive cache statistics."""
         try:
+            self.local_cache.sweep_expired()
+            
             # Update hit rate and error rate
             total_ops = self.metrics.total_operations
             if total_ops > 0:
                 self.metrics.hit_rate = self.metrics.hits / total_ops
                 self.metrics.error_rate = self.metrics.errors / total_ops
             
-            # Calculate compression ratio
-            if self.metrics.total_bytes_written > 0:
-                # This is a simplified compression ratio calculation
-                self.metrics.compression_ratio = 0.8  # Placeholder
+            # Stored bytes per serialized byte over everything written to Redis
+            if self.metrics.total_raw_bytes_written > 0:
+                self.metrics.compression_ratio = (
+                    self.metrics.total_bytes_written / self.metrics.total_raw_bytes_written
+                )
+            
+            local_entries = self.local_cache.namespace_counts()
+            namespaces = {
+                namespace: {**stats.to_dict(), "local_entries": local_entries.get(namespace, 0)}
+                for namespace, stats in self.namespace_stats.items()
+            }
             
             stats = {
                 "cache_metrics": asdict(self.metrics),
                 "configuration": {
                     "cache_mode": self.config.cache_mode.value,
                     "serialization_format": self.config.serialization_format.value,
+                    "payload_format": self.serializer.payload_format.name,
+                    "compressor": self.serializer.compressor.name,
                     "default_ttl_seconds": self.config.default_ttl_seconds,
                     "max_connections": self.config.max_connections
                 },
@@ -633,9 +1956,14 @@ class RedisCacheLayer:
                     "failure_count": self.circuit_breaker.failure_count,
                     "threshold": self.circuit_breaker.threshold
                 },
-                "local_cache": {
-                    "size": len(self.local_cache),
-                    "estimated_memory_mb": len(self.local_cache) * 0.001  # Rough estimate
+                "local_cache": self.local_cache.stats(),
+                "namespaces": namespaces,
+                "latency": {operation: histogram.stats() for operation, histogram in self.latency.items()},
+                "batching": self.batcher.stats(),
+                "stampede": {**self.stampede_stats, **self._flights.stats()},
+                "invalidations": self.invalidation_stats,
+                "namespace_generations": {
+                    namespace: generation for namespace, (generation, _) in self._generations.items()
                 },
                 "runtime_info": {
                     "uptime_seconds": time.time() - self.start_time,
@@ -671,20 +1999,40 @@ class RedisCacheLayer:
     @logfire.instrument("redis_close")
     async def close(self):
         """Close Redis connection."""
+        tasks = list(self._background_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
         if self.redis_client:
             with logfire.span("Closing Redis connection"):
+                await self.batcher.flush()
+                await self._publish_pending_invalidations()
                 await self.redis_client.close()
                 self.redis_client = None
                 logfire.info("Redis connection closed")
 
+def _escape_glob(text: str) -> str:
+    """Escape Redis glob characters so ``text`` matches literally in SCAN MATCH."""
+    return re.sub(r"([*?\[\]\\])", r"\\\1", text)
+
 # Cache decorators and utilities
 def redis_cached(
     namespace: str = "default",
     ttl_seconds: Optional[int] = None,
-    key_generator: Optional[Callable] = None
+    key_generator: Optional[Callable] = None,
+    stale_seconds: Optional[int] = None
 ):
-    """Decorator for caching function results in Redis."""
+    """Decorator for caching function results in Redis.
+    
+    The wrapped function is called with a ``cache_layer`` keyword, which is
+    passed on if the function declares it. Misses go through
+    ``RedisCacheLayer.get_or_compute``, so concurrent callers of an expired
+    key trigger a single call.
+    """
     def decorator(func):
+        takes_cache_layer = "cache_layer" in inspect.signature(func).parameters
+        
+        @functools.wraps(func)
         async def wrapper(*args, cache_layer: RedisCacheLayer, **kwargs):
             # Generate cache key
             if key_generator:
@@ -693,16 +2041,14 @@ def redis_cached(
                 key_parts = [func.__name__] + [str(arg) for arg in args]
                 cache_key = ":".join(key_parts)
             
-            # Try to get from cache
-            cached_result, found = await cache_layer.get(cache_key, namespace)
-            if found:
-                return cached_result
-            
-            # Execute function and cache result
-            result = await func(*args, **kwargs)
-            await cache_layer.set(cache_key, result, namespace, ttl_seconds)
-            
-            return result
+            call_kwargs = dict(kwargs, cache_layer=cache_layer) if takes_cache_layer else kwargs
+            return await cache_layer.get_or_compute(
+                cache_key,
+                lambda: func(*args, **call_kwargs),
+                namespace,
+                ttl_seconds,
+                stale_seconds
+            )
         return wrapper
     return decorator
 
@@ -748,12 +2094,14 @@ async def warm_cache_with_common_data(
         ]
     
     with logfire.span("Cache warmup", items_to_warm=len(common_queries)):
-        for query in common_queries:
-            await cache_layer.set(f"warmup_{query}", {"query": query, "warmed": True}, "warmup", 7200)
+        await cache_layer.set_many(
+            {f"warmup_{query}": {"query": query, "warmed": True} for query in common_queries},
+            "warmup",
+            7200
+        )
         
         if common_results:
-            for key, value in common_results.items():
-                await cache_layer.set(key, value, "common", 3600)
+            await cache_layer.set_many(common_results, "common", 3600)
         
         logfire.info("Cache warmup completed", queries_warmed=len(common_queries))
 
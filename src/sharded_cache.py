@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Sharded In-Process Cache for Ptolemies
+A thread-safe TTL cache split into lock-striped shards, each with its own LRU
+order and a hierarchical timing wheel that expires entries in O(1) without
+waiting for them to be read again. Capacity is bounded by entry count and by
+estimated bytes.
+"""
+
+import math
+import sys
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Any, Optional, Set, Tuple
+import time
+
+def estimate_size(value: Any) -> int:
+    """Approximate in-memory size of a value in bytes, following containers."""
+    size = 0
+    seen = set()
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+            stack.append(vars(obj))
+    return size
+
+class TimingWheel:
+    """Hierarchical timing wheel of key expiry times.
+    
+    Level 0 has ``slots`` buckets of one tick each; every higher level's
+    bucket spans a full turn of the level below. Scheduling and cancelling
+    are O(1). As time advances, due level-0 buckets are drained and
+    higher-level buckets are cascaded down when their span begins. Keys
+    beyond the top level's range wait in its furthest bucket and are
+    rescheduled when it cascades. Keys never expire before their time, and
+    at most one tick after it.
+    """
+    
+    def __init__(self, tick_seconds: float = 1.0, slots: int = 64, levels: int = 4, now: Optional[float] = None):
+        self.tick_seconds = tick_seconds
+        self.slots = slots
+        self.levels = levels
+        self.current_tick = int((time.time() if now is None else now) / tick_seconds)
+        self._buckets: List[List[Set[str]]] = [[set() for _ in range(slots)] for _ in range(levels)]
+        self._due: Dict[str, int] = {}
+        self._location: Dict[str, Tuple[int, int]] = {}
+        self._level_counts = [0] * levels
+    
+    def __len__(self) -> int:
+        return len(self._due)
+    
+    def schedule(self, key: str, expires_at: float):
+        """Schedule (or reschedule) ``key`` to expire at ``expires_at``."""
+        self.cancel(key)
+        due = max(math.ceil(expires_at / self.tick_seconds), self.current_tick + 1)
+        self._due[key] = due
+        self._place(key, due)
+    
+    def cancel(self, key: str):
+        location = self._location.pop(key, None)
+        if location is not None:
+            level, slot = location
+            self._buckets[level][slot].discard(key)
+            self._level_counts[level] -= 1
+            del self._due[key]
+    
+    def _place(self, key: str, due: int):
+        for level in range(self.levels):
+            shift = self.slots ** level
+            if due // shift - self.current_tick // shift < self.slots:
+                slot = (due // shift) % self.slots
+                break
+        else:
+            # Past the top level's range: park in its furthest bucket
+            level = self.levels - 1
+            shift = self.slots ** level
+            slot = (self.current_tick // shift + self.slots - 1) % self.slots
+        self._buckets[level][slot].add(key)
+        self._location[key] = (level, slot)
+        self._level_counts[level] += 1
+    
+    def advance(self, now: Optional[float] = None) -> List[str]:
+        """Move the wheel to ``now``; returns the keys that have expired."""
+        target = int((time.time() if now is None else now) / self.tick_seconds)
+        expired = []
+        if not self._due:
+            self.current_tick = max(self.current_tick, target)
+            return expired
+        
+        while self.current_tick < target:
+            if not self._level_counts[0]:
+                # Nothing can expire before the next level-1 boundary
+                boundary = (self.current_tick // self.slots + 1) * self.slots
+                self.current_tick = min(target, boundary - 1)
+                if self.current_tick == target:
+                    break
+            self.current_tick += 1
+            for level in range(self.levels - 1, 0, -1):
+                shift = self.slots ** level
+                if self.current_tick % shift == 0:
+                    self._cascade(level, (self.current_tick // shift) % self.slots)
+            bucket = self._buckets[0][self.current_tick % self.slots]
+            for key in bucket:
+                del self._location[key]
+                del self._due[key]
+                expired.append(key)
+            self._level_counts[0] -= len(bucket)
+            bucket.clear()
+            if not self._due:
+                self.current_tick = target
+        return expired
+    
+    def _cascade(self, level: int, slot: int):
+        keys = self._buckets[level][slot]
+        self._buckets[level][slot] = set()
+        self._level_counts[level] -= len(keys)
+        for key in keys:
+            self._place(key, self._due[key])
+    
+    def clear(self):
+        for level in self._buckets:
+            for bucket in level:
+                bucket.clear()
+        self._due.clear()
+        self._location.clear()
+        self._level_counts = [0] * self.levels
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "size", "tags")
+    
+    def __init__(self, value: Any, expires_at: float, size: int, tags: Tuple[str, ...]):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        self.tags = tags
+
+class _Shard:
+    """One lock-protected slice of a ``ShardedCache``."""
+    
+    def __init__(self, max_size: int, max_bytes: Optional[int], tick_seconds: float):
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.wheel = TimingWheel(tick_seconds)
+        self.tagged: Dict[str, Set[str]] = defaultdict(set)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    # Callers hold self.lock
+    
+    def remove(self, key: str) -> Optional[_Entry]:
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return None
+        self.bytes -= entry.size
+        self.wheel.cancel(key)
+        for tag in entry.tags:
+            self.tagged[tag].discard(key)
+            if not self.tagged[tag]:
+                del self.tagged[tag]
+        return entry
+    
+    def expire(self, now: float):
+        for key in self.wheel.advance(now):
+            entry = self.entries.pop(key)
+            self.bytes -= entry.size
+            for tag in entry.tags:
+                self.tagged[tag].discard(key)
+                if not self.tagged[tag]:
+                    del self.tagged[tag]
+            self.expirations += 1
+    
+    def make_room(self, size: int):
+        while self.entries and (len(self.entries) >= self.max_size
+                                or (self.max_bytes is not None and self.bytes + size > self.max_bytes)):
+            self.remove(next(iter(self.entries)))
+            self.evictions += 1
+    
+    def clear(self):
+        self.entries.clear()
+        self.wheel.clear()
+        self.tagged.clear()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+class ShardedCache:
+    """Thread-safe TTL cache with lock-striped shards.
+    
+    Keys hash to one of ``shards`` shards, each guarded by its own lock, so
+    threads and coroutines touching different keys rarely contend. Each
+    shard keeps its own LRU order and an equal share of ``max_size`` and
+    ``max_bytes``, so eviction is least-recently-used within a shard. Small
+    caches use fewer shards (at least ``min_shard_size`` entries each) to
+    keep eviction close to a global LRU. Entry sizes come from
+    ``estimate_size``. Expired entries are removed by each shard's timing
+    wheel whenever the shard is touched, and reads never return them.
+    """
+    
+    def __init__(
+        self,
+        max_size: int = 1000,
+        ttl_seconds: float = 3600,
+        max_bytes: Optional[int] = None,
+        shards: int = 16,
+        min_shard_size: int = 64,
+        tick_seconds: float = 1.0
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        shard_count = max(1, min(shards, max_size // max(min_shard_size, 1)))
+        self._shards = [
+            _Shard(
+                max_size=math.ceil(max_size / shard_count),
+                max_bytes=None if max_bytes is None else max_bytes // shard_count,
+                tick_seconds=tick_seconds
+            )
+            for _ in range(shard_count)
+        ]
+    
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get value from cache, or None if missing or expired."""
+        shard = self._shard(key)
+        now = time.time()
+        with shard.lock:
+            shard.expire(now)
+            entry = shard.entries.get(key)
+            if entry is not None and now < entry.expires_at:
+                shard.entries.move_to_end(key)
+                shard.hits += 1
+                return entry.value
+            if entry is not None:
+                # Expired within the current wheel tick
+                shard.remove(key)
+                shard.expirations += 1
+            shard.misses += 1
+            return None
+    
+    def put(self, key: str, value: Any, tags: Tuple[str, ...] = ()) -> bool:
+        """Put value in cache, recorded under ``tags`` for ``invalidate_tag``.
+        
+        Returns False when the value alone exceeds a shard's byte budget.
+        """
+        shard = self._shard(key)
+        size = estimate_size(value)
+        now = time.time()
+        with shard.lock:
+            shard.expire(now)
+            shard.remove(key)
+            if shard.max_bytes is not None and size > shard.max_bytes:
+                return False
+            shard.make_room(size)
+            
+            expires_at = now + self.ttl_seconds
+            shard.entries[key] = _Entry(value, expires_at, size, tuple(tags))
+            shard.bytes += size
+            shard.wheel.schedule(key, expires_at)
+            for tag in tags:
+                shard.tagged[tag].add(key)
+            return True
+    
+    def delete(self, key: str) -> bool:
+        shard = self._shard(key)
+        with shard.lock:
+            return shard.remove(key) is not None
+    
+    def invalidate_tag(self, tag: str) -> int:
+        """Remove every entry stored under ``tag``; returns the number removed."""
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                for key in list(shard.tagged.get(tag, ())):
+                    shard.remove(key)
+                    removed += 1
+        return removed
+    
+    def purge_expired(self) -> int:
+        """Expire due entries in every shard; returns the number removed."""
+        now = time.time()
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                before = shard.expirations
+                shard.expire(now)
+                removed += shard.expirations - before
+        return removed
+    
+    def clear(self) -> None:
+        """Clear all cache entries and counters."""
+        for shard in self._shards:
+            with shard.lock:
+                shard.clear()
+    
+    def keys(self) -> List[str]:
+        keys = []
+        for shard in self._shards:
+            with shard.lock:
+                keys.extend(shard.entries)
+        return keys
+    
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+    
+    def __contains__(self, key: str) -> bool:
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
+            return entry is not None and time.time() < entry.expires_at
+    
+    @property
+    def hits(self) -> int:
+        return sum(shard.hits for shard in self._shards)
+    
+    @property
+    def misses(self) -> int:
+        return sum(shard.misses for shard in self._shards)
+    
+    @property
+    def memory_bytes(self) -> int:
+        return sum(shard.bytes for shard in self._shards)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        hits = self.hits
+        misses = self.misses
+        total_requests = hits + misses
+        memory_bytes = self.memory_bytes
+        return {
+            "size": len(self),
+            "max_size": self.max_size,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total_requests if total_requests > 0 else 0.0,
+            "memory_usage_estimate": memory_bytes,
+            "memory_bytes": memory_bytes,
+            "max_bytes": self.max_bytes,
+            "shards": len(self._shards),
+            "evictions": sum(shard.evictions for shard in self._shards),
+            "expirations": sum(shard.expirations for shard in self._shards)
+        }
@@ -8,6 +8,7 @@ import asyncio
 import os
 import json
 import time
+from contextlib import nullcontext
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, UTC
 from dataclasses import dataclass, asdict
@@ -17,6 +18,9 @@ import numpy as np
 import logfire
 from surrealdb import Surreal
 
+from adaptive_concurrency import AIMDLimiter
+from connection_pool import SurrealConnectionPool
+
 # Configure Logfire
 logfire.configure(send_to_logfire=False)  # Configure appropriately for production
 
@@ -51,13 +55,20 @@ class VectorStoreConfig:
     similarity_threshold: float = 0.7
     max_results: int = 50
     batch_size: int = 100
+    pool_min_size: int = 1
+    pool_max_size: int = 10
+    pool_idle_timeout_seconds: float = 300.0
+    pool_health_check_seconds: float = 30.0
 
 class SurrealDBVectorStore:
     """SurrealDB vector storage implementation with OpenAI embeddings."""
     
-    def __init__(self, config: VectorStoreConfig = None):
+    def __init__(self, config: VectorStoreConfig = None, limiter: Optional[AIMDLimiter] = None):
         self.config = config or VectorStoreConfig()
-        self.db: Optional[Surreal] = None
+        # A connection pool; it offers the client's query/create, so a single client also works
+        self.db: Optional[SurrealConnectionPool] = None
+        # Adaptive concurrency limit every SurrealDB call counts against, if any
+        self.limiter = limiter
         self.openai_client = None
         self._initialize_clients()
     
@@ -86,12 +97,26 @@ class SurrealDBVectorStore:
                 namespace = os.getenv("SURREALDB_NAMESPACE", "ptolemies")
                 database = os.getenv("SURREALDB_DATABASE", "knowledge")
                 
-                logfire.info("Connecting to SurrealDB", url=url, username=username, namespace=namespace, database=database)
+                pool_size = int(os.getenv("SURREALDB_POOL_SIZE", self.config.pool_max_size))
+                
+                logfire.info("Connecting to SurrealDB", url=url, username=username, namespace=namespace,
+                           database=database, pool_size=pool_size)
                 
-                self.db = Surreal()
-                await self.db.connect(url)
-                await self.db.signin({"user": username, "pass": password})
-                await self.db.use(namespace, database)
+                async def open_connection() -> Surreal:
+                    client = Surreal()
+                    await client.connect(url)
+                    await client.signin({"user": username, "pass": password})
+                    await client.use(namespace, database)
+                    return client
+                
+                self.db = SurrealConnectionPool(
+                    open_connection,
+                    min_size=self.config.pool_min_size,
+                    max_size=pool_size,
+                    idle_timeout_seconds=self.config.pool_idle_timeout_seconds,
+                    health_check_interval_seconds=self.config.pool_health_check_seconds
+                )
+                await self.db.start()
                 
                 # Initialize schema
                 await self._initialize_schema()
@@ -101,9 +126,19 @@ class SurrealDBVectorStore:
                 
         except Exception as e:
             logfire.error("Failed to connect to SurrealDB", error=str(e))
+            if self.db:
+                await self.db.close()
             self.db = None  # Ensure db is None on failure
             return False
     
+    async def _query(self, *args: Any) -> Any:
+        async with self.limiter.slot() if self.limiter else nullcontext():
+            return await self.db.query(*args)
+    
+    async def _create(self, *args: Any) -> Any:
+        async with self.limiter.slot() if self.limiter else nullcontext():
+            return await self.db.create(*args)
+    
     @logfire.instrument("surrealdb_schema_init")
     async def _initialize_schema(self):
         """Initialize SurrealDB schema for vector storage."""
@@ -136,7 +171,7 @@ class SurrealDBVectorStore:
                 ]
                 
                 for query in schema_queries:
-                    await self.db.query(query)
+                    await self._query(query)
                 
                 logfire.info("SurrealDB schema initialized successfully")
                 
@@ -211,14 +246,13 @@ class SurrealDBVectorStore:
                     
                     stored_chunks.append(chunk_data)
                 
-                # Store in batches
+                # Store in batches, each batch's records concurrently across pooled connections
                 success_count = 0
                 for i in range(0, len(stored_chunks), self.config.batch_size):
                     batch = stored_chunks[i:i + self.config.batch_size]
                     
-                    for chunk_data in batch:
-                        await self.db.create("document_chunks", chunk_data)
-                        success_count += 1
+                    await asyncio.gather(*(self._create("document_chunks", chunk_data) for chunk_data in batch))
+                    success_count += len(batch)
                     
                     logfire.info("Stored chunk batch", 
                                batch_size=len(batch), 
@@ -282,7 +316,7 @@ class SurrealDBVectorStore:
                 LIMIT {limit};
                 """
                 
-                result = await self.db.query(query_str)
+                result = await self._query(query_str)
                 
                 # Process results
                 search_results = []
@@ -346,7 +380,7 @@ class SurrealDBVectorStore:
                 START {offset};
                 """
                 
-                result = await self.db.query(query_str)
+                result = await self._query(query_str)
                 
                 chunks = []
                 if result and len(result) > 0:
@@ -396,13 +430,16 @@ class SurrealDBVectorStore:
                     "date_range": {}
                 }
                 
+                # Independent queries, run concurrently across pooled connections
+                results = await asyncio.gather(*(self._query(query) for query in stats_queries))
+                
                 # Total chunks
-                result = await self.db.query(stats_queries[0])
+                result = results[0]
                 if result and len(result) > 0 and len(result[0]) > 0:
                     stats["total_chunks"] = result[0][0].get("count", 0)
                 
                 # Chunks by source
-                result = await self.db.query(stats_queries[1])
+                result = results[1]
                 if result and len(result) > 0:
                     for record in result[0]:
                         source = record.get("source_name", "unknown")
@@ -410,12 +447,12 @@ class SurrealDBVectorStore:
                         stats["chunks_by_source"][source] = count
                 
                 # Average quality
-                result = await self.db.query(stats_queries[2])
+                result = results[2]
                 if result and len(result) > 0 and len(result[0]) > 0:
                     stats["average_quality"] = result[0][0].get("avg_quality", 0.0)
                 
                 # Date range
-                result = await self.db.query(stats_queries[3])
+                result = results[3]
                 if result and len(result) > 0 and len(result[0]) > 0:
                     record = result[0][0]
                     stats["date_range"] = {
@@ -423,6 +460,9 @@ class SurrealDBVectorStore:
                         "latest": record.get("latest")
                     }
                 
+                if isinstance(self.db, SurrealConnectionPool):
+                    stats["connection_pool"] = self.db.stats()
+                
                 logfire.info("Storage statistics retrieved", stats=stats)
                 return stats
                 
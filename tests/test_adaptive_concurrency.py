@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test suite for adaptive concurrency limits
+"""
+
+import pytest
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Set logfire config for testing
+os.environ['LOGFIRE_IGNORE_NO_CONFIG'] = '1'
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from adaptive_concurrency import AIMDLimiter, BackendLimiters, ConcurrencyLimitExceeded
+
+class TestAIMDLimiter:
+    """Test AIMD concurrency limiter."""
+    
+    @pytest.mark.asyncio
+    async def test_additive_increase_when_fast_and_busy(self):
+        """Test fast completions under load grow the limit by about one per round."""
+        limiter = AIMDLimiter("test", target_latency_ms=1000, initial_limit=4, max_limit=10)
+        
+        for _ in range(3):
+            slots = [await limiter.acquire() for _ in range(limiter.current_limit)]
+            for started in slots:
+                limiter.release(started)
+        
+        assert limiter.current_limit == 5
+        assert limiter.in_flight == 0
+    
+    @pytest.mark.asyncio
+    async def test_no_increase_when_idle(self):
+        """Test the limit does not grow while it is barely used."""
+        limiter = AIMDLimiter("test", target_latency_ms=1000, initial_limit=4)
+        
+        for _ in range(20):
+            limiter.release(await limiter.acquire())
+        
+        assert limiter.current_limit == 4
+    
+    @pytest.mark.asyncio
+    async def test_multiplicative_decrease_once_per_burst(self):
+        """Test slow completions cut the limit once for operations started before the cut."""
+        limiter = AIMDLimiter("test", target_latency_ms=1, initial_limit=10, backoff=0.5)
+        
+        slots = [await limiter.acquire() for _ in range(4)]
+        time.sleep(0.005)
+        for started in slots:
+            limiter.release(started)
+        assert limiter.current_limit == 5
+        assert limiter.stats()["decreases"] == 1
+        
+        # A timeout always counts as overload
+        started = await limiter.acquire()
+        limiter.release(started, overloaded=True)
+        assert limiter.current_limit == 2
+        
+        for _ in range(5):
+            limiter.release(await limiter.acquire(), overloaded=True)
+        assert limiter.current_limit == 1
+    
+    @pytest.mark.asyncio
+    async def test_queue_then_reject(self):
+        """Test excess work queues, then is rejected when the queue is full or the wait expires."""
+        limiter = AIMDLimiter("test", target_latency_ms=1000, initial_limit=1, max_limit=1,
+                              max_queue=1, max_queue_wait_ms=50)
+        held = await limiter.acquire()
+        
+        queued = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(ConcurrencyLimitExceeded):
+            await limiter.acquire()
+        
+        # The queued caller gets the released slot
+        limiter.release(held)
+        limiter.release(await queued)
+        
+        held = await limiter.acquire()
+        with pytest.raises(ConcurrencyLimitExceeded):
+            await limiter.acquire()
+        
+        stats = limiter.stats()
+        assert stats["rejected"] == 2
+        assert stats["queue_depth"] == 0
+        assert stats["in_flight"] == 1
+        limiter.release(held)
+    
+    @pytest.mark.asyncio
+    async def test_slot_context_manager(self):
+        """Test the slot context manager releases on error and counts timeouts as overload."""
+        limiter = AIMDLimiter("test", target_latency_ms=1000, initial_limit=4, backoff=0.5)
+        
+        with pytest.raises(asyncio.TimeoutError):
+            async with limiter.slot():
+                raise asyncio.TimeoutError()
+        
+        assert limiter.in_flight == 0
+        assert limiter.current_limit == 2
+
+class TestBackendLimiters:
+    """Test per-backend limiters."""
+    
+    def test_independent_limits(self):
+        """Test each backend gets its own limiter with shared options."""
+        limiters = BackendLimiters(target_latency_ms=100, initial_limit=3)
+        
+        assert limiters["surrealdb"] is limiters["surrealdb"]
+        assert limiters["surrealdb"] is not limiters["neo4j"]
+        assert limiters["neo4j"].current_limit == 3
+        assert set(limiters.stats()) == {"surrealdb", "neo4j"}
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test suite for Cache Payload Codecs
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from cache_codecs import (
+    COMPRESSORS,
+    FORMATS,
+    DICTIONARIES,
+    MissingDictionaryError,
+    benchmark_codecs,
+    bind_dictionary,
+    choose_codec,
+    register_dictionary,
+    synthetic_result_payloads,
+    train_dictionary
+)
+
+class TestJsonFormat:
+    """Test the JSON format."""
+    
+    def test_wide_integers_round_trip_exactly(self):
+        """Test integers beyond 64 bits are not read back as floats."""
+        value = {"big": 2 ** 70, "negative": -(2 ** 70), "rows": [{"n": 2 ** 64}, {"n": 1}]}
+        for name in ("json", "columnar"):
+            decoded = FORMATS[name].loads(FORMATS[name].dumps(value))
+            
+            assert decoded == value
+            assert type(decoded["big"]) is int
+
+class TestColumnarFormat:
+    """Test the columnar result-list format."""
+    
+    def test_round_trip_result_lists(self):
+        """Test tables of results round-trip with their column types."""
+        value = {
+            "query": "fastapi",
+            "results": [
+                {"id": "a", "score": 0.5, "rank": 1, "topics": ["x"], "chunk_index": None},
+                {"id": "b\u00e9\U0001f600", "score": 0.25, "rank": 2, "topics": [], "chunk_index": 3}
+            ],
+            "nested": [{"pages": [{"n": 1}, {"n": 2}]}],
+            "empty": []
+        }
+        columnar = FORMATS["columnar"]
+        decoded = columnar.loads(columnar.dumps(value))
+        
+        assert decoded == value
+        assert type(decoded["results"][0]["rank"]) is int
+    
+    def test_values_without_tables(self):
+        """Test values without result lists are stored as plain JSON."""
+        columnar = FORMATS["columnar"]
+        for value in ["text", 3, [1, 2], {"a": [{"x": 1}]}, [{"a": 1}, {"b": 2}]]:
+            assert columnar.loads(columnar.dumps(value)) == value
+    
+    def test_smaller_than_json_for_scores(self):
+        """Test float columns are stored as binary rather than text."""
+        value = [{"id": str(i), "score": i / 7} for i in range(100)]
+        assert len(FORMATS["columnar"].dumps(value)) < len(FORMATS["json"].dumps(value))
+
+class TestCompressors:
+    """Test compressors and dictionaries."""
+    
+    @pytest.mark.parametrize("name", [name for name, c in COMPRESSORS.items() if not c.uses_dictionary])
+    def test_round_trip(self, name):
+        """Test every plain compressor round-trips."""
+        compressor = COMPRESSORS[name]
+        data = b"fastapi dependency injection " * 50
+        assert compressor.decompress(compressor.compress(data)) == data
+    
+    def test_dictionary_compression(self):
+        """Test a trained dictionary shrinks small payloads and is required to read them."""
+        payloads = [FORMATS["json"].dumps(sample) for sample in synthetic_result_payloads(count=12, results=2)]
+        dict_id = register_dictionary(train_dictionary(payloads[:10], size=4096))
+        compressor = bind_dictionary("deflate-dict", dict_id)
+        
+        blob = compressor.compress(payloads[11])
+        assert len(blob) < len(COMPRESSORS["deflate"].compress(payloads[11]))
+        assert COMPRESSORS["deflate-dict"].decompress(blob) == payloads[11]
+        
+        del DICTIONARIES[dict_id]
+        with pytest.raises(MissingDictionaryError) as error:
+            COMPRESSORS["deflate-dict"].decompress(blob)
+        assert error.value.dictionary_id == dict_id
+    
+    def test_unbound_dictionary_compressor(self):
+        """Test dictionary compressors refuse to compress without a dictionary."""
+        with pytest.raises(ValueError):
+            COMPRESSORS["deflate-dict"].compress(b"data")
+
+class TestBenchmark:
+    """Test codec benchmarking."""
+    
+    def test_benchmark_and_choose(self):
+        """Test every pair is measured and the choice respects the size tolerance."""
+        samples = synthetic_result_payloads(count=6, results=5)
+        results = benchmark_codecs(samples, repeat=1)
+        
+        assert {(r["format"], r["compressor"]) for r in results} == {
+            (f, c) for f in FORMATS for c in COMPRESSORS
+        }
+        best = choose_codec(results, size_tolerance=0.1)
+        candidates = [r for r in results if r["format"] != "pickle"]
+        assert best["format"] != "pickle"
+        assert best["bytes"] <= min(r["bytes"] for r in candidates) * 1.1
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test suite for cache stampede protection helpers
+"""
+
+import pytest
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Set logfire config for testing
+os.environ['LOGFIRE_IGNORE_NO_CONFIG'] = '1'
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from cache_stampede import SingleFlight, should_refresh_early, unwrap_value, wrap_value
+
+
+class TestEnvelope:
+    """Test freshness envelopes."""
+    
+    def test_round_trip(self):
+        """Test a wrapped value unwraps with its metadata."""
+        stored = wrap_value({"a": 1}, 60, 0.25, now=1000.0)
+        
+        assert unwrap_value(stored) == ({"a": 1}, 1060.0, 0.25)
+    
+    def test_plain_values_never_go_stale(self):
+        """Test values cached without an envelope have no freshness limit."""
+        assert unwrap_value({"a": 1}) == ({"a": 1}, None, 0.0)
+        assert unwrap_value("value") == ("value", None, 0.0)
+
+
+class TestShouldRefreshEarly:
+    """Test the XFetch early refresh decision."""
+    
+    def test_never_refreshes_far_from_expiry(self):
+        """Test a value an hour from expiry with a fast recompute stays put."""
+        now = time.time()
+        assert not any(should_refresh_early(now + 3600, 0.01, 1.0, now) for _ in range(1000))
+    
+    def test_always_refreshes_at_expiry(self):
+        """Test a value at its expiry time is always refreshed."""
+        now = time.time()
+        assert all(should_refresh_early(now, 0.5, 1.0, now) for _ in range(100))
+    
+    def test_disabled(self):
+        """Test beta 0, unknown compute time and plain values disable it."""
+        now = time.time()
+        assert not should_refresh_early(now, 0.5, 0.0, now)
+        assert not should_refresh_early(now, 0.0, 1.0, now)
+        assert not should_refresh_early(None, 0.5, 1.0, now)
+
+
+class TestSingleFlight:
+    """Test coalescing of concurrent calls."""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test concurrent callers of one key run the call once."""
+        flights = SingleFlight()
+        calls = 0
+        
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+        
+        results = await asyncio.gather(*(flights.run("key", compute) for _ in range(10)))
+        
+        assert results == [1] * 10
+        assert calls == 1
+        assert flights.stats() == {"in_flight": 0, "started": 1, "coalesced": 9}
+        
+        # Once finished, the next call runs again
+        assert await flights.run("key", compute) == 2
+    
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_waiter(self):
+        """Test a failed call raises in every caller and is not cached."""
+        flights = SingleFlight()
+        
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("backend down")
+        
+        results = await asyncio.gather(*(flights.run("key", fail) for _ in range(3)), return_exceptions=True)
+        
+        assert all(isinstance(result, ValueError) for result in results)
+        assert not flights.in_flight("key")
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_call(self):
+        """Test other waiters still get the result when one caller is cancelled."""
+        flights = SingleFlight()
+        
+        async def compute():
+            await asyncio.sleep(0.02)
+            return "done"
+        
+        first = asyncio.create_task(flights.run("key", compute))
+        second = asyncio.create_task(flights.run("key", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        
+        assert await second == "done"
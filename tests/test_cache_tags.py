@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test suite for source tags of cached results
+"""
+
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+# Set logfire config for testing
+os.environ['LOGFIRE_IGNORE_NO_CONFIG'] = '1'
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from cache_tags import UNSOURCED_TAG, invalidation_tags, source_names, source_tag, source_tags
+
+
+@dataclass
+class Result:
+    id: str
+    source_name: str
+
+
+class TestSourceTags:
+    """Test source extraction and tagging."""
+    
+    def test_source_names_from_nested_results(self):
+        """Test sources are found in nested dicts, lists and result objects."""
+        value = {
+            "results": [
+                {"id": "1", "source": "FastAPI"},
+                {"id": "2", "source_name": "Neo4j", "related": [{"source": "FastAPI"}]}
+            ],
+            "objects": (Result("3", "SurrealDB"),),
+            "metadata": {"source": None, "session_id": "s"}
+        }
+        
+        assert source_names(value) == {"FastAPI", "Neo4j", "SurrealDB"}
+    
+    def test_source_tags(self):
+        """Test tags are sorted and results without sources get the unsourced tag."""
+        assert source_tags([{"source": "b"}, {"source": "a"}]) == [source_tag("a"), source_tag("b")]
+        assert source_tags({"results": []}) == [UNSOURCED_TAG]
+    
+    def test_invalidation_tags_include_unsourced(self):
+        """Test invalidating a source also drops results that referenced nothing."""
+        assert invalidation_tags(["FastAPI"]) == [UNSOURCED_TAG, source_tag("FastAPI")]
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test suite for vocabulary-based concept extraction
+"""
+
+import pytest
+import json
+import os
+import sys
+from pathlib import Path
+
+# Set logfire config for testing
+os.environ['LOGFIRE_IGNORE_NO_CONFIG'] = '1'
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from concept_extraction import (
+    ConceptVocabulary,
+    ConceptExtractor,
+    VocabularyTerm,
+    tokenize
+)
+
+
+class TestConceptVocabulary:
+    """Test single-pass vocabulary matching."""
+    
+    def test_tokenize(self):
+        """Test lowercase alphanumeric tokenization."""
+        assert tokenize("FastAPI, Neo4j & Redis!") == ["fastapi", "neo4j", "redis"]
+    
+    def test_count_matches_whole_tokens_and_plurals(self):
+        """Test term counting on token boundaries."""
+        vocabulary = ConceptVocabulary.default()
+        counts = vocabulary.count(tokenize("FastAPI serves API endpoints; each endpoint is an api."))
+        
+        assert counts["api"] == 2
+        assert counts["endpoint"] == 2
+        assert counts["fastapi"] == 1
+    
+    def test_count_multi_word_terms(self):
+        """Test phrases are matched alongside single tokens."""
+        vocabulary = ConceptVocabulary([
+            VocabularyTerm("machine learning", "Machine Learning", "Technical", ""),
+            VocabularyTerm("learning", "Learning", "Technical", "")
+        ])
+        counts = vocabulary.count(tokenize("Machine learning and deep learning"))
+        
+        assert counts["machine learning"] == 1
+        assert counts["learning"] == 2
+    
+    def test_extract_applies_topic_weight_and_threshold(self):
+        """Test topic boost and per-term minimum frequency."""
+        vocabulary = ConceptVocabulary.default()
+        concepts = vocabulary.extract(["authentication"], ["authentication via middleware with redis"])
+        by_name = {c["name"]: c for c in concepts}
+        
+        assert by_name["Authentication"]["frequency"] == 11
+        assert by_name["Authentication"]["confidence_score"] == 0.9
+        assert "Middleware" not in by_name
+        assert by_name["Redis"]["frequency"] == 1
+        assert by_name["Redis"]["related_topics"] == ["authentication"]
+    
+    def test_topic_weight_skips_framework_concepts(self):
+        """Test a framework named as a topic keeps its counted frequency."""
+        vocabulary = ConceptVocabulary.default()
+        concepts = vocabulary.extract(["redis", "api"], ["redis api"])
+        by_name = {c["name"]: c for c in concepts}
+        
+        assert by_name["Redis"]["frequency"] == 1
+        assert by_name["Redis"]["confidence_score"] == 0.2
+        assert by_name["Api"]["frequency"] == 11
+    
+    def test_from_file(self, tmp_path):
+        """Test loading a vocabulary from JSON."""
+        path = tmp_path / "vocabulary.json"
+        path.write_text(json.dumps([
+            {"term": "vector search", "category": "Technical", "description": "Similarity search"},
+            {"term": "pydantic", "name": "Pydantic", "category": "Framework"}
+        ]))
+        
+        vocabulary = ConceptVocabulary.from_file(path)
+        
+        assert len(vocabulary) == 2
+        concepts = vocabulary.extract([], ["Pydantic models power vector search"])
+        assert {c["name"] for c in concepts} == {"Pydantic", "Vector Search"}
+
+
+class TestConceptExtractor:
+    """Test batch extraction."""
+    
+    @pytest.mark.asyncio
+    async def test_extract_many_inline(self):
+        """Test small batches run in-process and keep order."""
+        extractor = ConceptExtractor(max_workers=4, min_parallel_documents=10)
+        
+        results = await extractor.extract_many([([], ["redis"]), ([], ["neo4j"])])
+        
+        assert [[c["name"] for c in r] for r in results] == [["Redis"], ["Neo4j"]]
+        assert extractor._executor is None
+    
+    @pytest.mark.asyncio
+    async def test_extract_many_process_pool(self):
+        """Test large batches are spread over worker processes."""
+        extractor = ConceptExtractor(max_workers=2, min_parallel_documents=2)
+        items = [([], ["redis"]), ([], ["neo4j neo4j"]), ([], ["nothing here"])]
+        
+        try:
+            results = await extractor.extract_many(items)
+        finally:
+            extractor.close()
+        
+        assert [[(c["name"], c["frequency"]) for c in r] for r in results] == [
+            [("Redis", 1)],
+            [("Neo4j", 2)],
+            []
+        ]
+        assert extractor._executor is None
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Test suite for database connection pooling
+"""
+
+import pytest
+import asyncio
+import os
+import sys
+from unittest.mock import AsyncMock
+from pathlib import Path
+
+# Set logfire config for testing
+os.environ['LOGFIRE_IGNORE_NO_CONFIG'] = '1'
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from websockets.exceptions import ConnectionClosed
+
+from connection_pool import SurrealConnectionPool, PoolTimeoutError, PoolMetrics
+
+def make_factory(clients):
+    """Factory returning a new AsyncMock client per call, recorded in ``clients``."""
+    async def factory():
+        client = AsyncMock()
+        clients.append(client)
+        return client
+    return factory
+
+class TestSurrealConnectionPool:
+    """Test SurrealDB connection pool."""
+    
+    @pytest.mark.asyncio
+    async def test_start_opens_min_size(self):
+        """Test starting the pool opens min_size connections."""
+        clients = []
+        pool = SurrealConnectionPool(make_factory(clients), min_size=2, max_size=4,
+                                     health_check_interval_seconds=0)
+        await pool.start()
+        
+        assert len(clients) == 2
+        assert pool.stats()["size"] == 2
+        
+        await pool.close()
+        assert all(client.close.await_count == 1 for client in clients)
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_queries_use_separate_connections(self):
+        """Test concurrent queries grow the pool instead of sharing one client."""
+        clients = []
+        release = asyncio.Event()
+        
+        async def factory():
+            client = AsyncMock()
+            
+            async def query(sql):
+                await release.wait()
+                return [[{"ok": True}]]
+            
+            client.query.side_effect = query
+            clients.append(client)
+            return client
+        
+        pool = SurrealConnectionPool(factory, min_size=1, max_size=3, health_check_interval_seconds=0)
+        await pool.start()
+        
+        tasks = [asyncio.ensure_future(pool.query("SELECT 1")) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        assert pool.stats()["in_use"] == 3
+        assert len(clients) == 3
+        
+        release.set()
+        await asyncio.gather(*tasks)
+        assert all(client.query.await_count == 1 for client in clients)
+        assert pool.stats()["in_use"] == 0
+        
+        await pool.close()
+    
+    @pytest.mark.asyncio
+    async def test_least_loaded_checkout(self):
+        """Test checkout prefers the connection with the fewest queries in flight."""
+        pool = SurrealConnectionPool(make_factory([]), min_size=2, max_size=2, max_in_flight=2,
+                                     health_check_interval_seconds=0)
+        await pool.start()
+        
+        first = await pool.acquire()
+        second = await pool.acquire()
+        third = await pool.acquire()
+        
+        assert first is not second
+        assert third.in_flight == 2
+        
+        for connection in (first, second, third):
+            await pool.release(connection)
+        await pool.close()
+    
+    @pytest.mark.asyncio
+    async def test_acquire_timeout_when_exhausted(self):
+        """Test callers wait for a free connection and time out."""
+        pool = SurrealConnectionPool(make_factory([]), min_size=1, max_size=1,
+                                     acquire_timeout_seconds=0.05, health_check_interval_seconds=0)
+        await pool.start()
+        
+        held = await pool.acquire()
+        with pytest.raises(PoolTimeoutError):
+            await pool.acquire()
+        assert pool.stats()["timeouts"] == 1
+        
+        # A released connection is handed to the next waiter
+        waiter = asyncio.ensure_future(pool.acquire())
+        await asyncio.sleep(0)
+        await pool.release(held)
+        assert await waiter is held
+        
+        await pool.release(held)
+        await pool.close()
+    
+    @pytest.mark.asyncio
+    async def test_broken_connection_discarded(self):
+        """Test a connection error discards the connection."""
+        clients = []
+        pool = SurrealConnectionPool(make_factory(clients), min_size=1, max_size=2,
+                                     health_check_interval_seconds=0)
+        await pool.start()
+        clients[0].query.side_effect = ConnectionError("socket closed")
+        
+        with pytest.raises(ConnectionError):
+            await pool.query("SELECT 1")
+        
+        assert pool.stats()["size"] == 0
+        assert pool.stats()["discarded"] == 1
+        clients[0].close.assert_awaited_once()
+        
+        await pool.close()
+    
+    @pytest.mark.asyncio
+    async def test_closed_websocket_discarded(self):
+        """Test a dropped websocket discards the connection instead of returning it."""
+        clients = []
+        pool = SurrealConnectionPool(make_factory(clients), min_size=1, max_size=2,
+                                     health_check_interval_seconds=0)
+        await pool.start()
+        clients[0].query.side_effect = ConnectionClosed(None, None)
+        
+        with pytest.raises(ConnectionClosed):
+            await pool.query("SELECT 1")
+        
+        assert pool.stats()["size"] == 0
+        assert pool.stats()["discarded"] == 1
+        
+        # The next query opens a fresh connection rather than reusing the dead one
+        await pool.query("SELECT 1")
+        clients[1].query.assert_awaited_once_with("SELECT 1")
+        
+        await pool.close()
+    
+    @pytest.mark.asyncio
+    async def test_health_check_replaces_failed_connections(self):
+        """Test failing idle connections are replaced up to min_size."""
+        clients = []
+        pool = SurrealConnectionPool(make_factory(clients), min_size=2, max_size=4,
+                                     health_check_interval_seconds=0)
+        await pool.start()
+        clients[0].query.side_effect = ConnectionError("gone")
+        
+        assert await pool.check_health() == 1
+        assert pool.stats()["size"] == 1
+        
+        await pool.fill()
+        assert pool.stats()["size"] == 2
+        assert len(clients) == 3
+        
+        await pool.close()
+    
+    @pytest.mark.asyncio
+    async def test_reap_idle_keeps_min_size(self):
+        """Test idle connections above min_size are closed."""
+        pool = SurrealConnectionPool(make_factory([]), min_size=1, max_size=3,
+                                     idle_timeout_seconds=60, health_check_interval_seconds=0)
+        await pool.start()
+        connections = [await pool.acquire() for _ in range(3)]
+        for connection in connections:
+            await pool.release(connection)
+        
+        assert await pool.reap_idle() == 0
+        assert await pool.reap_idle(now=connections[-1].last_used + 61) == 2
+        assert pool.stats()["size"] == 1
+        
+        await pool.close()
+
+class TestPoolMetrics:
+    """Test Neo4j pool metrics."""
+    
+    def test_saturation_and_acquisition(self):
+        """Test saturation and average acquisition time."""
+        metrics = PoolMetrics(max_size=4)
+        metrics.session_opened()
+        metrics.session_opened()
+        metrics.record_transaction(write=False, attempts=2, acquisition_ms=3.0, failed=False)
+        metrics.record_transaction(write=True, attempts=1, acquisition_ms=1.0, failed=True)
+        metrics.session_closed()
+        
+        stats = metrics.to_dict()
+        assert stats["saturation"] == 0.25
+        assert stats["peak_sessions_in_use"] == 2
+        assert stats["avg_acquisition_ms"] == 2.0
+        assert stats["retried_attempts"] == 1
+        assert stats["failed_transactions"] == 1
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test suite for the versioned Cypher result cache
+"""
+
+import pytest
+import os
+import sys
+from unittest.mock import AsyncMock
+from pathlib import Path
+
+# Set logfire config for testing
+os.environ['LOGFIRE_IGNORE_NO_CONFIG'] = '1'
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from cypher_cache import CypherResultCache, query_cache_key
+
+
+class TestQueryCacheKey:
+    """Test cache key derivation."""
+    
+    def test_key_depends_on_query_and_parameters(self):
+        """Test parameter order does not matter but values do."""
+        query = "MATCH (n) WHERE n.name = $name RETURN n LIMIT $limit"
+        
+        assert query_cache_key(query, {"name": "a", "limit": 5}) == query_cache_key(query, {"limit": 5, "name": "a"})
+        assert query_cache_key(query, {"name": "a", "limit": 5}) != query_cache_key(query, {"name": "b", "limit": 5})
+        assert query_cache_key(query) != query_cache_key(query + " ")
+
+
+class TestCypherResultCache:
+    """Test version tagging, invalidation and bounds."""
+    
+    @pytest.mark.asyncio
+    async def test_fetch_caches_within_version(self):
+        """Test a second fetch at the same version does not load again."""
+        cache = CypherResultCache(version_check_seconds=60)
+        read_version = AsyncMock(return_value=3)
+        load = AsyncMock(return_value=["row"])
+        
+        assert await cache.fetch("k", read_version, load) == ["row"]
+        assert await cache.fetch("k", read_version, load) == ["row"]
+        
+        assert load.await_count == 1
+        assert read_version.await_count == 1
+        assert cache.stats()["hit_rate"] == 0.5
+    
+    @pytest.mark.asyncio
+    async def test_invalidate_forces_version_recheck(self):
+        """Test a local write makes the next fetch re-read the version and reload."""
+        cache = CypherResultCache(version_check_seconds=60)
+        read_version = AsyncMock(side_effect=[1, 2])
+        load = AsyncMock(side_effect=["old", "new"])
+        
+        assert await cache.fetch("k", read_version, load) == "old"
+        cache.invalidate()
+        assert await cache.fetch("k", read_version, load) == "new"
+        assert cache.version == 2
+    
+    @pytest.mark.asyncio
+    async def test_default_checks_version_before_every_read(self):
+        """Test a write by another process is seen on the very next read by default."""
+        cache = CypherResultCache()
+        read_version = AsyncMock(side_effect=[1, 1, 2])
+        load = AsyncMock(side_effect=["old", "new"])
+        
+        assert await cache.fetch("k", read_version, load) == "old"
+        assert await cache.fetch("k", read_version, load) == "old"
+        assert await cache.fetch("k", read_version, load) == "new"
+        
+        assert read_version.await_count == 3
+        assert load.await_count == 2
+    
+    def test_overlapping_version_read_is_ignored(self):
+        """Test a version read that started before a local write is not adopted."""
+        cache = CypherResultCache()
+        epoch = cache.epoch
+        cache.invalidate()
+        
+        cache.observe_version(4, epoch)
+        assert cache.version is None
+        
+        cache.observe_version(5, cache.epoch)
+        cache.observe_version(4, cache.epoch)
+        assert cache.version == 5
+    
+    def test_results_from_superseded_version_are_dropped(self):
+        """Test put ignores values read at an older version."""
+        cache = CypherResultCache()
+        cache.observe_version(2, cache.epoch)
+        
+        cache.put("k", "stale", 1)
+        assert cache.get("k", 2) is CypherResultCache.MISS
+    
+    def test_entries_bounded_by_lru(self):
+        """Test the least recently used entry is evicted first."""
+        cache = CypherResultCache(max_entries=2)
+        cache.observe_version(1, cache.epoch)
+        cache.put("a", 1, 1)
+        cache.put("b", 2, 1)
+        cache.get("a", 1)
+        cache.put("c", 3, 1)
+        
+        assert cache.get("b", 1) is CypherResultCache.MISS
+        assert cache.get("a", 1) == 1
+        assert cache.stats()["entries"] == 2
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test suite for the shared bulk graph importer
+"""
+
+import pytest
+import csv
+import os
+import sys
+from unittest.mock import Mock, AsyncMock
+from pathlib import Path
+
+# Set logfire config for testing
+os.environ['LOGFIRE_IGNORE_NO_CONFIG'] = '1'
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from graph_bulk_import import (
+    AdminImportWriter,
+    BulkImportConfig,
+    Neo4jBulkWriter,
+    SurrealRowStream,
+    validate_identifier,
+    _records
+)
+
+
+def make_writer(execute_write=None, batch_size=2, workers=2):
+    """Bulk writer over a mock driver."""
+    session = AsyncMock()
+    session.__aenter__.return_value = session
+    session.execute_write = execute_write or AsyncMock()
+    driver = Mock()
+    driver.session = Mock(return_value=session)
+    config = BulkImportConfig(batch_size=batch_size, workers=workers)
+    return Neo4jBulkWriter(config, driver=driver), session
+
+
+class TestHelpers:
+    """Test identifier validation and response normalization."""
+    
+    def test_validate_identifier(self):
+        assert validate_identifier("HAS_CHUNK") == "HAS_CHUNK"
+        with pytest.raises(ValueError):
+            validate_identifier("HAS_CHUNK]->(x) DETACH DELETE x //")
+    
+    def test_records_shapes(self):
+        rows = [{"id": "chunk:1", "title": "A"}]
+        assert _records([{"result": rows, "status": "OK"}]) == rows
+        assert _records([rows]) == rows
+        assert _records(rows) == rows
+        assert _records(None) == []
+    
+    def test_config_from_env(self, monkeypatch):
+        monkeypatch.setenv("NEO4J_USER", "importer")
+        monkeypatch.delenv("NEO4J_USERNAME", raising=False)
+        monkeypatch.delenv("NEO4J_PASSWORD", raising=False)
+        
+        config = BulkImportConfig.from_env(neo4j_password="ptolemies", batch_size=50)
+        
+        assert config.neo4j_user == "importer"
+        assert config.neo4j_password == "ptolemies"
+        assert config.batch_size == 50
+
+
+class TestSurrealRowStream:
+    """Test paged streaming."""
+    
+    @pytest.mark.asyncio
+    async def test_stream_pages_until_short_page(self):
+        stream = SurrealRowStream(BulkImportConfig(page_size=2))
+        stream.db = AsyncMock()
+        stream.db.query.side_effect = [
+            [{"result": [{"id": 1}, {"id": 2}]}],
+            [{"result": [{"id": 3}]}]
+        ]
+        
+        rows = [row async for row in stream.stream("document_chunks", fields=["id"], order_by="id")]
+        
+        assert [row["id"] for row in rows] == ["1", "2", "3"]
+        first_sql, first_vars = stream.db.query.call_args_list[0].args
+        assert "LIMIT $limit START $start" in first_sql
+        assert first_vars == {"limit": 2, "start": 0}
+        assert stream.db.query.call_args_list[1].args[1]["start"] == 2
+
+
+class TestNeo4jBulkWriter:
+    """Test batched parallel writes."""
+    
+    @pytest.mark.asyncio
+    async def test_write_batches_rows(self):
+        batches = []
+        
+        async def execute_write(fn, batch):
+            batches.append(batch)
+        
+        writer, _ = make_writer(AsyncMock(side_effect=execute_write), batch_size=2, workers=2)
+        
+        stats = await writer.write("UNWIND $rows AS row MERGE (c:Chunk {id: row.id})",
+                                   ({"id": i} for i in range(5)))
+        
+        assert stats.rows == 5
+        assert stats.batches == 3
+        assert stats.failed_batches == 0
+        assert sorted(len(b) for b in batches) == [1, 2, 2]
+    
+    @pytest.mark.asyncio
+    async def test_write_accepts_async_rows_and_records_failures(self):
+        calls = 0
+        
+        async def execute_write(fn, batch):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise RuntimeError("deadlock")
+        
+        async def rows():
+            for i in range(4):
+                yield {"id": i}
+        
+        writer, _ = make_writer(AsyncMock(side_effect=execute_write), batch_size=2, workers=1)
+        
+        stats = await writer.write("UNWIND $rows AS row RETURN row", rows())
+        
+        assert stats.rows == 2
+        assert stats.failed_batches == 1
+        assert stats.errors == ["deadlock"]
+
+
+class TestAdminImportWriter:
+    """Test neo4j-admin CSV output."""
+    
+    @pytest.mark.asyncio
+    async def test_writes_nodes_relationships_and_command(self, tmp_path):
+        admin = AdminImportWriter(tmp_path)
+        
+        count = await admin.write_nodes(
+            "Chunk",
+            [{"id": "c1", "title": "Intro", "has_code": True, "topics": ["api", "auth"]}],
+            "id",
+            ["title", "has_code", "topics[]"],
+            id_space="Chunk"
+        )
+        await admin.write_relationships("HAS_CHUNK", [{"start": "FastAPI", "end": "c1"}],
+                                        start_id_space="Source", end_id_space="Chunk")
+        
+        assert count == 1
+        with open(admin.node_files[0][1], newline="") as f:
+            rows = list(csv.reader(f))
+        assert rows == [["id:ID(Chunk)", "title", "has_code", "topics:string[]"],
+                        ["c1", "Intro", "true", "api|auth"]]
+        
+        command = admin.command("ptolemies")
+        assert command[:4] == ["neo4j-admin", "database", "import", "full"]
+        assert any(arg.startswith("--nodes=Chunk=") for arg in command)
+        assert any(arg.startswith("--relationships=HAS_CHUNK=") for arg in command)
+        assert command[-1] == "ptolemies"
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test suite for materialized learning paths and dependency closures
+"""
+
+import pytest
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock
+from pathlib import Path
+
+# Set logfire config for testing
+os.environ['LOGFIRE_IGNORE_NO_CONFIG'] = '1'
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from graph_snapshot import GraphSnapshot
+from graph_materialization import (
+    LEARNING_PATH_LABEL,
+    DEPENDENCY_CLOSURE_LABEL,
+    learning_path_key,
+    materialize_learning_paths,
+    materialize_dependency_closures,
+    learning_path_result,
+    dependency_closure_result,
+    write_materialized
+)
+
+
+@pytest.fixture
+def snapshot():
+    """Framework dependency graph with a cycle back to the root."""
+    return GraphSnapshot.build(
+        nodes=[
+            ("f1", "Framework", "FastAPI"),
+            ("f2", "Framework", "Starlette"),
+            ("f3", "Framework", "Pydantic"),
+            ("f4", "Framework", "Uvicorn"),
+            ("f5", "Framework", "Redis"),
+            ("c1", "Concept", "Routing")
+        ],
+        edges=[
+            ("f1", "f2", "DEPENDS_ON"),
+            ("f1", "f3", "DEPENDS_ON"),
+            ("f2", "f4", "USES"),
+            ("f4", "f1", "INTEGRATES_WITH"),
+            ("f2", "c1", "MENTIONS_CONCEPT")
+        ]
+    )
+
+
+class TestMaterializeLearningPaths:
+    """Test pairwise learning path rows."""
+    
+    def test_rows_for_every_framework_pair(self, snapshot):
+        """Test one row per ordered pair, unreachable pairs included."""
+        rows = {row["key"]: row for row in materialize_learning_paths(snapshot)}
+        
+        assert len(rows) == 25
+        assert rows[learning_path_key("FastAPI", "Uvicorn")]["path_length"] == 1
+        assert rows[learning_path_key("Pydantic", "Starlette")]["path_length"] == 2
+        assert rows[learning_path_key("Redis", "FastAPI")]["steps"] == []
+    
+    def test_rows_match_snapshot_shortest_path(self, snapshot):
+        """Test materialized steps equal a direct shortest-path search."""
+        rows = {row["key"]: row for row in materialize_learning_paths(snapshot)}
+        
+        for start in ("FastAPI", "Pydantic", "Uvicorn"):
+            for end in ("Starlette", "Uvicorn"):
+                path = snapshot.shortest_path(snapshot.find(start), snapshot.find(end)) or []
+                row = rows[learning_path_key(start, end)]
+                assert row["steps"] == [snapshot.names[i] for i in path]
+    
+    def test_result_respects_max_depth(self, snapshot):
+        """Test reading a row with a shorter or longer depth bound."""
+        rows = {row["key"]: row for row in materialize_learning_paths(snapshot)}
+        row = rows[learning_path_key("Pydantic", "Starlette")]
+        
+        result = learning_path_result(row, max_depth=6)
+        assert [step["name"] for step in result["learning_steps"]] == ["Pydantic", "FastAPI", "Starlette"]
+        assert result["prerequisites"] == ["Uvicorn"]
+        
+        assert learning_path_result(row, max_depth=1)["learning_steps"] == []
+        assert learning_path_result(row, max_depth=10) is None
+
+
+class TestMaterializeDependencyClosures:
+    """Test transitive dependency closure rows."""
+    
+    def test_closure_depths_and_cycles(self, snapshot):
+        """Test full closure with depths and the cycle back to the root."""
+        rows = {row["key"]: row for row in materialize_dependency_closures(snapshot)}
+        result = dependency_closure_result(rows["fastapi"], depth=3)
+        
+        depths = {node["name"]: node["depth"] for node in result["dependency_nodes"]}
+        assert depths == {"Starlette": 1, "Pydantic": 1, "Uvicorn": 2}
+        assert result["circular_dependencies"] == ["Uvicorn"]
+        assert {"source": "Starlette", "target": "Uvicorn"} in result["dependency_relationships"]
+    
+    def test_closure_cut_to_direct_dependencies(self, snapshot):
+        """Test reading only direct dependencies from the full closure."""
+        rows = {row["key"]: row for row in materialize_dependency_closures(snapshot)}
+        result = dependency_closure_result(rows["fastapi"], depth=1)
+        
+        assert {node["name"] for node in result["dependency_nodes"]} == {"Starlette", "Pydantic"}
+        assert result["circular_dependencies"] == []
+        assert len(result["dependency_relationships"]) == 2
+        assert dependency_closure_result(rows["redis"], depth=3)["dependency_nodes"] == []
+
+
+class TestWriteMaterialized:
+    """Test storing materialized rows."""
+    
+    @pytest.mark.asyncio
+    async def test_batches_rows_and_removes_stale(self):
+        """Test rows are upserted in batches before stale rows are deleted."""
+        session = AsyncMock()
+        session.__aenter__ = AsyncMock(return_value=session)
+        session.__aexit__ = AsyncMock(return_value=None)
+        driver = MagicMock()
+        driver.session.return_value = session
+        
+        paths = [{"key": f"a->{i}"} for i in range(5)]
+        closures = [{"key": "a"}]
+        run_id = await write_materialized(driver, "ptolemies", paths, closures, batch_size=2)
+        
+        calls = session.execute_write.call_args_list
+        labels = [call.args[1] for call in calls]
+        assert labels == [LEARNING_PATH_LABEL] * 4 + [DEPENDENCY_CLOSURE_LABEL] * 2
+        assert [len(call.args[2]) for call in calls if len(call.args) > 2] == [2, 2, 1, 1]
+        assert run_id
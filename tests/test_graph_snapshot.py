@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Test suite for the in-memory graph snapshot
+"""
+
+import pytest
+import os
+import sys
+from unittest.mock import AsyncMock, Mock
+from pathlib import Path
+
+# Set logfire config for testing
+os.environ['LOGFIRE_IGNORE_NO_CONFIG'] = '1'
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from graph_snapshot import (
+    GraphSnapshot,
+    GraphSnapshotManager,
+    EXCLUDED_LABELS,
+    OUTGOING,
+    INCOMING,
+    load_graph_snapshot
+)
+
+
+@pytest.fixture
+def snapshot():
+    """Small framework/concept graph."""
+    return GraphSnapshot.build(
+        nodes=[
+            ("f1", "Framework", "FastAPI"),
+            ("f2", "Framework", "Starlette"),
+            ("f3", "Framework", "Pydantic"),
+            ("f4", "Framework", "Uvicorn"),
+            ("c1", "Concept", "Authentication"),
+            ("c2", "Concept", "Security"),
+            ("c3", "Concept", "Routing"),
+            ("d1", "Document", "doc_1"),
+            ("d2", "Document", "doc_2")
+        ],
+        edges=[
+            ("f1", "f2", "DEPENDS_ON"),
+            ("f1", "f3", "DEPENDS_ON"),
+            ("f2", "f4", "USES"),
+            ("d1", "c1", "MENTIONS_CONCEPT"),
+            ("d1", "c2", "MENTIONS_CONCEPT"),
+            ("d2", "c1", "MENTIONS_CONCEPT"),
+            ("d2", "c2", "MENTIONS_CONCEPT"),
+            ("d2", "c3", "MENTIONS_CONCEPT"),
+            ("d1", "missing", "MENTIONS_CONCEPT")
+        ]
+    )
+
+
+class TestGraphSnapshot:
+    """Test CSR snapshot traversals."""
+    
+    def test_build_skips_dangling_edges(self, snapshot):
+        """Test node and edge counts."""
+        assert snapshot.node_count == 9
+        assert snapshot.edge_count == 8
+    
+    def test_find_is_case_insensitive(self, snapshot):
+        """Test name lookup with and without label."""
+        index = snapshot.find("fastapi", "Framework")
+        assert snapshot.node(index)["name"] == "FastAPI"
+        assert snapshot.find("FastAPI") == index
+        assert snapshot.find("FastAPI", "Concept") is None
+        assert snapshot.index_of("f1") == index
+    
+    def test_neighbours_by_direction_and_type(self, snapshot):
+        """Test directed and typed adjacency."""
+        fastapi = snapshot.find("FastAPI")
+        starlette = snapshot.find("Starlette")
+        
+        outgoing = {snapshot.names[i] for i in snapshot.neighbours(fastapi, OUTGOING).tolist()}
+        assert outgoing == {"Starlette", "Pydantic"}
+        assert snapshot.neighbours(fastapi, INCOMING).size == 0
+        assert snapshot.neighbours(starlette, OUTGOING, ["DEPENDS_ON"]).size == 0
+        
+        with pytest.raises(ValueError):
+            snapshot.neighbours(fastapi, "sideways")
+    
+    def test_k_hop(self, snapshot):
+        """Test breadth-first distances."""
+        fastapi = snapshot.find("FastAPI")
+        distances = snapshot.k_hop(fastapi, 2, OUTGOING)
+        
+        assert {snapshot.names[i]: d for i, d in distances.items()} == {
+            "Starlette": 1,
+            "Pydantic": 1,
+            "Uvicorn": 2
+        }
+        assert len(snapshot.k_hop(fastapi, 1, OUTGOING)) == 2
+    
+    def test_shortest_path(self, snapshot):
+        """Test unweighted shortest path and depth bound."""
+        fastapi = snapshot.find("FastAPI")
+        uvicorn = snapshot.find("Uvicorn")
+        
+        path = snapshot.shortest_path(fastapi, uvicorn)
+        assert [snapshot.names[i] for i in path] == ["FastAPI", "Starlette", "Uvicorn"]
+        assert snapshot.shortest_path(fastapi, uvicorn, max_depth=1) is None
+        assert snapshot.shortest_path(fastapi, snapshot.find("Routing")) is None
+    
+    def test_shortest_path_tree_matches_shortest_path(self, snapshot):
+        """Test the BFS parent tree reproduces each shortest path."""
+        fastapi = snapshot.find("FastAPI")
+        parents = snapshot.shortest_path_tree(fastapi)
+        
+        assert parents[fastapi] == -1
+        assert snapshot.find("Routing") not in parents
+        for target in (snapshot.find("Uvicorn"), snapshot.find("Pydantic")):
+            path = [target]
+            while parents[path[-1]] != -1:
+                path.append(parents[path[-1]])
+            assert path[::-1] == snapshot.shortest_path(fastapi, target)
+        assert snapshot.find("Uvicorn") not in snapshot.shortest_path_tree(fastapi, max_depth=1)
+    
+    def test_co_neighbours(self, snapshot):
+        """Test concept co-occurrence ranking."""
+        auth = snapshot.find("Authentication", "Concept")
+        ranked = snapshot.co_neighbours(auth, "Concept")
+        
+        assert [(snapshot.names[i], count) for i, count in ranked] == [
+            ("Security", 2),
+            ("Routing", 1)
+        ]
+
+
+class TestGraphSnapshotManager:
+    """Test snapshot refresh and swap."""
+    
+    @pytest.mark.asyncio
+    async def test_get_loads_on_demand(self, snapshot):
+        """Test first access loads a snapshot."""
+        loader = AsyncMock(return_value=snapshot)
+        manager = GraphSnapshotManager(loader)
+        
+        assert manager.snapshot is None
+        assert await manager.get() is snapshot
+        assert await manager.get() is snapshot
+        loader.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_refresh_swaps_snapshot(self, snapshot):
+        """Test refresh replaces the current snapshot."""
+        newer = GraphSnapshot.build([("n1", "Concept", "New")], [])
+        manager = GraphSnapshotManager(AsyncMock(side_effect=[snapshot, newer]))
+        
+        await manager.refresh()
+        await manager.refresh()
+        
+        assert manager.snapshot is newer
+    
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_previous_snapshot(self, snapshot):
+        """Test a failing loader does not drop the current snapshot."""
+        manager = GraphSnapshotManager(AsyncMock(side_effect=[snapshot, RuntimeError("down")]))
+        
+        await manager.refresh()
+        assert await manager.refresh() is snapshot
+    
+    @pytest.mark.asyncio
+    async def test_start_and_stop(self, snapshot):
+        """Test background refresh lifecycle."""
+        manager = GraphSnapshotManager(AsyncMock(return_value=snapshot), refresh_interval_seconds=60)
+        
+        manager.start()
+        await manager.stop()
+        
+        assert manager._refresh_task is None
+
+
+class TestLoadGraphSnapshot:
+    """Test loading a snapshot from Neo4j."""
+    
+    @pytest.mark.asyncio
+    async def test_materialized_and_bookkeeping_nodes_excluded(self):
+        """Test the load queries skip materialized tables and sync state."""
+        class Result:
+            def __init__(self, records):
+                self.records = records
+            
+            def __aiter__(self):
+                async def iterate():
+                    for record in self.records:
+                        yield record
+                return iterate()
+        
+        session = AsyncMock()
+        session.run.side_effect = [
+            Result([{"element_id": "c1", "label": "Concept", "name": "Security"}]),
+            Result([])
+        ]
+        session.__aenter__.return_value = session
+        driver = Mock()
+        driver.session.return_value = session
+        
+        snapshot = await load_graph_snapshot(driver, "neo4j")
+        
+        assert snapshot.node_count == 1
+        for call in session.run.call_args_list:
+            assert "WHERE none(label IN labels(" in call.args[0]
+            assert call.kwargs["excluded"] == EXCLUDED_LABELS
+        assert {"LearningPath", "DependencyClosure", "GraphVersion", "SyncState"} <= set(EXCLUDED_LABELS)
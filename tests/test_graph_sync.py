@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Test suite for incremental SurrealDB to Neo4j graph sync
+"""
+
+import pytest
+import os
+import sys
+from datetime import datetime
+from unittest.mock import AsyncMock, Mock
+from pathlib import Path
+
+# Set logfire config for testing
+os.environ['LOGFIRE_IGNORE_NO_CONFIG'] = '1'
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from cypher_cache import BUMP_GRAPH_VERSION_QUERY
+from graph_sync import (
+    IncrementalGraphSync,
+    READ_WATERMARK_QUERY,
+    SAVE_WATERMARK_QUERY,
+    UPSERT_CHUNKS_QUERY,
+    DELETE_CHUNKS_QUERY,
+    CHUNK_IDS_QUERY,
+    CHUNK_IDS_AFTER_QUERY,
+    CHUNKS_PRESENT_QUERY,
+    chunk_row
+)
+
+
+def make_chunk(chunk_id, updated_at, **extra):
+    return {
+        "id": chunk_id,
+        "source_name": "FastAPI",
+        "title": f"Chunk {chunk_id}",
+        "content": "content",
+        "topics": ["api"],
+        "updated_at": updated_at,
+        **extra
+    }
+
+
+def parse(timestamp):
+    return datetime.fromisoformat(timestamp) if timestamp else None
+
+
+def select_chunks(table, sql, variables):
+    """Evaluate the sync's paged SurrealQL against an in-memory table."""
+    rows = sorted(table, key=lambda row: (row["updated_at"] is not None, parse(row["updated_at"]) or "", row["id"]))
+    if "last_id" in variables:
+        last, last_id = parse(variables["last"]), variables["last_id"]
+        if last is None:
+            rows = [r for r in rows if r["updated_at"] is not None or r["id"] > last_id]
+        else:
+            rows = [
+                r for r in rows
+                if r["updated_at"] is not None
+                and (parse(r["updated_at"]) > last or (parse(r["updated_at"]) == last and r["id"] > last_id))
+            ]
+    elif variables.get("since"):
+        since = parse(variables["since"])
+        inclusive = "updated_at >= <datetime> $since" in sql
+        rows = [
+            r for r in rows
+            if r["updated_at"] is not None
+            and (parse(r["updated_at"]) >= since if inclusive else parse(r["updated_at"]) > since)
+        ]
+    return [dict(row) for row in rows[:variables["limit"]]]
+
+
+def make_sync(chunks, watermark=None, inclusive=True, batch_size=2):
+    """Sync over a fake SurrealDB table and a recording Neo4j writer."""
+    surreal = Mock()
+    
+    async def query(sql, variables=None):
+        return select_chunks(chunks, sql, variables)
+    
+    surreal.query = AsyncMock(side_effect=query)
+    
+    writer = Mock()
+    
+    async def run(query, parameters=None):
+        if query == READ_WATERMARK_QUERY:
+            return [{"watermark": watermark, "inclusive": inclusive}]
+        if query == DELETE_CHUNKS_QUERY:
+            return [{"sources": ["FastAPI"], "topics": ["api"]}]
+        return []
+    
+    writer.run = AsyncMock(side_effect=run)
+    return IncrementalGraphSync(surreal, writer, batch_size=batch_size), surreal, writer
+
+
+def calls_for(writer, query):
+    return [call.args[1] for call in writer.run.call_args_list if call.args[0] == query]
+
+
+def bumps(writer):
+    return sum(1 for call in writer.run.call_args_list if call.args[0] == BUMP_GRAPH_VERSION_QUERY)
+
+
+class TestIncrementalGraphSync:
+    """Test watermark-driven sync."""
+    
+    @pytest.mark.asyncio
+    async def test_first_sync_reads_everything_and_sets_watermark(self):
+        chunks = [make_chunk(f"c{i}", f"2025-01-0{i + 1}T00:00:00+00:00") for i in range(3)]
+        sync, surreal, writer = make_sync(chunks)
+        
+        result = await sync.sync()
+        
+        first_sql = surreal.query.call_args_list[0].args[0]
+        assert "WHERE" not in first_sql
+        assert "ORDER BY updated_at, id LIMIT $limit" in first_sql
+        assert result.upserted == 3
+        assert result.batches == 2
+        assert result.watermark == "2025-01-03T00:00:00+00:00"
+        
+        upserts = calls_for(writer, UPSERT_CHUNKS_QUERY)
+        assert [len(call["rows"]) for call in upserts] == [2, 1]
+        
+        saves = calls_for(writer, SAVE_WATERMARK_QUERY)
+        assert [(s["watermark"], s["inclusive"]) for s in saves] == [
+            ("2025-01-02T00:00:00+00:00", True),
+            ("2025-01-03T00:00:00+00:00", True),
+            ("2025-01-03T00:00:00+00:00", False)
+        ]
+        assert bumps(writer) == 1
+    
+    @pytest.mark.asyncio
+    async def test_resumes_from_stored_watermark(self):
+        sync, surreal, writer = make_sync([], watermark="2025-01-03T00:00:00+00:00", inclusive=False)
+        
+        result = await sync.sync()
+        
+        sql, variables = surreal.query.call_args.args
+        assert "WHERE updated_at > <datetime> $since" in sql
+        assert variables == {"since": "2025-01-03T00:00:00+00:00", "limit": 2}
+        assert result.upserted == 0
+        assert calls_for(writer, SAVE_WATERMARK_QUERY) == []
+        assert bumps(writer) == 0
+    
+    @pytest.mark.asyncio
+    async def test_rows_updated_mid_scan_are_not_skipped(self):
+        chunks = [make_chunk(f"c{i}", f"2025-01-0{i + 1}T00:00:00+00:00") for i in range(5)]
+        sync, surreal, _ = make_sync(chunks)
+        
+        seen = []
+        async for chunk in sync.stream_changes(None):
+            seen.append(chunk["id"])
+            if chunk["id"] == "c1":
+                # An already-read row moves to the end between pages
+                chunks[0]["updated_at"] = "2025-01-09T00:00:00+00:00"
+        
+        assert seen == ["c0", "c1", "c2", "c3", "c4", "c0"]
+        cursor_sql, cursor = surreal.query.call_args_list[1].args
+        assert "id > <record> $last_id" in cursor_sql
+        assert cursor == {"last": "2025-01-02T00:00:00+00:00", "last_id": "c1", "limit": 2}
+    
+    @pytest.mark.asyncio
+    async def test_unstamped_rows_page_before_stamped_ones(self):
+        chunks = [make_chunk("a", None), make_chunk("b", None), make_chunk("c", "2025-01-01T00:00:00+00:00")]
+        sync, surreal, _ = make_sync(chunks)
+        
+        seen = [chunk["id"] async for chunk in sync.stream_changes(None)]
+        
+        assert seen == ["a", "b", "c"]
+        assert "updated_at != NONE" in surreal.query.call_args_list[1].args[0]
+    
+    @pytest.mark.asyncio
+    async def test_tombstones_are_deleted(self):
+        chunks = [
+            make_chunk("c1", "2025-01-01T00:00:00+00:00"),
+            make_chunk("c2", "2025-01-02T00:00:00+00:00", deleted_at="2025-01-02T00:00:00+00:00")
+        ]
+        sync, _, writer = make_sync(chunks)
+        
+        result = await sync.sync()
+        
+        assert result.upserted == 1
+        assert result.deleted == 1
+        assert calls_for(writer, DELETE_CHUNKS_QUERY) == [{"ids": ["c2"]}]
+    
+    @pytest.mark.asyncio
+    async def test_failed_batch_does_not_advance_watermark(self):
+        chunks = [make_chunk(f"c{i}", f"2025-01-0{i + 1}T00:00:00+00:00") for i in range(4)]
+        sync, _, writer = make_sync(chunks)
+        original = writer.run.side_effect
+        upserts = 0
+        
+        async def run(query, parameters=None):
+            nonlocal upserts
+            if query == UPSERT_CHUNKS_QUERY:
+                upserts += 1
+                if upserts == 2:
+                    raise RuntimeError("connection lost")
+            return await original(query, parameters)
+        
+        writer.run.side_effect = run
+        
+        with pytest.raises(RuntimeError):
+            await sync.sync()
+        
+        saves = calls_for(writer, SAVE_WATERMARK_QUERY)
+        assert [s["watermark"] for s in saves] == ["2025-01-02T00:00:00+00:00"]
+    
+    @pytest.mark.asyncio
+    async def test_watermark_follows_row_order_not_text_order(self):
+        chunks = [
+            make_chunk("c1", "2025-01-01T00:00:00Z"),
+            make_chunk("c2", "2025-01-01T00:00:00.5Z")
+        ]
+        sync, _, writer = make_sync(chunks)
+        
+        result = await sync.sync()
+        
+        # As text "…:00Z" sorts after "…:00.5Z", which would move the watermark back
+        assert result.watermark == "2025-01-01T00:00:00.5Z"
+        saves = calls_for(writer, SAVE_WATERMARK_QUERY)
+        assert [s["watermark"] for s in saves] == ["2025-01-01T00:00:00.5Z", "2025-01-01T00:00:00.5Z"]
+    
+    def test_chunk_row_limits_content_and_topics(self):
+        row = chunk_row(make_chunk("c1", None, content="x" * 2000, topics=list("abcdefg")))
+        
+        assert len(row["content"]) == 1000
+        assert row["topics"] == ["a", "b", "c", "d", "e"]
+        assert row["updated_at"] is None
+    
+    @pytest.mark.asyncio
+    async def test_reconcile_deletes_only_rechecked_missing_chunks(self):
+        live = {"c1", "c2", "c4", "c5"}
+        sync, surreal, writer = make_sync([], batch_size=2)
+        id_pages = 0
+        
+        async def query(sql, variables=None):
+            nonlocal id_pages
+            if sql == CHUNKS_PRESENT_QUERY:
+                return [{"id": chunk_id} for chunk_id in variables["ids"] if chunk_id in live]
+            ids = sorted(live)
+            if sql == CHUNK_IDS_AFTER_QUERY:
+                ids = [chunk_id for chunk_id in ids if chunk_id > variables["last"]]
+            else:
+                assert sql == CHUNK_IDS_QUERY
+            id_pages += 1
+            if id_pages == 1:
+                # Inserted ahead of the cursor mid-scan, then recreated before the recheck
+                live.add("c0")
+                live.discard("c5")
+            if id_pages == 2:
+                live.add("c5")
+            return [{"id": chunk_id} for chunk_id in ids[:variables["limit"]]]
+        
+        surreal.query = AsyncMock(side_effect=query)
+        original = writer.run.side_effect
+        
+        async def run(query, parameters=None):
+            if query == "MATCH (c:Chunk) RETURN c.id AS id":
+                return [{"id": f"c{i}"} for i in range(1, 6)]
+            return await original(query, parameters)
+        
+        writer.run.side_effect = run
+        
+        removed = await sync.reconcile_deletions()
+        
+        assert removed == 1
+        assert calls_for(writer, DELETE_CHUNKS_QUERY) == [{"ids": ["c3"]}]
+        assert writer.run.call_args_list[0].args[0] == "MATCH (c:Chunk) RETURN c.id AS id"
+        assert bumps(writer) == 1
@@ -39,6 +39,8 @@ from neo4j_integration import (
     GraphSearchResult
 )
 
+from graph_snapshot import GraphSnapshot, GraphSnapshotManager
+
 class TestHybridQueryConfig:
     """Test hybrid query configuration."""
     
@@ -390,6 +392,35 @@ class TestHybridQueryEngine:
         
         assert expanded == ["test query"]
     
+    @pytest.mark.asyncio
+    async def test_concept_expansion_uses_graph_snapshot(self, mock_vector_store, mock_graph_store, config):
+        """Test concept expansion reads co-occurring concepts from the snapshot."""
+        snapshot = GraphSnapshot.build(
+            nodes=[
+                ("c1", "Concept", "Authentication"),
+                ("c2", "Concept", "Security"),
+                ("d1", "Document", "doc_1")
+            ],
+            edges=[("d1", "c1", "MENTIONS_CONCEPT"), ("d1", "c2", "MENTIONS_CONCEPT")]
+        )
+        snapshots = GraphSnapshotManager(AsyncMock(return_value=snapshot))
+        await snapshots.refresh()
+        engine = HybridQueryEngine(mock_vector_store, mock_graph_store, config, graph_snapshots=snapshots)
+        
+        analysis = QueryAnalysis(
+            query_type="general",
+            detected_concepts=["authentication"],
+            suggested_expansions=[],
+            complexity_score=0.6,
+            semantic_weight=0.6,
+            graph_weight=0.4
+        )
+        
+        expanded = await engine._expand_query_concepts("test query", analysis)
+        
+        assert any("Security" in query for query in expanded)
+        mock_graph_store.graph_search.assert_not_called()
+    
     @pytest.mark.asyncio
     async def test_result_fusion(self, engine):
         """Test result fusion functionality."""
@@ -704,6 +735,11 @@ class TestUtilityFunctions:
         assert engine.graph_store == mock_graph_store
         mock_create_vector.assert_called_once()
         mock_create_graph.assert_called_once()
+        
+        # The engine keeps a snapshot refreshed for concept expansion
+        await asyncio.sleep(0)
+        assert engine.graph_snapshots.snapshot is mock_graph_store.load_snapshot.return_value
+        await engine.close()
 
 class TestIntegrationScenarios:
     """Test complex integration scenarios."""
@@ -27,6 +27,8 @@ from neo4j_integration import (
     create_graph_store,
     migrate_documents_to_graph
 )
+from neo4j.exceptions import ServiceUnavailable
+from adaptive_concurrency import AIMDLimiter
 
 class TestNeo4jConfig:
     """Test Neo4j configuration."""
@@ -144,7 +146,8 @@ class TestNeo4jGraphStore:
     @pytest.fixture
     def config(self):
         """Test configuration."""
-        return Neo4jConfig(database="test_ptolemies")
+        # Query result caching is covered separately; it adds a version read before queries
+        return Neo4jConfig(database="test_ptolemies", query_cache_size=0)
     
     @pytest.fixture
     def mock_driver(self):
@@ -161,6 +164,13 @@ class TestNeo4jGraphStore:
         mock_session.__aenter__ = AsyncMock(return_value=mock_session)
         mock_session.__aexit__ = AsyncMock(return_value=None)
         mock_session.run = AsyncMock()
+        
+        # Managed transactions run their work function against the session itself
+        async def run_transaction(work, *args):
+            return await work(mock_session, *args)
+        
+        mock_session.execute_read = AsyncMock(side_effect=run_transaction)
+        mock_session.execute_write = AsyncMock(side_effect=run_transaction)
         return mock_session
     
     def test_graph_store_initialization(self, config):
@@ -327,6 +337,61 @@ class TestNeo4jGraphStore:
         assert result is True
         mock_session.run.assert_called_once()
     
+    @pytest.mark.asyncio
+    async def test_create_relationships_bulk(self, config, mock_driver, mock_session):
+        """Test bulk relationship creation batches rows per relationship type."""
+        store = Neo4jGraphStore(config)
+        store.driver = mock_driver
+        mock_driver.session = Mock(return_value=mock_session)
+        
+        mock_session.run.side_effect = [
+            AsyncMock(single=AsyncMock(return_value={"created": 2})),
+            AsyncMock(single=AsyncMock(return_value={"created": 1})),
+            AsyncMock(single=AsyncMock(return_value={"created": 1}))
+        ]
+        
+        rels = [
+            Relationship("doc_1", "doc_2", "RELATED_TO", 0.7, {"shared_topics": ["api"]},
+                         from_label="Document", to_label="Document"),
+            Relationship("doc_1", "doc_3", "RELATED_TO", 0.6, {"shared_topics": ["web"]},
+                         from_label="Document", to_label="Document"),
+            Relationship("doc_2", "doc_3", "RELATED_TO", 0.5, {"shared_topics": ["web"]},
+                         from_label="Document", to_label="Document"),
+            Relationship("doc_1", "API", "CONTAINS_CONCEPT", 0.8, {"frequency": 3},
+                         from_label="Document", to_label="Concept")
+        ]
+        
+        created = await store.create_relationships_bulk(rels, batch_size=2)
+        
+        assert created == 4
+        assert mock_session.run.call_count == 3
+        
+        first_query = mock_session.run.call_args_list[0].args[0]
+        assert "UNWIND $rows AS row" in first_query
+        assert "(from_node:Document {id: row.from_key})" in first_query
+        assert "[r:RELATED_TO]" in first_query
+        assert len(mock_session.run.call_args_list[0].args[1]["rows"]) == 2
+        
+        concept_query = mock_session.run.call_args_list[2].args[0]
+        assert "(to_node:Concept {name: row.to_key})" in concept_query
+    
+    @pytest.mark.asyncio
+    async def test_create_relationships_bulk_requires_typed_endpoints(self, config, mock_driver):
+        """Test bulk creation rejects untyped endpoints and unsafe types."""
+        store = Neo4jGraphStore(config)
+        store.driver = mock_driver
+        
+        with pytest.raises(ValueError, match="typed endpoints"):
+            await store.create_relationships_bulk([
+                Relationship("doc_1", "doc_2", "RELATED_TO", 0.7, {})
+            ])
+        
+        with pytest.raises(ValueError, match="Invalid relationship type"):
+            await store.create_relationships_bulk([
+                Relationship("doc_1", "doc_2", "RELATED_TO]->() DETACH DELETE", 0.7, {},
+                             from_label="Document", to_label="Document")
+            ])
+    
     @pytest.mark.asyncio
     async def test_extract_concepts_from_document(self, config):
         """Test concept extraction from document."""
@@ -408,9 +473,11 @@ class TestNeo4jGraphStore:
         topic_rels = [r for r in relationships if r.relationship_type == "RELATED_TO"]
         assert len(topic_rels) > 0
         
-        # Check for same source relationships
-        source_rels = [r for r in relationships if r.relationship_type == "PART_OF_SAME_SOURCE"]
-        assert len(source_rels) > 0
+        # Check for same source membership via Source hub nodes
+        source_rels = [r for r in relationships if r.relationship_type == "HAS_DOCUMENT"]
+        assert len(source_rels) == len(docs)
+        assert all(r.from_label == "Source" for r in source_rels)
+        assert not [r for r in relationships if r.relationship_type == "PART_OF_SAME_SOURCE"]
         
         # Verify relationship properties
         for rel in relationships:
@@ -454,29 +521,118 @@ class TestNeo4jGraphStore:
         mock_session.run.assert_called_once()
     
     @pytest.mark.asyncio
-    async def test_get_graph_stats(self, config, mock_driver, mock_session):
-        """Test getting graph statistics."""
+    async def test_graph_search_uses_fulltext_index(self, config, mock_driver, mock_session):
+        """Test graph search seeds from the full-text index with escaped terms."""
         store = Neo4jGraphStore(config)
         store.driver = mock_driver
-        mock_driver.session.return_value = mock_session
+        mock_driver.session = Mock(return_value=mock_session)
         
-        # Mock the session context manager properly
-        mock_session.__aenter__ = AsyncMock(return_value=mock_session)
-        mock_session.__aexit__ = AsyncMock(return_value=None)
+        mock_records = [
+            {
+                "element_id": "4:c:1",
+                "c": {"name": "OAuth2", "category": "Security", "description": None},
+                "score": 2.5,
+                "rels": [
+                    {"type": "CONTAINS_CONCEPT", "start": "4:d:7", "end": "4:c:1", "properties": {"strength": 0.8}},
+                    {"type": None, "start": None, "end": None, "properties": None}
+                ],
+                "related_nodes": [
+                    {"element_id": "4:d:7", "node": {"id": "doc_7", "title": "Security", "labels": ["Document"]}},
+                    {"element_id": None, "node": None}
+                ]
+            }
+        ]
         
-        # Mock statistics results
-        mock_results = [
-            {"document_count": 50},
-            {"concept_count": 25},
-            {"relationship_count": 100},
-            {"avg_quality": 0.85},
-            {"avg_relationship_strength": 0.7}
+        mock_result = AsyncMock()
+        mock_result.__aiter__.return_value = mock_records
+        mock_session.run.return_value = mock_result
+        
+        result = await store.graph_search("OAuth2 (scopes)", search_type="concept")
+        
+        query = mock_session.run.call_args.args[0]
+        params = mock_session.run.call_args.args[1]
+        assert "db.index.fulltext.queryNodes" in query
+        assert "CONTAINS" not in query
+        assert params["index_name"] == "concept_fulltext_idx"
+        assert params["search_text"] == "oauth2 OR \\(scopes\\)"
+        assert result.nodes[0]["relevance_score"] == 2.5
+        assert "description" not in result.nodes[0]
+        
+        # Nodes are stored once, keyed by element id, and relationships refer to those ids
+        assert set(result.node_table) == {"4:c:1", "4:d:7"}
+        assert result.relationships == [
+            {"type": "CONTAINS_CONCEPT", "start": "4:d:7", "end": "4:c:1", "properties": {"strength": 0.8}}
         ]
+        assert "labels" in query and "content" not in query
+        assert result.node_table["4:d:7"]["id"] == "doc_7"
+    
+    @pytest.mark.asyncio
+    async def test_expand_neighbourhood_respects_node_budget(self, config, mock_session):
+        """Test breadth-first expansion stops at the node budget."""
+        store = Neo4jGraphStore(config)
+        
+        def hop_result(records):
+            result = AsyncMock()
+            result.__aiter__.return_value = records
+            return result
         
         mock_session.run.side_effect = [
-            AsyncMock(single=AsyncMock(return_value=result)) for result in mock_results
+            hop_result([
+                {"node_id": "n2", "parent_id": "n1", "edges": [["n1", "n2", "RELATED_TO"]]},
+                {"node_id": "n3", "parent_id": "n1", "edges": [["n3", "n1", "HAS_DOCUMENT"]]}
+            ]),
+            hop_result([
+                {"node_id": "n4", "parent_id": "n2", "edges": [["n2", "n4", "RELATED_TO"]]}
+            ])
         ]
         
+        neighbourhood = await store._expand_neighbourhood(
+            mock_session, ["n1"], max_depth=5, fan_out=10, node_budget=4
+        )
+        
+        assert neighbourhood.node_ids == ["n1", "n2", "n3", "n4"]
+        assert ("n3", "n1", "HAS_DOCUMENT") in neighbourhood.edges
+        assert neighbourhood.origins["n4"] == "n1"
+        assert neighbourhood.depth_reached == 2
+        assert neighbourhood.truncated is True
+        assert mock_session.run.call_count == 2
+        
+        second_call = mock_session.run.call_args_list[1].args[1]
+        assert second_call["frontier"] == ["n2", "n3"]
+        assert second_call["remaining"] == 1
+        assert second_call["fan_out"] == 10
+        assert "*" not in mock_session.run.call_args_list[0].args[0]
+    
+    @pytest.mark.asyncio
+    async def test_graph_search_empty_query_skips_database(self, config, mock_driver, mock_session):
+        """Test an empty query returns no results without querying Neo4j."""
+        store = Neo4jGraphStore(config)
+        store.driver = mock_driver
+        mock_driver.session = Mock(return_value=mock_session)
+        
+        result = await store.graph_search("   ", search_type="concept")
+        
+        assert result.nodes == []
+        mock_session.run.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_get_graph_stats(self, config, mock_driver, mock_session):
+        """Test getting graph statistics."""
+        store = Neo4jGraphStore(config)
+        store.driver = mock_driver
+        mock_driver.session = Mock(return_value=mock_session)
+        
+        # All statistics come back from one query
+        mock_result = AsyncMock()
+        mock_result.single.return_value = {
+            "document_count": 50,
+            "concept_count": 25,
+            "relationship_count": 100,
+            "avg_quality": 0.85,
+            "avg_relationship_strength": 0.7
+        }
+        mock_session.run.return_value = mock_result
+        
         stats = await store.get_graph_stats()
         
         assert stats["document_count"] == 50
@@ -485,6 +641,231 @@ class TestNeo4jGraphStore:
         assert stats["average_quality"] == 0.85
         assert stats["average_relationship_strength"] == 0.7
         assert stats["connected"] is True
+        assert stats["cached"] is False
+        mock_session.run.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_get_graph_stats_cached_until_write(self, config, mock_driver, mock_session):
+        """Test graph statistics are cached and dropped by writes."""
+        store = Neo4jGraphStore(config)
+        store.driver = mock_driver
+        mock_driver.session = Mock(return_value=mock_session)
+        
+        stats_result = AsyncMock()
+        stats_result.single.return_value = {
+            "document_count": 1,
+            "concept_count": 0,
+            "relationship_count": 0,
+            "avg_quality": 0.5,
+            "avg_relationship_strength": None
+        }
+        mock_session.run.return_value = stats_result
+        
+        first = await store.get_graph_stats()
+        second = await store.get_graph_stats()
+        counts = await store.get_graph_stats(include_averages=False)
+        
+        assert first["cached"] is False
+        assert second["cached"] is True
+        assert counts["cached"] is True
+        assert second["average_relationship_strength"] == 0.0
+        assert mock_session.run.call_count == 1
+        
+        concept_result = AsyncMock()
+        concept_result.single.return_value = {"concept_name": "FastAPI"}
+        mock_session.run.return_value = concept_result
+        await store.create_concept_node(ConceptNode(
+            name="FastAPI",
+            category="Framework",
+            description="Web framework",
+            frequency=1,
+            confidence_score=0.5,
+            related_topics=[]
+        ))
+        
+        mock_session.run.return_value = stats_result
+        after_write = await store.get_graph_stats()
+        
+        assert after_write["cached"] is False
+        assert mock_session.run.call_count == 3
+    
+    @pytest.mark.asyncio
+    async def test_get_graph_counts_only(self, config, mock_driver, mock_session):
+        """Test counts-only statistics skip the averaging scans."""
+        store = Neo4jGraphStore(config)
+        store.driver = mock_driver
+        mock_driver.session = Mock(return_value=mock_session)
+        
+        mock_result = AsyncMock()
+        mock_result.single.return_value = {
+            "document_count": 3,
+            "concept_count": 2,
+            "relationship_count": 1
+        }
+        mock_session.run.return_value = mock_result
+        
+        counts = await store.get_graph_stats(include_averages=False)
+        
+        assert counts["document_count"] == 3
+        assert "average_quality" not in counts
+        assert "avg(" not in mock_session.run.call_args[0][0]
+        
+        # A cached counts-only result cannot answer a full request
+        mock_result.single.return_value = {
+            "document_count": 3,
+            "concept_count": 2,
+            "relationship_count": 1,
+            "avg_quality": 0.9,
+            "avg_relationship_strength": 0.4
+        }
+        stats = await store.get_graph_stats()
+        
+        assert stats["cached"] is False
+        assert stats["average_quality"] == 0.9
+    
+    @pytest.mark.asyncio
+    async def test_shared_session_reused_across_calls(self, config, mock_driver, mock_session):
+        """Test store calls inside shared_session open a single session."""
+        store = Neo4jGraphStore(config)
+        store.driver = mock_driver
+        mock_driver.session = Mock(return_value=mock_session)
+        
+        mock_result = AsyncMock()
+        mock_result.single.return_value = {"concept_name": "Redis"}
+        mock_session.run.return_value = mock_result
+        concept = ConceptNode(
+            name="Redis",
+            category="Framework",
+            description="In-memory store",
+            frequency=2,
+            confidence_score=0.4,
+            related_topics=[]
+        )
+        
+        async with store.shared_session():
+            assert await store.create_concept_node(concept) is True
+            assert await store.create_concept_node(concept) is True
+            assert store.get_pool_metrics()["sessions_in_use"] == 1
+        
+        assert mock_driver.session.call_count == 1
+        assert mock_session.execute_write.call_count == 2
+        metrics = store.get_pool_metrics()
+        assert metrics["sessions_opened"] == 1
+        assert metrics["sessions_in_use"] == 0
+        assert metrics["write_transactions"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_pool_metrics_count_retries_and_failures(self, config, mock_driver, mock_session):
+        """Test transaction retries and failures are reflected in pool metrics."""
+        store = Neo4jGraphStore(config)
+        store.driver = mock_driver
+        mock_driver.session = Mock(return_value=mock_session)
+        
+        mock_result = AsyncMock()
+        mock_result.single.return_value = {"document_count": 1, "concept_count": 0, "relationship_count": 0}
+        mock_session.run.return_value = mock_result
+        
+        # Simulate the driver retrying the transaction function once
+        async def retry_once(work, *args):
+            await work(mock_session, *args)
+            return await work(mock_session, *args)
+        
+        mock_session.execute_read = AsyncMock(side_effect=retry_once)
+        await store.get_graph_stats(include_averages=False)
+        
+        mock_session.execute_read = AsyncMock(side_effect=ServiceUnavailable("pool exhausted"))
+        with pytest.raises(ServiceUnavailable):
+            await store.get_graph_stats(include_averages=False, refresh=True)
+        
+        metrics = store.get_pool_metrics()
+        assert metrics["read_transactions"] == 2
+        assert metrics["retried_attempts"] == 1
+        assert metrics["failed_transactions"] == 1
+        assert metrics["max_size"] == config.max_connection_pool_size
+        assert metrics["saturation"] == 0.0
+    
+    @pytest.mark.asyncio
+    async def test_transactions_hold_a_limiter_slot(self, config, mock_driver, mock_session):
+        """Test every transaction counts against the store's adaptive concurrency limit."""
+        limiter = AIMDLimiter("neo4j", target_latency_ms=1000)
+        store = Neo4jGraphStore(config, limiter=limiter)
+        store.driver = mock_driver
+        mock_driver.session = Mock(return_value=mock_session)
+        in_flight = []
+        
+        async def write(work, *args):
+            in_flight.append(limiter.in_flight)
+            return None
+        
+        mock_session.execute_write = AsyncMock(side_effect=write)
+        concept = ConceptNode(name="Routing", category="concept", description="", frequency=1,
+                              confidence_score=0.4, related_topics=[])
+        await store.create_concept_node(concept)
+        
+        assert in_flight == [1]
+        assert limiter.in_flight == 0
+        assert limiter.admitted == 1
+    
+    @pytest.mark.asyncio
+    async def test_query_cache_serves_repeats_until_write(self, mock_driver, mock_session):
+        """Test repeated reads hit the versioned cache and a local write drops it."""
+        store = Neo4jGraphStore(Neo4jConfig(database="test_ptolemies", graph_version_check_seconds=60))
+        store.driver = mock_driver
+        mock_driver.session = Mock(return_value=mock_session)
+        
+        version_result = AsyncMock()
+        version_result.single.return_value = {"version": 7}
+        search_result = AsyncMock()
+        search_result.__aiter__.return_value = [
+            {"element_id": "4:d:1", "d": {"id": "doc_1", "title": "Intro"}, "score": 1.0}
+        ]
+        mock_session.run.side_effect = [version_result, search_result]
+        
+        first = await store.graph_search("intro", search_type="document", max_depth=0)
+        second = await store.graph_search("intro", search_type="document", max_depth=0)
+        
+        assert first.nodes == second.nodes
+        assert mock_session.run.call_count == 2
+        assert store.get_query_cache_stats()["hits"] == 1
+        assert store.get_query_cache_stats()["graph_version"] == 7
+        
+        write_result = AsyncMock()
+        write_result.single.return_value = {"concept_name": "Intro"}
+        mock_session.run.side_effect = [write_result, version_result, search_result]
+        await store.create_concept_node(ConceptNode(
+            name="Intro",
+            category="Technical",
+            description="",
+            frequency=1,
+            confidence_score=0.5,
+            related_topics=[]
+        ))
+        assert "GraphVersion" in mock_session.run.call_args.args[0]
+        
+        await store.graph_search("intro", search_type="document", max_depth=0)
+        assert mock_session.run.call_count == 5
+    
+    @pytest.mark.asyncio
+    async def test_query_cache_drops_results_on_new_version(self, mock_driver, mock_session):
+        """Test a version bumped by another writer turns cached reads into misses."""
+        store = Neo4jGraphStore(Neo4jConfig(database="test_ptolemies", graph_version_check_seconds=0))
+        store.driver = mock_driver
+        mock_driver.session = Mock(return_value=mock_session)
+        
+        versions = [AsyncMock(single=AsyncMock(return_value={"version": v})) for v in (1, 1, 2)]
+        stats = AsyncMock(single=AsyncMock(return_value={
+            "document_count": 1, "concept_count": 0, "relationship_count": 0
+        }))
+        mock_session.run.side_effect = [versions[0], stats, versions[1], versions[2], stats]
+        
+        await store.get_graph_stats(include_averages=False, refresh=True)
+        await store.get_graph_stats(include_averages=False, refresh=True)
+        await store.get_graph_stats(include_averages=False, refresh=True)
+        
+        cache_stats = store.get_query_cache_stats()
+        assert cache_stats["hits"] == 1
+        assert cache_stats["misses"] == 2
+        assert cache_stats["graph_version"] == 2
     
     @pytest.mark.asyncio
     async def test_close_connection(self, config, mock_driver):
@@ -529,18 +910,22 @@ class TestUtilityFunctions:
     async def test_migrate_documents_to_graph(self):
         """Test migrating documents to graph format."""
         mock_store = AsyncMock()
+        mock_store.shared_session = MagicMock()
         mock_store.create_document_node.return_value = True
         mock_store.create_concept_node.return_value = True
         mock_store.create_relationship.return_value = True
-        mock_store.extract_concepts_from_document.return_value = [
-            ConceptNode(
-                name="API",
-                category="Technical",
-                description="Application Programming Interface",
-                frequency=5,
-                confidence_score=0.8,
-                related_topics=["web", "api"]
-            )
+        mock_store.extract_concepts_from_documents.return_value = [
+            [
+                ConceptNode(
+                    name="API",
+                    category="Technical",
+                    description="Application Programming Interface",
+                    frequency=5,
+                    confidence_score=0.8,
+                    related_topics=["web", "api"]
+                )
+            ],
+            []
         ]
         mock_store.build_document_relationships.return_value = [
             Relationship(
@@ -239,9 +239,11 @@ class TestNeo4jGraphStoreSimple:
         topic_rels = [r for r in relationships if r.relationship_type == "RELATED_TO"]
         assert len(topic_rels) > 0
         
-        # Check for same source relationships
-        source_rels = [r for r in relationships if r.relationship_type == "PART_OF_SAME_SOURCE"]
-        assert len(source_rels) > 0
+        # Check for same source membership via Source hub nodes
+        source_rels = [r for r in relationships if r.relationship_type == "HAS_DOCUMENT"]
+        assert len(source_rels) == len(docs)
+        assert all(r.from_label == "Source" for r in source_rels)
+        assert not [r for r in relationships if r.relationship_type == "PART_OF_SAME_SOURCE"]
         
         # Verify relationship properties
         for rel in relationships:
@@ -303,18 +305,22 @@ class TestUtilityFunctionsSimple:
     async def test_migrate_documents_to_graph(self):
         """Test migrating documents to graph format."""
         mock_store = AsyncMock()
+        mock_store.shared_session = MagicMock()
         mock_store.create_document_node.return_value = True
         mock_store.create_concept_node.return_value = True
         mock_store.create_relationship.return_value = True
-        mock_store.extract_concepts_from_document.return_value = [
-            ConceptNode(
-                name="API",
-                category="Technical",
-                description="Application Programming Interface",
-                frequency=5,
-                confidence_score=0.8,
-                related_topics=["web", "api"]
-            )
+        mock_store.extract_concepts_from_documents.return_value = [
+            [
+                ConceptNode(
+                    name="API",
+                    category="Technical",
+                    description="Application Programming Interface",
+                    frequency=5,
+                    confidence_score=0.8,
+                    related_topics=["web", "api"]
+                )
+            ],
+            []
         ]
         mock_store.build_document_relationships.return_value = [
             Relationship(
@@ -524,17 +530,81 @@ class TestRelationshipBuilding:
         
         relationships = await store.build_document_relationships(docs)
         
-        # Should create same-source relationship between FastAPI docs
+        # Should link every document to its Source hub node
         same_source_relations = [r for r in relationships 
-                               if r.relationship_type == "PART_OF_SAME_SOURCE"]
+                               if r.relationship_type == "HAS_DOCUMENT"]
         
-        assert len(same_source_relations) > 0, "Should create relationships between documents from same source"
+        assert len(same_source_relations) == len(docs), "Should create one hub edge per document"
         
         # Verify same source relationship
         fastapi_relations = [r for r in same_source_relations 
                            if r.properties.get("source_name") == "FastAPI"]
         
-        assert len(fastapi_relations) > 0, "Should create FastAPI same-source relationship"
+        assert {r.to_node for r in fastapi_relations} == {"fastapi_intro", "fastapi_advanced"}
+        assert all(r.from_node == "FastAPI" for r in fastapi_relations)
+    
+    @pytest.mark.asyncio
+    async def test_only_documents_sharing_topics_are_paired(self):
+        """Test pairing from the inverted index matches brute-force topic overlap."""
+        config = Neo4jConfig()
+        store = Neo4jGraphStore(config)
+        
+        topic_sets = [
+            ["auth", "security"],
+            ["security", "jwt"],
+            ["deploy"],
+            ["auth", "security", "jwt"],
+            ["deploy", "docker"]
+        ]
+        docs = [
+            DocumentNode(
+                id=f"doc_{i}",
+                source_name="Docs",
+                source_url=f"https://docs.com/{i}",
+                title=f"Doc {i}",
+                content_hash=f"hash_{i}",
+                chunk_count=1,
+                quality_score=0.9,
+                topics=topics
+            )
+            for i, topics in enumerate(topic_sets)
+        ]
+        
+        relationships = await store.build_document_relationships(docs)
+        related = {(r.from_node, r.to_node): r for r in relationships if r.relationship_type == "RELATED_TO"}
+        
+        expected = set()
+        for i, doc1 in enumerate(docs):
+            for doc2 in docs[i + 1:]:
+                shared = set(doc1.topics) & set(doc2.topics)
+                if shared:
+                    overlap = len(shared) / max(len(doc1.topics), len(doc2.topics))
+                    if overlap * 0.9 >= 0.3:
+                        expected.add((doc1.id, doc2.id))
+        
+        assert set(related) == expected
+        assert related[("doc_0", "doc_3")].properties["shared_topics"] == ["auth", "security"]
+        assert ("doc_0", "doc_2") not in related
+        
+        # Topics present in too many documents are ignored for pairing
+        pruned = await store.build_document_relationships(docs, max_topic_document_frequency=2)
+        pruned_pairs = {(r.from_node, r.to_node) for r in pruned if r.relationship_type == "RELATED_TO"}
+        assert ("doc_2", "doc_4") in pruned_pairs
+        assert ("doc_0", "doc_1") not in pruned_pairs
+        
+        # Shared topics list only the topics used for pairing
+        pruned_related = {(r.from_node, r.to_node): r for r in pruned if r.relationship_type == "RELATED_TO"}
+        assert pruned_related[("doc_0", "doc_3")].properties["shared_topics"] == ["auth"]
+        
+        # Without an explicit cap the config's applies
+        assert config.max_topic_document_frequency == 1000
+        config.max_topic_document_frequency = 2
+        default_pruned = await store.build_document_relationships(docs)
+        assert {(r.from_node, r.to_node) for r in default_pruned if r.relationship_type == "RELATED_TO"} == pruned_pairs
+        
+        # An explicit None still disables the cap
+        uncapped = await store.build_document_relationships(docs, max_topic_document_frequency=None)
+        assert {(r.from_node, r.to_node) for r in uncapped if r.relationship_type == "RELATED_TO"} == expected
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -29,6 +29,7 @@ from performance_optimizer import (
     create_performance_optimizer,
     analyze_query_performance
 )
+from adaptive_concurrency import ConcurrencyLimitExceeded
 
 class TestPerformanceConfig:
     """Test performance configuration."""
@@ -117,7 +118,7 @@ class TestLRUCache:
         
         assert cache.max_size == 100
         assert cache.ttl_seconds == 300
-        assert len(cache.cache) == 0
+        assert len(cache) == 0
         assert cache.hits == 0
         assert cache.misses == 0
     
@@ -182,7 +183,8 @@ class TestLRUCache:
         assert stats["hits"] == 1
         assert stats["misses"] == 1
         assert stats["hit_rate"] == 0.5
-        assert "memory_usage_estimate" in stats
+        assert stats["memory_bytes"] > 0
+        assert stats["memory_usage_estimate"] == stats["memory_bytes"]
     
     def test_cache_clear(self):
         """Test cache clearing."""
@@ -194,7 +196,7 @@ class TestLRUCache:
         
         cache.clear()
         
-        assert len(cache.cache) == 0
+        assert len(cache) == 0
         assert cache.hits == 0
         assert cache.misses == 0
 
@@ -391,6 +393,74 @@ class TestPerformanceOptimizer:
         assert was_cached2 is True
         assert result1 == result2
     
+    @pytest.mark.asyncio
+    async def test_cached_operation_coalesces_concurrent_misses(self, optimizer):
+        """Test concurrent misses for one key execute the operation once."""
+        execution_count = 0
+        
+        async def slow_operation(**kwargs):
+            nonlocal execution_count
+            execution_count += 1
+            await asyncio.sleep(0.01)
+            return {"result": "success"}
+        
+        results = await asyncio.gather(*(
+            optimizer.cached_operation("query", "slow_op", slow_operation, param="value")
+            for _ in range(10)
+        ))
+        
+        assert execution_count == 1
+        assert all(result == {"result": "success"} for result, _ in results)
+    
+    @pytest.mark.asyncio
+    async def test_cached_operation_serves_stale_while_refreshing(self):
+        """Test an expired result is served while a single background refresh runs."""
+        optimizer = PerformanceOptimizer(PerformanceConfig(
+            cache_ttl_seconds=1,
+            stale_while_revalidate_seconds=60,
+            early_refresh_beta=0.0
+        ))
+        execution_count = 0
+        
+        async def operation(**kwargs):
+            nonlocal execution_count
+            execution_count += 1
+            await asyncio.sleep(0.01)
+            return {"execution": execution_count}
+        
+        await optimizer.cached_operation("result", "op", operation, param="value")
+        
+        with patch("performance_optimizer.time.time", return_value=time.time() + 5):
+            results = await asyncio.gather(*(
+                optimizer.cached_operation("result", "op", operation, param="value") for _ in range(5)
+            ))
+        assert results == [({"execution": 1}, True)] * 5
+        
+        await asyncio.sleep(0.05)
+        assert execution_count == 2
+        result, was_cached = await optimizer.cached_operation("result", "op", operation, param="value")
+        assert result == {"execution": 2}
+        assert was_cached is True
+    
+    @pytest.mark.asyncio
+    async def test_invalidate_sources(self, optimizer):
+        """Test re-ingesting a source drops only the results that reference it."""
+        async def search(source):
+            return [{"id": "chunk", "source_name": source}]
+        
+        async def empty_search(source):
+            return []
+        
+        await optimizer.cached_operation("result", "search", search, source="fastapi")
+        await optimizer.cached_operation("result", "search", search, source="neo4j")
+        await optimizer.cached_operation("result", "empty", empty_search, source="none")
+        
+        assert optimizer.invalidate_sources(["fastapi"]) == 2
+        assert len(optimizer.result_cache) == 1
+        
+        _, was_cached = await optimizer.cached_operation("result", "search", search, source="neo4j")
+        assert was_cached is True
+    
     def test_optimize_search_parameters(self, optimizer):
         """Test search parameter optimization."""
         optimizations = optimizer.optimize_search_parameters(
@@ -492,6 +562,42 @@ class TestPerformanceOptimizer:
         # Should track error in bottlenecks
         assert "error_failing_operation" in optimizer.bottleneck_history
     
+    @pytest.mark.asyncio
+    async def test_execute_rejected_when_backend_saturated(self):
+        """Test work beyond a backend's adaptive limit and queue is rejected early."""
+        optimizer = PerformanceOptimizer(PerformanceConfig(
+            initial_concurrency_limit=1,
+            max_queued_queries=0
+        ))
+        release = asyncio.Event()
+        
+        async def blocking_operation(**kwargs):
+            await release.wait()
+            return {"result": "done"}
+        
+        first = asyncio.ensure_future(optimizer.execute_with_performance_monitoring(
+            "search", blocking_operation, backend="surrealdb"
+        ))
+        await asyncio.sleep(0)
+        
+        with pytest.raises(ConcurrencyLimitExceeded):
+            await optimizer.execute_with_performance_monitoring(
+                "search", blocking_operation, backend="surrealdb"
+            )
+        assert optimizer.bottleneck_history["rejected_search"] == 1
+        
+        # Other backends have their own limits
+        release.set()
+        result, _ = await optimizer.execute_with_performance_monitoring(
+            "traverse", blocking_operation, backend="neo4j"
+        )
+        assert result["result"] == "done"
+        await first
+        
+        limits = optimizer.get_performance_report()["concurrency_limits"]
+        assert limits["surrealdb"]["rejected"] == 1
+        assert limits["neo4j"]["in_flight"] == 0
+    
     @pytest.mark.asyncio
     async def test_adaptive_optimization(self, optimizer):
         """Test adaptive optimization based on performance history."""
@@ -514,8 +620,11 @@ class TestPerformanceOptimizer:
         optimizer.metrics.query_count = 100
         optimizer.metrics.total_query_time_ms = 5000
         optimizer.metrics.avg_query_time_ms = 50
-        optimizer.query_cache.hits = 75
-        optimizer.query_cache.misses = 25
+        optimizer.query_cache.put("hot", "value")
+        for _ in range(75):
+            optimizer.query_cache.get("hot")
+        for _ in range(25):
+            optimizer.query_cache.get("cold")
         
         report = optimizer.get_performance_report()
         
@@ -542,13 +651,30 @@ class TestPerformanceOptimizer:
         optimizer.query_cache.put("key1", "value1")
         optimizer.result_cache.put("key2", "value2")
         
-        assert len(optimizer.query_cache.cache) == 1
-        assert len(optimizer.result_cache.cache) == 1
+        assert len(optimizer.query_cache) == 1
+        assert len(optimizer.result_cache) == 1
         
         optimizer.clear_caches()
         
-        assert len(optimizer.query_cache.cache) == 0
-        assert len(optimizer.result_cache.cache) == 0
+        assert len(optimizer.query_cache) == 0
+        assert len(optimizer.result_cache) == 0
+    
+    def test_cache_memory_budget(self):
+        """Test the cache memory budget is split in proportion to cache sizes."""
+        optimizer = PerformanceOptimizer(PerformanceConfig(
+            query_cache_size=100,
+            result_cache_size=300,
+            embedding_cache_size=0,
+            concept_cache_size=0,
+            cache_memory_mb=4
+        ))
+        
+        assert optimizer.query_cache.max_bytes == 1024 * 1024
+        assert optimizer.result_cache.max_bytes == 3 * 1024 * 1024
+        
+        optimizer.result_cache.put("key", "x" * 1000)
+        report = optimizer.get_performance_report()
+        assert report["performance_metrics"]["memory_usage_mb"] > 0
     
     @pytest.mark.asyncio
     async def test_warmup_caches(self, optimizer):
@@ -558,7 +684,7 @@ class TestPerformanceOptimizer:
         await optimizer.warmup_caches(test_queries)
         
         # Should have added entries to query cache
-        assert len(optimizer.query_cache.cache) == len(test_queries)
+        assert len(optimizer.query_cache) == len(test_queries)
 
 class TestUtilityFunctions:
     """Test utility functions."""
@@ -20,6 +20,7 @@ os.environ['LOGFIRE_IGNORE_NO_CONFIG'] = '1'
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+from cache_codecs import COMPRESSORS, DICTIONARIES, FORMATS
 from redis_cache_layer import (
     RedisCacheLayer,
     RedisCacheConfig,
@@ -30,10 +31,18 @@ from redis_cache_layer import (
     CacheMode,
     SerializationFormat,
     CacheStrategy,
+    EvictionPolicy,
+    LocalCacheTier,
+    LatencyHistogram,
+    NamespaceStats,
+    estimate_size,
     redis_cached,
+    _escape_glob,
     create_redis_cache_layer,
-    warm_cache_with_common_data
+    warm_cache_with_common_data,
+    TAG_KEYS_SCRIPT
 )
+from cache_stampede import wrap_value
 
 class TestRedisCacheConfig:
     """Test Redis cache configuration."""
@@ -142,6 +151,20 @@ class TestCacheMetrics:
         assert metrics.circuit_breaker_trips == 2
         assert metrics.compression_ratio == 0.6
 
+class TestNamespaceStats:
+    """Test per-namespace counters."""
+    
+    def test_to_dict_includes_compression_ratio(self):
+        """Test serialized stats carry the counters and the rounded ratio."""
+        stats = NamespaceStats(writes=3, raw_bytes_written=3000, encoded_bytes_written=1000, hits=2)
+        data = stats.to_dict()
+        
+        assert data["writes"] == 3
+        assert data["hits"] == 2
+        assert data["misses"] == 0
+        assert data["compression_ratio"] == 0.3333
+        assert NamespaceStats().to_dict()["compression_ratio"] == 0.0
+
 class TestCacheEntry:
     """Test cache entry."""
     
@@ -251,6 +274,33 @@ class TestCircuitBreaker:
         assert breaker.state == "CLOSED"
         assert breaker.failure_count == 0
 
+class TestLatencyHistogram:
+    """Test log-bucketed latency percentiles."""
+    
+    def test_percentiles_within_bucket_growth(self):
+        """Test percentiles land within one bucket of the true value."""
+        histogram = LatencyHistogram(growth=1.25)
+        for ms in range(1, 101):
+            histogram.record(float(ms))
+        
+        stats = histogram.stats()
+        assert stats["count"] == 100
+        assert stats["mean_ms"] == 50.5
+        assert 50 <= stats["p50_ms"] <= 50 * 1.25
+        assert 95 <= stats["p95_ms"] <= 95 * 1.25
+        assert 99 <= stats["p99_ms"] <= 100
+        assert stats["max_ms"] == 100
+    
+    def test_empty_and_out_of_range(self):
+        """Test an empty histogram and values beyond the last bucket."""
+        histogram = LatencyHistogram(min_ms=1.0, growth=2.0, buckets=4)
+        assert histogram.percentile(0.99) == 0.0
+        
+        histogram.record(0.001)
+        histogram.record(1000.0)
+        assert histogram.percentile(0.5) == 1.0
+        assert histogram.percentile(1.0) == 1000.0
+
 class TestRedisSerializer:
     """Test Redis serializer."""
     
@@ -329,6 +379,41 @@ class TestRedisSerializer:
             with pytest.raises(TypeError):
                 serializer.serialize({"test": "data"})
     
+    def test_encode_decode_with_header(self):
+        """Test stored values carry their format and codec in a header."""
+        serializer = RedisSerializer(SerializationFormat.COMPRESSED_JSON)
+        data = {"data": "x" * 2000}
+        
+        blob, compressed = serializer.encode(data, compress_threshold=1000)
+        assert compressed is True
+        assert blob[:3] == bytes([0xA7, FORMATS["json"].format_id, serializer.compressor.codec_id])
+        assert serializer.decode(blob) == (data, True)
+        
+        # Values in the gzip format of earlier releases keep their ids
+        legacy = bytes([0xA7, 1, 1]) + gzip.compress(json.dumps(data).encode())
+        assert serializer.decode(legacy) == (data, True)
+        
+        # The header, not the configured format, decides how to read a value
+        assert RedisSerializer(SerializationFormat.PICKLE).decode(blob) == (data, True)
+    
+    def test_encode_with_configured_codec(self):
+        """Test the payload format and compressor can be chosen by name."""
+        serializer = RedisSerializer(SerializationFormat.COMPRESSED_JSON,
+                                     payload_format="columnar", compressor="gzip")
+        data = {"results": [{"id": str(i), "score": i / 10} for i in range(50)]}
+        
+        blob, compressed = serializer.encode(data, compress_threshold=100)
+        assert compressed is True
+        assert blob[1:3] == bytes([FORMATS["columnar"].format_id, COMPRESSORS["gzip"].codec_id])
+        assert RedisSerializer().decode(blob) == (data, True)
+    
+    def test_decode_values_without_header(self):
+        """Test values written before the header existed stay readable."""
+        serializer = RedisSerializer(SerializationFormat.COMPRESSED_JSON)
+        
+        assert serializer.decode(b'{"legacy": true}') == ({"legacy": True}, False)
+        assert serializer.decode(gzip.compress(b'[1, 2]')) == ([1, 2], True)
+    
     def test_deserialization_error_handling(self):
         """Test deserialization error handling."""
         serializer = RedisSerializer(SerializationFormat.JSON)
@@ -337,6 +422,88 @@ class TestRedisSerializer:
         with pytest.raises(json.JSONDecodeError):
             serializer.deserialize(b"invalid json", False)
 
+class TestLocalCacheTier:
+    """Test the bounded local cache tier."""
+    
+    def test_lru_evicts_least_recently_used(self):
+        """Test LRU eviction when the entry limit is reached."""
+        tier = LocalCacheTier(max_entries=2, policy=EvictionPolicy.LRU)
+        tier.put("a", CacheEntry(key="a", value=1))
+        tier.put("b", CacheEntry(key="b", value=2))
+        tier.get("a")
+        tier.put("c", CacheEntry(key="c", value=3))
+        
+        assert "a" in tier and "c" in tier
+        assert "b" not in tier
+        assert tier.evictions == 1
+    
+    def test_remove_tagged(self):
+        """Test tagged entries are dropped together and evicted entries leave the tag index."""
+        tier = LocalCacheTier(max_entries=3)
+        tier.put("a", CacheEntry(key="a", value=1, tags=("source:x",)))
+        tier.put("b", CacheEntry(key="b", value=2, tags=("source:x", "source:y")))
+        tier.put("c", CacheEntry(key="c", value=3, tags=("source:y",)))
+        tier.pop("a")
+        
+        assert tier.remove_tagged("source:x") == 1
+        assert list(tier.keys()) == ["c"]
+        assert tier.remove_tagged("source:x") == 0
+        assert tier.remove_tagged("source:y") == 1
+        assert len(tier) == 0
+    
+    def test_lfu_evicts_least_frequently_used(self):
+        """Test LFU eviction keeps frequently read keys."""
+        tier = LocalCacheTier(max_entries=2, policy=EvictionPolicy.LFU)
+        tier.put("a", CacheEntry(key="a", value=1))
+        tier.put("b", CacheEntry(key="b", value=2))
+        for _ in range(3):
+            tier.get("b")
+        tier.get("a")
+        tier.put("c", CacheEntry(key="c", value=3))
+        tier.put("d", CacheEntry(key="d", value=4))
+        
+        assert "b" in tier and "d" in tier
+        assert "a" not in tier and "c" not in tier
+    
+    def test_byte_limit_and_accounting(self):
+        """Test entries are evicted to stay under the byte limit."""
+        value = "x" * 1000
+        size = estimate_size(value)
+        tier = LocalCacheTier(max_bytes=size * 2 + 10)
+        for key in ["a", "b", "c"]:
+            tier.put(key, CacheEntry(key=key, value=value))
+        
+        assert len(tier) == 2
+        assert tier.total_bytes == 2 * size
+        assert tier.put("big", CacheEntry(key="big", value="y" * 10000)) is False
+        
+        tier.pop("b")
+        assert tier.total_bytes == size
+        assert tier.stats()["memory_bytes"] == size
+    
+    def test_sweep_removes_expired_entries(self):
+        """Test expired entries are reclaimed without being read."""
+        tier = LocalCacheTier(sweep_interval_seconds=0)
+        tier.put("old", CacheEntry(key="old", value=1, ttl_seconds=1, created_at=time.time() - 2))
+        tier.put("live", CacheEntry(key="live", value=2, ttl_seconds=60))
+        
+        assert "old" not in tier
+        assert "live" in tier
+        assert tier.expirations == 1
+        assert tier.total_bytes == estimate_size(2)
+
+    def test_reads_sweep_other_expired_entries(self):
+        """Test a read past the sweep interval reclaims other expired entries."""
+        tier = LocalCacheTier(sweep_interval_seconds=60)
+        tier.put("old", CacheEntry(key="old", value=1, ttl_seconds=1, created_at=time.time() - 2))
+        tier.put("live", CacheEntry(key="live", value=2, ttl_seconds=60))
+        assert "old" in tier
+        
+        tier._next_sweep = time.time()
+        assert tier.get("live").value == 2
+        assert "old" not in tier
+        assert tier.expirations == 1
+
 class TestRedisCacheLayer:
     """Test Redis cache layer functionality."""
     
@@ -361,7 +528,7 @@ class TestRedisCacheLayer:
         assert isinstance(cache_layer.serializer, RedisSerializer)
         assert isinstance(cache_layer.circuit_breaker, CircuitBreaker)
         assert isinstance(cache_layer.metrics, CacheMetrics)
-        assert isinstance(cache_layer.local_cache, dict)
+        assert isinstance(cache_layer.local_cache, LocalCacheTier)
         assert cache_layer.start_time > 0
     
     def test_environment_initialization(self):
@@ -399,6 +566,7 @@ class TestRedisCacheLayer:
             assert cache_layer.redis_client == mock_redis
             mock_from_url.assert_called_once()
             mock_redis.ping.assert_called_once()
+            await cache_layer.close()
     
     @pytest.mark.asyncio
     async def test_connect_standard_redis(self):
@@ -420,6 +588,7 @@ class TestRedisCacheLayer:
             assert cache_layer.redis_client == mock_redis
             mock_from_url.assert_called_once()
             mock_redis.ping.assert_called_once()
+            await cache_layer.close()
     
     @pytest.mark.asyncio
     async def test_connect_failure(self):
@@ -558,6 +727,315 @@ class TestRedisCacheLayer:
         runtime = stats["runtime_info"]
         assert "uptime_seconds" in runtime
         assert "operations_per_second" in runtime
+        
+        # Local tier reports tracked bytes
+        assert stats["local_cache"]["size"] == 1
+        assert stats["local_cache"]["memory_bytes"] == estimate_size("value1")
+    
+    @pytest.mark.asyncio
+    async def test_local_entries_swept_while_idle(self):
+        """Test a timer reclaims expired local entries without any further reads or writes."""
+        cache_layer = RedisCacheLayer(RedisCacheConfig(cache_mode=CacheMode.LOCAL_ONLY, local_sweep_interval_seconds=0.01))
+        await cache_layer.connect()
+        cache_layer.local_cache.put("old", CacheEntry(key="old", value=1, ttl_seconds=1, created_at=time.time() - 2))
+        
+        await asyncio.sleep(0.05)
+        
+        assert "old" not in cache_layer.local_cache
+        sweeper = cache_layer._local_sweeper
+        assert sweeper in cache_layer._background_tasks
+        await cache_layer.close()
+        assert sweeper.cancelled()
+    
+    @pytest.mark.asyncio
+    async def test_clear_namespace_bumps_generation(self):
+        """Test clearing a namespace is one INCR and old keys are swept in the background."""
+        cache_layer = RedisCacheLayer(RedisCacheConfig(cache_mode=CacheMode.HYBRID, generation_sweep_batch=2))
+        # Older generations and the pre-generation key form are swept; the new generation and later stay
+        old_keys = [b"ptolemies:test:g0:key_0", b"ptolemies:test:g0:key_1", b"ptolemies:test:legacy_key"]
+        live_keys = [b"ptolemies:test:g1:key_0", b"ptolemies:test:g2:key_0"]
+        
+        async def scan_iter(match=None, count=None):
+            assert match == "ptolemies:test:*"
+            for key in [old_keys[0], live_keys[0], old_keys[1], old_keys[2], live_keys[1]]:
+                yield key
+        
+        mock_redis = AsyncMock()
+        mock_redis.get.return_value = None
+        mock_redis.set.return_value = True
+        mock_redis.incr.return_value = 1
+        mock_redis.scan_iter = scan_iter
+        mock_redis.unlink.side_effect = lambda *keys: len(keys)
+        mock_redis.info.return_value = {}
+        cache_layer.redis_client = mock_redis
+        
+        await cache_layer.set("key_0", "value", "test")
+        cleared = await cache_layer.clear_namespace("test")
+        await asyncio.gather(*cache_layer._background_tasks)
+        
+        assert cleared == 1
+        mock_redis.incr.assert_called_once_with("ptolemies:generation:test")
+        assert [call.args for call in mock_redis.unlink.call_args_list] == [tuple(old_keys[:2]), tuple(old_keys[2:])]
+        
+        # New reads and writes use the new generation
+        await cache_layer.set("key_0", "value", "test")
+        assert mock_redis.set.call_args.args[0] == "ptolemies:test:g1:key_0"
+        assert (await cache_layer.get_cache_stats())["namespace_generations"] == {"test": 1}
+    
+    def test_escape_glob(self):
+        """Test namespaces with glob characters are matched literally when sweeping."""
+        assert _escape_glob("ptolemies:a*b?[c]:g0:") == "ptolemies:a\\*b\\?\\[c\\]:g0:"
+    
+    @pytest.mark.asyncio
+    async def test_writes_publish_one_invalidation_per_tick(self):
+        """Test keys written together are published once, after the writes land."""
+        cache_layer = RedisCacheLayer(RedisCacheConfig(cache_mode=CacheMode.HYBRID, enable_batching=False))
+        mock_redis = AsyncMock()
+        mock_redis.get.return_value = None
+        cache_layer.redis_client = mock_redis
+        
+        await asyncio.gather(
+            cache_layer.set("key_1", "value", "test"),
+            cache_layer.set("key_2", "value", "test")
+        )
+        await asyncio.gather(*cache_layer._background_tasks)
+        
+        mock_redis.publish.assert_called_once()
+        channel, payload = mock_redis.publish.call_args.args
+        assert channel == "ptolemies:invalidations"
+        assert json.loads(payload) == {
+            "origin": cache_layer.instance_id,
+            "keys": ["ptolemies:test:g0:key_1", "ptolemies:test:g0:key_2"]
+        }
+    
+    @pytest.mark.asyncio
+    async def test_invalidation_messages_evict_local_copies(self):
+        """Test another worker's key and namespace invalidations evict local entries."""
+        cache_layer = RedisCacheLayer(RedisCacheConfig(cache_mode=CacheMode.LOCAL_ONLY))
+        await cache_layer.set("key_1", "value", "test")
+        await cache_layer.set("key_2", "value", "test")
+        await cache_layer.set("key_3", "value", "other")
+        
+        # Our own messages are ignored
+        cache_layer._apply_invalidation(json.dumps({
+            "origin": cache_layer.instance_id, "keys": ["ptolemies:test:g0:key_1"]
+        }))
+        assert len(cache_layer.local_cache) == 3
+        
+        cache_layer._apply_invalidation(json.dumps({
+            "origin": "other-worker", "keys": ["ptolemies:test:g0:key_1", "ptolemies:test:g0:missing"]
+        }))
+        assert "ptolemies:test:g0:key_1" not in cache_layer.local_cache
+        assert len(cache_layer.local_cache) == 2
+        
+        cache_layer._apply_invalidation(json.dumps({
+            "origin": "other-worker", "namespace": "test", "generation": 4
+        }))
+        assert list(cache_layer.local_cache.keys()) == ["ptolemies:other:g0:key_3"]
+        assert await cache_layer._namespace_generation("test") == 4
+        assert cache_layer.invalidation_stats["received"] == 2
+        assert cache_layer.invalidation_stats["keys_evicted"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_invalidation_during_read_skips_local_fill(self):
+        """Test a value read across an invalidation is not kept locally."""
+        cache_layer = RedisCacheLayer(RedisCacheConfig(cache_mode=CacheMode.HYBRID))
+        redis_key = cache_layer._generate_cache_key("test", "key", 0)
+        stale = cache_layer.serializer.encode("old")[0]
+        
+        async def get(key):
+            if key == redis_key:
+                # Another worker's write lands while this read is in flight
+                cache_layer._apply_invalidation(json.dumps({"origin": "other-worker", "keys": [redis_key]}))
+                return stale
+            return None
+        
+        mock_redis = AsyncMock()
+        mock_redis.get.side_effect = get
+        cache_layer.redis_client = mock_redis
+        
+        assert await cache_layer.get("key", "test") == ("old", True)
+        assert redis_key not in cache_layer.local_cache
+        
+        # Without an invalidation in between, the next read fills the local tier
+        mock_redis.get.side_effect = lambda key: stale if key == redis_key else None
+        assert await cache_layer.get("key", "test") == ("old", True)
+        assert redis_key in cache_layer.local_cache
+    
+    @pytest.mark.asyncio
+    async def test_invalidation_listener(self):
+        """Test the listener subscribes on connect and applies received messages."""
+        cache_layer = RedisCacheLayer(RedisCacheConfig(cache_mode=CacheMode.HYBRID))
+        received = asyncio.Event()
+        message = json.dumps({"origin": "other-worker", "keys": ["ptolemies:test:g0:key"]}).encode()
+        
+        class FakePubSub:
+            async def __aenter__(self):
+                return self
+            
+            async def __aexit__(self, *exc_info):
+                return False
+            
+            async def subscribe(self, channel):
+                assert channel == "ptolemies:invalidations"
+            
+            async def listen(self):
+                yield {"type": "subscribe", "data": 1}
+                yield {"type": "message", "data": message}
+                received.set()
+                await asyncio.Event().wait()
+        
+        with patch('redis.asyncio.from_url') as mock_from_url:
+            mock_redis = AsyncMock()
+            mock_redis.pubsub = Mock(return_value=FakePubSub())
+            mock_from_url.return_value = mock_redis
+            assert await cache_layer.connect() is True
+        
+        cache_layer.local_cache.put("ptolemies:test:g0:key", CacheEntry(key="key", value="value", created_at=time.time()))
+        await asyncio.wait_for(received.wait(), 1)
+        
+        assert "ptolemies:test:g0:key" not in cache_layer.local_cache
+        await cache_layer.close()
+        assert cache_layer._invalidation_listener.cancelled()
+    
+    @pytest.mark.asyncio
+    async def test_invalidate_tags(self):
+        """Test tagged keys are read and dropped from Redis and announced to other workers."""
+        cache_layer = RedisCacheLayer(RedisCacheConfig(cache_mode=CacheMode.HYBRID, enable_batching=False))
+        mock_redis = AsyncMock()
+        mock_redis.get.return_value = None
+        tag_pipeline = Mock()
+        tag_pipeline.execute = AsyncMock(return_value=[])
+        invalidate_pipeline = Mock()
+        invalidate_pipeline.execute = AsyncMock(return_value=[
+            {b"ptolemies:query_pipeline:g0:q1"},
+            {b"ptolemies:query_pipeline:g0:q1", b"ptolemies:query_pipeline:g0:q2"},
+            1
+        ])
+        mock_redis.pipeline = Mock(side_effect=[tag_pipeline, invalidate_pipeline])
+        cache_layer.redis_client = mock_redis
+        
+        await cache_layer.set("q1", {"results": []}, "query_pipeline", 60, tags=["source:fastapi"])
+        tag_pipeline.eval.assert_called_once_with(
+            TAG_KEYS_SCRIPT, 1, "ptolemies:tag:source:fastapi", 60, 20, "ptolemies:query_pipeline:g0:q1"
+        )
+        tag_pipeline.expire.assert_not_called()
+        await asyncio.gather(*cache_layer._background_tasks)
+        
+        removed = await cache_layer.invalidate_tags(["source:fastapi", "source:"])
+        await asyncio.gather(*cache_layer._background_tasks)
+        
+        assert removed == 2
+        assert "ptolemies:query_pipeline:g0:q1" not in cache_layer.local_cache
+        mock_redis.pipeline.assert_called_with(transaction=True)
+        invalidate_pipeline.delete.assert_called_once_with("ptolemies:tag:source:fastapi", "ptolemies:tag:source:")
+        mock_redis.unlink.assert_called_once_with("ptolemies:query_pipeline:g0:q1", "ptolemies:query_pipeline:g0:q2")
+        assert json.loads(mock_redis.publish.call_args.args[1])["keys"] == [
+            "ptolemies:query_pipeline:g0:q1", "ptolemies:query_pipeline:g0:q2"
+        ]
+    
+    @pytest.mark.asyncio
+    async def test_namespace_byte_accounting(self):
+        """Test per-namespace bytes, compression ratio, entries and latency are measured."""
+        cache_layer = RedisCacheLayer(RedisCacheConfig(cache_mode=CacheMode.HYBRID, enable_batching=False))
+        mock_redis = AsyncMock()
+        mock_redis.get.return_value = None
+        mock_redis.info.return_value = {}
+        cache_layer.redis_client = mock_redis
+        
+        compressible = {"content": "authentication middleware " * 200}
+        await cache_layer.set("big", compressible, "docs")
+        await cache_layer.set("small", {"n": 1}, "docs")
+        await cache_layer.get("missing", "docs")
+        await cache_layer.get("big", "docs")
+        
+        stats = await cache_layer.get_cache_stats()
+        docs = stats["namespaces"]["docs"]
+        assert docs["writes"] == 2
+        assert docs["hits"] == 1 and docs["misses"] == 1
+        assert docs["local_entries"] == 2
+        assert docs["encoded_bytes_written"] == sum(len(call.args[1]) for call in mock_redis.set.call_args_list)
+        assert 0 < docs["compression_ratio"] < 0.5
+        assert stats["cache_metrics"]["compression_ratio"] == pytest.approx(
+            docs["encoded_bytes_written"] / docs["raw_bytes_written"]
+        )
+        assert stats["latency"]["set"]["count"] == 2
+        assert stats["latency"]["get"]["count"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_get_or_compute_serves_stale_while_refreshing(self):
+        """Test an expired value is served within the stale window while one refresh runs."""
+        cache_layer = RedisCacheLayer(RedisCacheConfig(
+            cache_mode=CacheMode.LOCAL_ONLY,
+            stale_while_revalidate_seconds=60,
+            early_refresh_beta=0.0
+        ))
+        calls = 0
+        
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return f"value_{calls}"
+        
+        assert await cache_layer.get_or_compute("key", compute, "test", ttl_seconds=1) == "value_1"
+        assert await cache_layer.get_or_compute("key", compute, "test", ttl_seconds=1) == "value_1"
+        assert calls == 1
+        
+        # Past its freshness but inside the stale window
+        with patch("redis_cache_layer.time.time", return_value=time.time() + 5):
+            results = await asyncio.gather(*(
+                cache_layer.get_or_compute("key", compute, "test", ttl_seconds=1) for _ in range(5)
+            ))
+        assert results == ["value_1"] * 5
+        
+        await asyncio.sleep(0.05)
+        assert calls == 2
+        assert await cache_layer.get_or_compute("key", compute, "test", ttl_seconds=1) == "value_2"
+        assert cache_layer.stampede_stats["stale_served"] == 5
+    
+    @pytest.mark.asyncio
+    async def test_get_or_compute_waits_for_lease_holder(self):
+        """Test a worker that loses the recompute lease waits for the holder's value."""
+        cache_layer = RedisCacheLayer(RedisCacheConfig(
+            cache_mode=CacheMode.REDIS_ONLY,
+            lease_poll_ms=1,
+            lease_wait_ms=1000
+        ))
+        holder = RedisCacheLayer(RedisCacheConfig(cache_mode=CacheMode.REDIS_ONLY))
+        store = {}
+        
+        async def redis_set(key, value, ex=None, nx=False, px=None):
+            if nx and key in store:
+                return None
+            store[key] = value
+            return True
+        
+        mock_redis = AsyncMock()
+        mock_redis.get.side_effect = store.get
+        mock_redis.set.side_effect = redis_set
+        mock_redis.mget.side_effect = lambda *keys: [store.get(key) for key in keys]
+        cache_layer.redis_client = mock_redis
+        holder.redis_client = mock_redis
+        
+        # Another worker holds the lease and stores the value shortly after
+        store["ptolemies:lease:test:key"] = b"other-worker"
+        
+        async def finish_elsewhere():
+            await asyncio.sleep(0.02)
+            await holder.set("key", wrap_value("from_holder", 60, 0.1), "test")
+        
+        async def compute():
+            raise AssertionError("lease loser must not recompute")
+        
+        results = await asyncio.gather(
+            cache_layer.get_or_compute("key", compute, "test", ttl_seconds=60),
+            finish_elsewhere()
+        )
+        
+        assert results[0] == "from_holder"
+        assert cache_layer.stampede_stats["lease_waits"] == 1
+        assert cache_layer.stampede_stats["computes"] == 0
     
     @pytest.mark.asyncio
     async def test_circuit_breaker_integration(self):
@@ -587,37 +1065,33 @@ class TestRedisCacheLayer:
         cache_layer = RedisCacheLayer(config)
         
         # Mock Redis client
+        stored = {
+            "ptolemies:generation:test": b"3",
+            "ptolemies:test:g3:test_key": b'{"test": "data"}'  # Value written without a header
+        }
         mock_redis = AsyncMock()
-        mock_pipeline = AsyncMock()
-        mock_redis.pipeline.return_value = mock_pipeline
-        
-        # Mock pipeline methods
-        mock_pipeline.get = Mock()
-        mock_pipeline.setex = Mock()
-        
-        # Make execute return actual awaitable result for GET
-        async def mock_execute_get():
-            return [
-                b'{"test": "data"}',  # Value
-                b'{"compressed": false, "size_bytes": 16}'  # Metadata
-            ]
-        
-        mock_pipeline.execute = mock_execute_get
+        mock_redis.get.side_effect = lambda key: stored.get(key)
+        mock_redis.set.return_value = True
         
         cache_layer.redis_client = mock_redis
         
-        # Test get
+        # Test get - the namespace generation is read once, then the value
         result, found = await cache_layer.get("test_key", "test")
         assert found is True
         assert result == {"test": "data"}
+        assert [call.args[0] for call in mock_redis.get.call_args_list] == [
+            "ptolemies:generation:test", "ptolemies:test:g3:test_key"
+        ]
         
-        # Test set - mock different execute for set operation
-        async def mock_execute_set():
-            return [True, True]  # Success for both operations
-        
-        mock_pipeline.execute = mock_execute_set
-        success = await cache_layer.set("test_key", {"test": "data"}, "test")
+        # Test set - one command storing header and payload together
+        success = await cache_layer.set("test_key", {"test": "data"}, "test", ttl_seconds=60)
         assert success is True
+        assert mock_redis.get.call_count == 2  # Generation still fresh
+        mock_redis.set.assert_called_once()
+        args, kwargs = mock_redis.set.call_args
+        assert args[0] == "ptolemies:test:g3:test_key"
+        assert kwargs["ex"] == 60
+        assert cache_layer.serializer.decode(args[1]) == ({"test": "data"}, False)
     
     @pytest.mark.asyncio
     async def test_value_size_limit(self, cache_layer):
@@ -639,7 +1113,7 @@ class TestRedisCacheLayer:
         
         # Set value with short TTL
         test_data = {"message": "Hello World"}
-        redis_key = cache_layer._generate_cache_key("test", "test_key")
+        redis_key = cache_layer._generate_cache_key("test", "test_key", 0)
         
         # Manually add to local cache with TTL
         entry = CacheEntry(
@@ -656,6 +1130,178 @@ class TestRedisCacheLayer:
         assert found is False
         assert redis_key not in cache_layer.local_cache  # Should be removed
     
+    @pytest.mark.asyncio
+    async def test_concurrent_gets_coalesced_into_mget(self):
+        """Test single-key gets in the same tick share one MGET."""
+        cache_layer = RedisCacheLayer(RedisCacheConfig(cache_mode=CacheMode.REDIS_ONLY))
+        serializer = cache_layer.serializer
+        stored = {
+            cache_layer._generate_cache_key("test", f"key_{i}", 0): serializer.encode({"n": i})[0]
+            for i in range(4)
+        }
+        mock_redis = AsyncMock()
+        mock_redis.get.return_value = None  # Namespace generation never bumped
+        mock_redis.mget.side_effect = lambda keys: [stored.get(key) for key in keys]
+        cache_layer.redis_client = mock_redis
+        
+        results = await asyncio.gather(*[cache_layer.get(f"key_{i}", "test") for i in range(5)])
+        
+        assert results == [({"n": i}, True) for i in range(4)] + [(None, False)]
+        mock_redis.mget.assert_called_once()
+        mock_redis.get.assert_called_once_with("ptolemies:generation:test")
+        assert cache_layer.batcher.stats()["round_trips"] == 2  # Generation, then one MGET
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_sets_pipelined(self):
+        """Test single-key sets in the same tick share one pipeline."""
+        cache_layer = RedisCacheLayer(RedisCacheConfig(cache_mode=CacheMode.REDIS_ONLY))
+        mock_redis = AsyncMock()
+        mock_pipeline = Mock()
+        mock_pipeline.execute = AsyncMock(return_value=[True, True, True])
+        mock_redis.pipeline = Mock(return_value=mock_pipeline)
+        cache_layer.redis_client = mock_redis
+        
+        results = await asyncio.gather(*[cache_layer.set(f"key_{i}", i, "test", 60) for i in range(3)])
+        
+        assert results == [True, True, True]
+        mock_redis.pipeline.assert_called_once_with(transaction=False)
+        assert mock_pipeline.set.call_count == 3
+        assert mock_pipeline.set.call_args.kwargs["ex"] == 60
+        mock_redis.set.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_batch_failure_reaches_every_caller(self):
+        """Test a failed batch is reported by each coalesced call."""
+        cache_layer = RedisCacheLayer(RedisCacheConfig(cache_mode=CacheMode.REDIS_ONLY))
+        mock_redis = AsyncMock()
+        mock_redis.mget.side_effect = Exception("Redis error")
+        cache_layer.redis_client = mock_redis
+        
+        results = await asyncio.gather(*[cache_layer.get(f"key_{i}", "test") for i in range(3)])
+        
+        assert results == [(None, False)] * 3
+        assert cache_layer.metrics.errors == 3
+    
+    @pytest.mark.asyncio
+    async def test_get_many_and_set_many(self):
+        """Test multi-key calls use one round trip and fill the local tier."""
+        cache_layer = RedisCacheLayer(RedisCacheConfig(cache_mode=CacheMode.HYBRID))
+        stored = {}
+        mock_pipeline = Mock()
+        mock_pipeline.set.side_effect = lambda key, value, ex=None: stored.__setitem__(key, value)
+        mock_pipeline.execute = AsyncMock(return_value=[True, True])
+        mock_redis = AsyncMock()
+        mock_redis.get.return_value = None
+        mock_redis.pipeline = Mock(return_value=mock_pipeline)
+        mock_redis.mget.side_effect = lambda keys: [stored.get(key) for key in keys]
+        cache_layer.redis_client = mock_redis
+        
+        assert await cache_layer.set_many({"a": 1, "b": {"x": 2}}, "test") is True
+        assert len(stored) == 2
+        
+        # Local hits are served without Redis; only the rest go to MGET
+        cache_layer.local_cache.pop(cache_layer._generate_cache_key("test", "b", 0))
+        results = await cache_layer.get_many(["a", "b", "c"], "test")
+        
+        assert results == [(1, True), ({"x": 2}, True), (None, False)]
+        mock_redis.mget.assert_called_once_with([
+            cache_layer._generate_cache_key("test", "b", 0),
+            cache_layer._generate_cache_key("test", "c", 0)
+        ])
+        assert cache_layer._generate_cache_key("test", "b", 0) in cache_layer.local_cache
+    
+    @pytest.mark.asyncio
+    async def test_get_many_undecodable_value_is_a_miss(self):
+        """Test one corrupt value misses for its key without failing the batch."""
+        cache_layer = RedisCacheLayer(RedisCacheConfig(cache_mode=CacheMode.REDIS_ONLY))
+        good = cache_layer.serializer.encode({"n": 1})[0]
+        mock_redis = AsyncMock()
+        mock_redis.get.return_value = None
+        mock_redis.mget.return_value = [good, b"\xff corrupt", good]
+        cache_layer.redis_client = mock_redis
+        
+        results = await cache_layer.get_many(["a", "b", "c"], "test")
+        
+        assert results == [({"n": 1}, True), (None, False), ({"n": 1}, True)]
+        assert cache_layer.metrics.errors == 0
+        assert cache_layer.metrics.misses == 1
+        assert cache_layer.circuit_breaker.failure_count == 0
+    
+    @pytest.mark.asyncio
+    async def test_batcher_keeps_flush_tasks_referenced(self):
+        """Test scheduled flushes are held until they finish."""
+        cache_layer = RedisCacheLayer(RedisCacheConfig(cache_mode=CacheMode.REDIS_ONLY))
+        release = asyncio.Event()
+        
+        async def slow_get(key):
+            await release.wait()
+            return b"value"
+        
+        mock_redis = AsyncMock()
+        mock_redis.get.side_effect = slow_get
+        cache_layer.redis_client = mock_redis
+        batcher = cache_layer.batcher
+        
+        pending = asyncio.ensure_future(batcher.get("k"))
+        for _ in range(3):
+            await asyncio.sleep(0)
+        
+        assert len(batcher._flush_tasks) == 1
+        release.set()
+        assert await pending == b"value"
+        await asyncio.sleep(0)
+        assert batcher._flush_tasks == set()
+    
+    @pytest.mark.asyncio
+    async def test_dictionary_shared_through_redis(self):
+        """Test a trained dictionary is stored in Redis and loaded by other workers."""
+        store = {}
+        
+        async def redis_set(key, value, ex=None):
+            store[key] = value
+            return True
+        
+        async def redis_get(key):
+            return store.get(key)
+        
+        mock_redis = AsyncMock()
+        mock_redis.set.side_effect = redis_set
+        mock_redis.get.side_effect = redis_get
+        
+        config = RedisCacheConfig(cache_mode=CacheMode.REDIS_ONLY, compression_threshold=10)
+        writer = RedisCacheLayer(config)
+        writer.redis_client = mock_redis
+        writer.serializer.sample_every = 1
+        for i in range(10):
+            await writer.set(f"key_{i}", {"title": f"FastAPI dependency injection {i}", "source_name": "fastapi"}, "test")
+        
+        dict_id = await writer.train_compression_dictionary()
+        assert dict_id is not None
+        assert writer.serializer.compressor.name == "deflate-dict"
+        assert writer._dictionary_key(dict_id) in store
+        await writer.set("trained", {"title": "FastAPI dependency injection", "source_name": "fastapi"}, "test")
+        
+        # A worker that has never seen the dictionary fetches it on first read
+        del DICTIONARIES[dict_id]
+        reader = RedisCacheLayer(RedisCacheConfig(cache_mode=CacheMode.REDIS_ONLY))
+        reader.redis_client = mock_redis
+        result, found = await reader.get("trained", "test")
+        assert found is True
+        assert result == {"title": "FastAPI dependency injection", "source_name": "fastapi"}
+        assert dict_id in DICTIONARIES
+    
+    @pytest.mark.asyncio
+    async def test_tune_codecs_switches_codec(self, cache_layer):
+        """Test codec tuning benchmarks samples and keeps old values readable."""
+        await cache_layer.set("before", {"value": 1}, "test")
+        samples = [{"results": [{"id": f"{i}_{j}", "score": j / 3} for j in range(20)]} for i in range(10)]
+        
+        best = await cache_layer.tune_codecs(samples)
+        
+        assert best["format"] in ("json", "columnar")
+        assert cache_layer.serializer.payload_format.name == best["format"]
+        assert await cache_layer.tune_codecs(samples[:2]) is None
+    
     @pytest.mark.asyncio
     async def test_close_connection(self, cache_layer):
         """Test closing Redis connection."""
@@ -725,6 +1371,24 @@ class TestRedisDecorator:
         assert result2 == "result_test"
         assert call_count == 1
 
+    @pytest.mark.asyncio
+    async def test_redis_cached_coalesces_concurrent_misses(self):
+        """Test concurrent callers of an uncached key run the function once."""
+        cache_layer = RedisCacheLayer(RedisCacheConfig(cache_mode=CacheMode.LOCAL_ONLY))
+        call_count = 0
+        
+        @redis_cached(namespace="test")
+        async def slow_function(param):
+            nonlocal call_count
+            call_count += 1
+            await asyncio.sleep(0.01)
+            return f"result_{param}"
+        
+        results = await asyncio.gather(*(slow_function("a", cache_layer=cache_layer) for _ in range(10)))
+        
+        assert results == ["result_a"] * 10
+        assert call_count == 1
+
 class TestUtilityFunctions:
     """Test utility functions."""
     
@@ -817,7 +1481,7 @@ class TestIntegrationScenarios:
         
         # Test local cache hit first
         test_data = {"hybrid": "test"}
-        redis_key = cache_layer._generate_cache_key("test", "hybrid_key")
+        redis_key = cache_layer._generate_cache_key("test", "hybrid_key", 0)
         
         # Add to local cache
         entry = CacheEntry(
@@ -877,7 +1541,7 @@ class TestIntegrationScenarios:
         
         # Mock Redis client that fails
         mock_redis = AsyncMock()
-        mock_redis.pipeline.side_effect = Exception("Redis error")
+        mock_redis.get.side_effect = Exception("Redis error")
         cache_layer.redis_client = mock_redis
         
         # Perform operations that will fail
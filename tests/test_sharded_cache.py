@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test suite for the sharded in-process cache
+"""
+
+import os
+import sys
+import threading
+from unittest.mock import patch
+from pathlib import Path
+
+# Set logfire config for testing
+os.environ['LOGFIRE_IGNORE_NO_CONFIG'] = '1'
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from sharded_cache import ShardedCache, TimingWheel, estimate_size
+
+class TestTimingWheel:
+    """Test hierarchical timing wheel expiry."""
+    
+    def test_expires_on_due_tick(self):
+        """Test keys expire once their time has passed, not before."""
+        wheel = TimingWheel(tick_seconds=1.0, slots=4, levels=2, now=100.0)
+        wheel.schedule("a", 102.5)
+        wheel.schedule("b", 110.0)
+        
+        assert wheel.advance(102.0) == []
+        assert wheel.advance(103.0) == ["a"]
+        assert wheel.advance(109.0) == []
+        assert wheel.advance(110.0) == ["b"]
+        assert len(wheel) == 0
+    
+    def test_cascades_and_parks_far_entries(self):
+        """Test entries beyond the wheel's range still expire on time."""
+        wheel = TimingWheel(tick_seconds=1.0, slots=4, levels=2, now=0.0)
+        # Levels span 4 and 16 ticks, so 50 is parked and 13 cascades
+        wheel.schedule("near", 13.0)
+        wheel.schedule("far", 50.0)
+        
+        assert wheel.advance(12.0) == []
+        assert wheel.advance(13.0) == ["near"]
+        assert wheel.advance(49.0) == []
+        assert wheel.advance(1000.0) == ["far"]
+    
+    def test_cancel_and_reschedule(self):
+        """Test cancelled keys never expire and rescheduling moves them."""
+        wheel = TimingWheel(tick_seconds=1.0, slots=4, levels=2, now=0.0)
+        wheel.schedule("a", 2.0)
+        wheel.schedule("b", 2.0)
+        wheel.cancel("a")
+        wheel.schedule("b", 5.0)
+        
+        assert wheel.advance(3.0) == []
+        assert wheel.advance(5.0) == ["b"]
+
+class TestShardedCache:
+    """Test sharded cache behaviour."""
+    
+    def test_expired_entries_removed_without_reads(self):
+        """Test expiry frees entries that are never read again."""
+        with patch("sharded_cache.time.time", return_value=1000.0):
+            cache = ShardedCache(max_size=10, ttl_seconds=5, shards=1)
+            cache.put("old", "value")
+        
+        with patch("sharded_cache.time.time", return_value=1006.0):
+            assert cache.purge_expired() == 1
+        
+        assert len(cache) == 0
+        assert cache.memory_bytes == 0
+        assert cache.stats()["expirations"] == 1
+    
+    def test_byte_capacity_eviction(self):
+        """Test least recently used entries are evicted to stay within max_bytes."""
+        value_size = estimate_size("x" * 1000)
+        cache = ShardedCache(max_size=100, ttl_seconds=300, max_bytes=value_size * 2, shards=1)
+        
+        cache.put("a", "x" * 1000)
+        cache.put("b", "y" * 1000)
+        cache.get("a")
+        cache.put("c", "z" * 1000)
+        
+        assert "a" in cache
+        assert "b" not in cache
+        assert cache.memory_bytes <= value_size * 2
+        assert cache.stats()["evictions"] == 1
+        
+        # A value larger than the whole budget is not cached
+        assert cache.put("huge", "x" * 10000) is False
+        assert "huge" not in cache
+    
+    def test_shard_count(self):
+        """Test small caches use fewer shards."""
+        assert ShardedCache(max_size=10, shards=16).stats()["shards"] == 1
+        assert ShardedCache(max_size=256, shards=16).stats()["shards"] == 4
+        assert ShardedCache(max_size=5000, shards=16).stats()["shards"] == 16
+    
+    def test_invalidate_tag(self):
+        """Test entries are removed by tag across shards."""
+        cache = ShardedCache(max_size=1000, ttl_seconds=300, shards=8, min_shard_size=1)
+        for i in range(20):
+            cache.put(f"key{i}", i, tags=("even",) if i % 2 == 0 else ())
+        
+        assert cache.invalidate_tag("even") == 10
+        assert len(cache) == 10
+        assert cache.invalidate_tag("even") == 0
+    
+    def test_concurrent_access(self):
+        """Test threads putting and getting concurrently keep counts consistent."""
+        cache = ShardedCache(max_size=10000, ttl_seconds=300, shards=16)
+        
+        def worker(worker_id):
+            for i in range(500):
+                cache.put(f"{worker_id}:{i}", i)
+                assert cache.get(f"{worker_id}:{i}") == i
+        
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert len(cache) == 4000
+        assert cache.hits == 4000
+        assert cache.memory_bytes == sum(estimate_size(i) for i in range(500)) * 8
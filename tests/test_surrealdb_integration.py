@@ -25,6 +25,8 @@ from surrealdb_integration import (
     create_vector_store,
     migrate_crawl_data_to_vector_store
 )
+from connection_pool import SurrealConnectionPool
+from adaptive_concurrency import AIMDLimiter
 
 class TestVectorStoreConfig:
     """Test VectorStoreConfig dataclass."""
@@ -191,10 +193,14 @@ class TestSurrealDBVectorStore:
         result = await store.connect()
         
         assert result is True
-        assert store.db == mock_surrealdb
+        assert isinstance(store.db, SurrealConnectionPool)
+        assert store.db.size == config.pool_min_size
         mock_surrealdb.connect.assert_called_once_with("ws://test:8000/rpc")
         mock_surrealdb.signin.assert_called_once_with({"user": "testuser", "pass": "testpass"})
         mock_surrealdb.use.assert_called_once_with("ptolemies", "knowledge")
+        
+        await store.close()
+        mock_surrealdb.close.assert_called_once()
     
     @pytest.mark.asyncio
     @patch('surrealdb_integration.Surreal')
@@ -370,6 +376,25 @@ class TestSurrealDBVectorStore:
         assert "source_name IN" in query_args
         assert "quality_score >= 0.8" in query_args
     
+    @pytest.mark.asyncio
+    async def test_queries_hold_a_limiter_slot(self, config, mock_surrealdb):
+        """Test SurrealDB calls count against the store's adaptive concurrency limit."""
+        limiter = AIMDLimiter("surrealdb", target_latency_ms=1000)
+        store = SurrealDBVectorStore(config, limiter=limiter)
+        store.db = mock_surrealdb
+        in_flight = []
+        
+        async def query(*args):
+            in_flight.append(limiter.in_flight)
+            return [[]]
+        
+        mock_surrealdb.query.side_effect = query
+        await store.get_document_chunks()
+        
+        assert in_flight == [1]
+        assert limiter.in_flight == 0
+        assert limiter.admitted == 1
+    
     @pytest.mark.asyncio
     async def test_get_document_chunks(self, config, mock_surrealdb):
         """Test retrieving document chunks."""